@@ -1,10 +1,10 @@
 import json
+import os
 import time
 import uuid
 from dotenv import load_dotenv
-from typing import Any, Dict, TypedDict, Annotated, Sequence, Optional, Literal
+from typing import Any, Dict, List, TypedDict, Annotated, Sequence, Optional, Literal
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from langchain_core.messages import (
     HumanMessage,
     AIMessage,
@@ -15,7 +15,12 @@ from langchain_core.messages import (
 from langgraph.graph.message import add_messages
 from infrastructure.llm.llm_provider import LLMProvider
 from infrastructure.llm.two_phase_parser import TwoPhaseParser
+from application.agents.fan_out import SYNTHESIS_PROMPT, QueryFanOut, synthesis_input
+from application.agents.hybrid_splitter import HybridQuerySplitter
+from application.agents.parallel_tools import ParallelToolExecutor
+from application.agents.tool_memo import get_tool_memo
 from application.agents.tool_registry import ALL_TOOLS
+from application.services.market.alert_service import take_alert_notices
 from infrastructure.resilience.guardrails import (
     get_output_guardrails,
 )
@@ -45,14 +50,16 @@ CÁC LOẠI TRUY VẤN:
 10. alert_query: Cảnh báo giá khi ticker vượt ngưỡng. Input: tickers (bắt buộc), threshold (bắt buộc), condition.
 11. forecast_query: Dự báo giá cổ phiếu. Input: tickers (bắt buộc), timeframe.
 12. sector_query: Phân tích hiệu suất cổ phiếu theo ngành. Input: sector (bắt buộc), metric.
+13. screening_query: Lọc cổ phiếu toàn thị trường/ngành theo điều kiện chỉ số tài chính. Input: filters (field/op/value), sector, sort_by, limit.
 
 QUY TẮC:
 1. Gọi công cụ phù hợp dựa trên parsed_query.
-2. Nếu câu hỏi cần nhiều dữ liệu, hãy gọi nhiều công cụ tuần tự.
+2. Nếu câu hỏi cần nhiều dữ liệu độc lập, hãy gọi nhiều công cụ cùng lúc trong một lượt (chúng được chạy song song).
 3. Sau khi nhận kết quả từ công cụ, tổng hợp thành câu trả lời rõ ràng bằng tiếng Việt.
 4. Dừng lại khi đã có câu trả lời hoàn chỉnh.
 5. Nếu công cụ trả về lỗi (bắt đầu bằng TOOL_ERR#), hãy giải thích lỗi cho người dùng và dừng lại.
-6. Hãy ngắn gọn nhưng đầy đủ thông tin. Đưa ra số liệu cụ thể khi có thể."""
+6. Hãy ngắn gọn nhưng đầy đủ thông tin. Đưa ra số liệu cụ thể khi có thể.
+7. Chuỗi dữ liệu dài được trả về dạng cột: "rows" là tổng số dòng, "summary" chứa first/last/min/max/mean/change_pct tính trên toàn bộ chuỗi, "columns" có thể chỉ là các điểm lấy mẫu (xem "sampled_rows"). Dùng "summary" cho số liệu tổng hợp."""
 
 
 class AgentState(TypedDict):
@@ -65,18 +72,28 @@ class AgentState(TypedDict):
     retry_count: int
     iterations: int
     original_query: str
+    sub_queries: List[str]
 
 
 class StockAgent:
-    def __init__(self, model="llama-3.1-8b-instant"):
+    def __init__(self, model="llama-3.1-8b-instant", fan_out: Optional[bool] = None):
         load_dotenv()
 
         self.llm_provider = LLMProvider()
         self.two_phase_parser = TwoPhaseParser(llm_provider=self.llm_provider)
         self.tools = ALL_TOOLS
-        self.tool_node = ToolNode(self.tools)
+        self.tool_node = ParallelToolExecutor(self.tools)
         self.llm = self.llm_provider.get_tool_calling_llm(self.tools)
 
+        # Fan-out mode: compound questions are split and answered by concurrent
+        # parser -> tool pipelines plus one synthesis call instead of the agent loop
+        if fan_out is None:
+            fan_out = os.getenv("AGENT_FAN_OUT", "").lower() in ("1", "true", "yes")
+        self.fan_out_enabled = fan_out
+        if fan_out:
+            self.query_splitter = HybridQuerySplitter(llm_provider=self.llm_provider)
+            self.fan_out = QueryFanOut(self.two_phase_parser, self.tool_node)
+
         graph = StateGraph(AgentState)
 
         def parser_node(state: AgentState) -> dict:
@@ -212,6 +229,52 @@ class StockAgent:
 
         graph.add_node("final_answer", final_answer_node)
 
+        def router_node(state: AgentState) -> dict:
+            query = state.get("original_query", "")
+            sub_queries = []
+            if self.query_splitter.may_be_compound(query):
+                sub_queries = self.query_splitter.split(query)
+            return {"sub_queries": sub_queries if len(sub_queries) > 1 else []}
+
+        def route_query(state: AgentState) -> Literal["fan_out", "single"]:
+            return "fan_out" if len(state.get("sub_queries") or []) > 1 else "single"
+
+        def fan_out_node(state: AgentState) -> dict:
+            node_logger = get_logger("agent.fan_out")
+            rid = request_id_var.get() or "unknown"
+            request_id_var.set(rid)
+            start = time.time()
+
+            query = state.get("original_query", "")
+            answers = self.fan_out.run(state["sub_queries"])
+            parsed = {"query_type": "multi_query", "sub_queries": [a["parsed"] for a in answers]}
+
+            try:
+                response = self.llm_provider.invoke_with_fallback([
+                    SystemMessage(content=SYNTHESIS_PROMPT),
+                    HumanMessage(content=synthesis_input(query, answers)),
+                ])
+                content = response.content
+            except Exception as e:
+                node_logger.error("Fan-out synthesis failed", extra={
+                    "request_id": rid,
+                    "error_type": type(e).__name__,
+                    "error": str(e),
+                })
+                content = "Xin lỗi, đã xảy ra lỗi khi xử lý yêu cầu của bạn. Vui lòng thử lại sau."
+
+            node_logger.info("Fan-out completed", extra={
+                "request_id": rid,
+                "sub_queries": len(answers),
+                "query_types": [a["parsed"].get("query_type") for a in answers],
+                "duration_ms": round((time.time() - start) * 1000, 2),
+            })
+            return {
+                "messages": [AIMessage(content=content)],
+                "parsed_query": parsed,
+                "iterations": state.get("iterations", 0) + 1,
+            }
+
         def should_continue(state: AgentState) -> Literal["continue", "end"]:
             messages = state["messages"]
             if not messages:
@@ -221,7 +284,14 @@ class StockAgent:
                 return "continue"
             return "end"
 
-        graph.set_entry_point("parser")
+        if self.fan_out_enabled:
+            graph.add_node("router", router_node)
+            graph.add_node("fan_out", fan_out_node)
+            graph.set_entry_point("router")
+            graph.add_conditional_edges("router", route_query, {"fan_out": "fan_out", "single": "parser"})
+            graph.add_edge("fan_out", "final_answer")
+        else:
+            graph.set_entry_point("parser")
         graph.add_edge("parser", "agent")
         graph.add_conditional_edges(
             "agent",
@@ -266,24 +336,37 @@ class StockAgent:
             "retry_count": 0,
             "iterations": 0,
             "original_query": query,
+            "sub_queries": [],
         }
         final_response = ""
         try:
-            for step in self.app.stream(init_state, stream_mode="values"):
-                if "messages" in step:
-                    self.print_messages(step["messages"])
-                    if step["messages"] and isinstance(step["messages"][-1], AIMessage):
-                        final_response = step["messages"][-1].content
-                if "parsed_query" in step and step["parsed_query"]:
-                    self._last_parsed_query = step["parsed_query"]
-                if "confidence" in step:
-                    self._last_confidence = step["confidence"]
+            with get_tool_memo().request_scope(rid):
+                for step in self.app.stream(init_state, stream_mode="values"):
+                    if "messages" in step:
+                        self.print_messages(step["messages"])
+                        if step["messages"] and isinstance(step["messages"][-1], AIMessage):
+                            final_response = step["messages"][-1].content
+                    if "parsed_query" in step and step["parsed_query"]:
+                        self._last_parsed_query = step["parsed_query"]
+                    if "confidence" in step:
+                        self._last_confidence = step["confidence"]
         except Exception as e:
             agent_logger = get_logger("agent._execute_graph")
             agent_logger.exception("Agent execution failed", extra={
                 "request_id": rid, "error": str(e)
             })
             final_response = "Xin lỗi, đã xảy ra lỗi trong quá trình xử lý. Vui lòng thử lại sau."
+
+        # Watch alerts fire between turns; the owner sees them on the next answer
+        try:
+            notices = take_alert_notices()
+        except Exception as e:
+            get_logger("agent._execute_graph").warning("Alert notices unavailable", extra={
+                "request_id": rid, "error": str(e)
+            })
+            notices = ""
+        if notices:
+            final_response = f"{final_response}\n\n{notices}" if final_response else notices
         return final_response
 
     def run(self, query: str, request_id: Optional[str] = None):
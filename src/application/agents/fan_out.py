@@ -0,0 +1,99 @@
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, List
+
+from application.agents.parallel_tools import ParallelToolExecutor
+from application.agents.tool_registry import TOOL_ERR_PREFIX, TOOL_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Seconds a sub-question may spend in the parser before its tool deadline starts
+PARSE_TIMEOUT_SECONDS = 20
+_MAX_WORKERS = 4
+
+SYNTHESIS_PROMPT = """Bạn là một agent chứng khoán chuyên nghiệp tại thị trường Việt Nam.
+Câu hỏi của người dùng đã được tách thành các câu hỏi con, mỗi câu hỏi con đã có kết quả từ công cụ.
+Hãy tổng hợp thành MỘT câu trả lời rõ ràng bằng tiếng Việt, trả lời lần lượt từng ý.
+- Chỉ dùng số liệu có trong kết quả, không tự suy đoán.
+- Kết quả bắt đầu bằng TOOL_ERR# là lỗi: nêu ngắn gọn ý đó không lấy được dữ liệu.
+- Chuỗi dữ liệu dạng cột: "summary" là thống kê trên toàn bộ chuỗi, "columns" có thể chỉ là điểm lấy mẫu."""
+
+
+class QueryFanOut:
+    """
+    Runs each sub-question of a compound query through its own parser -> tool
+    pipeline, concurrently.
+
+    The parser already yields query_type and params, so no tool-calling LLM round
+    is needed per sub-question. Tool calls go through the ParallelToolExecutor's
+    invoke for the same error handling; each pipeline is bounded by the parse
+    budget plus the longest tool timeout.
+    """
+
+    def __init__(
+        self,
+        parser: Any,
+        executor: ParallelToolExecutor,
+        parse_timeout: float = PARSE_TIMEOUT_SECONDS,
+        max_workers: int = _MAX_WORKERS
+    ):
+        self.parser = parser
+        self.executor = executor
+        self.parse_timeout = parse_timeout
+        self.max_workers = max_workers
+
+    def _pipeline(self, index: int, question: str) -> Dict[str, Any]:
+        parsed = self.parser.parse(question)
+        query_type = parsed.get("query_type", "unknown")
+        tool = TOOL_REGISTRY.get(query_type)
+        if tool is None:
+            return {"question": question, "parsed": parsed,
+                    "result": f"{TOOL_ERR_PREFIX} No tool for {query_type}."}
+        call = {"id": f"fan_out_{index}", "name": tool.name, "args": {"query": parsed}}
+        return {"question": question, "parsed": parsed, "result": self.executor.invoke(call)}
+
+    def run(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """One {question, parsed, result} per sub-question, in input order."""
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(questions)))
+        futures = [
+            pool.submit(contextvars.copy_context().run, self._pipeline, i, q)
+            for i, q in enumerate(questions)
+        ]
+        # Budget for the slowest tool; the parsed query types are not known up front
+        deadline = start + self.parse_timeout + max(
+            [self.executor.default_timeout, *self.executor.timeouts.values()]
+        )
+        answers = []
+        try:
+            for question, future in zip(questions, futures):
+                try:
+                    answers.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+                except FuturesTimeoutError:
+                    future.cancel()
+                    answers.append({"question": question, "parsed": {},
+                                    "result": f"{TOOL_ERR_PREFIX} Sub-question timed out."})
+                except Exception as e:
+                    logger.exception("Fan-out pipeline failed")
+                    answers.append({"question": question, "parsed": {},
+                                    "result": f"{TOOL_ERR_PREFIX} Error while handling sub-question: {e}"})
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(f"Fanned out {len(questions)} sub-questions in {(time.monotonic() - start) * 1000:.1f} ms")
+        return answers
+
+
+def synthesis_input(original_query: str, answers: List[Dict[str, Any]]) -> str:
+    """User message for the single synthesis call over all sub-question results."""
+    lines = [f"Câu hỏi gốc: {original_query}", ""]
+    for i, answer in enumerate(answers, 1):
+        lines.append(f"[{i}] {answer['question']}")
+        lines.append(f"query_type={answer['parsed'].get('query_type', 'unknown')} "
+                     f"params={json.dumps(answer['parsed'], ensure_ascii=False, default=str)}")
+        lines.append(f"Kết quả: {answer['result']}")
+        lines.append("")
+    return "\n".join(lines)
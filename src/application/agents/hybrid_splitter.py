@@ -6,6 +6,25 @@ from infrastructure.llm.llm_provider import LLMProvider, MultiQuery
 
 logger = logging.getLogger(__name__)
 
+_TICKER = re.compile(r"\b[A-Z][A-Z0-9]{2}\b")
+# Three-letter indicator and ratio names that look like tickers
+_FIELD_TOKENS = frozenset({
+    "RSI", "SMA", "EMA", "ATR", "ADX", "CCI", "OBV", "EPS", "ROE", "ROA", "ROS", "DPS", "NAV", "VND", "USD",
+})
+_FIELD = re.compile(
+    r"\b(giá|gia|volume|khối lượng|ohlcv|sma|ema|rsi|macd|bollinger|atr|adx|p/?e|p/?b|roe|roa|eps|"
+    r"cổ đông|ban lãnh đạo|công ty con|tin tức|dự báo|cảnh báo)"
+)
+_ACTION = re.compile(r"\b(lấy|tính|xem|phân tích|cho biết)\b")
+_COMPARISON = re.compile(r"(so sánh|so với|\bvs\b|\bhơn\b)")
+# Connectors that always start a new question, and those that may only join a list
+_SEQUENCE = re.compile(r"\s+(?:rồi|sau đó|đồng thời)\s+|[;?]\s*\S|\.\s+\S")
+_JOINERS = re.compile(r"\s+(?:và|cùng với)\s+|,\s*")
+
+
+def _has_ticker(text: str) -> bool:
+    return any(token not in _FIELD_TOKENS for token in _TICKER.findall(text))
+
 
 class HybridQuerySplitter:
     def __init__(self, llm_provider: Optional[LLMProvider] = None):
@@ -54,6 +73,13 @@ class HybridQuerySplitter:
                 if len(parts) > 1:
                     return parts
 
+        # Ex: "giá VCB và RSI của HPG" -> each side names its own field and ticker;
+        # "So sánh giá VCB và giá BID" stays one comparison
+        if not _COMPARISON.search(original):
+            parts = [p.strip() for p in _JOINERS.split(text) if p.strip()]
+            if len(parts) > 1 and all(_has_ticker(p) and _FIELD.search(p.lower()) for p in parts):
+                return parts
+
         # 3) Pattern "..., rồi ..."
         if " rồi " in original:
             parts = [p.strip() for p in re.split(
@@ -91,6 +117,26 @@ class HybridQuerySplitter:
     # ----------------------------------------------------------------------
     # PUBLIC API
     # ----------------------------------------------------------------------
+    @staticmethod
+    def may_be_compound(text: str) -> bool:
+        """
+        Cheap pre-check so callers can skip the LLM split for single questions.
+
+        True for sequencing connectors ("rồi", ";", a second sentence). "và" and
+        commas only count when at least two of the joined parts ask for something
+        (a field or an action), so ticker lists and comparisons are single questions.
+        """
+        if not text:
+            return False
+        text = text.strip().rstrip("?.!")
+        if _SEQUENCE.search(text):
+            return True
+        lowered = text.lower()
+        if _COMPARISON.search(lowered):
+            return False
+        parts = _JOINERS.split(lowered)
+        return sum(1 for p in parts if _FIELD.search(p) or _ACTION.search(p)) >= 2
+
     def split(self, text: str) -> List[str]:
         """
         Return list of questions answered by hybrid approach.
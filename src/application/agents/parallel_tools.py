@@ -0,0 +1,124 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from application.agents.tool_registry import TOOL_ERR_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single tool call may run before its result is replaced by a timeout
+# error. Tools that scan many tickers or fit models get more room.
+TOOL_TIMEOUT_SECONDS: Dict[str, float] = {
+    "handle_forecast_query": 60,
+    "handle_sector_query": 60,
+    "handle_screening_query": 60,
+    "handle_portfolio_query": 45,
+}
+DEFAULT_TOOL_TIMEOUT_SECONDS = 30
+_MAX_WORKERS = 8
+# How often a waiter re-checks a call that is still queued behind busy workers
+_QUEUED_POLL_SECONDS = 0.05
+
+
+class ParallelToolExecutor:
+    """
+    Graph node that runs the tool calls of the last AIMessage concurrently, each
+    under a per-tool timeout.
+
+    It stands in for langgraph's ToolNode, which also runs calls concurrently but
+    has no timeout, so one hung vendor call would stall the whole turn. Each call
+    runs in a copy of the caller's context (request id, memo scope) and receives
+    the node's RunnableConfig, so callbacks, tracing and tags reach the tool.
+
+    A call's timeout is measured from when a worker starts it. A call still queued
+    behind ``max_workers`` busy workers when its timeout has elapsed since the
+    batch started is cancelled unstarted. Python threads cannot be interrupted, so
+    a running call that times out keeps its worker until the tool returns; its
+    result is discarded. Either way the call is answered with a timeout error.
+    ToolMessages are returned in the order of the tool calls.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Any],
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = DEFAULT_TOOL_TIMEOUT_SECONDS,
+        max_workers: int = _MAX_WORKERS
+    ):
+        self.tools = {t.name: t for t in tools}
+        self.timeouts = dict(TOOL_TIMEOUT_SECONDS if timeouts is None else timeouts)
+        self.default_timeout = default_timeout
+        self.max_workers = max_workers
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.default_timeout)
+
+    def invoke(self, call: Dict[str, Any], config: Optional[RunnableConfig] = None) -> str:
+        """Run one tool call on the current thread; failures become TOOL_ERR strings."""
+        tool = self.tools.get(call["name"])
+        if tool is None:
+            return f"{TOOL_ERR_PREFIX} Unknown tool {call['name']}."
+        try:
+            return tool.invoke(call.get("args") or {}, config)
+        except Exception as e:
+            logger.exception(f"{call['name']} failed")
+            return f"{TOOL_ERR_PREFIX} Error while running {call['name']}: {e}"
+
+    def _wait(self, future: Future, started: List[Optional[float]], index: int, timeout: float, start: float) -> Any:
+        # Deadline runs from the call's own start; while queued, from the batch start
+        while True:
+            began = started[index]
+            deadline = (began if began is not None else start) + timeout
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and (began is not None or future.cancel()):
+                raise FuturesTimeoutError()
+            wait_for = remaining if began is not None else min(max(remaining, 0), _QUEUED_POLL_SECONDS)
+            try:
+                return future.result(timeout=wait_for)
+            except FuturesTimeoutError:
+                continue
+
+    def run(self, calls: List[Dict[str, Any]], config: Optional[RunnableConfig] = None) -> List[ToolMessage]:
+        """Execute tool calls concurrently; one ToolMessage per call, in call order."""
+        if not calls:
+            return []
+
+        started: List[Optional[float]] = [None] * len(calls)
+
+        def timed(index: int, call: Dict[str, Any]) -> str:
+            started[index] = time.monotonic()
+            return self.invoke(call, config)
+
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls)))
+        futures = [pool.submit(contextvars.copy_context().run, timed, i, call) for i, call in enumerate(calls)]
+        messages = []
+        try:
+            for i, (call, future) in enumerate(zip(calls, futures)):
+                timeout = self.timeout_for(call["name"])
+                try:
+                    content = self._wait(future, started, i, timeout, start)
+                except FuturesTimeoutError:
+                    state = "did not start" if started[i] is None else "timed out"
+                    logger.warning(f"{call['name']} {state} within {timeout}s")
+                    content = f"{TOOL_ERR_PREFIX} {call['name']} {state} within {timeout:g}s."
+                messages.append(ToolMessage(content=str(content), name=call["name"], tool_call_id=call["id"]))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(
+            f"Ran {len(calls)} tool calls in {(time.monotonic() - start) * 1000:.1f} ms",
+            extra={"tools": [c["name"] for c in calls]},
+        )
+        return messages
+
+    def __call__(self, state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        messages = state.get("messages") or []
+        last = messages[-1] if messages else None
+        calls = last.tool_calls if isinstance(last, AIMessage) else []
+        return {"messages": self.run(list(calls or []), config)}
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from infrastructure.observability.logging.logger import request_id_var
+from shared.utils.time_processor import TimeProcessor
+
+_TIME_KEYS = ("start", "end", "days", "weeks", "months", "years")
+_TICKER_KEYS = ("tickers", "compare_with")
+
+# Seconds a serialized tool result is reused across requests. Tools that are not
+# listed (portfolio and alert mutate state) are never memoized.
+TOOL_MEMO_TTL_SECONDS: Dict[str, float] = {
+    "price_query": 60,
+    "indicator_query": 60,
+    "comparison_query": 60,
+    "ranking_query": 60,
+    "aggregate_query": 60,
+    "forecast_query": 300,
+    "sector_query": 300,
+    "news_sentiment_query": 300,
+    "financial_ratio_query": 900,
+    "screening_query": 900,
+    "company_query": 3600,
+}
+
+_MAX_ENTRIES = 2048
+_MAX_REQUESTS = 64
+_MAX_REQUEST_ENTRIES = 64
+
+_ERROR_KEY = re.compile(r'"error"\s*:')
+
+
+def _prune(value: Any) -> Any:
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_prune(v) for v in value]
+    return value.strip() if isinstance(value, str) else value
+
+
+def canonical_query(query: Dict[str, Any]) -> str:
+    """
+    Canonical JSON for a tool payload: empty fields dropped, tickers upper-cased
+    and relative time params (days/weeks/..., "today") resolved to concrete dates.
+    """
+    q = _prune(dict(query))
+    q.pop("query_type", None)
+    for key in _TICKER_KEYS:
+        if isinstance(q.get(key), list):
+            q[key] = [str(t).upper() for t in q[key]]
+        elif isinstance(q.get(key), str):
+            q[key] = q[key].upper()
+
+    if any(key in q for key in _TIME_KEYS):
+        try:
+            resolved = TimeProcessor().process_time_params(q)
+            if resolved.get("start_date") and resolved.get("end_date"):
+                for key in _TIME_KEYS:
+                    q.pop(key, None)
+                q["start_date"], q["end_date"] = resolved["start_date"], resolved["end_date"]
+        except Exception:
+            pass
+    return json.dumps(q, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _is_error(result: str, err_prefix: str) -> bool:
+    # Tool errors and any {"error": ...} entry, including per-ticker partial failures,
+    # are transient and never memoized
+    return result.startswith(err_prefix) or _ERROR_KEY.search(result) is not None
+
+
+class ToolMemo:
+    """
+    Serialized tool results keyed on canonical payloads.
+
+    Two layers: within a request opened with ``request_scope`` results seen earlier
+    are reused for the rest of that request regardless of age, and all results are
+    shared across requests for the tool's TTL. Calls outside an open request only
+    use the shared layer.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+        max_entries: int = _MAX_ENTRIES,
+        max_requests: int = _MAX_REQUESTS,
+        max_request_entries: int = _MAX_REQUEST_ENTRIES
+    ):
+        self.ttl_seconds = dict(TOOL_MEMO_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self.max_entries = max_entries
+        self.max_requests = max_requests
+        self.max_request_entries = max_request_entries
+        self._shared: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._requests: "OrderedDict[str, OrderedDict[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def enabled(self, tool: str) -> bool:
+        return self.ttl_seconds.get(tool, 0) > 0
+
+    def begin_request(self, rid: str) -> None:
+        with self._lock:
+            self._requests[rid] = OrderedDict()
+            while len(self._requests) > self.max_requests:
+                self._requests.popitem(last=False)
+
+    def end_request(self, rid: str) -> None:
+        with self._lock:
+            self._requests.pop(rid, None)
+
+    @contextmanager
+    def request_scope(self, rid: str) -> Iterator[None]:
+        """Open the request layer for ``rid`` for the duration of the block."""
+        self.begin_request(rid)
+        try:
+            yield
+        finally:
+            self.end_request(rid)
+
+    def _remember(self, scoped: "OrderedDict[bytes, str]", key: bytes, result: str) -> None:
+        scoped[key] = result
+        while len(scoped) > self.max_request_entries:
+            scoped.popitem(last=False)
+
+    @staticmethod
+    def key(tool: str, query: Dict[str, Any]) -> bytes:
+        return hashlib.blake2b(f"{tool}\0{canonical_query(query)}".encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        rid = request_id_var.get()
+        with self._lock:
+            scoped = self._requests.get(rid) if rid else None
+            if scoped is not None and key in scoped:
+                self.hits += 1
+                return scoped[key]
+
+            entry = self._shared.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._shared.move_to_end(key)
+                if scoped is not None:
+                    self._remember(scoped, key, entry[1])
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, tool: str, key: bytes, result: str) -> None:
+        rid = request_id_var.get()
+        with self._lock:
+            self._shared[key] = (time.monotonic() + self.ttl_seconds.get(tool, 0), result)
+            self._shared.move_to_end(key)
+            while len(self._shared) > self.max_entries:
+                self._shared.popitem(last=False)
+
+            scoped = self._requests.get(rid) if rid else None
+            if scoped is not None:
+                self._remember(scoped, key, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shared.clear()
+            self._requests.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._shared),
+            "requests": len(self._requests),
+        }
+
+
+_tool_memo = ToolMemo()
+
+
+def get_tool_memo() -> ToolMemo:
+    return _tool_memo
+
+
+def memoized_tool(tool: str, err_prefix: str) -> Callable:
+    """Reuse the serialized result of ``fn(query)`` for identical canonical payloads."""
+    def decorator(fn: Callable[..., str]) -> Callable[..., str]:
+        @wraps(fn)
+        def wrapper(query: Optional[Dict[str, Any]] = None) -> str:
+            memo = _tool_memo
+            if query is None or not memo.enabled(tool):
+                return fn(query)
+            try:
+                key = memo.key(tool, query)
+            except (TypeError, ValueError):
+                return fn(query)
+
+            cached = memo.get(key)
+            if cached is not None:
+                return cached
+            result = fn(query)
+            if isinstance(result, str) and not _is_error(result, err_prefix):
+                memo.put(tool, key, result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from shared.utils.compact_encoding import DEFAULT_POINT_BUDGET, compact_payload, dumps_compact
+
+_MAX_PAYLOADS = 256
+# Outlives the longest tool memo TTL, so a memoized output's full_ref still resolves
+_PAYLOAD_TTL_SECONDS = 3600
+
+
+def _point_budget() -> int:
+    try:
+        return max(int(os.getenv("TOOL_OUTPUT_POINT_BUDGET", DEFAULT_POINT_BUDGET)), 2)
+    except ValueError:
+        return DEFAULT_POINT_BUDGET
+
+
+class ToolPayloadStore:
+    """
+    Full service payloads behind downsampled tool outputs.
+
+    The LLM only sees the compact form; the complete result stays here under the
+    ``full_ref`` id for ``ttl_seconds`` so callers (API, response formatting) can
+    still serve the dropped rows.
+    """
+
+    def __init__(self, max_entries: int = _MAX_PAYLOADS, ttl_seconds: float = _PAYLOAD_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._payloads: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, payload: Any) -> str:
+        ref = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._payloads[ref] = (now + self.ttl_seconds, payload)
+            # Oldest first: expired entries and any over the bound are dropped from the front
+            while self._payloads and (
+                len(self._payloads) > self.max_entries or next(iter(self._payloads.values()))[0] <= now
+            ):
+                self._payloads.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._payloads.get(ref)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._payloads.clear()
+
+
+_payload_store = ToolPayloadStore()
+
+
+def get_tool_payload(ref: str) -> Optional[Any]:
+    """Full payload for a ``full_ref`` found in a compact tool output, or None once expired."""
+    return _payload_store.get(ref)
+
+
+def encode_tool_output(obj: Any, point_budget: Optional[int] = None) -> str:
+    """
+    Compact JSON for a service result (set TOOL_OUTPUT_FORMAT=pretty for the old indented form).
+
+    Record lists become columns; date-indexed series also get a summary header
+    computed over every row and are downsampled to ``point_budget`` rows. When
+    rows were dropped the full payload is kept server-side and referenced by
+    ``full_ref``.
+    """
+    if os.getenv("TOOL_OUTPUT_FORMAT", "compact").lower() == "pretty":
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+    compact, sampled = compact_payload(obj, point_budget or _point_budget())
+    if sampled and isinstance(compact, dict):
+        compact["full_ref"] = _payload_store.put(obj)
+    return dumps_compact(compact)
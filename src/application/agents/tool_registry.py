@@ -4,6 +4,9 @@ from typing import Dict, Any, Optional
 
 from langchain.tools import tool
 
+from application.agents.tool_memo import memoized_tool
+from application.agents.tool_output import encode_tool_output
+
 logger = logging.getLogger(__name__)
 TOOL_ERR_PREFIX = "TOOL_ERR#"
 
@@ -14,6 +17,7 @@ from application.services.market.indicator_service import handle_indicator_query
 from application.services.market.price_service import handle_price_query
 from application.services.financial.ranking_service import handle_ranking_query
 from application.services.financial.financial_ratio_service import handle_financial_ratio_query
+from application.services.financial.screening_service import handle_screening_query
 from application.services.portfolio.news_sentiment_service import handle_news_sentiment_query
 from application.services.portfolio.portfolio_service import handle_portfolio_query
 from application.services.market.alert_service import handle_alert_query
@@ -38,6 +42,7 @@ Dùng KHI: query_type là "price_query". Lấy OHLCV, open, close, high, low, vo
 Input: tickers (req), requested_field (open/close/high/low/volume/ohlcv), time.
 KHÔNG dùng cho: chỉ báo kỹ thuật, xếp hạng, so sánh, tổng hợp, tỷ lệ tài chính.
 """)
+@memoized_tool("price_query", TOOL_ERR_PREFIX)
 def handle_price_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing price_query payload."
@@ -52,7 +57,7 @@ def handle_price_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for price_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -62,6 +67,7 @@ Dùng KHI: query_type là "ranking_query". Xếp hạng >=2 tickers theo field,
 Input: tickers (req,>=2), requested_field, aggregate, time.
 KHÔNG dùng cho: so sánh 2 nhóm (dùng compare), tổng hợp số học (dùng aggregate).
 """)
+@memoized_tool("ranking_query", TOOL_ERR_PREFIX)
 def handle_ranking_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing ranking_query payload."
@@ -76,16 +82,17 @@ def handle_ranking_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for ranking_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
 
 @tool("handle_indicator_query", description="""
-Dùng KHI: query_type là "indicator_query". Tính SMA/RSI/MACD cho 1+ tickers.
-Input: tickers (req), requested_field (sma/rsi/macd), indicator_params, time.
+Dùng KHI: query_type là "indicator_query". Tính SMA/EMA/RSI/MACD/BB/ATR/OBV/ADX/CCI/Stochastic cho 1+ tickers.
+Input: tickers (req), requested_field (sma/ema/rsi/macd/bb/atr/obv/adx/cci/stochastic), indicator_params, time, latest_only (chỉ lấy giá trị mới nhất), interval (1m/5m/15m/30m/1H/1d/1W/1M), intervals (nhiều khung cùng lúc).
 KHÔNG dùng cho: giá OHLCV thô (dùng price_query), xếp hạng, so sánh.
 """)
+@memoized_tool("indicator_query", TOOL_ERR_PREFIX)
 def handle_indicator_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing indicator_query payload."
@@ -100,7 +107,7 @@ def handle_indicator_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for indicator_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -110,6 +117,7 @@ Dùng KHI: query_type là "comparison_query". So sánh nhóm chính (tickers) vs
 Input: tickers (req, nhóm chính), compare_with (req), requested_field, time.
 KHÔNG dùng cho: 1 nhóm tickers (dùng price_query), tổng hợp (dùng aggregate).
 """)
+@memoized_tool("comparison_query", TOOL_ERR_PREFIX)
 def handle_compare_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing compare_query payload."
@@ -124,7 +132,7 @@ def handle_compare_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for compare_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -134,6 +142,7 @@ Dùng KHI: query_type là "company_query". Lấy cổ đông, ban lãnh đạo,
 Input: tickers (req), requested_field (shareholders/executives/subsidiaries).
 KHÔNG dùng cho: giá cổ phiếu, chỉ báo kỹ thuật, tỷ lệ tài chính.
 """)
+@memoized_tool("company_query", TOOL_ERR_PREFIX)
 def handle_company_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing company_query payload."
@@ -148,7 +157,7 @@ def handle_company_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for company_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -158,6 +167,7 @@ Dùng KHI: query_type là "aggregate_query". Tính mean/sum/median/std/min/max t
 Input: tickers (req), requested_field, aggregate_fn (mean/sum/median/std/min/max), time.
 KHÔNG dùng cho: xếp hạng từng ticker (dùng ranking), so sánh (dùng compare).
 """)
+@memoized_tool("aggregate_query", TOOL_ERR_PREFIX)
 def handle_aggregate_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing aggregate_query payload."
@@ -172,7 +182,7 @@ def handle_aggregate_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for aggregate_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -182,6 +192,7 @@ Dùng KHI: query_type là "financial_ratio_query". Lấy PE, PB, ROE, EPS, debt_
 Input: tickers (req), requested_field, period/quarter/year (tùy chọn).
 KHÔNG dùng cho: giá cổ phiếu, chỉ báo kỹ thuật, thông tin công ty.
 """)
+@memoized_tool("financial_ratio_query", TOOL_ERR_PREFIX)
 def handle_financial_ratio_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing financial_ratio_query payload."
@@ -196,7 +207,32 @@ def handle_financial_ratio_query_tool(query: Optional[Dict[str, Any]] = None) ->
         return f"{TOOL_ERR_PREFIX} No data returned for financial_ratio_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
+    except (TypeError, ValueError):
+        return str(res)
+
+
+@tool("handle_screening_query", description="""
+Dùng KHI: query_type là "screening_query". Lọc cổ phiếu toàn thị trường/ngành theo điều kiện chỉ số tài chính (ROE > 15, PE < 10, ...).
+Input: filters [{field, op, value}] (req), sector/tickers (tùy chọn, mặc định toàn thị trường), sort_by, order, limit, period/quarter/year.
+KHÔNG dùng cho: chỉ số của mã đã biết (dùng financial_ratio), hiệu suất giá theo ngành (dùng sector).
+""")
+@memoized_tool("screening_query", TOOL_ERR_PREFIX)
+def handle_screening_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
+    if query is None:
+        return f"{TOOL_ERR_PREFIX} Missing screening_query payload."
+
+    try:
+        res = handle_screening_query(query)
+    except Exception as e:
+        logger.exception("screening_query failed")
+        return f"{TOOL_ERR_PREFIX} Error while handling screening_query: {e}"
+
+    if res is None:
+        return f"{TOOL_ERR_PREFIX} No data returned for screening_query."
+
+    try:
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -206,6 +242,7 @@ Dùng KHI: query_type là "news_sentiment_query". Lấy tin tức, sentiment, so
 Input: tickers (req), requested_field (news/sentiment/social_volume), compare_with (tùy chọn), time.
 KHÔNG dùng cho: giá cổ phiếu, chỉ báo kỹ thuật, tỷ lệ tài chính.
 """)
+@memoized_tool("news_sentiment_query", TOOL_ERR_PREFIX)
 def handle_news_sentiment_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing news_sentiment_query payload."
@@ -220,7 +257,7 @@ def handle_news_sentiment_query_tool(query: Optional[Dict[str, Any]] = None) ->
         return f"{TOOL_ERR_PREFIX} No data returned for news_sentiment_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -244,14 +281,14 @@ def handle_portfolio_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for portfolio_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
 
 @tool("handle_alert_query", description="""
 Dùng KHI: query_type là "alert_query". Cảnh báo giá khi ticker vượt ngưỡng.
-Input: tickers (req), threshold (req), condition (above/below), timeframe.
+Input: tickers (req), threshold (req; giá, % hoặc chu kỳ MA), condition (above/below/percent_up/percent_down/cross_above/cross_below), indicator (sma/ema cho cross), timeframe, action (check/watch để đăng ký theo dõi/list/cancel), alert_ids (cho cancel).
 KHÔNG dùng cho: dự báo, phân tích ngành, xếp hạng.
 """)
 def handle_alert_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
@@ -268,7 +305,7 @@ def handle_alert_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for alert_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -278,6 +315,7 @@ Dùng KHI: query_type là "forecast_query". Dự báo giá cổ phiếu từ d
 Input: tickers (req), timeframe, model (tùy chọn).
 KHÔNG dùng cho: chỉ báo kỹ thuật, cảnh báo giá, phân tích ngành.
 """)
+@memoized_tool("forecast_query", TOOL_ERR_PREFIX)
 def handle_forecast_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing forecast_query payload."
@@ -292,7 +330,7 @@ def handle_forecast_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for forecast_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -302,6 +340,7 @@ Dùng KHI: query_type là "sector_query". Phân tích hiệu suất cổ phiếu
 Input: sector (req), metric (performance/volume), timeframe.
 KHÔNG dùng cho: phân tích từng ticker, chỉ báo kỹ thuật.
 """)
+@memoized_tool("sector_query", TOOL_ERR_PREFIX)
 def handle_sector_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
     if query is None:
         return f"{TOOL_ERR_PREFIX} Missing sector_query payload."
@@ -316,7 +355,7 @@ def handle_sector_query_tool(query: Optional[Dict[str, Any]] = None) -> str:
         return f"{TOOL_ERR_PREFIX} No data returned for sector_query."
 
     try:
-        return to_pretty_json(res)
+        return encode_tool_output(res)
     except (TypeError, ValueError):
         return str(res)
 
@@ -335,7 +374,7 @@ TOOL_GROUPS: dict[str, dict] = {
     },
     "fundamental": {
         "label": "Cơ bản",
-        "tool_names": ["financial_ratio_query", "company_query"],
+        "tool_names": ["financial_ratio_query", "screening_query", "company_query"],
     },
     "portfolio": {
         "label": "Danh mục & Tin tức",
@@ -355,6 +394,7 @@ _tool_by_query_type: dict[str, Any] = {
     "aggregate_query": handle_aggregate_query_tool,
     "forecast_query": handle_forecast_query_tool,
     "financial_ratio_query": handle_financial_ratio_query_tool,
+    "screening_query": handle_screening_query_tool,
     "company_query": handle_company_query_tool,
     "portfolio_query": handle_portfolio_query_tool,
     "news_sentiment_query": handle_news_sentiment_query_tool,
@@ -381,6 +421,7 @@ QUERY_TYPE_TO_GROUP: dict[str, str] = {
     "aggregate_query": "market",
     "forecast_query": "market",
     "financial_ratio_query": "fundamental",
+    "screening_query": "fundamental",
     "company_query": "fundamental",
     "portfolio_query": "portfolio",
     "news_sentiment_query": "portfolio",
@@ -1,49 +1,41 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from infrastructure.api_clients.vn_stock_client import VNStockClient
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
+from infrastructure.storage.company_profiles import get_company_profile_store
 
 _COMPANY_TTL_HOURS = 4
 
+_PROFILE_FIELDS = ("shareholders", "executives", "subsidiaries")
+_BASIC_FIELDS = ['company_name', 'company_code', 'industry', 'sector']
+
 
 def _cache() -> Optional[Any]:
     return get_cache_manager()
 
 
+def _profile(ticker: str, sections: Iterable[str]) -> Dict[str, Any]:
+    # Sections come from the shared profile store, which downloads each one once per ticker
+    store = get_company_profile_store()
+    if store is None:
+        raise RuntimeError("Company profile store unavailable")
+    return store.get(ticker, sections)
+
+
 def handle_company_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
     tickers = parsed.get("tickers") or []
     if not tickers:
         return {"error": "Missing ticker"}
 
     requested_field = parsed.get("requested_field", "shareholders")
+    section = requested_field if requested_field in _PROFILE_FIELDS else "shareholders"
 
     try:
-        cache = _cache()
         results = {}
 
         for ticker in tickers:
             try:
-                cache_key = make_cache_key("company", ticker, requested_field=requested_field)
-                cached = cache.get(cache_key) if cache else None
-                if cached is not None:
-                    results[ticker] = cached
-                    continue
-
-                client = VNStockClient(ticker=ticker)
-
-                if requested_field == "shareholders":
-                    data = get_shareholders(client)
-                elif requested_field == "executives":
-                    data = get_executives(client)
-                elif requested_field == "subsidiaries":
-                    data = get_subsidiaries(client)
-                else:
-                    data = get_shareholders(client)
-
-                results[ticker] = data
-                if cache and "error" not in data:
-                    cache.set(cache_key, data, ttl_hours=_COMPANY_TTL_HOURS)
-
+                results[ticker] = get_profile_section(ticker, section)
             except Exception as e:
                 results[ticker] = {"error": str(e)}
 
@@ -53,146 +45,49 @@ def handle_company_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
-def get_shareholders(client: VNStockClient) -> Dict[str, Any]:
+def get_profile_section(ticker: str, section: str) -> Dict[str, Any]:
     try:
-        company_data = client.company.overview()
+        records = _profile(ticker, (section,)).get(section)
 
-        if company_data is None or company_data.empty:
+        if records is None:
             return {"error": "No company data available"}
 
-        shareholders = []
-
-        shareholder_columns = [
-            'major_shareholders', 'top_shareholders', 'shareholder_list',
-            'ownership_structure', 'shareholder_info'
-        ]
-
-        for col in shareholder_columns:
-            if col in company_data.columns:
-                shareholders_data = company_data[col].iloc[0]
-                if shareholders_data:
-                    shareholders.append({
-                        "type": col,
-                        "data": shareholders_data
-                    })
-
-        if not shareholders:
-            basic_info = {}
-            for col in company_data.columns:
-                if col in ['company_name', 'company_code', 'industry', 'sector']:
-                    basic_info[col] = company_data[col].iloc[0]
+        if not records:
+            # The overview is only needed (and only downloaded) for the fallback summary
+            overview = _profile(ticker, ("overview",)).get("overview", {})
+            basic_info = {field: overview[field] for field in _BASIC_FIELDS if field in overview}
 
             return {
                 "company_info": basic_info,
-                "note": "Detailed shareholder information not available in current data source"
+                "note": f"Detailed {section} information not available in current data source"
             }
 
         return {
-            "shareholders": shareholders,
-            "total_shareholders": len(shareholders)
+            section: records,
+            f"total_{section}": len(records)
         }
 
     except Exception as e:
         return {"error": str(e)}
 
 
-def get_executives(client: VNStockClient) -> Dict[str, Any]:
-    try:
-        company_data = client.company.overview()
-
-        if company_data is None or company_data.empty:
-            return {"error": "No company data available"}
-
-        executives = []
-
-        executive_columns = [
-            'executives', 'management_team', 'board_of_directors',
-            'leadership', 'key_personnel'
-        ]
-
-        for col in executive_columns:
-            if col in company_data.columns:
-                executives_data = company_data[col].iloc[0]
-                if executives_data:
-                    executives.append({
-                        "type": col,
-                        "data": executives_data
-                    })
-
-        if not executives:
-            basic_info = {}
-            for col in company_data.columns:
-                if col in ['company_name', 'company_code', 'industry', 'sector']:
-                    basic_info[col] = company_data[col].iloc[0]
-
-            return {
-                "company_info": basic_info,
-                "note": "Detailed executives information not available in current data source"
-            }
+def get_shareholders(client: VNStockClient) -> Dict[str, Any]:
+    return get_profile_section(client.ticker, "shareholders")
 
-        return {
-            "executives": executives,
-            "total_executives": len(executives)
-        }
 
-    except Exception as e:
-        return {"error": str(e)}
+def get_executives(client: VNStockClient) -> Dict[str, Any]:
+    return get_profile_section(client.ticker, "executives")
 
 
 def get_subsidiaries(client: VNStockClient) -> Dict[str, Any]:
-    try:
-        company_data = client.company.overview()
-
-        if company_data is None or company_data.empty:
-            return {"error": "No company data available"}
-
-        subsidiaries = []
-
-        subsidiary_columns = [
-            'subsidiaries', 'affiliated_companies', 'group_companies',
-            'related_entities', 'business_units'
-        ]
-
-        for col in subsidiary_columns:
-            if col in company_data.columns:
-                subsidiaries_data = company_data[col].iloc[0]
-                if subsidiaries_data:
-                    subsidiaries.append({
-                        "type": col,
-                        "data": subsidiaries_data
-                    })
-
-        if not subsidiaries:
-            basic_info = {}
-            for col in company_data.columns:
-                if col in ['company_name', 'company_code', 'industry', 'sector']:
-                    basic_info[col] = company_data[col].iloc[0]
-
-            return {
-                "company_info": basic_info,
-                "note": "Detailed subsidiaries information not available in current data source"
-            }
-
-        return {
-            "subsidiaries": subsidiaries,
-            "total_subsidiaries": len(subsidiaries)
-        }
-
-    except Exception as e:
-        return {"error": str(e)}
+    return get_profile_section(client.ticker, "subsidiaries")
 
 
 def get_company_overview(client: VNStockClient) -> Dict[str, Any]:
     try:
-        cache = _cache()
-        cache_key = make_cache_key("company_overview", client.ticker)
-        cached = cache.get(cache_key) if cache else None
-        if cached is not None:
-            return cached
-
-        company_data = client.company.overview()
+        company_data = _profile(client.ticker, ("overview",)).get("overview")
 
-        if company_data is None or company_data.empty:
+        if not company_data:
             return {"error": "No company data available"}
 
         overview = {}
@@ -203,18 +98,15 @@ def get_company_overview(client: VNStockClient) -> Dict[str, Any]:
         ]
 
         for field in basic_fields:
-            if field in company_data.columns:
-                overview[field] = company_data[field].iloc[0]
+            if field in company_data:
+                overview[field] = company_data[field]
 
         financial_fields = [
             'market_cap', 'pe_ratio', 'pb_ratio', 'roe', 'eps',
             'dividend_yield', 'revenue', 'net_profit'
         ]
 
-        financial_info = {}
-        for field in financial_fields:
-            if field in company_data.columns:
-                financial_info[field] = company_data[field].iloc[0]
+        financial_info = {field: company_data[field] for field in financial_fields if field in company_data}
 
         if financial_info:
             overview['financial_info'] = financial_info
@@ -224,18 +116,12 @@ def get_company_overview(client: VNStockClient) -> Dict[str, Any]:
             'competitive_advantages', 'growth_strategy'
         ]
 
-        business_info = {}
-        for field in business_fields:
-            if field in company_data.columns:
-                business_info[field] = company_data[field].iloc[0]
+        business_info = {field: company_data[field] for field in business_fields if field in company_data}
 
         if business_info:
             overview['business_info'] = business_info
 
-        result = overview if overview else {"error": "No detailed information available"}
-        if cache and "error" not in result:
-            cache.set(cache_key, result, ttl_hours=_COMPANY_TTL_HOURS)
-        return result
+        return overview if overview else {"error": "No detailed information available"}
 
     except Exception as e:
         return {"error": str(e)}
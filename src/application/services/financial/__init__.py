@@ -1,9 +1,11 @@
 from .financial_ratio_service import handle_financial_ratio_query
 from .aggregate_service import handle_aggregate_query
 from .ranking_service import handle_ranking_query
+from .screening_service import handle_screening_query
 
 __all__ = [
     'handle_financial_ratio_query',
     'handle_aggregate_query',
     'handle_ranking_query',
+    'handle_screening_query',
 ]
\ No newline at end of file
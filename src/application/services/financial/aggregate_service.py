@@ -2,6 +2,7 @@ from typing import Dict, Any, List, Optional
 import pandas as pd
 from shared.utils.time_processor import TimeProcessor
 from shared.utils.calculations import calculate_volatility, calculate_std_dev
+from shared.utils.aggregation import aggregate_rows, build_field_matrix, pooled_statistics
 from infrastructure.api_clients.vn_stock_client import VNStockClient
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
@@ -108,67 +109,29 @@ def perform_aggregation(
     field: str,
     aggregate_func: str
 ) -> Dict[str, Any]:
-    aggregation = {}
+    matrix = build_field_matrix(all_data, field)
+    overall = pooled_statistics(matrix)
 
-    all_values = []
-    ticker_data = {}
+    if not overall:
+        return {"error": "No valid data for aggregation"}
 
-    for ticker, data in all_data.items():
-        if "error" in data:
-            continue
-
-        values = [item[field] for item in data["data"] if field in item]
-        if values:
-            ticker_data[ticker] = {
-                "values": values,
-                "count": len(values),
-                "mean": sum(values) / len(values),
-                "min": min(values),
-                "max": max(values)
-            }
-            all_values.extend(values)
+    rows = aggregate_rows(matrix)
+    ticker_data = {}
+    for i, ticker in enumerate(matrix.tickers):
+        ticker_data[ticker] = {
+            "values": matrix.row_values(i),
+            "count": int(rows["count"][i]),
+            "mean": float(rows["mean"][i]),
+            "min": float(rows["min"][i]),
+            "max": float(rows["max"][i])
+        }
 
-    if not all_values:
-        return {"error": "No valid data for aggregation"}
+    result_value = overall.get(aggregate_func) if aggregate_func != "count" else None
+    if result_value is None:
+        result_value = overall["mean"]
 
-    if aggregate_func == "mean":
-        result_value = sum(all_values) / len(all_values)
-    elif aggregate_func == "sum":
-        result_value = sum(all_values)
-    elif aggregate_func == "median":
-        sorted_values = sorted(all_values)
-        n = len(sorted_values)
-        if n % 2 == 0:
-            result_value = (sorted_values[n//2 - 1] + sorted_values[n//2]) / 2
-        else:
-            result_value = sorted_values[n//2]
-    elif aggregate_func == "std":
-        mean_val = sum(all_values) / len(all_values)
-        variance = sum((x - mean_val) ** 2 for x in all_values) / len(all_values)
-        result_value = variance ** 0.5
-    elif aggregate_func == "min":
-        result_value = min(all_values)
-    elif aggregate_func == "max":
-        result_value = max(all_values)
-    else:
-        result_value = sum(all_values) / len(all_values)
-
-    overall_mean = sum(all_values) / len(all_values)
-    overall_min = min(all_values)
-    overall_max = max(all_values)
-    overall_sum = sum(all_values)
-
-    sorted_values = sorted(all_values)
-    n = len(sorted_values)
-    if n % 2 == 0:
-        overall_median = (sorted_values[n//2 - 1] + sorted_values[n//2]) / 2
-    else:
-        overall_median = sorted_values[n//2]
-
-    variance = sum((x - overall_mean) ** 2 for x in all_values) / len(all_values)
-    overall_std = variance ** 0.5
-
-    cv = (overall_std / overall_mean) * 100 if overall_mean != 0 else 0
+    overall_mean = overall["mean"]
+    cv = (overall["std"] / overall_mean) * 100 if overall_mean != 0 else 0
 
     aggregation = {
         "result": {
@@ -178,13 +141,13 @@ def perform_aggregation(
         },
         "overall_statistics": {
             "mean": overall_mean,
-            "median": overall_median,
-            "std_dev": overall_std,
-            "min": overall_min,
-            "max": overall_max,
-            "sum": overall_sum,
+            "median": overall["median"],
+            "std_dev": overall["std"],
+            "min": overall["min"],
+            "max": overall["max"],
+            "sum": overall["sum"],
             "coefficient_of_variation": cv,
-            "total_data_points": len(all_values)
+            "total_data_points": overall["count"]
         },
         "ticker_breakdown": ticker_data,
         "valid_tickers": list(ticker_data.keys()),
@@ -1,9 +1,23 @@
 from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+import numpy as np
 from shared.utils.time_processor import TimeProcessor
+from shared.utils.financial_ratios import (
+    PERIODS_PER_YEAR,
+    PRICE_RATIOS,
+    RATIO_INPUTS,
+    VND_PER_QUOTED_PRICE,
+    compute_ratio_table,
+    resolve_ratio,
+)
+from application.services.market.bar_service import get_bars
+from infrastructure.api_clients.vendor_limit import acquire_vendor_slot
 from infrastructure.api_clients.vn_stock_client import VNStockClient
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
+from infrastructure.storage.statements import get_statement_store
 
+# Statements change once per period; the table is cached for the price-based ratios
 _RATIO_TTL_HOURS = 2
 
 
@@ -36,165 +50,113 @@ def handle_financial_ratio_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if not np.isfinite(v) else float(v) for v in values]
+
+
+def _period_end_prices(ticker: str, end_dates: np.ndarray) -> np.ndarray:
+    # One daily-bar fetch (one vendor slot) covering every period; each period takes its last close on or before the period end,
+    # converted from the quoted thousand VND to VND so it matches the statement items
+    prices = np.full(len(end_dates), np.nan)
+    if not len(end_dates):
+        return prices
+    start = (end_dates[0].astype(datetime) - timedelta(days=10)).strftime("%Y-%m-%d")
+    acquire_vendor_slot()
+    bars = get_bars(ticker, start, datetime.now().strftime("%Y-%m-%d"), "1d")
+    if bars is None or bars.empty:
+        return prices
+    dates = bars["date"].astype(str).str[:10].to_numpy(dtype="M8[D]")
+    closes = bars["close"].to_numpy(dtype=np.float64) * VND_PER_QUOTED_PRICE
+    idx = np.searchsorted(dates, end_dates, side="right") - 1
+    found = idx >= 0
+    prices[found] = closes[idx[found]]
+    return prices
+
+
+def get_ratio_table(ticker: str, period: str = "quarter") -> Optional[Dict[str, Any]]:
+    # Every supported ratio over every stored period, shared by all ratio queries for the ticker
+    cache = _cache()
+    cache_key = make_cache_key("financial_ratio_table", ticker, period=period)
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        return cached
+
+    store = get_statement_store()
+    table = store.get(ticker, period) if store else None
+    if table is None or not len(table):
+        return None
+
+    prices = _period_end_prices(ticker, table.end_dates)
+    ratios = compute_ratio_table(table.items, prices, PERIODS_PER_YEAR[period])
+    result = {
+        "periods": table.periods,
+        "end_dates": [str(d) for d in table.end_dates],
+        "prices": _to_list(prices),
+        "items": {item: _to_list(values) for item, values in table.items.items()},
+        "ratios": {name: _to_list(values) for name, values in ratios.items()},
+    }
+    if cache:
+        cache.set(cache_key, result, ttl_hours=_RATIO_TTL_HOURS)
+    return result
+
+
+def _select_periods(table: Dict[str, Any], parsed: Dict[str, Any], time_params: Dict[str, Any]) -> List[int]:
+    periods = table["periods"]
+    year, quarter = parsed.get("year"), parsed.get("quarter")
+    if year:
+        prefix = f"{year}-Q{quarter}" if quarter else str(year)
+        return [i for i, label in enumerate(periods) if label.startswith(prefix)]
+
+    if parsed.get("start") or parsed.get("end") or any(parsed.get(k) for k in ("days", "weeks", "months", "years")):
+        start, end = time_params.get("start_date"), time_params.get("end_date")
+        if start and end:
+            selected = [i for i, d in enumerate(table["end_dates"]) if start <= d <= end]
+            if selected:
+                return selected
+
+    return [len(periods) - 1] if periods else []
+
+
 def get_financial_ratios(client: VNStockClient, ratio_type: str = None, parsed: Dict[str, Any] = None) -> Dict[str, Any]:
     try:
         ticker = client.ticker
-        cache = _cache()
-        rt = ratio_type or "all"
-        cache_key = make_cache_key("financial_ratio", ticker, ratio_type=rt)
-        cached = cache.get(cache_key) if cache else None
-        if cached is not None:
-            if parsed:
-                tp = TimeProcessor()
-                tp_result = tp.process_time_params(parsed)
-                for key, val in cached.items():
-                    if isinstance(val, dict) and "time_range" in val:
-                        val["time_range"] = tp_result.get("time_description", "Latest")
-            return cached
-
-        financial_data = client.company.financial_statement()
-
-        if financial_data is None or financial_data.empty:
-            return {"error": "No financial data available"}
-
-        market_data = client.company.market_data()
+        parsed = parsed or {}
+        period = parsed.get("period") if parsed.get("period") in PERIODS_PER_YEAR else "quarter"
 
-        ratios = {}
-
-        revenue = financial_data.get('revenue', 0)
-        net_profit = financial_data.get('net_profit', 0)
-        total_assets = financial_data.get('total_assets', 0)
-        total_equity = financial_data.get('equity', 0)
-        total_liabilities = financial_data.get('total_liabilities', 0)
+        table = get_ratio_table(ticker, period)
+        if table is None:
+            return {"error": "No financial data available"}
 
         time_processor = TimeProcessor()
         time_params = time_processor.process_time_params(parsed) if parsed else time_processor.get_default_time_range()
+        rows = _select_periods(table, parsed, time_params)
+        if not rows:
+            return {"error": "No financial data for the requested period"}
 
-        if ratio_type is None or ratio_type == "pe":
-            eps = financial_data.get('eps', 0)
-            if eps != 0 and market_data.get('current_price'):
-                pe_ratio = market_data['current_price'] / eps
-                ratios['pe_ratio'] = {
-                    "value": pe_ratio,
-                    "eps": eps,
-                    "current_price": market_data['current_price'],
-                    "interpretation": get_pe_interpretation(pe_ratio),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "pb":
-            book_value_per_share = financial_data.get('book_value_per_share', 0)
-            if book_value_per_share != 0 and market_data.get('current_price'):
-                pb_ratio = market_data['current_price'] / book_value_per_share
-                ratios['pb_ratio'] = {
-                    "value": pb_ratio,
-                    "book_value_per_share": book_value_per_share,
-                    "current_price": market_data['current_price'],
-                    "interpretation": get_pb_interpretation(pb_ratio),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "roe":
-            if total_equity != 0:
-                roe = (net_profit / total_equity) * 100
-                ratios['roe'] = {
-                    "value": roe,
-                    "net_profit": net_profit,
-                    "total_equity": total_equity,
-                    "interpretation": get_roe_interpretation(roe),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "eps":
-            shares_outstanding = financial_data.get('shares_outstanding', 0)
-            if shares_outstanding != 0:
-                eps = net_profit / shares_outstanding
-                ratios['eps'] = {
-                    "value": eps,
-                    "net_profit": net_profit,
-                    "shares_outstanding": shares_outstanding,
-                    "interpretation": get_eps_interpretation(eps),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "current_ratio":
-            current_assets = financial_data.get('current_assets', 0)
-            current_liabilities = financial_data.get('current_liabilities', 0)
-            if current_liabilities != 0:
-                current_ratio = current_assets / current_liabilities
-                ratios['current_ratio'] = {
-                    "value": current_ratio,
-                    "current_assets": current_assets,
-                    "current_liabilities": current_liabilities,
-                    "interpretation": get_current_ratio_interpretation(current_ratio),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "debt_to_equity":
-            if total_equity != 0:
-                debt_to_equity = total_liabilities / total_equity
-                ratios['debt_to_equity'] = {
-                    "value": debt_to_equity,
-                    "total_liabilities": total_liabilities,
-                    "total_equity": total_equity,
-                    "interpretation": get_debt_to_equity_interpretation(debt_to_equity),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "profit_margin":
-            if revenue != 0:
-                profit_margin = (net_profit / revenue) * 100
-                ratios['profit_margin'] = {
-                    "value": profit_margin,
-                    "net_profit": net_profit,
-                    "revenue": revenue,
-                    "interpretation": get_profit_margin_interpretation(profit_margin),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "quick_ratio":
-            cash_and_equivalents = financial_data.get('cash_and_equivalents', 0)
-            marketable_securities = financial_data.get('marketable_securities', 0)
-            current_liabilities = financial_data.get('current_liabilities', 0)
-
-            if current_liabilities != 0:
-                quick_assets = cash_and_equivalents + marketable_securities
-                quick_ratio = quick_assets / current_liabilities
-                ratios['quick_ratio'] = {
-                    "value": quick_ratio,
-                    "quick_assets": quick_assets,
-                    "current_liabilities": current_liabilities,
-                    "interpretation": get_quick_ratio_interpretation(quick_ratio),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "asset_turnover":
-            if total_assets != 0:
-                asset_turnover = revenue / total_assets
-                ratios['asset_turnover'] = {
-                    "value": asset_turnover,
-                    "revenue": revenue,
-                    "total_assets": total_assets,
-                    "interpretation": get_asset_turnover_interpretation(asset_turnover),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        if ratio_type is None or ratio_type == "dividend_yield":
-            dividend_per_share = financial_data.get('dividend_per_share', 0)
-            if market_data.get('current_price') and market_data['current_price'] != 0:
-                dividend_yield = (dividend_per_share / market_data['current_price']) * 100
-                ratios['dividend_yield'] = {
-                    "value": dividend_yield,
-                    "dividend_per_share": dividend_per_share,
-                    "current_price": market_data['current_price'],
-                    "interpretation": get_dividend_yield_interpretation(dividend_yield),
-                    "time_range": time_params.get("time_description", "Latest")
-                }
-
-        result = ratios if ratios else {"error": "No ratios calculated"}
-        if cache and "error" not in result:
-            cache.set(cache_key, result, ttl_hours=_RATIO_TTL_HOURS)
-        return result
+        requested = resolve_ratio(ratio_type)
+        names = [requested] if requested else list(RATIO_INPUTS)
+        latest = rows[-1]
+
+        ratios = {}
+        for name in names:
+            values = table["ratios"][name]
+            if values[latest] is None:
+                continue
+            entry = {
+                "value": values[latest],
+                "period": table["periods"][latest],
+                **{item: table["items"][item][latest] for item in RATIO_INPUTS[name]},
+                "time_range": time_params.get("time_description", "Latest"),
+            }
+            if name in PRICE_RATIOS:
+                entry["price"] = table["prices"][latest]
+            if name in _INTERPRETATIONS:
+                entry["interpretation"] = _INTERPRETATIONS[name](values[latest])
+            if len(rows) > 1:
+                entry["history"] = [{"period": table["periods"][i], "value": values[i]} for i in rows]
+            ratios[name] = entry
+
+        return ratios if ratios else {"error": "No ratios calculated"}
 
     except Exception as e:
         return {"error": str(e)}
@@ -311,14 +273,15 @@ def get_dividend_yield_interpretation(dividend_yield: float) -> str:
 def compare_financial_ratios(tickers: List[str], ratio_type: str) -> Dict[str, Any]:
     try:
         comparison_results = {}
+        ratio_key = resolve_ratio(ratio_type) or ratio_type
 
         for ticker in tickers:
             try:
                 client = VNStockClient(ticker=ticker)
                 ratios = get_financial_ratios(client, ratio_type)
 
-                if ratio_type in ratios:
-                    comparison_results[ticker] = ratios[ratio_type]
+                if ratio_key in ratios:
+                    comparison_results[ticker] = ratios[ratio_key]
                 else:
                     comparison_results[ticker] = {"error": f"No {ratio_type} data available"}
 
@@ -447,6 +410,20 @@ def calculate_financial_health_score(ticker: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+_INTERPRETATIONS = {
+    "pe_ratio": get_pe_interpretation,
+    "pb_ratio": get_pb_interpretation,
+    "roe": get_roe_interpretation,
+    "eps": get_eps_interpretation,
+    "current_ratio": get_current_ratio_interpretation,
+    "debt_to_equity": get_debt_to_equity_interpretation,
+    "profit_margin": get_profit_margin_interpretation,
+    "quick_ratio": get_quick_ratio_interpretation,
+    "asset_turnover": get_asset_turnover_interpretation,
+    "dividend_yield": get_dividend_yield_interpretation,
+}
+
+
 def get_health_level(score: float) -> str:
     if score < 40:
         return "Poor"
@@ -1,12 +1,17 @@
 from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
 from shared.utils.time_processor import TimeProcessor
 from shared.utils.calculations import calculate_volatility, calculate_std_dev
+from shared.utils.aggregation import aggregate_rows, build_field_matrix
 from infrastructure.api_clients.vn_stock_client import VNStockClient
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
+from infrastructure.storage.market_snapshot import get_current_snapshot
 
 _RANKING_TTL_HOURS = 0.5
+_SNAPSHOT_MAX_AGE_HOURS = 24
+_SNAPSHOT_FIELDS = ("open", "high", "low", "close", "volume")
 
 
 def _cache() -> Optional[Any]:
@@ -29,16 +34,18 @@ def handle_ranking_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
         start_date = time_params["start_date"]
         end_date = time_params["end_date"]
 
-        all_data = {}
-        for ticker in tickers:
-            try:
-                data = get_price_data(ticker, start_date, end_date)
-                if data:
-                    all_data[ticker] = data
-            except Exception as e:
-                all_data[ticker] = {"error": str(e)}
+        ranking_results = _rank_latest_from_snapshot(tickers, requested_field, aggregate, start_date, end_date)
+        if ranking_results is None:
+            all_data = {}
+            for ticker in tickers:
+                try:
+                    data = get_price_data(ticker, start_date, end_date)
+                    if data:
+                        all_data[ticker] = data
+                except Exception as e:
+                    all_data[ticker] = {"error": str(e)}
 
-        ranking_results = perform_ranking(all_data, requested_field, aggregate)
+            ranking_results = perform_ranking(all_data, requested_field, aggregate)
 
         results["ranking"] = ranking_results
         results["tickers"] = tickers
@@ -55,6 +62,25 @@ def handle_ranking_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+def _rank_latest_from_snapshot(
+    tickers: List[str],
+    field: str,
+    aggregate: str,
+    start_date: str,
+    end_date: str
+) -> Optional[Dict[str, Any]]:
+    # "Latest value" rankings are answered from the daily snapshot when it covers every ticker
+    if aggregate != "latest" or field not in _SNAPSHOT_FIELDS:
+        return None
+    snapshot = get_current_snapshot(_SNAPSHOT_MAX_AGE_HOURS, on_or_before=end_date)
+    if snapshot is None or snapshot.as_of < start_date:
+        return None
+    values = snapshot.column(field, tickers)
+    if len(values) != len(tickers):
+        return None
+    return rank_values(list(values), np.array(list(values.values())), None, field, aggregate)
+
+
 def get_price_data(
     ticker: str,
     start_date: str = None,
@@ -108,70 +134,54 @@ def perform_ranking(
     field: str,
     aggregate: str
 ) -> Dict[str, Any]:
-    ranking = {}
-
-    ticker_stats = {}
-    for ticker, data in all_data.items():
-        if "error" in data:
-            ticker_stats[ticker] = {"error": data["error"]}
-            continue
-
-        values = [item[field] for item in data["data"] if field in item]
-        if values:
-            if aggregate == "max":
-                stat_value = max(values)
-            elif aggregate == "min":
-                stat_value = min(values)
-            elif aggregate == "mean":
-                stat_value = sum(values) / len(values)
-            elif aggregate == "latest":
-                stat_value = values[-1]
-            else:
-                stat_value = max(values)
-
-            ticker_stats[ticker] = {
-                "value": stat_value,
-                "count": len(values),
-                "data_points": values
-            }
-
-    valid_stats = {k: v for k, v in ticker_stats.items() if "error" not in v}
-
-    if not valid_stats:
+    matrix = build_field_matrix(all_data, field)
+    if not matrix.tickers:
         return {"error": "No valid data for ranking"}
 
-    sorted_tickers = sorted(
-        valid_stats.items(),
-        key=lambda x: x[1]["value"],
-        reverse=(aggregate != "min")
-    )
+    rows = aggregate_rows(matrix)
+    stat_key = aggregate if aggregate in ("max", "min", "mean", "latest") else "max"
+    # A latest-value ranking reads one bar per ticker, so a range count is not reported
+    counts = None if stat_key == "latest" else rows["count"]
+    return rank_values(list(matrix.tickers), rows[stat_key], counts, field, aggregate)
+
+
+def rank_values(
+    tickers: List[str],
+    stat_values: np.ndarray,
+    counts: Optional[np.ndarray],
+    field: str,
+    aggregate: str
+) -> Dict[str, Any]:
+    # Stable sort keeps input order for ties, matching sorted(..., reverse=...)
+    order = np.argsort(stat_values if aggregate == "min" else -stat_values, kind="stable")
 
     ranking_list = []
-    for i, (ticker, stats) in enumerate(sorted_tickers, 1):
-        ranking_list.append({
-            "rank": i,
-            "ticker": ticker,
-            "value": stats["value"],
-            "data_points": stats["count"]
-        })
+    for rank, i in enumerate(order, 1):
+        entry = {
+            "rank": rank,
+            "ticker": tickers[i],
+            "value": float(stat_values[i])
+        }
+        if counts is not None:
+            entry["data_points"] = int(counts[i])
+        ranking_list.append(entry)
 
     top_performer = ranking_list[0] if ranking_list else None
     bottom_performer = ranking_list[-1] if ranking_list else None
 
-    values = [stats["value"] for stats in valid_stats.values()]
     stats_summary = {
-        "mean": sum(values) / len(values) if values else 0,
-        "median": sorted(values)[len(values) // 2] if values else 0,
-        "std_dev": calculate_std_dev(values) if values else 0,
-        "range": (max(values) - min(values)) if values else 0
+        "mean": float(stat_values.mean()),
+        "median": float(np.sort(stat_values)[len(stat_values) // 2]),
+        "std_dev": calculate_std_dev(stat_values),
+        "range": float(stat_values.max() - stat_values.min())
     }
 
     ranking = {
         "ranking_list": ranking_list,
         "top_performer": top_performer,
         "bottom_performer": bottom_performer,
-        "total_tickers": len(valid_stats),
-        "valid_tickers": list(valid_stats.keys()),
+        "total_tickers": len(ranking_list),
+        "valid_tickers": list(tickers),
         "statistics": stats_summary,
         "field": field,
         "aggregate": aggregate
@@ -180,9 +190,6 @@ def perform_ranking(
     return ranking
 
 
-
-
-
 def rank_performance(tickers: List[str], days: int = 30, metric: str = "performance") -> Dict[str, Any]:
     try:
         all_data = {}
@@ -0,0 +1,136 @@
+from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, wait
+import time
+import numpy as np
+from application.services.financial.financial_ratio_service import get_ratio_table
+from infrastructure.observability import get_logger
+from infrastructure.storage.sector_index import get_sector_index
+from shared.utils.financial_ratios import PERIODS_PER_YEAR, resolve_ratio
+from shared.utils.screening import FundamentalsMatrix, parse_conditions
+
+logger = get_logger(__name__)
+
+# Matrix rows follow the ratio-table cache lifetime
+_ROW_TTL_HOURS = 2
+_LOAD_MAX_WORKERS = 8
+_LOAD_TIME_BUDGET_SECONDS = 20.0
+_DEFAULT_LIMIT = 20
+_MAX_LIMIT = 200
+
+# One universe-wide matrix per statement period, kept across queries
+_matrices: Dict[str, FundamentalsMatrix] = {period: FundamentalsMatrix() for period in PERIODS_PER_YEAR}
+
+
+def get_fundamentals_matrix(period: str = "quarter") -> FundamentalsMatrix:
+    return _matrices[period]
+
+
+def _universe(parsed: Dict[str, Any]) -> List[str]:
+    tickers = parsed.get("tickers") or []
+    if tickers:
+        return [t.upper() for t in tickers]
+    index = get_sector_index()
+    if index is None:
+        logger.warning("Sector index unavailable; screening universe is empty")
+        return []
+    sector = parsed.get("sector")
+    return index.tickers_for_sector(sector) if sector else index.tickers()
+
+
+def _load_row(matrix: FundamentalsMatrix, ticker: str, period: str) -> None:
+    # The statement and price fetchers behind get_ratio_table each take a vendor slot, so rows
+    # share the vendor budget with sector scans and snapshot builds
+    table = get_ratio_table(ticker, period)
+    # A ticker without statements still gets an (empty) row so it is not refetched on every screen
+    if table is None:
+        matrix.update(ticker, [], {})
+    else:
+        matrix.update(ticker, table["periods"], table["ratios"])
+
+
+def load_universe(
+    tickers: List[str],
+    period: str = "quarter",
+    time_budget: float = _LOAD_TIME_BUDGET_SECONDS,
+    max_workers: int = _LOAD_MAX_WORKERS
+) -> List[str]:
+    """Load missing or expired rows concurrently; returns the tickers still loading when the budget ran out."""
+    matrix = _matrices[period]
+    to_load = matrix.stale(tickers, _ROW_TTL_HOURS * 3600)
+    if not to_load:
+        return []
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(to_load)))
+    futures = {pool.submit(_load_row, matrix, ticker, period): ticker for ticker in to_load}
+    _, not_done = wait(futures, timeout=time_budget)
+    # Loads already running still land in the matrix for the next screen
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for future in futures:
+        if future.done() and not future.cancelled() and future.exception() is not None:
+            logger.debug(f"Screening row load failed: {future.exception()}")
+    pending = [futures[future] for future in futures if future in not_done]
+    if pending:
+        logger.warning(f"Screening load budget exhausted with {len(pending)} tickers pending")
+    return pending
+
+
+def handle_screening_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        conditions = parse_conditions(parsed.get("filters") or parsed.get("expression"))
+    except ValueError as e:
+        return {"error": str(e)}
+
+    sort_by = parsed.get("sort_by")
+    if sort_by and resolve_ratio(sort_by) is None:
+        return {"error": f"Unknown ratio: {sort_by}"}
+    sort_by = resolve_ratio(sort_by) or (conditions[0].ratio if conditions else None)
+    if not conditions and sort_by is None:
+        return {"error": "Missing screening filters"}
+
+    period = parsed.get("period") if parsed.get("period") in PERIODS_PER_YEAR else "quarter"
+    year, quarter = parsed.get("year"), parsed.get("quarter")
+    period_label = (f"{year}-Q{quarter}" if quarter and period == "quarter" else str(year)) if year else None
+    limit = min(int(parsed.get("limit") or _DEFAULT_LIMIT), _MAX_LIMIT)
+    descending = parsed.get("order", "desc") != "asc"
+
+    try:
+        universe = _universe(parsed)
+        if not universe:
+            return {"error": "No tickers to screen"}
+
+        pending = load_universe(universe, period)
+        matrix = _matrices[period]
+        fields = list(dict.fromkeys([c.ratio for c in conditions] + ([sort_by] if sort_by else [])))
+        start = time.perf_counter()
+        # Every value of a ticker comes from one period: its latest with all screened ratios reported
+        tickers, periods, values = matrix.snapshot(universe, period_label, ratios=fields)
+        matches = matrix.screen(values, conditions, sort_by, descending)
+
+        columns = [matrix.ratio_index[f] for f in fields]
+        results = []
+        for row in matches[:limit]:
+            record = {"ticker": tickers[row], "period": periods[row]}
+            for field, col in zip(fields, columns):
+                value = values[row, col]
+                record[field] = round(float(value), 4) if np.isfinite(value) else None
+            results.append(record)
+
+        result = {
+            "filters": [{"field": c.ratio, "op": c.op, "value": c.value} for c in conditions],
+            "sort_by": sort_by,
+            "order": "desc" if descending else "asc",
+            "universe": parsed.get("sector") or ("tickers" if parsed.get("tickers") else "all"),
+            "period": period_label or "latest",
+            "total_screened": len(tickers),
+            "total_matches": len(matches),
+            "results": results,
+            "screen_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if pending:
+            result["partial"] = True
+            result["pending_tickers"] = pending
+        return result
+
+    except Exception as e:
+        return {"error": str(e)}
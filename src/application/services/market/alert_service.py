@@ -1,50 +1,116 @@
-from typing import Dict, Any, Optional
-from infrastructure.api_clients.vn_stock_client import VNStockClient
+from typing import Dict, Any, List
 from infrastructure.observability import get_logger
+from infrastructure.observability.logging.logger import user_id_var
+from infrastructure.storage.alert_rules import (
+    CROSS_CONDITIONS,
+    DEFAULT_USER,
+    AlertRuleIndex,
+    fetch_latest_closes,
+    get_alert_monitor,
+)
 
 logger = get_logger(__name__)
 
 
+def _owner() -> str:
+    # The owner comes from the request context (API header, CLI user), not from the parsed query
+    return user_id_var.get() or DEFAULT_USER
+
+
+def _check_once(tickers: List[str], threshold: float, condition: str, indicator: str) -> List[Dict[str, Any]]:
+    # Ad-hoc rules evaluated against one batched price sweep; percent moves are measured from the previous close
+    tickers = [t.upper() for t in tickers]
+    rules = [{"id": i, "ticker": t, "condition": condition, "threshold": threshold, "indicator": indicator}
+             for i, t in enumerate(tickers)]
+    index = AlertRuleIndex(rules)
+
+    lookback = 2 if condition.startswith("percent") else index.lookback_bars(tickers[0])
+    closes = fetch_latest_closes(tickers, {t: lookback for t in tickers})
+    prices = {t: float(values[-1]) for t, values in closes.items()}
+    index.assign_references({t: float(values[-2]) for t, values in closes.items() if len(values) > 1})
+    fired = {trigger["rule_id"] for trigger in index.evaluate(prices, closes)}
+
+    results = []
+    for rule in rules:
+        ticker = rule["ticker"]
+        if ticker not in prices:
+            results.append({"ticker": ticker, "error": "No price data available"})
+            continue
+        results.append({
+            "ticker": ticker,
+            "current_price": prices[ticker],
+            "threshold": threshold,
+            "condition": condition,
+            "triggered": rule["id"] in fired,
+        })
+    return results
+
+
+def _watch(parsed: Dict[str, Any], tickers: List[str], threshold: float, condition: str, user_id: str) -> Dict[str, Any]:
+    monitor = get_alert_monitor()
+    if monitor is None:
+        return {"error": "Alert monitor unavailable"}
+
+    rules = [
+        monitor.add_rule(ticker, condition, threshold, user_id=user_id, indicator=parsed.get("indicator"))
+        for ticker in tickers
+    ]
+    return {"registered": rules, "summary": {"total": len(rules), "watched_tickers": len(monitor.index.tickers())}}
+
+
+def _list_rules(parsed: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    monitor = get_alert_monitor()
+    if monitor is None:
+        return {"error": "Alert monitor unavailable"}
+
+    rules = monitor.store.get_rules(user_id=user_id, status=parsed.get("status"))
+    tickers = {t.upper() for t in parsed.get("tickers") or []}
+    if tickers:
+        rules = [r for r in rules if r["ticker"] in tickers]
+    return {
+        "rules": rules,
+        "summary": {
+            "total": len(rules),
+            "active": sum(1 for r in rules if r["status"] == "active"),
+            "triggered": sum(1 for r in rules if r["status"] == "triggered"),
+        },
+    }
+
+
+def _cancel(parsed: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    monitor = get_alert_monitor()
+    if monitor is None:
+        return {"error": "Alert monitor unavailable"}
+
+    rule_ids = parsed.get("alert_ids") or []
+    if not rule_ids:
+        return {"error": "Missing alert_ids parameter"}
+    cancelled = [rule_id for rule_id in rule_ids if monitor.cancel_rule(int(rule_id), user_id)]
+    return {"cancelled": cancelled, "not_found": [r for r in rule_ids if r not in cancelled]}
+
+
 def handle_alert_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
     tickers = parsed.get("tickers") or []
-    threshold = parsed.get("threshold", 0.0)
-    condition = parsed.get("condition", "above")
+    threshold = parsed.get("threshold") or 0.0
+    condition = parsed.get("condition") or "above"
     timeframe = parsed.get("timeframe", "1d")
-
-    if not tickers or threshold == 0.0:
-        return {"error": "Missing tickers or threshold parameter"}
+    action = parsed.get("action") or "check"
+    user_id = _owner()
 
     try:
-        results = []
-        for ticker in tickers:
-            try:
-                client = VNStockClient(ticker=ticker)
-                data = client.fetch_trading_data(end=None, interval="1d")
-
-                if data is None or data.empty:
-                    results.append({
-                        "ticker": ticker,
-                        "error": "No price data available",
-                    })
-                    continue
-
-                current_price = float(data.iloc[-1]["close"])
-                triggered = (
-                    (condition == "above" and current_price >= threshold)
-                    or (condition == "below" and current_price <= threshold)
-                )
-
-                results.append({
-                    "ticker": ticker,
-                    "current_price": current_price,
-                    "threshold": threshold,
-                    "condition": condition,
-                    "triggered": triggered,
-                })
-
-            except Exception as e:
-                logger.error(f"Alert check failed for {ticker}: {e}")
-                results.append({"ticker": ticker, "error": str(e)})
+        if action == "list":
+            return _list_rules(parsed, user_id)
+        if action == "cancel":
+            return _cancel(parsed, user_id)
+
+        if not tickers or threshold == 0.0:
+            return {"error": "Missing tickers or threshold parameter"}
+
+        if action == "watch":
+            return _watch(parsed, tickers, threshold, condition, user_id)
+
+        indicator = (parsed.get("indicator") or "sma") if condition in CROSS_CONDITIONS else None
+        results = _check_once(tickers, threshold, condition, indicator)
 
         if not results:
             return {"error": "Alert monitoring requires price data"}
@@ -60,4 +126,16 @@ def handle_alert_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
 
     except Exception as e:
         logger.error(f"Alert query failed: {e}")
-        return {"error": f"Alert monitoring requires price data: {e}"}
\ No newline at end of file
+        return {"error": f"Alert monitoring requires price data: {e}"}
+
+
+def take_alert_notices() -> str:
+    """Watch alerts that fired since the owner's last turn, as lines to append to the answer."""
+    monitor = get_alert_monitor()
+    if monitor is None:
+        return ""
+    return "\n".join(
+        f"🔔 Cảnh báo #{rule['id']}: {rule['ticker']} {rule['condition']} {rule['threshold']:g} "
+        f"đã kích hoạt lúc {rule['triggered_at'][:16].replace('T', ' ')} (giá {rule['triggered_price']:g})"
+        for rule in monitor.store.take_notifications(_owner())
+    )
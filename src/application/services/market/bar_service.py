@@ -0,0 +1,90 @@
+from typing import Dict, Any, Iterable, Optional
+import numpy as np
+import pandas as pd
+from infrastructure.api_clients.vn_stock_client import VNStockClient
+from infrastructure.cache import get_cache_manager
+from infrastructure.cache.cache_keys import make_cache_key
+from shared.utils.resampling import (
+    finest_interval,
+    format_bar_dates,
+    is_intraday,
+    normalize_interval,
+    resample_ohlcv,
+)
+
+_DAILY_BARS_TTL_HOURS = 0.5
+_INTRADAY_BARS_TTL_HOURS = 0.1
+
+_BAR_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+
+def _cache() -> Optional[Any]:
+    return get_cache_manager()
+
+
+def _ttl(interval: str) -> float:
+    return _INTRADAY_BARS_TTL_HOURS if is_intraday(interval) else _DAILY_BARS_TTL_HOURS
+
+
+def _bars_key(ticker: str, start: str, end: str, interval: str) -> str:
+    return make_cache_key("bars", ticker, start, end, interval=interval)
+
+
+def _to_frame(data: Dict[str, list]) -> pd.DataFrame:
+    return pd.DataFrame(data, columns=_BAR_COLUMNS)
+
+
+def _derive(base: pd.DataFrame, base_interval: str, interval: str) -> pd.DataFrame:
+    if interval == base_interval or base.empty:
+        return base
+    resampled = resample_ohlcv({
+        "date": pd.to_datetime(base["date"]).to_numpy(),
+        **{name: base[name].to_numpy() for name in _BAR_COLUMNS[1:]}
+    }, interval)
+    resampled["date"] = format_bar_dates(resampled["date"], interval)
+    frame = pd.DataFrame(resampled, columns=_BAR_COLUMNS)
+    frame["volume"] = frame["volume"].astype(np.int64)
+    return frame
+
+
+def get_multi_interval_bars(
+    ticker: str,
+    start: str,
+    end: str,
+    intervals: Iterable[str]
+) -> Dict[str, pd.DataFrame]:
+    # One vendor call at the finest requested interval; coarser series are resampled from it
+    wanted = list(dict.fromkeys(normalize_interval(i) for i in intervals))
+    cache = _cache()
+    result: Dict[str, pd.DataFrame] = {}
+
+    for interval in wanted:
+        cached = cache.get(_bars_key(ticker, start, end, interval)) if cache else None
+        if cached is not None:
+            result[interval] = _to_frame(cached)
+
+    missing = [interval for interval in wanted if interval not in result]
+    if not missing:
+        return result
+
+    # Every coarser interval in Interval is a whole multiple of every finer one
+    base_interval = finest_interval(missing)
+
+    base = VNStockClient(ticker=ticker).fetch_trading_data(start=start, end=end, interval=base_interval)
+    if base is None or base.empty:
+        base = _to_frame({})
+    else:
+        base = base[_BAR_COLUMNS].reset_index(drop=True)
+
+    for interval in missing:
+        frame = _derive(base, base_interval, interval)
+        result[interval] = frame
+        if cache and not frame.empty:
+            cache.set(_bars_key(ticker, start, end, interval), frame.to_dict("list"), ttl_hours=_ttl(interval))
+
+    return result
+
+
+def get_bars(ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+    interval = normalize_interval(interval)
+    return get_multi_interval_bars(ticker, start, end, [interval])[interval]
@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Optional
 from shared.utils.time_processor import TimeProcessor
 from shared.utils.calculations import calculate_volatility
+from shared.utils.aggregation import aggregate_rows, build_field_matrix
 from infrastructure.api_clients.vn_stock_client import VNStockClient
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
@@ -114,44 +115,39 @@ def get_price_data(
         return {"error": str(e)}
 
 
-def perform_comparison(
-    main_data: Dict[str, Any],
-    compare_data: Dict[str, Any],
-    field: str
-) -> Dict[str, Any]:
-    comparison = {}
+def summarize_field(all_data: Dict[str, Any], field: str) -> Dict[str, Any]:
+    matrix = build_field_matrix(all_data, field)
+    rows = aggregate_rows(matrix)
+    positions = {ticker: i for i, ticker in enumerate(matrix.tickers)}
 
-    main_stats = {}
-    for ticker, data in main_data.items():
+    stats = {}
+    for ticker, data in all_data.items():
         if "error" in data:
-            main_stats[ticker] = {"error": data["error"]}
+            stats[ticker] = {"error": data["error"]}
             continue
 
-        values = [item[field] for item in data["data"] if field in item]
-        if values:
-            main_stats[ticker] = {
-                "mean": sum(values) / len(values),
-                "min": min(values),
-                "max": max(values),
-                "latest": values[-1] if values else None,
-                "count": len(values)
+        i = positions.get(ticker)
+        if i is not None:
+            stats[ticker] = {
+                "mean": float(rows["mean"][i]),
+                "min": float(rows["min"][i]),
+                "max": float(rows["max"][i]),
+                "latest": float(rows["latest"][i]),
+                "count": int(rows["count"][i])
             }
 
-    compare_stats = {}
-    for ticker, data in compare_data.items():
-        if "error" in data:
-            compare_stats[ticker] = {"error": data["error"]}
-            continue
+    return stats
 
-        values = [item[field] for item in data["data"] if field in item]
-        if values:
-            compare_stats[ticker] = {
-                "mean": sum(values) / len(values),
-                "min": min(values),
-                "max": max(values),
-                "latest": values[-1] if values else None,
-                "count": len(values)
-            }
+
+def perform_comparison(
+    main_data: Dict[str, Any],
+    compare_data: Dict[str, Any],
+    field: str
+) -> Dict[str, Any]:
+    comparison = {}
+
+    main_stats = summarize_field(main_data, field)
+    compare_stats = summarize_field(compare_data, field)
 
     main_overall = calculate_overall_stats(main_stats, field)
     compare_overall = calculate_overall_stats(compare_stats, field)
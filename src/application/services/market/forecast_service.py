@@ -1,7 +1,8 @@
-from typing import Dict, Any, List, Optional
-from statistics import mean, stdev
-from infrastructure.api_clients.vn_stock_client import VNStockClient
-from shared.utils.time_processor import TimeProcessor
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import numpy as np
+from application.services.market.bar_service import get_bars
+from shared.utils.forecasting import FORECAST_MODELS, ForecastModels, right_aligned
 from infrastructure.observability import get_logger
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
@@ -9,15 +10,121 @@ from infrastructure.cache.cache_keys import make_cache_key
 logger = get_logger(__name__)
 
 _FORECAST_TTL_HOURS = 1
+# Fitted state is updated bar by bar; a full refit runs after this many incremental bars
+_STATE_TTL_HOURS = 24 * 7
+_REFIT_AFTER_BARS = 63
+_HISTORY_DAYS = 730
+_MIN_BARS = 20
+# Local time after which today's daily bar is final
+_SESSION_CLOSE = "15:00"
+
+_HORIZON_BARS = {"1d": 1, "3d": 3, "1w": 5, "2w": 10, "1m": 21, "1M": 21, "3m": 63, "3M": 63}
 
 
 def _cache() -> Optional[Any]:
     return get_cache_manager()
 
 
+def _state_key(ticker: str) -> str:
+    return make_cache_key("forecast_state", ticker)
+
+
+def _last_completed_session(now: datetime) -> str:
+    """Latest date whose daily bar is final: today once the session has closed, else yesterday."""
+    close = datetime.strptime(_SESSION_CLOSE, "%H:%M").time()
+    day = now.date() if now.time() >= close else now.date() - timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+def _closes_after(ticker: str, start: str, end: str, after: Optional[str]) -> Tuple[np.ndarray, Optional[str]]:
+    # Bars in (after, end]; ``end`` is the last completed session, so a partial bar never enters the state
+    data = get_bars(ticker, start, end, "1d")
+    if data is None or data.empty:
+        return np.empty(0), after
+    day = data["date"].astype(str).str[:10]
+    data = data[day <= end]
+    if after is not None:
+        data = data[data["date"] > after]
+    if data.empty:
+        return np.empty(0), after
+    return data["close"].to_numpy(dtype=np.float64), data["date"].iloc[-1]
+
+
+def _load_models(tickers: List[str], cache: Optional[Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    # Cached tickers fetch only bars after their state; the rest are fitted together in one batch
+    today = datetime.now()
+    end = _last_completed_session(today)
+    history_start = (today - timedelta(days=_HISTORY_DAYS)).strftime("%Y-%m-%d")
+
+    states: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    to_update: Dict[str, Tuple[Dict[str, Any], np.ndarray, Optional[str]]] = {}
+    to_fit: Dict[str, Tuple[np.ndarray, Optional[str]]] = {}
+
+    for ticker in tickers:
+        try:
+            stored = cache.get(_state_key(ticker)) if cache else None
+            if stored is not None and stored.get("last_date") and stored["bars_since_fit"] < _REFIT_AFTER_BARS:
+                closes, last_date = _closes_after(ticker, stored["last_date"][:10], end, stored["last_date"])
+                to_update[ticker] = (stored, closes, last_date)
+                continue
+
+            closes, last_date = _closes_after(ticker, history_start, end, None)
+            if len(closes) < _MIN_BARS:
+                errors[ticker] = "Insufficient historical data for forecast"
+                continue
+            to_fit[ticker] = (closes, last_date)
+        except Exception as e:
+            logger.error(f"Forecast data fetch failed for {ticker}: {e}")
+            errors[ticker] = f"Insufficient historical data for forecast: {e}"
+
+    if to_fit:
+        names = list(to_fit)
+        fitted = ForecastModels.fit(right_aligned([to_fit[t][0] for t in names]))
+        states.update(zip(names, fitted.to_rows([to_fit[t][1] for t in names])))
+
+    if to_update:
+        names = list(to_update)
+        models = ForecastModels.from_rows([to_update[t][0] for t in names])
+        models.update(right_aligned([to_update[t][1] for t in names]))
+        states.update(zip(names, models.to_rows([to_update[t][2] for t in names])))
+
+    if cache:
+        for ticker in to_fit.keys() | to_update.keys():
+            cache.set(_state_key(ticker), states[ticker], ttl_hours=_STATE_TTL_HOURS)
+
+    return states, errors
+
+
+def _format_forecast(ticker: str, row: int, projections: Dict[str, np.ndarray], model: str, data_points: int, timeframe: str) -> Dict[str, Any]:
+    per_model = {name: float(projections[name][row]) for name in FORECAST_MODELS if np.isfinite(projections[name][row])}
+    if model in per_model:
+        projected_price = per_model[model]
+    else:
+        projected_price = float(np.mean(list(per_model.values())))
+    band = float(projections["band"][row])
+
+    return {
+        "ticker": ticker,
+        "last_price": round(float(projections["last_price"][row]), 2),
+        "projected_price": round(projected_price, 2),
+        "confidence_bounds": {
+            "lower": round(projected_price / band, 2),
+            "upper": round(projected_price * band, 2),
+        },
+        "model_projections": {name: round(value, 2) for name, value in per_model.items()},
+        "volatility": round(float(projections["volatility"][row]), 4),
+        "trend_pct": round(float(projections["trend_5"][row]) * 100, 2),
+        "sma_20": round(float(projections["sma_20"][row]), 2),
+        "data_points": data_points,
+        "timeframe": timeframe,
+    }
+
+
 def handle_forecast_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
     tickers = parsed.get("tickers") or []
     timeframe = parsed.get("timeframe", "1w")
+    model = parsed.get("model") if parsed.get("model") in FORECAST_MODELS else "ensemble"
 
     if not tickers:
         return {"error": "Missing tickers"}
@@ -25,64 +132,37 @@ def handle_forecast_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
     try:
         cache = _cache()
         results = {}
+        pending = []
 
         for ticker in tickers:
-            try:
-                cache_key = make_cache_key("forecast", ticker, timeframe)
-                cached = cache.get(cache_key) if cache else None
-                if cached is not None:
-                    results[ticker] = cached
-                    continue
-
-                client = VNStockClient(ticker=ticker)
-                data = client.fetch_trading_data(start=None, end=None, interval="1d")
-
-                if data is None or data.empty or len(data) < 20:
-                    results[ticker] = {"error": "Insufficient historical data for forecast"}
-                    continue
-
-                close_prices = data["close"].astype(float).tolist()
-                n = len(close_prices)
-                sma_20 = mean(close_prices[-20:])
-                recent_trend = (close_prices[-1] - close_prices[-5]) / close_prices[-5] if n >= 5 else 0.0
-                volatility = stdev(close_prices[-20:]) if n >= 20 else 0.0
-
-                last_price = close_prices[-1]
-                projected_price = last_price * (1 + recent_trend)
-                confidence_bound = volatility * 1.96
-
-                forecast = {
-                    "ticker": ticker,
-                    "last_price": round(last_price, 2),
-                    "projected_price": round(projected_price, 2),
-                    "confidence_bounds": {
-                        "lower": round(projected_price - confidence_bound, 2),
-                        "upper": round(projected_price + confidence_bound, 2),
-                    },
-                    "volatility": round(volatility, 4),
-                    "trend_pct": round(recent_trend * 100, 2),
-                    "sma_20": round(sma_20, 2),
-                    "data_points": n,
-                    "timeframe": timeframe,
-                }
-
-                results[ticker] = forecast
-                if cache:
-                    cache.set(cache_key, forecast, ttl_hours=_FORECAST_TTL_HOURS)
-
-            except Exception as e:
-                logger.error(f"Forecast failed for {ticker}: {e}")
-                results[ticker] = {"error": f"Insufficient historical data for forecast: {e}"}
+            cached = cache.get(make_cache_key("forecast", ticker, timeframe, model=model)) if cache else None
+            if cached is not None:
+                results[ticker] = cached
+            else:
+                pending.append(ticker)
+
+        if pending:
+            states, errors = _load_models(pending, cache)
+            results.update({ticker: {"error": message} for ticker, message in errors.items()})
+
+            names = [t for t in pending if t in states]
+            if names:
+                projections = ForecastModels.from_rows([states[t] for t in names]).forecast(_HORIZON_BARS.get(timeframe, 5))
+                for row, ticker in enumerate(names):
+                    forecast = _format_forecast(ticker, row, projections, model, states[ticker]["bars"], timeframe)
+                    results[ticker] = forecast
+                    if cache:
+                        cache.set(make_cache_key("forecast", ticker, timeframe, model=model), forecast, ttl_hours=_FORECAST_TTL_HOURS)
 
         if not results:
             return {"error": "Insufficient historical data for forecast"}
 
         return {
-            "forecasts": results,
-            "model": "simple_moving_average",
+            "forecasts": {ticker: results[ticker] for ticker in tickers if ticker in results},
+            "model": model,
             "timeframe": timeframe,
         }
 
     except Exception as e:
         logger.error(f"Forecast query failed: {e}")
-        return {"error": f"Insufficient historical data for forecast: {e}"}
\ No newline at end of file
+        return {"error": f"Insufficient historical data for forecast: {e}"}
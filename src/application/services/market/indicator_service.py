@@ -1,12 +1,17 @@
 import json
 from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
-from infrastructure.api_clients.vn_stock_client import VNStockClient
+from application.services.market.bar_service import get_multi_interval_bars
 from shared.utils.time_processor import TimeProcessor
+from shared.utils.indicators import IndicatorEngine, indicator_result_name, normalize_indicator_spec
+from shared.utils.resampling import normalize_interval
+from shared.utils.streaming_indicators import STREAMING_INDICATORS, IndicatorState, make_indicator_state
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
 
 _INDICATOR_TTL_HOURS = 0.5
+_INDICATOR_STATE_TTL_HOURS = 24
 
 
 def _cache() -> Optional[Any]:
@@ -24,59 +29,83 @@ def handle_indicator_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
     try:
         cache = _cache()
         results = {}
+        pending = {}
+
+        time_processor = TimeProcessor()
+        time_params = time_processor.process_time_params(parsed)
+        start_date = time_params["start_date"]
+        end_date = time_params["end_date"]
+
+        spec = normalize_indicator_spec(requested_field, indicator_params)
+        ip_str = json.dumps(indicator_params, sort_keys=True) if indicator_params else ""
+
+        # Several intervals of one ticker share a single fetch at the finest granularity
+        intervals = [normalize_interval(i) for i in (parsed.get("intervals") or [parsed.get("interval") or "1d"])]
+        multi_interval = len(intervals) > 1
+
+        def store(ticker: str, interval: str, value: Any) -> None:
+            if multi_interval:
+                results.setdefault(ticker, {})[interval] = value
+            else:
+                results[ticker] = value
 
         for ticker in tickers:
             try:
-                client = VNStockClient(ticker=ticker)
-
-                time_processor = TimeProcessor()
-                time_params = time_processor.process_time_params(parsed)
-                start_date = time_params["start_date"]
-                end_date = time_params["end_date"]
-
-                ip_str = json.dumps(indicator_params, sort_keys=True) if indicator_params else ""
-                cache_key = make_cache_key("indicator", ticker, start_date, end_date, requested_field=requested_field, indicator_params=ip_str)
-                cached = cache.get(cache_key) if cache else None
-                if cached is not None:
-                    results[ticker] = cached
+                if parsed.get("latest_only"):
+                    # Stored states fetch only the bars after them, not the whole window
+                    for interval in intervals:
+                        store(ticker, interval, get_latest_indicator_values(ticker, spec, start_date, end_date, interval))
                     continue
 
-                data = client.fetch_trading_data(
-                    start=start_date,
-                    end=end_date,
-                    interval="1d"
-                )
+                to_fetch = []
+                for interval in intervals:
+                    cache_key = make_cache_key("indicator", ticker, start_date, end_date, interval=interval, requested_field=requested_field, indicator_params=ip_str)
+                    cached = cache.get(cache_key) if cache else None
+                    if cached is not None:
+                        store(ticker, interval, cached)
+                    else:
+                        to_fetch.append((interval, cache_key))
 
-                if data is None or data.empty:
-                    results[ticker] = {"error": "No data available"}
+                if not to_fetch:
                     continue
 
-                ticker_results = {}
+                bars = get_multi_interval_bars(ticker, start_date, end_date, [interval for interval, _ in to_fetch])
+                for interval, cache_key in to_fetch:
+                    data = bars.get(interval)
+                    if data is None or data.empty:
+                        store(ticker, interval, {"error": "No data available"})
+                        continue
 
-                if requested_field == "sma" or "sma" in indicator_params:
-                    sma_periods = indicator_params.get("sma", [20])
-                    for period in sma_periods:
-                        sma_data = calculate_sma(data, period)
-                        ticker_results[f"sma_{period}"] = sma_data
+                    pending[(ticker, interval)] = (data, cache_key)
+                    store(ticker, interval, None)
 
-                if requested_field == "rsi" or "rsi" in indicator_params:
-                    rsi_periods = indicator_params.get("rsi", [14])
-                    for period in rsi_periods:
-                        rsi_data = calculate_rsi(data, period)
-                        ticker_results[f"rsi_{period}"] = rsi_data
+            except Exception as e:
+                results[ticker] = {"error": str(e)}
 
-                if requested_field == "macd" or "macd" in indicator_params:
-                    macd_params = indicator_params.get("macd", [(12, 26)])
-                    for fast, slow in macd_params:
-                        macd_data = calculate_macd(data, fast, slow)
-                        ticker_results[f"macd_{fast}_{slow}"] = macd_data
+        # Series sharing a calendar are evaluated together in one pass
+        groups: Dict[tuple, List[tuple]] = {}
+        for item, (data, _) in pending.items():
+            groups.setdefault(tuple(data["date"]), []).append(item)
 
-                results[ticker] = ticker_results
-                if cache:
-                    cache.set(cache_key, ticker_results, ttl_hours=_INDICATOR_TTL_HOURS)
+        for dates, group in groups.items():
+            try:
+                frames = [pending[item][0] for item in group]
+                engine = IndicatorEngine(
+                    close=np.stack([f["close"].to_numpy(dtype=float) for f in frames]),
+                    high=np.stack([f["high"].to_numpy(dtype=float) for f in frames]),
+                    low=np.stack([f["low"].to_numpy(dtype=float) for f in frames]),
+                    volume=np.stack([f["volume"].to_numpy(dtype=float) for f in frames])
+                )
+                computed = engine.evaluate(spec)
 
+                for row, (ticker, interval) in enumerate(group):
+                    ticker_results = format_indicator_results(list(dates), computed, row)
+                    store(ticker, interval, ticker_results)
+                    if cache:
+                        cache.set(pending[(ticker, interval)][1], ticker_results, ttl_hours=_INDICATOR_TTL_HOURS)
             except Exception as e:
-                results[ticker] = {"error": str(e)}
+                for ticker, interval in group:
+                    store(ticker, interval, {"error": str(e)})
 
         return results if results else {"error": "No valid data found"}
 
@@ -84,169 +113,156 @@ def handle_indicator_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
-def calculate_sma(data: pd.DataFrame, period: int) -> List[Dict[str, Any]]:
-    if len(data) < period:
-        return []
+def _state_cache_key(ticker: str, kind: str, params: Any, interval: str = "1d") -> str:
+    return make_cache_key("indicator_state", ticker, indicator=indicator_result_name(kind, params), interval=interval)
 
-    close_prices = data['close'].astype(float)
-    sma_values = close_prices.rolling(window=period).mean()
 
-    result = []
-    for i, (date, sma) in enumerate(zip(data['time'], sma_values)):
-        if pd.notna(sma):
-            result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "sma": float(sma)
-            })
+def _state_result_name(state: IndicatorState) -> str:
+    return indicator_result_name(state.kind, state.params)
 
-    return result
 
+def _fetch_bar_records(ticker: str, start: str, end: str, interval: str) -> List[Dict[str, Any]]:
+    data = get_multi_interval_bars(ticker, start, end, [interval]).get(interval)
+    return [] if data is None or data.empty else data.to_dict("records")
 
-def calculate_rsi(data: pd.DataFrame, period: int = 14) -> List[Dict[str, Any]]:
-    if len(data) < period + 1:
-        return []
 
-    close_prices = data['close'].astype(float)
+def get_latest_indicator_values(
+    ticker: str,
+    spec: Dict[str, List[Any]],
+    start_date: str,
+    end_date: str,
+    interval: str = "1d"
+) -> Dict[str, Any]:
+    # Persisted per (ticker, indicator, params). Stored states fetch from their last bar on; that bar
+    # must come back too, otherwise the series has a gap (state older than the vendor history, or
+    # revised bars) and the state is rebuilt from the full [start_date, end_date] window.
+    cache = _cache()
+    latest = {}
+    states = []
 
-    delta = close_prices.diff()
+    for kind, param_list in spec.items():
+        if kind not in STREAMING_INDICATORS:
+            latest[kind] = {"error": f"Incremental updates not supported for {kind}"}
+            continue
+        for params in param_list:
+            key = _state_cache_key(ticker, kind, params, interval)
+            stored = cache.get(key) if cache else None
+            try:
+                state = IndicatorState.from_dict(stored) if stored else make_indicator_state(kind, params)
+            except (KeyError, TypeError, ValueError):
+                state = make_indicator_state(kind, params)
+            states.append((key, kind, params, state))
+
+    resumable = [state.last_date for _, _, _, state in states if state.last_date]
+    recent = _fetch_bar_records(ticker, min(resumable)[:10], end_date, interval) if resumable else []
+    recent_dates = {bar["date"] for bar in recent}
+
+    rebuild = []
+    for i, (key, kind, params, state) in enumerate(states):
+        if state.last_date and state.last_date in recent_dates:
+            updated = state.update_many(recent)
+        else:
+            states[i] = (key, kind, params, make_indicator_state(kind, params))
+            rebuild.append(i)
+            continue
+        if updated and cache:
+            cache.set(key, state.to_dict(), ttl_hours=_INDICATOR_STATE_TTL_HOURS)
+
+    if rebuild:
+        bars = _fetch_bar_records(ticker, start_date, end_date, interval)
+        for i in rebuild:
+            key, _, _, state = states[i]
+            if state.update_many(bars) and cache:
+                cache.set(key, state.to_dict(), ttl_hours=_INDICATOR_STATE_TTL_HOURS)
+
+    if states and all(state.last_date is None for _, _, _, state in states):
+        return {"error": "No data available"}
+
+    for _, _, _, state in states:
+        latest[_state_result_name(state)] = {
+            "date": state.last_date,
+            "value": state.value()
+        }
+    return latest
+
+
+# Output layout per indicator: (line name in engine output, result key, record value key)
+_MULTI_LINE_FORMATS = {
+    "macd": [("macd", "macd_line", "macd"), ("signal", "signal_line", "signal"), ("histogram", "histogram", "histogram")],
+    "bb": [("upper", "upper_band", "upper_band"), ("middle", "middle_band", "middle_band"), ("lower", "lower_band", "lower_band")],
+    "stochastic": [("k", "k_percent", "k_percent"), ("d", "d_percent", "d_percent")],
+    "adx": [("adx", "adx", "adx"), ("plus_di", "plus_di", "plus_di"), ("minus_di", "minus_di", "minus_di")],
+}
+
+_MIN_BARS_ERRORS = {
+    "macd": "Insufficient data for MACD calculation",
+    "bb": "Insufficient data for Bollinger Bands calculation",
+    "stochastic": "Insufficient data for Stochastic Oscillator calculation",
+}
+
+
+def _to_records(dates: List[str], values: np.ndarray, key: str) -> List[Dict[str, Any]]:
+    valid = np.flatnonzero(~np.isnan(values))
+    return [{"date": dates[i], key: v} for i, v in zip(valid.tolist(), values[valid].tolist())]
+
+
+def format_indicator_results(dates: List[str], computed: Dict[str, Any], row: Optional[int] = None) -> Dict[str, Any]:
+    formatted = {}
+    for name, output in computed.items():
+        kind, _, params = name.partition("_")
+        if kind == "macd" and len(dates) < int(params.split("_")[1]):
+            formatted[name] = {"error": _MIN_BARS_ERRORS["macd"]}
+        elif kind == "rsi" and len(dates) < int(params) + 1:
+            formatted[name] = []
+        elif isinstance(output, dict):
+            lines = {
+                result_key: _to_records(dates, output[line] if row is None else output[line][row], value_key)
+                for line, result_key, value_key in _MULTI_LINE_FORMATS[kind]
+            }
+            if kind in _MIN_BARS_ERRORS and not any(lines.values()):
+                formatted[name] = {"error": _MIN_BARS_ERRORS[kind]}
+            else:
+                formatted[name] = lines
+        else:
+            formatted[name] = _to_records(dates, output if row is None else output[row], kind)
+    return formatted
+
+
+def _evaluate_single(data: pd.DataFrame, spec: Dict[str, List[Any]]) -> Dict[str, Any]:
+    engine = IndicatorEngine(
+        close=data["close"].to_numpy(dtype=float),
+        high=data["high"].to_numpy(dtype=float) if "high" in data else None,
+        low=data["low"].to_numpy(dtype=float) if "low" in data else None,
+        volume=data["volume"].to_numpy(dtype=float) if "volume" in data else None
+    )
+    return format_indicator_results(data["date"].tolist(), engine.evaluate(spec))
 
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
 
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+def calculate_sma(data: pd.DataFrame, period: int) -> List[Dict[str, Any]]:
+    if len(data) < period:
+        return []
+    return _evaluate_single(data, {"sma": [period]})[indicator_result_name("sma", period)]
 
-    result = []
-    for i, (date, rsi_val) in enumerate(zip(data['time'], rsi)):
-        if pd.notna(rsi_val):
-            result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "rsi": float(rsi_val)
-            })
 
-    return result
+def calculate_rsi(data: pd.DataFrame, period: int = 14) -> List[Dict[str, Any]]:
+    if len(data) < period + 1:
+        return []
+    return _evaluate_single(data, {"rsi": [period]})[indicator_result_name("rsi", period)]
 
 
 def calculate_macd(data: pd.DataFrame, fast_period: int = 12, slow_period: int = 26) -> Dict[str, List[Dict[str, Any]]]:
     if len(data) < slow_period:
         return {"error": "Insufficient data for MACD calculation"}
-
-    close_prices = data['close'].astype(float)
-
-    ema_fast = close_prices.ewm(span=fast_period).mean()
-    ema_slow = close_prices.ewm(span=slow_period).mean()
-
-    macd_line = ema_fast - ema_slow
-
-    signal_line = macd_line.ewm(span=9).mean()
-
-    histogram = macd_line - signal_line
-
-    macd_result = []
-    signal_result = []
-    histogram_result = []
-
-    for i, date in enumerate(data['time']):
-        if pd.notna(macd_line.iloc[i]):
-            macd_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "macd": float(macd_line.iloc[i])
-            })
-
-        if pd.notna(signal_line.iloc[i]):
-            signal_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "signal": float(signal_line.iloc[i])
-            })
-
-        if pd.notna(histogram.iloc[i]):
-            histogram_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "histogram": float(histogram.iloc[i])
-            })
-
-    return {
-        "macd_line": macd_result,
-        "signal_line": signal_result,
-        "histogram": histogram_result
-    }
+    return _evaluate_single(data, {"macd": [(fast_period, slow_period, 9)]})[indicator_result_name("macd", (fast_period, slow_period, 9))]
 
 
 def calculate_bollinger_bands(data: pd.DataFrame, period: int = 20, std_dev: float = 2) -> Dict[str, List[Dict[str, Any]]]:
     if len(data) < period:
         return {"error": "Insufficient data for Bollinger Bands calculation"}
-
-    close_prices = data['close'].astype(float)
-
-    middle_band = close_prices.rolling(window=period).mean()
-
-    std_dev_values = close_prices.rolling(window=period).std()
-
-    upper_band = middle_band + (std_dev * std_dev_values)
-    lower_band = middle_band - (std_dev * std_dev_values)
-
-    upper_result = []
-    middle_result = []
-    lower_result = []
-
-    for i, date in enumerate(data['time']):
-        if pd.notna(upper_band.iloc[i]):
-            upper_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "upper_band": float(upper_band.iloc[i])
-            })
-
-        if pd.notna(middle_band.iloc[i]):
-            middle_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "middle_band": float(middle_band.iloc[i])
-            })
-
-        if pd.notna(lower_band.iloc[i]):
-            lower_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "lower_band": float(lower_band.iloc[i])
-            })
-
-    return {
-        "upper_band": upper_result,
-        "middle_band": middle_result,
-        "lower_band": lower_result
-    }
+    return _evaluate_single(data, {"bb": [(period, std_dev)]})[indicator_result_name("bb", (period, std_dev))]
 
 
 def calculate_stochastic_oscillator(data: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> Dict[str, List[Dict[str, Any]]]:
     if len(data) < k_period:
         return {"error": "Insufficient data for Stochastic Oscillator calculation"}
-
-    high_prices = data['high'].astype(float)
-    low_prices = data['low'].astype(float)
-    close_prices = data['close'].astype(float)
-
-    lowest_low = low_prices.rolling(window=k_period).min()
-    highest_high = high_prices.rolling(window=k_period).max()
-
-    k_percent = 100 * ((close_prices - lowest_low) / (highest_high - lowest_low))
-
-    d_percent = k_percent.rolling(window=d_period).mean()
-
-    k_result = []
-    d_result = []
-
-    for i, date in enumerate(data['time']):
-        if pd.notna(k_percent.iloc[i]):
-            k_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "k_percent": float(k_percent.iloc[i])
-            })
-
-        if pd.notna(d_percent.iloc[i]):
-            d_result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "d_percent": float(d_percent.iloc[i])
-            })
-
-    return {
-        "k_percent": k_result,
-        "d_percent": d_result
-    }
\ No newline at end of file
+    return _evaluate_single(data, {"stochastic": [(k_period, d_period)]})[indicator_result_name("stochastic", (k_period, d_period))]
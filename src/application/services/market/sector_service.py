@@ -1,13 +1,27 @@
-from typing import Dict, Any, List, Optional
-from statistics import mean
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from datetime import datetime, timedelta
+import time
+import numpy as np
+from infrastructure.api_clients.vendor_limit import acquire_vendor_slot
 from infrastructure.api_clients.vn_stock_client import VNStockClient
 from infrastructure.observability import get_logger
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
+from infrastructure.storage.market_snapshot import SNAPSHOT_HORIZONS, get_current_snapshot, snapshot_horizon
+from infrastructure.storage.sector_index import get_sector_index, normalize_sector_name
 
 logger = get_logger(__name__)
 
 _SECTOR_TTL_HOURS = 2
+_SCAN_MAX_WORKERS = 8
+_SCAN_TIME_BUDGET_SECONDS = 20.0
+_SNAPSHOT_MAX_AGE_HOURS = 24
+
+# Calendar days of history for timeframes without a snapshot horizon
+_TIMEFRAME_DAYS = {"1d": 7, "1w": 7, "2w": 14, "1m": 30, "1M": 30, "3m": 90, "3M": 90, "6m": 180, "6M": 180, "1y": 365}
+
+Bars = Tuple[np.ndarray, np.ndarray]
 
 
 def _cache() -> Optional[Any]:
@@ -15,45 +29,143 @@ def _cache() -> Optional[Any]:
 
 
 def _get_tickers_in_sector(sector: str) -> List[str]:
-    try:
-        client = VNStockClient(ticker="VNINDEX")
-        companies = client.company.overview()
-        if companies is None or companies.empty:
-            return []
-        if "sector" in companies.columns:
-            mask = companies["sector"].str.lower().str.contains(sector.lower(), na=False)
-            return companies[mask]["ticker"].tolist() if "ticker" in companies.columns else []
-        if "industry" in companies.columns:
-            mask = companies["industry"].str.lower().str.contains(sector.lower(), na=False)
-            return companies[mask]["ticker"].tolist() if "ticker" in companies.columns else []
-        if "company_code" in companies.columns:
-            mask = companies["sector"].str.lower().str.contains(sector.lower(), na=False) if "sector" in companies.columns else []
-            return companies[mask]["company_code"].tolist() if not mask.empty else []
-        return []
-    except Exception as e:
-        logger.warning(f"Cannot query companies by sector '{sector}': {e}")
+    index = get_sector_index()
+    if index is None:
+        logger.warning(f"Sector index unavailable for sector '{sector}'")
         return []
+    return index.tickers_for_sector(sector)
 
 
-def _get_performance(ticker: str) -> Optional[Dict[str, Any]]:
+def _scan_window(timeframe: str, end: Optional[str] = None) -> Tuple[str, str, Optional[int]]:
+    # Timeframes with a snapshot horizon are measured over the same bar count as the snapshot
+    # (horizon bars of return, horizon + 1 bars of volume); others over a calendar window
+    end_dt = datetime.strptime(end, "%Y-%m-%d") if end else datetime.now()
+    horizon = snapshot_horizon(timeframe)
+    if horizon:
+        last_n = SNAPSHOT_HORIZONS[horizon] + 1
+        start = end_dt - timedelta(days=int(last_n * 1.6) + 10)
+    else:
+        last_n = None
+        start = end_dt - timedelta(days=_TIMEFRAME_DAYS.get(timeframe, 7))
+    return start.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d"), last_n
+
+
+def _fetch_member_bars(ticker: str, start: str, end: str, deadline: float) -> Optional[Bars]:
+    if not acquire_vendor_slot(deadline):
+        return None
+    client = VNStockClient(ticker=ticker)
+    data = client.fetch_trading_data(start=start, end=end, interval="1d")
+    if data is None or data.empty:
+        return None
+    return (
+        data["close"].to_numpy(dtype=np.float64),
+        data["volume"].to_numpy(dtype=np.float64) if "volume" in data.columns else np.zeros(len(data))
+    )
+
+
+def scan_sector(
+    tickers: List[str],
+    start: str,
+    end: str,
+    time_budget: float = _SCAN_TIME_BUDGET_SECONDS,
+    max_workers: int = _SCAN_MAX_WORKERS
+) -> Iterator[Tuple[str, Optional[Bars]]]:
+    # Yields (ticker, bars) as members complete; stops yielding when the time budget runs out
+    deadline = time.monotonic() + time_budget
+    cache = _cache()
+    to_fetch = []
+
+    for ticker in tickers:
+        cached = cache.get(make_cache_key("sector_bars", ticker, start, end)) if cache else None
+        if cached is not None:
+            yield ticker, (np.asarray(cached["close"], dtype=np.float64), np.asarray(cached["volume"], dtype=np.float64))
+        else:
+            to_fetch.append(ticker)
+
+    if not to_fetch:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(to_fetch)))
+    futures = {pool.submit(_fetch_member_bars, ticker, start, end, deadline): ticker for ticker in to_fetch}
     try:
-        client = VNStockClient(ticker=ticker)
-        data = client.fetch_trading_data(start=None, end=None, interval="1d")
-        if data is None or data.empty or len(data) < 2:
-            return None
-        first = float(data.iloc[0]["close"])
-        last = float(data.iloc[-1]["close"])
-        perf_pct = ((last - first) / first) * 100 if first else 0.0
-        avg_volume = mean([int(r["volume"]) for _, r in data.iterrows()]) if len(data) > 0 else 0
-        return {
-            "ticker": ticker,
-            "first_price": first,
-            "last_price": last,
-            "performance_pct": round(perf_pct, 2),
-            "avg_volume": int(avg_volume),
-        }
+        for future in as_completed(futures, timeout=max(deadline - time.monotonic(), 0)):
+            ticker = futures[future]
+            try:
+                bars = future.result()
+            except Exception as e:
+                logger.debug(f"Sector scan fetch failed for {ticker}: {e}")
+                bars = None
+            if bars is not None and cache:
+                cache.set(
+                    make_cache_key("sector_bars", ticker, start, end),
+                    {"close": bars[0].tolist(), "volume": bars[1].tolist()},
+                    ttl_hours=_SECTOR_TTL_HOURS
+                )
+            yield ticker, bars
+    except FuturesTimeoutError:
+        logger.warning(f"Sector scan time budget exhausted with {sum(not f.done() for f in futures)} members pending")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def compute_sector_metrics(bars: Dict[str, Bars], last_n: Optional[int] = None) -> Dict[str, np.ndarray]:
+    # One pass over the concatenated member bars: first/last close and mean volume per ticker
+    members = [(ticker, closes, volumes) for ticker, (closes, volumes) in bars.items() if len(closes) >= 2]
+    if last_n:
+        members = [(ticker, closes[-last_n:], volumes[-last_n:]) for ticker, closes, volumes in members]
+    if not members:
+        return {"tickers": np.array([], dtype=object), "first": np.empty(0), "last": np.empty(0),
+                "performance_pct": np.empty(0), "avg_volume": np.empty(0)}
+
+    lengths = np.fromiter((len(closes) for _, closes, _ in members), dtype=np.intp, count=len(members))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    closes = np.concatenate([c for _, c, _ in members])
+    volumes = np.concatenate([v for _, _, v in members])
+
+    first = closes[offsets]
+    last = closes[offsets + lengths - 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        performance = np.where(first != 0, (last - first) / first * 100, 0.0)
+    avg_volume = np.add.reduceat(volumes, offsets) / lengths
+
+    return {
+        "tickers": np.array([ticker for ticker, _, _ in members], dtype=object),
+        "first": first,
+        "last": last,
+        "performance_pct": performance,
+        "avg_volume": avg_volume,
+    }
+
+
+def _snapshot_metrics(tickers: List[str], timeframe: str) -> Tuple[Dict[str, Tuple[float, float]], Optional[str]]:
+    # Returns ({ticker: (performance %, avg volume)}, snapshot date)
+    horizon = snapshot_horizon(timeframe)
+    snapshot = get_current_snapshot(_SNAPSHOT_MAX_AGE_HOURS) if horizon else None
+    if snapshot is None:
+        return {}, None
+    returns = snapshot.column(f"ret_{horizon}", tickers)
+    volumes = snapshot.column(f"avg_volume_{horizon}", tickers)
+    return {t: (returns[t] * 100, volumes.get(t, 0.0)) for t in returns}, snapshot.as_of
+
+
+def _get_performance(ticker: str, timeframe: str = "1w") -> Optional[Dict[str, Any]]:
+    start, end, last_n = _scan_window(timeframe)
+    try:
+        bars = _fetch_member_bars(ticker, start, end, time.monotonic() + _SCAN_TIME_BUDGET_SECONDS)
     except Exception:
         return None
+    if bars is None:
+        return None
+    metrics = compute_sector_metrics({ticker: bars}, last_n)
+    if len(metrics["tickers"]) == 0:
+        return None
+    return {
+        "ticker": ticker,
+        "first_price": float(metrics["first"][0]),
+        "last_price": float(metrics["last"][0]),
+        "performance_pct": round(float(metrics["performance_pct"][0]), 2),
+        "avg_volume": int(metrics["avg_volume"][0]),
+    }
 
 
 def handle_sector_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
@@ -66,7 +178,7 @@ def handle_sector_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
 
     try:
         cache = _cache()
-        cache_key = make_cache_key("sector", sector, metric, timeframe)
+        cache_key = make_cache_key("sector", normalize_sector_name(sector), metric, timeframe)
         cached = cache.get(cache_key) if cache else None
         if cached is not None:
             return cached
@@ -81,39 +193,58 @@ def handle_sector_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
             }
             return result
 
-        performances = []
-        for ticker in tickers:
-            perf = _get_performance(ticker)
-            if perf:
-                performances.append(perf)
-
-        if metric == "volume":
-            performances.sort(key=lambda x: x.get("avg_volume", 0), reverse=True)
-        else:
-            performances.sort(key=lambda x: x.get("performance_pct", 0), reverse=True)
+        # Members covered by a current snapshot are answered without touching the vendor; the
+        # rest are scanned over the same bars, ending on the snapshot's date, so rows compare
+        precomputed, as_of = _snapshot_metrics(tickers, timeframe)
+        to_scan = [ticker for ticker in tickers if ticker not in precomputed]
+
+        start, end, last_n = _scan_window(timeframe, as_of if precomputed else None)
+        bars: Dict[str, Bars] = {}
+        completed = set()
+        if to_scan:
+            for ticker, member_bars in scan_sector(to_scan, start, end):
+                completed.add(ticker)
+                if member_bars is not None:
+                    bars[ticker] = member_bars
+        pending = [ticker for ticker in to_scan if ticker not in completed]
+
+        metrics = compute_sector_metrics(bars, last_n)
+        members = list(precomputed) + metrics["tickers"].tolist()
+        sources = ["snapshot"] * len(precomputed) + ["live"] * len(metrics["tickers"])
+        performance = np.concatenate(([p for p, _ in precomputed.values()], metrics["performance_pct"]))
+        avg_volume = np.concatenate(([v for _, v in precomputed.values()], metrics["avg_volume"]))
+
+        sort_by = avg_volume if metric == "volume" else performance
+        order = np.argsort(-sort_by, kind="stable")
 
         ranked = [
             {
                 "rank": i + 1,
-                "ticker": p["ticker"],
-                "performance_pct": p.get("performance_pct"),
-                "avg_volume": p.get("avg_volume"),
+                "ticker": members[j],
+                "performance_pct": round(float(performance[j]), 2),
+                "avg_volume": int(avg_volume[j]),
+                "source": sources[j],
             }
-            for i, p in enumerate(performances)
+            for i, j in enumerate(order.tolist())
         ]
 
         result = {
             "sector": sector,
             "metric": metric,
             "timeframe": timeframe,
+            "as_of": end,
             "ranked_tickers": ranked,
-            "total_tickers": len(performances),
+            "total_tickers": len(ranked),
         }
 
-        if cache:
+        if pending:
+            # Partial scans are returned but not cached, so a retry picks up the rest
+            result["partial"] = True
+            result["pending_tickers"] = pending
+        elif cache:
             cache.set(cache_key, result, ttl_hours=_SECTOR_TTL_HOURS)
         return result
 
     except Exception as e:
         logger.error(f"Sector query failed: {e}")
-        return {"error": "Sector data unavailable", "suggested_tickers": []}
\ No newline at end of file
+        return {"error": "Sector data unavailable", "suggested_tickers": []}
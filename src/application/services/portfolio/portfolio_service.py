@@ -1,250 +1,287 @@
-from typing import Dict, Any, List, Optional
-from datetime import datetime
-import json
-import os
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import numpy as np
 from infrastructure.cache import get_cache_manager
 from infrastructure.cache.cache_keys import make_cache_key
+from infrastructure.observability.logging.logger import user_id_var
+from infrastructure.storage.company_profiles import get_company_profile_store
+from infrastructure.storage.portfolio_store import DEFAULT_USER, PortfolioStore, get_portfolio_store
+from infrastructure.storage.sector_index import get_sector_index
 
 _PORTFOLIO_TTL_HOURS = 0.25
 _SECTOR_TTL_HOURS = 4
+_PRICE_LOOKBACK_DAYS = 10
+_MAX_FETCH_WORKERS = 8
 
 
 def _cache() -> Optional[Any]:
     return get_cache_manager()
 
 
-class PortfolioManager:
-    def __init__(self, portfolio_file: str = "user_portfolio.json"):
-        self.portfolio_file = portfolio_file
-        self.portfolio = self.load_portfolio()
-
-    def load_portfolio(self) -> Dict[str, Any]:
-        if os.path.exists(self.portfolio_file):
-            try:
-                with open(self.portfolio_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                return {"holdings": {}, "transactions": []}
+def _owner() -> str:
+    # Set by the API or CLI for the current request; never taken from the parsed query
+    return user_id_var.get() or DEFAULT_USER
 
-    def add_holding(self, ticker: str, quantity: int, price: float):
-        if ticker not in self.portfolio["holdings"]:
-            self.portfolio["holdings"][ticker] = 0
-        self.portfolio["holdings"][ticker] += quantity
 
-        self.portfolio["transactions"].append({
-            "ticker": ticker,
-            "quantity": quantity,
-            "price": price,
-            "date": datetime.now().isoformat(),
-            "type": "buy"
-        })
+class PortfolioManager:
+    def __init__(self, user_id: str = DEFAULT_USER, store: Optional[PortfolioStore] = None):
+        self.user_id = user_id
+        self.store = store or get_portfolio_store()
+        if self.store is None:
+            raise RuntimeError("Portfolio store unavailable")
 
-        self.save_portfolio()
+    def add_holding(self, ticker: str, quantity: int, price: float):
+        self.store.record_trade(ticker, "buy", quantity, price, user_id=self.user_id)
 
     def remove_holding(self, ticker: str, quantity: int, price: float):
-        if ticker in self.portfolio["holdings"]:
-            self.portfolio["holdings"][ticker] = max(0, self.portfolio["holdings"][ticker] - quantity)
-
-            self.portfolio["transactions"].append({
-                "ticker": ticker,
-                "quantity": quantity,
-                "price": price,
-                "date": datetime.now().isoformat(),
-                "type": "sell"
-            })
+        self.store.record_trade(ticker, "sell", quantity, price, user_id=self.user_id)
 
-            self.save_portfolio()
+    def adjust_holding(self, ticker: str, quantity: int):
+        self.store.adjust_quantity(ticker, quantity, user_id=self.user_id)
 
     def get_holdings(self) -> Dict[str, int]:
-        return self.portfolio["holdings"]
+        return self.store.get_holdings(self.user_id)
 
-    def get_transactions(self) -> List[Dict]:
-        return self.portfolio["transactions"]
-
-
-def get_portfolio_value(query: dict) -> Dict[str, Any]:
-    portfolio_manager = PortfolioManager()
-    holdings = portfolio_manager.get_holdings()
+    def get_summary(self) -> Dict[str, float]:
+        return self.store.get_summary(self.user_id)
 
-    if not holdings:
-        return {"portfolio_value": 0, "holdings": {}}
-
-    try:
-        cache = _cache()
-        from infrastructure.api_clients.vn_stock_client import VNStockClient
-        total_value = 0
-        holding_values = {}
+    def get_positions(self) -> List[Dict[str, Any]]:
+        return self.store.get_positions(self.user_id)
 
-        today_str = datetime.now().strftime("%Y-%m-%d")
-
-        for ticker, quantity in holdings.items():
-            if quantity > 0:
+    def get_transactions(self) -> List[Dict]:
+        return self.store.get_transactions(self.user_id)
+
+
+def _fetch_ticker_snapshot(ticker: str, need_price: bool, need_sector: bool) -> Dict[str, Any]:
+    from infrastructure.api_clients.vn_stock_client import VNStockClient
+
+    snapshot: Dict[str, Any] = {}
+    client = VNStockClient(ticker=ticker)
+
+    if need_price:
+        try:
+            today = datetime.now()
+            # Look back a few sessions so weekends and holidays still resolve a close
+            data = client.fetch_trading_data(
+                start=(today - timedelta(days=_PRICE_LOOKBACK_DAYS)).strftime("%Y-%m-%d"),
+                end=today.strftime("%Y-%m-%d"),
+                interval="1d"
+            )
+            if data is not None and not data.empty:
+                snapshot["price"] = float(data["close"].iloc[-1])
+        except Exception as e:
+            snapshot["price_error"] = str(e)
+
+    if need_sector:
+        sector = None
+        try:
+            store = get_company_profile_store()
+            sector = store.sector(ticker) if store else None
+        except Exception:
+            pass
+        snapshot["sector"] = sector or "Unknown"
+
+    return snapshot
+
+
+def resolve_market_data(tickers: List[str], include_sectors: bool = True) -> Dict[str, Dict[str, Any]]:
+    cache = _cache()
+    index = get_sector_index() if include_sectors else None
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    resolved: Dict[str, Dict[str, Any]] = {ticker: {} for ticker in tickers}
+    missing: Dict[str, Tuple[bool, bool]] = {}
+
+    for ticker in tickers:
+        price_key = make_cache_key("portfolio_price", ticker, today_str, today_str, interval="1d")
+        price = cache.get(price_key) if cache else None
+        if price is not None:
+            resolved[ticker]["price"] = price
+
+        sector = None
+        if include_sectors:
+            sector = index.sector_for_ticker(ticker) if index else None
+            if sector is None and cache:
+                sector = cache.get(make_cache_key("portfolio_sector", ticker))
+            if sector is not None:
+                resolved[ticker]["sector"] = sector
+
+        need_price = price is None
+        need_sector = include_sectors and sector is None
+        if need_price or need_sector:
+            missing[ticker] = (need_price, need_sector)
+
+    if missing:
+        workers = min(_MAX_FETCH_WORKERS, len(missing))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                ticker: pool.submit(_fetch_ticker_snapshot, ticker, need_price, need_sector)
+                for ticker, (need_price, need_sector) in missing.items()
+            }
+            for ticker, future in futures.items():
                 try:
-                    cache_key = make_cache_key("portfolio_price", ticker, today_str, today_str, interval="1d")
-                    cached_price = cache.get(cache_key) if cache else None
-                    if cached_price is not None:
-                        price = cached_price
-                    else:
-                        client = VNStockClient(ticker=ticker)
-                        current_price = client.fetch_trading_data(
-                            start=today_str,
-                            end=today_str,
-                            interval="1d"
-                        )
-
-                        if current_price is None or current_price.empty:
-                            continue
-                        price = float(current_price["close"].iloc[-1])
-                        if cache:
-                            cache.set(cache_key, price, ttl_hours=_PORTFOLIO_TTL_HOURS)
-
-                    value = price * quantity
-                    total_value += value
-                    holding_values[ticker] = {
-                        "quantity": quantity,
-                        "current_price": price,
-                        "value": value
-                    }
+                    snapshot = future.result()
                 except Exception as e:
-                    print(f"Error getting price for {ticker}: {e}")
-
-        return {
-            "portfolio_value": total_value,
-            "holdings": holding_values
+                    snapshot = {"price_error": str(e)}
+                resolved[ticker].update(snapshot)
+
+                if cache and "price" in snapshot:
+                    cache.set(
+                        make_cache_key("portfolio_price", ticker, today_str, today_str, interval="1d"),
+                        snapshot["price"],
+                        ttl_hours=_PORTFOLIO_TTL_HOURS
+                    )
+                if cache and "sector" in snapshot:
+                    cache.set(make_cache_key("portfolio_sector", ticker), snapshot["sector"], ttl_hours=_SECTOR_TTL_HOURS)
+
+    return resolved
+
+
+@dataclass
+class PortfolioValuation:
+    tickers: List[str]
+    quantities: np.ndarray
+    prices: np.ndarray
+    sectors: List[str] = field(default_factory=list)
+    unpriced: List[str] = field(default_factory=list)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.quantities * self.prices
+
+    @property
+    def total_value(self) -> float:
+        return float(self.values.sum())
+
+
+def value_portfolio(holdings: Dict[str, int], include_sectors: bool = True) -> PortfolioValuation:
+    held = [(ticker, quantity) for ticker, quantity in holdings.items() if quantity > 0]
+    market = resolve_market_data([ticker for ticker, _ in held], include_sectors) if held else {}
+
+    tickers, quantities, prices, sectors, unpriced = [], [], [], [], []
+    for ticker, quantity in held:
+        info = market.get(ticker, {})
+        if "price" not in info:
+            unpriced.append(ticker)
+            continue
+        tickers.append(ticker)
+        quantities.append(quantity)
+        prices.append(info["price"])
+        sectors.append(info.get("sector", "Unknown"))
+
+    return PortfolioValuation(
+        tickers=tickers,
+        quantities=np.asarray(quantities, dtype=np.float64),
+        prices=np.asarray(prices, dtype=np.float64),
+        sectors=sectors if include_sectors else [],
+        unpriced=unpriced
+    )
+
+
+def get_portfolio_value(query: dict, valuation: Optional[PortfolioValuation] = None) -> Dict[str, Any]:
+    if valuation is None:
+        holdings = PortfolioManager(_owner()).get_holdings()
+        if not holdings:
+            return {"portfolio_value": 0, "holdings": {}}
+        valuation = value_portfolio(holdings, include_sectors=False)
+
+    values = valuation.values
+    holding_values = {
+        ticker: {
+            "quantity": int(quantity),
+            "current_price": price,
+            "value": value
         }
+        for ticker, quantity, price, value in zip(
+            valuation.tickers, valuation.quantities.tolist(), valuation.prices.tolist(), values.tolist()
+        )
+    }
 
-    except Exception as e:
-        print(f"Error calculating portfolio value: {e}")
-        return {"error": str(e)}
+    result = {
+        "portfolio_value": valuation.total_value,
+        "holdings": holding_values
+    }
+    if valuation.unpriced:
+        result["unpriced_tickers"] = valuation.unpriced
+    return result
 
 
-def get_portfolio_performance(query: dict) -> Dict[str, Any]:
-    portfolio_manager = PortfolioManager()
-    transactions = portfolio_manager.get_transactions()
-
-    if not transactions:
-        return {"performance": {}, "total_return": 0}
-
+def get_portfolio_performance(query: dict, valuation: Optional[PortfolioValuation] = None) -> Dict[str, Any]:
     try:
-        total_invested = 0
-        total_current_value = 0
-
-        for transaction in transactions:
-            if transaction["type"] == "buy":
-                total_invested += transaction["quantity"] * transaction["price"]
-            elif transaction["type"] == "sell":
-                # Track realized proceeds or reduce cost basis
-                total_invested -= transaction["quantity"] * transaction["price"]
-
-        portfolio_value = get_portfolio_value(query)
-        if "portfolio_value" in portfolio_value:
-            total_current_value = portfolio_value["portfolio_value"]
-
-        total_return = total_current_value - total_invested
-        return_rate = (total_return / total_invested * 100) if total_invested > 0 else 0
-
-        return {
+        portfolio_manager = PortfolioManager(_owner())
+        # Cost basis and realized P&L are maintained per trade, so this is O(holdings)
+        positions = portfolio_manager.get_positions()
+        total_invested = sum(position["cost_basis"] for position in positions)
+        realized_pnl = sum(position["realized_pnl"] for position in positions)
+
+        if total_invested == 0 and realized_pnl == 0:
+            return {"performance": {}, "total_return": 0}
+
+        if valuation is None:
+            valuation = value_portfolio(portfolio_manager.get_holdings(), include_sectors=False)
+        total_current_value = valuation.total_value
+
+        # Only holdings with a price have a current value to set against their cost
+        priced = set(valuation.tickers)
+        priced_invested = sum(position["cost_basis"] for position in positions if position["ticker"] in priced)
+        unrealized_pnl = total_current_value - priced_invested
+        total_return = unrealized_pnl + realized_pnl
+        return_rate = (total_return / priced_invested * 100) if priced_invested > 0 else 0
+
+        result = {
             "total_invested": total_invested,
             "current_value": total_current_value,
+            "realized_pnl": realized_pnl,
+            "unrealized_pnl": unrealized_pnl,
             "total_return": total_return,
             "return_rate": return_rate
         }
+        if valuation.unpriced:
+            result["unpriced_tickers"] = valuation.unpriced
+        return result
 
     except Exception as e:
-        print(f"Error calculating portfolio performance: {e}")
         return {"error": str(e)}
 
 
-def get_portfolio_allocation(query: dict) -> Dict[str, Any]:
-    portfolio_manager = PortfolioManager()
-    holdings = portfolio_manager.get_holdings()
-
-    if not holdings:
-        return {"allocation": {}, "diversification_score": 0}
-
-    try:
-        cache = _cache()
-        from infrastructure.api_clients.vn_stock_client import VNStockClient
-        allocation = {}
-        total_value = 0
-        today_str = datetime.now().strftime("%Y-%m-%d")
-
-        for ticker, quantity in holdings.items():
-            if quantity > 0:
-                try:
-                    sector_cache_key = make_cache_key("portfolio_sector", ticker)
-                    cached_sector = cache.get(sector_cache_key) if cache else None
-                    if cached_sector is not None:
-                        sector = cached_sector
-                    else:
-                        client = VNStockClient(ticker=ticker)
-                        company_info = client.company.overview()
-                        sector = "Unknown"
-                        if company_info is not None and not company_info.empty:
-                            if "sector" in company_info.columns and len(company_info) > 0:
-                                sector = company_info["sector"].iloc[0]
-                            else:
-                                sector = "Unknown"
-                        if cache:
-                            cache.set(sector_cache_key, sector, ttl_hours=_SECTOR_TTL_HOURS)
-
-                    price_cache_key = make_cache_key("portfolio_allocation_price", ticker, today_str, today_str, interval="1d")
-                    cached_price = cache.get(price_cache_key) if cache else None
-                    if cached_price is not None:
-                        price = cached_price
-                    else:
-                        client = VNStockClient(ticker=ticker)
-                        current_price = client.fetch_trading_data(
-                            start=today_str,
-                            end=today_str,
-                            interval="1d"
-                        )
-                        if current_price is None or current_price.empty:
-                            continue
-                        price = float(current_price["close"].iloc[-1])
-                        if cache:
-                            cache.set(price_cache_key, price, ttl_hours=_PORTFOLIO_TTL_HOURS)
-
-                    value = price * quantity
-                    total_value += value
-
-                    if sector not in allocation:
-                        allocation[sector] = 0
-                    allocation[sector] += value
-
-                except Exception as e:
-                    print(f"Error getting allocation for {ticker}: {e}")
-
-        if total_value > 0:
-            for sector in allocation:
-                allocation[sector] = {
-                    "value": allocation[sector],
-                    "percentage": (allocation[sector] / total_value) * 100
-                }
-
-        num_sectors = len(allocation)
-        if num_sectors == 0:
-            diversification_score = 0
-        elif num_sectors == 1:
-            diversification_score = 20
-        elif num_sectors == 2:
-            diversification_score = 50
-        elif num_sectors == 3:
-            diversification_score = 70
-        elif num_sectors == 4:
-            diversification_score = 85
-        else:
-            diversification_score = 100
-
-        return {
-            "allocation": allocation,
-            "diversification_score": diversification_score,
-            "total_value": total_value
-        }
-
-    except Exception as e:
-        print(f"Error calculating portfolio allocation: {e}")
-        return {"error": str(e)}
+def _diversification_score(num_sectors: int) -> int:
+    if num_sectors == 0:
+        return 0
+    if num_sectors == 1:
+        return 20
+    if num_sectors == 2:
+        return 50
+    if num_sectors == 3:
+        return 70
+    if num_sectors == 4:
+        return 85
+    return 100
+
+
+def get_portfolio_allocation(query: dict, valuation: Optional[PortfolioValuation] = None) -> Dict[str, Any]:
+    if valuation is None:
+        holdings = PortfolioManager(_owner()).get_holdings()
+        if not holdings:
+            return {"allocation": {}, "diversification_score": 0}
+        valuation = value_portfolio(holdings, include_sectors=True)
+
+    total_value = valuation.total_value
+    allocation = {}
+    if valuation.tickers:
+        sector_names, sector_idx = np.unique(np.asarray(valuation.sectors, dtype=object).astype(str), return_inverse=True)
+        sector_values = np.bincount(sector_idx, weights=valuation.values, minlength=len(sector_names))
+        for sector, value in zip(sector_names.tolist(), sector_values.tolist()):
+            allocation[sector] = {
+                "value": value,
+                "percentage": (value / total_value) * 100 if total_value > 0 else 0
+            }
+
+    return {
+        "allocation": allocation,
+        "diversification_score": _diversification_score(len(allocation)),
+        "total_value": total_value
+    }
 
 
 def handle_portfolio_query(parsed: Dict[str, Any]):
@@ -252,40 +289,46 @@ def handle_portfolio_query(parsed: Dict[str, Any]):
     portfolio_data = parsed.get("portfolio")
 
     try:
+        portfolio_manager = PortfolioManager(_owner())
         if portfolio_data:
-            portfolio_manager = PortfolioManager()
-            current_holdings = portfolio_manager.get_holdings()
-
             for ticker, quantity in portfolio_data.items():
-                if ticker not in current_holdings:
-                    current_holdings[ticker] = 0
-                current_holdings[ticker] += quantity
+                portfolio_manager.adjust_holding(ticker, quantity)
 
-            portfolio_manager.portfolio["holdings"] = current_holdings
-            portfolio_manager.save_portfolio()
+        holdings = portfolio_manager.get_holdings()
 
         if requested_field == "portfolio_value":
-            return get_portfolio_value(parsed)
-        elif requested_field == "portfolio_performance":
-            return get_portfolio_performance(parsed)
-        elif requested_field == "portfolio_allocation":
-            portfolio_value = get_portfolio_value(parsed)
-            if portfolio_value and "error" not in portfolio_value:
-                result["portfolio_value"] = portfolio_value
+            if not holdings:
+                return {"portfolio_value": 0, "holdings": {}}
+            return get_portfolio_value(parsed, value_portfolio(holdings, include_sectors=False))
+
+        if requested_field in ("portfolio_performance", "performance"):
+            return get_portfolio_performance(parsed, value_portfolio(holdings, include_sectors=False))
 
-            portfolio_performance = get_portfolio_performance(parsed)
-            if portfolio_performance and "error" not in portfolio_performance:
-                result["portfolio_performance"] = portfolio_performance
+        if requested_field in ("sector_allocation", "allocation"):
+            if not holdings:
+                return {"allocation": {}, "diversification_score": 0}
+            return get_portfolio_allocation(parsed, value_portfolio(holdings, include_sectors=True))
 
-            portfolio_allocation = get_portfolio_allocation(parsed)
-            if portfolio_allocation and "error" not in portfolio_allocation:
-                result["portfolio_allocation"] = portfolio_allocation
+        # Summary: value, performance and allocation from a single valuation pass
+        if not holdings:
+            return {"error": "No portfolio data found"}
 
-            portfolio_allocation = get_portfolio_allocation(parsed)
-            if portfolio_allocation:
-                result["portfolio_allocation"] = portfolio_allocation
+        valuation = value_portfolio(holdings, include_sectors=True)
+        result = {}
 
-            return result if result else {"error": "No portfolio data found"}
+        portfolio_value = get_portfolio_value(parsed, valuation)
+        if portfolio_value and "error" not in portfolio_value:
+            result["portfolio_value"] = portfolio_value
+
+        portfolio_performance = get_portfolio_performance(parsed, valuation)
+        if portfolio_performance and "error" not in portfolio_performance:
+            result["portfolio_performance"] = portfolio_performance
+
+        portfolio_allocation = get_portfolio_allocation(parsed, valuation)
+        if portfolio_allocation and "error" not in portfolio_allocation:
+            result["portfolio_allocation"] = portfolio_allocation
+
+        return result if result else {"error": "No portfolio data found"}
 
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
@@ -80,7 +80,8 @@ class HistoricalQuery(BaseModel):
             'price_query', 'indicator_query', 'company_query',
             'comparison_query', 'ranking_query', 'aggregate_query',
             'financial_ratio_query', 'news_sentiment_query',
-            'portfolio_query', 'alert_query', 'forecast_query', 'sector_query'
+            'portfolio_query', 'alert_query', 'forecast_query', 'sector_query',
+            'screening_query'
         ]
         if v not in valid_types:
             raise ValueError(f"Invalid query type: {v}")
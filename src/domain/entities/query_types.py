@@ -36,3 +36,6 @@ class QueryType(str, Enum):
     
     # Sector and group query type
     sector_query = "sector_query"
+
+    # Cross-ticker fundamentals screening query type
+    screening_query = "screening_query"
@@ -8,6 +8,7 @@ class RequestedField(str, Enum):
     volume = "volume"
     ohlcv = "ohlcv"
     sma = "sma"
+    ema = "ema"
     rsi = "rsi"
     macd = "macd"
     shareholders = "shareholders"
@@ -10,6 +10,7 @@ from domain.schemas.portfolio import PortfolioQueryParams
 from domain.schemas.alert import AlertQueryParams
 from domain.schemas.forecast import ForecastQueryParams
 from domain.schemas.sector import SectorQueryParams
+from domain.schemas.screening import ScreeningQueryParams
 
 from typing import Union
 QueryParams = Union[
@@ -17,5 +18,5 @@ QueryParams = Union[
     AggregateQueryParams, IndicatorQueryParams, CompanyQueryParams,
     FinancialRatioQueryParams, NewsSentimentQueryParams,
     PortfolioQueryParams, AlertQueryParams, ForecastQueryParams,
-    SectorQueryParams
+    SectorQueryParams, ScreeningQueryParams
 ]
\ No newline at end of file
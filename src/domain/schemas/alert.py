@@ -1,19 +1,46 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class AlertQueryParams(BaseModel):
     query_type: str = "alert_query"
-    tickers: List[str] = Field(..., min_length=1)
-    threshold: float = Field(..., gt=0, description="Price threshold value")
+    tickers: List[str] = Field(default_factory=list)
+    threshold: Optional[float] = Field(None, gt=0, description="Price level, percent move or indicator period")
     condition: Optional[str] = Field("above")
     timeframe: Optional[str] = Field("1d")
+    action: Optional[str] = Field("check", description="check (one-shot), watch (register), list, cancel")
+    indicator: Optional[str] = Field(None, description="Moving average for cross conditions: sma, ema")
+    alert_ids: Optional[List[int]] = Field(None, description="Rule ids to cancel")
+    status: Optional[str] = Field(None, description="Filter for list: active, triggered, cancelled")
 
     @field_validator('condition')
     def validate_condition(cls, v):
-        allowed = {'above', 'below'}
+        allowed = {'above', 'below', 'percent_up', 'percent_down', 'cross_above', 'cross_below'}
         if v is not None and v not in allowed:
             raise ValueError(f"condition must be one of {allowed}")
         return v
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    @field_validator('action')
+    def validate_action(cls, v):
+        allowed = {'check', 'watch', 'list', 'cancel'}
+        if v is not None and v not in allowed:
+            raise ValueError(f"action must be one of {allowed}")
+        return v
+
+    @field_validator('indicator')
+    def validate_indicator(cls, v):
+        allowed = {'sma', 'ema'}
+        if v is not None and v not in allowed:
+            raise ValueError(f"indicator must be one of {allowed}")
+        return v
+
+    @model_validator(mode='after')
+    def validate_rule_fields(self):
+        if self.action in (None, 'check', 'watch'):
+            if not self.tickers:
+                raise ValueError("tickers are required to check or watch an alert")
+            if self.threshold is None:
+                raise ValueError("threshold is required to check or watch an alert")
+        return self
+
+    model_config = {"from_attributes": True}
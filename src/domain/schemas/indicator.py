@@ -1,5 +1,16 @@
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, field_validator
+from domain.entities.interval import Interval
+
+_INTERVAL_ALIASES = {"1h": "1H", "1w": "1W"}
+
+
+def _check_interval(value: str) -> str:
+    value = _INTERVAL_ALIASES.get(value, value)
+    allowed = [i.value for i in Interval]
+    if value not in allowed:
+        raise ValueError(f"interval must be one of {allowed}")
+    return value
 
 
 class IndicatorQueryParams(BaseModel):
@@ -12,12 +23,23 @@ class IndicatorQueryParams(BaseModel):
     days: Optional[int] = Field(None, ge=1)
     weeks: Optional[int] = Field(None, ge=1)
     months: Optional[int] = Field(None, ge=1)
+    latest_only: bool = Field(False, description="Return only the latest value per indicator, updated incrementally")
+    interval: Optional[str] = Field("1d", description="Bar interval: 1m, 5m, 15m, 30m, 1H, 1d, 1W, 1M")
+    intervals: Optional[List[str]] = Field(None, description="Several bar intervals computed from one fetch")
 
     @field_validator('requested_field')
     def validate_field(cls, v):
-        allowed = {'sma', 'rsi', 'macd', 'bb', 'stochastic', 'adx', 'atr', 'obv', 'cci', 'williams_r', 'ultosc', 'mfi', 'vwap'}
+        allowed = {'sma', 'ema', 'rsi', 'macd', 'bb', 'stochastic', 'adx', 'atr', 'obv', 'cci', 'williams_r', 'ultosc', 'mfi', 'vwap'}
         if v is not None and v not in allowed:
             raise ValueError(f"requested_field must be one of {allowed}")
         return v
 
+    @field_validator('interval')
+    def validate_interval(cls, v):
+        return _check_interval(v) if v is not None else v
+
+    @field_validator('intervals')
+    def validate_intervals(cls, v):
+        return [_check_interval(i) for i in v] if v is not None else v
+
     model_config = {"from_attributes": True}
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+
+class ScreeningFilter(BaseModel):
+    field: str = Field(..., description="Ratio name, e.g. roe, pe")
+    op: str = Field(..., description="Comparison: >, >=, <, <=, =, !=")
+    value: float
+
+    @field_validator('op')
+    def validate_op(cls, v):
+        allowed = {'>', '>=', '<', '<=', '=', '==', '!='}
+        if v not in allowed:
+            raise ValueError(f"op must be one of {allowed}")
+        return v
+
+
+class ScreeningQueryParams(BaseModel):
+    query_type: str = "screening_query"
+    filters: List[ScreeningFilter] = Field(default_factory=list)
+    tickers: Optional[List[str]] = Field(None, description="Universe to screen (default: whole market)")
+    sector: Optional[str] = Field(None, description="Restrict the universe to a sector")
+    sort_by: Optional[str] = Field(None)
+    order: Optional[str] = Field("desc")
+    limit: Optional[int] = Field(20, ge=1, le=200)
+    period: Optional[str] = Field(None, description="quarter/year")
+    quarter: Optional[int] = Field(None, ge=1, le=4)
+    year: Optional[int] = Field(None)
+
+    @field_validator('order')
+    def validate_order(cls, v):
+        if v is not None and v not in {'asc', 'desc'}:
+            raise ValueError("order must be 'asc' or 'desc'")
+        return v
+
+    model_config = {"from_attributes": True}
@@ -4,8 +4,10 @@ Infrastructure API Clients
 This module contains all the API clients for external service integrations.
 """
 
+from .vendor_limit import acquire_vendor_slot
 from .vn_stock_client import VNStockClient
 
 __all__ = [
+    'acquire_vendor_slot',
     'VNStockClient',
 ]
\ No newline at end of file
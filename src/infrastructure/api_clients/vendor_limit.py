@@ -0,0 +1,36 @@
+"""
+Process-wide request budget for the market data vendor.
+
+Every bulk caller (sector scans, screening universe loads, snapshot builds)
+takes a slot from the same token bucket, so concurrent jobs together stay
+within the vendor's rate limit.
+"""
+
+import time
+from typing import Optional
+
+from infrastructure.guardrails.rate_limiter import TokenBucket
+
+VENDOR_REQUESTS_PER_SECOND = 5
+VENDOR_BURST = 8
+
+_POLL_SECONDS = 0.05
+
+vendor_bucket = TokenBucket(capacity=VENDOR_BURST, refill_rate=VENDOR_REQUESTS_PER_SECOND)
+
+
+def acquire_vendor_slot(deadline: Optional[float] = None) -> bool:
+    """
+    Wait for one vendor request slot.
+
+    Args:
+        deadline: time.monotonic() value to give up at (None waits indefinitely)
+
+    Returns:
+        True once a slot is taken, False if the deadline passed first
+    """
+    while not vendor_bucket.consume():
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(_POLL_SECONDS)
+    return True
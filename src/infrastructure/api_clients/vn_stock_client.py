@@ -1,12 +1,16 @@
 from vnstock import Company, Quote
 import pandas as pd
+from infrastructure.storage.bar_archive import ARCHIVED_INTERVALS, get_bar_archive
+
+INTRADAY_INTERVALS = ("1m", "5m", "15m", "30m", "1H")
 
 
 class VNStockClient: 
-    def __init__(self, ticker: str = "VCB", source: str = "TCBS"):
+    def __init__(self, ticker: str = "VCB", source: str = "TCBS", use_archive: bool = True):
         self.ticker = ticker
         self.company = Company(symbol=ticker, source=source)
         self.quote = Quote(symbol=ticker, source=source)
+        self.use_archive = use_archive
         
     def company_info(self):
         """Return static company overview"""
@@ -23,11 +27,12 @@ class VNStockClient:
         Fetch OHLCV trading data from vnstock (raw data only).
 
         - start, end: yyyy-mm-dd
-        - interval: 1d, 1m, 5m, 15m, 1W, 1M
+        - interval: 1d, 1m, 5m, 15m, 30m, 1H, 1W, 1M
 
         Returns:
             DataFrame with columns standardized:
             date, open, high, low, close, volume
+            (date is yyyy-mm-dd HH:MM:SS for intraday intervals)
         """
         # --- 1. Validate ---
         if start is None or end is None:
@@ -42,21 +47,44 @@ class VNStockClient:
         start_str = start.strftime("%Y-%m-%d")
         end_str = end.strftime("%Y-%m-%d")
 
-        # --- 2. Fetch raw data ---
+        archive = get_bar_archive() if self.use_archive and interval in ARCHIVED_INTERVALS else None
+        if archive is None:
+            return self._fetch_history(start_str, end_str, interval)
+
+        # --- 2. Fetch only the ranges the local archive does not cover ---
+        live = []
+        for gap_start, gap_end in archive.missing_ranges(self.ticker, start_str, end_str, interval):
+            df = self._fetch_history(gap_start, gap_end, interval)
+            archive.append(self.ticker, df, gap_start, gap_end, interval)
+            live.append(df)
+
+        archived = archive.read(self.ticker, start_str, end_str, interval)
+        # Bars the archive does not persist (the unfinished current session)
+        live = [df.loc[~df["date"].isin(archived["date"]), list(archived.columns)] for df in live if not df.empty]
+        df = pd.concat([archived, *live], ignore_index=True) if live else archived
+        if df.empty:
+            return pd.DataFrame()
+        return df.sort_values(by="date").reset_index(drop=True)
+
+    def _fetch_history(self, start_str: str, end_str: str, interval: str) -> pd.DataFrame:
+        # --- Fetch raw data ---
         df = self.quote.history(start=start_str, end=end_str, interval=interval)
         
         if df is None or df.empty:
             return pd.DataFrame()
         
-         # --- 3. Normalize column names ---
+         # --- Normalize column names ---
         df = df.rename(columns={"time": "date"})
-        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        # Intraday bars keep their time of day
+        date_format = "%Y-%m-%d %H:%M:%S" if interval in INTRADAY_INTERVALS else "%Y-%m-%d"
+        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime(date_format)
         
         # Ensure sort ascending
         df = df.sort_values(by="date")
 
         # Filter exact time window
-        df = df[(df["date"] >= start_str) & (df["date"] <= end_str)]
+        day = df["date"].str[:10]
+        df = df[(day >= start_str) & (day <= end_str)]
         
         return df
         
@@ -1,6 +1,28 @@
 import logging
 import threading
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from infrastructure.cache.cache_manager import CacheManager
+    from infrastructure.cache.config import CacheConfig
+    from infrastructure.cache.memory_cache import MemoryCache
+    from infrastructure.cache.redis_cache import RedisCache
+    from infrastructure.cache.serialization import SerializationManager
+    from infrastructure.cache.session_manager import SessionManager
+    from infrastructure.llm.llm_provider import LLMProvider
+    from infrastructure.memory.episodic.memory import EpisodicMemory
+    from infrastructure.memory.long_term.memory import LongTermMemory
+    from infrastructure.memory.memory_manager import MemoryManager
+    from infrastructure.memory.short_term.memory import ShortTermMemory
+    from infrastructure.observability.alerting.manager import AlertManager
+    from infrastructure.observability.metrics.collector import MetricsCollector
+    from infrastructure.storage.alert_rules import AlertMonitor
+    from infrastructure.storage.bar_archive import BarArchive
+    from infrastructure.storage.company_profiles import CompanyProfileStore
+    from infrastructure.storage.market_snapshot import MarketSnapshotJob, MarketSnapshotStore
+    from infrastructure.storage.portfolio_store import PortfolioStore
+    from infrastructure.storage.sector_index import SectorIndex
+    from infrastructure.storage.statements import StatementStore
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +53,16 @@ class Dependencies:
         self.long_term_memory: Optional["LongTermMemory"] = None
         self.memory_manager: Optional["MemoryManager"] = None
 
+        # Storage
+        self.portfolio_store: Optional["PortfolioStore"] = None
+        self.bar_archive: Optional["BarArchive"] = None
+        self.sector_index: Optional["SectorIndex"] = None
+        self.statement_store: Optional["StatementStore"] = None
+        self.company_profile_store: Optional["CompanyProfileStore"] = None
+        self.market_snapshot_store: Optional["MarketSnapshotStore"] = None
+        self.market_snapshot_job: Optional["MarketSnapshotJob"] = None
+        self.alert_monitor: Optional["AlertMonitor"] = None
+
         # LLM / Agent
         self.llm_provider: Optional["LLMProvider"] = None
 
@@ -48,6 +80,13 @@ class Dependencies:
         self._init_serialization()
         self._init_memory_cache()
         self._init_cache_config()
+        self._init_portfolio_store()
+        self._init_bar_archive()
+        self._init_sector_index()
+        self._init_statement_store()
+        self._init_company_profile_store()
+        self._init_market_snapshots()
+        self._init_alert_monitor()
 
         # ------ Tier 2 – Redis (optional) -----------------------------
         self._init_redis_cache()
@@ -108,6 +147,32 @@ class Dependencies:
                 self.memory_cache.close()
             except Exception:
                 logger.exception("Error closing MemoryCache")
+        if self.alert_monitor is not None:
+            try:
+                self.alert_monitor.stop_background_job()
+                self.alert_monitor.store.close()
+            except Exception:
+                logger.exception("Error stopping AlertMonitor")
+        if self.market_snapshot_job is not None:
+            try:
+                self.market_snapshot_job.stop_background_job()
+            except Exception:
+                logger.exception("Error stopping MarketSnapshotJob")
+        if self.company_profile_store is not None:
+            try:
+                self.company_profile_store.close()
+            except Exception:
+                logger.exception("Error closing CompanyProfileStore")
+        if self.sector_index is not None:
+            try:
+                self.sector_index.stop_background_refresh()
+            except Exception:
+                logger.exception("Error stopping SectorIndex refresh")
+        if self.portfolio_store is not None:
+            try:
+                self.portfolio_store.close()
+            except Exception:
+                logger.exception("Error closing PortfolioStore")
 
         if self.alert_manager is not None:
             try:
@@ -144,6 +209,66 @@ class Dependencies:
         except Exception as e:
             logger.warning("Failed to init CacheConfig: %s", e)
 
+    def _init_portfolio_store(self) -> None:
+        from infrastructure.storage.portfolio_store import PortfolioStore
+        try:
+            self.portfolio_store = PortfolioStore()
+            logger.debug("PortfolioStore initialised")
+        except Exception as e:
+            logger.warning("Failed to init PortfolioStore: %s", e)
+
+    def _init_bar_archive(self) -> None:
+        from infrastructure.storage.bar_archive import BarArchive
+        try:
+            self.bar_archive = BarArchive()
+            logger.debug("BarArchive initialised")
+        except Exception as e:
+            logger.warning("Failed to init BarArchive: %s", e)
+
+    def _init_statement_store(self) -> None:
+        from infrastructure.storage.statements import StatementStore
+        try:
+            self.statement_store = StatementStore()
+            logger.debug("StatementStore initialised")
+        except Exception as e:
+            logger.warning("Failed to init StatementStore: %s", e)
+
+    def _init_company_profile_store(self) -> None:
+        from infrastructure.storage.company_profiles import CompanyProfileStore
+        try:
+            self.company_profile_store = CompanyProfileStore()
+            logger.debug("CompanyProfileStore initialised")
+        except Exception as e:
+            logger.warning("Failed to init CompanyProfileStore: %s", e)
+
+    def _init_sector_index(self) -> None:
+        from infrastructure.storage.sector_index import SectorIndex
+        try:
+            self.sector_index = SectorIndex()
+            self.sector_index.start_background_refresh()
+            logger.debug("SectorIndex initialised")
+        except Exception as e:
+            logger.warning("Failed to init SectorIndex: %s", e)
+
+    def _init_market_snapshots(self) -> None:
+        from infrastructure.storage.market_snapshot import MarketSnapshotJob, MarketSnapshotStore
+        try:
+            self.market_snapshot_store = MarketSnapshotStore()
+            self.market_snapshot_job = MarketSnapshotJob(self.market_snapshot_store)
+            self.market_snapshot_job.start_background_job()
+            logger.debug("MarketSnapshotStore initialised")
+        except Exception as e:
+            logger.warning("Failed to init market snapshots: %s", e)
+
+    def _init_alert_monitor(self) -> None:
+        from infrastructure.storage.alert_rules import AlertMonitor, AlertRuleStore
+        try:
+            self.alert_monitor = AlertMonitor(AlertRuleStore())
+            self.alert_monitor.start_background_job()
+            logger.debug("AlertMonitor initialised")
+        except Exception as e:
+            logger.warning("Failed to init AlertMonitor: %s", e)
+
     def _init_redis_cache(self) -> None:
         from infrastructure.cache.redis_cache import RedisCache
         try:
@@ -4,6 +4,7 @@ from .config import GuardrailConfig
 from .rate_limiter import RateLimiter
 from .content_filter import ContentFilter
 from .query_validator import QuerySizeLimit, TickerValidator, PatternGuard
+from .verdict_cache import VerdictCache
 
 __all__ = [
     "Guardrail",
@@ -15,4 +16,5 @@ __all__ = [
     "QuerySizeLimit",
     "TickerValidator",
     "PatternGuard",
+    "VerdictCache",
 ]
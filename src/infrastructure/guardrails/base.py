@@ -11,6 +11,9 @@ class GuardrailResult:
 
 
 class Guardrail(ABC):
+    # Verdict depends only on the query text (not the client or time), so it may be memoized
+    cacheable: bool = False
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -1,3 +1,5 @@
+import os
+
 from .tickers import VIETNAMESE_TICKERS
 
 
@@ -6,6 +8,10 @@ class GuardrailConfig:
     rate_limit_window_seconds: int = 60
     rate_limit_burst: int = 5
     rate_limit_hourly_per_ip: int = 100
+    # Idle clients are evicted; beyond this many tracked clients the closest-to-idle are shed
+    rate_limit_max_clients: int = 100000
+    # "redis" shares limits across workers (falls back to per-process limits if Redis is down)
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
 
     max_query_length: int = 1000
     max_ticker_count: int = 10
@@ -16,3 +22,5 @@ class GuardrailConfig:
     ticker_pattern: str = r"\b[A-Z]{2,4}\b"
 
     vietnamese_tickers: frozenset = VIETNAMESE_TICKERS
+
+    verdict_cache_size: int = 10000
@@ -3,6 +3,7 @@ import unicodedata
 
 from .base import Guardrail, GuardrailResult
 from .config import GuardrailConfig
+from .scanner import CharClassifier, PatternSet, scan_text
 
 INJECTION_PATTERNS: list[re.Pattern] = [
     re.compile(r"ignore\s+(all\s+)?(previous|above|prior)\s+(instructions|messages|context|prompts?)", re.I),
@@ -64,7 +65,21 @@ SUSPICIOUS_KEYWORDS: list[re.Pattern] = [
 ]
 
 
+_INJECTION_SET = PatternSet(INJECTION_PATTERNS)
+_SUSPICIOUS_SET = PatternSet(SUSPICIOUS_KEYWORDS)
+
+_BASE64_PATTERN = re.compile(r"(?:[A-Za-z0-9+/]{40,}(?:[A-Za-z0-9+/]*={0,2})?)")
+_SEPARATOR_PATTERN = re.compile(r"-{10,}|_{10,}|={10,}|#{5,}|\*{5,}|\n\s*\n\s*\n")
+
+# str.translate tables: homoglyphs map to their Latin look-alikes, zero-width chars are dropped
+_NORMALIZE_TABLE = str.maketrans({**HOMOGLYPHS, **dict.fromkeys(ZERO_WIDTH_CHARS)})
+
+_char_classes = CharClassifier(ZERO_WIDTH_CHARS, HOMOGLYPHS)
+
+
 class ContentFilter(Guardrail):
+    cacheable = True
+
     def __init__(self, config: GuardrailConfig | None = None):
         cfg = config or GuardrailConfig()
         self.max_special_char_ratio = cfg.max_special_char_ratio
@@ -74,49 +89,8 @@ class ContentFilter(Guardrail):
     def name(self) -> str:
         return "content_filter"
 
-    def _has_zero_width(self, text: str) -> bool:
-        for ch in text:
-            if ch in ZERO_WIDTH_CHARS:
-                return True
-        return False
-
-    def _has_homoglyph(self, text: str) -> bool:
-        for ch in text:
-            if ch in HOMOGLYPHS:
-                return True
-        return False
-
-    def _normalize_homoglyphs(self, text: str) -> str:
-        result = []
-        for ch in text:
-            if ch in HOMOGLYPHS:
-                result.append(HOMOGLYPHS[ch])
-            else:
-                result.append(ch)
-        return "".join(result)
-
-    def _strip_zero_width(self, text: str) -> str:
-        return "".join(ch for ch in text if ch not in ZERO_WIDTH_CHARS)
-
-    def _has_high_uppercase_ratio(self, text: str) -> bool:
-        letters = [ch for ch in text if ch.isalpha()]
-        if not letters:
-            return False
-        upper_count = sum(1 for ch in letters if ch.isupper())
-        return (upper_count / len(letters)) > self.max_uppercase_ratio
-
-    def _has_high_special_char_ratio(self, text: str) -> bool:
-        if not text:
-            return False
-        special_count = sum(1 for ch in text if not ch.isalnum() and not ch.isspace())
-        return (special_count / len(text)) > self.max_special_char_ratio
-
     def _detect_base64(self, text: str) -> bool:
-        b64_pattern = re.compile(
-            r"(?:[A-Za-z0-9+/]{40,}(?:[A-Za-z0-9+/]*={0,2})?)"
-        )
-        matches = b64_pattern.findall(text)
-        for match in matches:
+        for match in _BASE64_PATTERN.findall(text):
             if len(match) >= 40:
                 alnum = sum(1 for ch in match if ch.isalnum())
                 if alnum / len(match) > 0.8:
@@ -124,52 +98,25 @@ class ContentFilter(Guardrail):
         return False
 
     def _detect_token_separator_abuse(self, text: str) -> bool:
-        sep_patterns = [
-            r"-{10,}",
-            r"_{10,}",
-            r"={10,}",
-            r"#{5,}",
-            r"\*{5,}",
-            r"\n\s*\n\s*\n",
-        ]
-        for pattern in sep_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
-
-    def _detect_unicode_normalization_attack(self, text: str) -> bool:
-        nfkd = unicodedata.normalize("NFKD", text)
-        if nfkd != text:
-            suspicious = re.findall(r'[\u0300-\u036F\u1AB0-\u1AFF\u1DC0-\u1DFF\u20D0-\u20FF\uFE00-\uFE0F]', text)
-            return len(suspicious) > 5
-        return False
+        return _SEPARATOR_PATTERN.search(text) is not None
 
     def normalize_query(self, query: str) -> str:
-        normalized = self._strip_zero_width(query)
-        normalized = self._normalize_homoglyphs(normalized)
-        return normalized
+        return query.translate(_NORMALIZE_TABLE)
 
     def validate(self, query: str, client_ip: str) -> GuardrailResult:
-        nfkd_checks = unicodedata.normalize("NFKD", query)
-
         raw = query
-        normalized = self.normalize_query(raw).lower()
-
-        injection_found = None
-        for pattern in INJECTION_PATTERNS:
-            match = pattern.search(normalized)
-            if match:
-                injection_found = match.group(0)
-                break
-
-        if not injection_found:
-            for pattern in INJECTION_PATTERNS:
-                match = pattern.search(nfkd_checks.lower())
-                if match:
-                    injection_found = match.group(0)
-                    break
-
-        if injection_found:
+        stats = scan_text(raw, _char_classes)
+
+        # Plain ASCII is its own NFKD form and has nothing to normalize, so one scan covers both views
+        if raw.isascii():
+            normalized = raw.lower()
+            match = _INJECTION_SET.search(normalized)
+        else:
+            normalized = self.normalize_query(raw).lower()
+            match = _INJECTION_SET.search(normalized) or _INJECTION_SET.search(unicodedata.normalize("NFKD", raw).lower())
+
+        if match:
+            injection_found = match.group(0)
             return GuardrailResult(
                 passed=False,
                 reason=f"Prompt injection detected: pattern '{injection_found}'",
@@ -177,16 +124,15 @@ class ContentFilter(Guardrail):
                 metadata={"pattern": injection_found, "type": "prompt_injection"},
             )
 
-        for pattern in SUSPICIOUS_KEYWORDS:
-            if pattern.search(normalized):
-                return GuardrailResult(
-                    passed=False,
-                    reason="Suspicious script or event handler detected.",
-                    status_code=400,
-                    metadata={"type": "xss_or_script"},
-                )
+        if _SUSPICIOUS_SET.search(normalized):
+            return GuardrailResult(
+                passed=False,
+                reason="Suspicious script or event handler detected.",
+                status_code=400,
+                metadata={"type": "xss_or_script"},
+            )
 
-        if self._has_zero_width(raw):
+        if stats.zero_width:
             return GuardrailResult(
                 passed=False,
                 reason="Query contains zero-width characters (possible obfuscation).",
@@ -194,7 +140,7 @@ class ContentFilter(Guardrail):
                 metadata={"type": "zero_width_chars"},
             )
 
-        if self._has_homoglyph(raw):
+        if stats.homoglyphs:
             return GuardrailResult(
                 passed=False,
                 reason="Query contains homoglyph characters (possible obfuscation).",
@@ -202,7 +148,7 @@ class ContentFilter(Guardrail):
                 metadata={"type": "homoglyph_detected"},
             )
 
-        if self._has_high_uppercase_ratio(raw):
+        if stats.uppercase_ratio > self.max_uppercase_ratio:
             return GuardrailResult(
                 passed=False,
                 reason="Suspiciously high uppercase ratio.",
@@ -210,7 +156,7 @@ class ContentFilter(Guardrail):
                 metadata={"type": "high_uppercase_ratio"},
             )
 
-        if self._has_high_special_char_ratio(raw):
+        if stats.special_ratio > self.max_special_char_ratio:
             return GuardrailResult(
                 passed=False,
                 reason="Suspiciously high special character ratio.",
@@ -234,7 +180,8 @@ class ContentFilter(Guardrail):
                 metadata={"type": "separator_abuse"},
             )
 
-        if self._detect_unicode_normalization_attack(raw):
+        # Many combining marks in text that NFKD would change
+        if stats.combining > 5 and unicodedata.normalize("NFKD", raw) != raw:
             return GuardrailResult(
                 passed=False,
                 reason="Unicode normalization attack detected.",
@@ -5,25 +5,73 @@ from .config import GuardrailConfig
 from .rate_limiter import RateLimiter
 from .content_filter import ContentFilter
 from .query_validator import QuerySizeLimit, TickerValidator, PatternGuard
+from .verdict_cache import VerdictCache, guardrail_fingerprint
 from infrastructure.observability.metrics.collector import get_metrics_collector
 
 logger = logging.getLogger("guardrails")
 
+# Verdict cache hit/miss counts are published to the metrics collector in batches of this many lookups
+_METRICS_FLUSH_LOOKUPS = 256
+
 
 class GuardrailPipeline:
     def __init__(self, config: GuardrailConfig | None = None):
         cfg = config or GuardrailConfig()
+        self.verdict_cache = VerdictCache(cfg.verdict_cache_size)
+        self._reported = {"hits": 0, "misses": 0}
+        self.configure(cfg)
+
+    def configure(self, config: GuardrailConfig) -> None:
+        # Rebuilding changes the fingerprint, so verdicts cached under the old settings are never served
         self.guardrails: list[Guardrail] = [
-            RateLimiter(cfg),
-            QuerySizeLimit(cfg),
-            ContentFilter(cfg),
-            TickerValidator(cfg),
+            RateLimiter(config),
+            QuerySizeLimit(config),
+            ContentFilter(config),
+            TickerValidator(config),
             PatternGuard(),
         ]
+        self._fingerprint = guardrail_fingerprint([g for g in self.guardrails if g.cacheable])
+
+    def _cached_verdict(self, query: str, client_ip: str) -> tuple[int, GuardrailResult | None]:
+        # Index of the first failing cacheable guardrail and its result, or (-1, None) if all pass
+        key = self.verdict_cache.key(self._fingerprint, query)
+        verdict = self.verdict_cache.get(key)
+        stats = self.verdict_cache.stats
+        if stats.hits + stats.misses - sum(self._reported.values()) >= _METRICS_FLUSH_LOOKUPS:
+            self.flush_metrics()
+        if verdict is not None:
+            return verdict
+
+        verdict = (-1, None)
+        for index, guardrail in enumerate(self.guardrails):
+            if guardrail.cacheable:
+                result = guardrail.validate(query, client_ip)
+                if not result.passed:
+                    verdict = (index, result)
+                    break
+        self.verdict_cache.put(key, *verdict)
+        return verdict
+
+    def flush_metrics(self) -> None:
+        stats = self.verdict_cache.get_stats()
+        hits, misses = stats["hits"] - self._reported["hits"], stats["misses"] - self._reported["misses"]
+        self._reported = {"hits": stats["hits"], "misses": stats["misses"]}
+        metrics = get_metrics_collector()
+        if metrics and hits + misses:
+            metrics.record_cache_metrics({**stats, "hits": hits, "misses": misses, "total_requests": hits + misses})
 
     def check(self, query: str, client_ip: str) -> GuardrailResult:
-        for guardrail in self.guardrails:
-            result = guardrail.validate(query, client_ip)
+        verdict = None
+        for index, guardrail in enumerate(self.guardrails):
+            if guardrail.cacheable:
+                # Cacheable guardrails are settled together, once, when the first one is reached
+                if verdict is None:
+                    verdict = self._cached_verdict(query, client_ip)
+                if verdict[0] != index:
+                    continue
+                result = verdict[1]
+            else:
+                result = guardrail.validate(query, client_ip)
             if not result.passed:
                 logger.warning(
                     "Guardrail '%s' blocked request from %s (len=%d): %s",
@@ -2,9 +2,12 @@ import re
 
 from .base import Guardrail, GuardrailResult
 from .config import GuardrailConfig
+from .scanner import PatternSet
 
 
 class QuerySizeLimit(Guardrail):
+    cacheable = True
+
     def __init__(self, config: GuardrailConfig | None = None):
         cfg = config or GuardrailConfig()
         self.max_length = cfg.max_query_length
@@ -31,9 +34,11 @@ class QuerySizeLimit(Guardrail):
 
 
 class TickerValidator(Guardrail):
+    cacheable = True
+
     def __init__(self, config: GuardrailConfig | None = None):
         cfg = config or GuardrailConfig()
-        self.ticker_pattern = cfg.ticker_pattern
+        self.ticker_pattern = re.compile(cfg.ticker_pattern)
         self.whitelist = cfg.vietnamese_tickers
 
     @property
@@ -41,7 +46,7 @@ class TickerValidator(Guardrail):
         return "ticker_validator"
 
     def validate(self, query: str, client_ip: str) -> GuardrailResult:
-        matches = re.findall(self.ticker_pattern, query.upper())
+        matches = self.ticker_pattern.findall(query.upper())
         if not matches:
             return GuardrailResult(passed=True)
 
@@ -61,6 +66,8 @@ class TickerValidator(Guardrail):
 
 
 class PatternGuard(Guardrail):
+    cacheable = True
+
     SQL_PATTERNS: list[re.Pattern] = [
         re.compile(r"(\bDROP\b.*\bTABLE\b|\bDROP\s+DATABASE\b)", re.I),
         re.compile(r"(\bDELETE\b.*\bFROM\b|\bTRUNCATE\b)", re.I),
@@ -90,36 +97,32 @@ class PatternGuard(Guardrail):
         re.compile(r"file://", re.I),
     ]
 
+    # (metadata type, reason) in the order categories are reported
+    CATEGORIES: list[tuple[str, str]] = [
+        ("sql_injection", "SQL injection pattern detected."),
+        ("shell_injection", "Shell injection pattern detected."),
+        ("path_traversal", "Path traversal pattern detected."),
+    ]
+
+    def __init__(self):
+        groups = [self.SQL_PATTERNS, self.SHELL_PATTERNS, self.PATH_TRAVERSAL_PATTERNS]
+        self._patterns = PatternSet([p for group in groups for p in group])
+        # Pattern index -> category, following the list order above
+        self._category_of = [category for group, category in zip(groups, self.CATEGORIES) for _ in group]
+
     @property
     def name(self) -> str:
         return "pattern_guard"
 
     def validate(self, query: str, client_ip: str) -> GuardrailResult:
-        for pattern in self.SQL_PATTERNS:
-            if pattern.search(query):
-                return GuardrailResult(
-                    passed=False,
-                    reason="SQL injection pattern detected.",
-                    status_code=400,
-                    metadata={"type": "sql_injection"},
-                )
-
-        for pattern in self.SHELL_PATTERNS:
-            if pattern.search(query):
-                return GuardrailResult(
-                    passed=False,
-                    reason="Shell injection pattern detected.",
-                    status_code=400,
-                    metadata={"type": "shell_injection"},
-                )
-
-        for pattern in self.PATH_TRAVERSAL_PATTERNS:
-            if pattern.search(query):
-                return GuardrailResult(
-                    passed=False,
-                    reason="Path traversal pattern detected.",
-                    status_code=400,
-                    metadata={"type": "path_traversal"},
-                )
+        found = self._patterns.find(query)
+        if found is None:
+            return GuardrailResult(passed=True)
 
-        return GuardrailResult(passed=True)
+        kind, reason = self._category_of[found[0]]
+        return GuardrailResult(
+            passed=False,
+            reason=reason,
+            status_code=400,
+            metadata={"type": kind},
+        )
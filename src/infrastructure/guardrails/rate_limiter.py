@@ -1,12 +1,68 @@
+import logging
+import math
 import time
 import threading
-from collections import defaultdict
 
 from .base import Guardrail, GuardrailResult
 from .config import GuardrailConfig
 
+logger = logging.getLogger("guardrails")
+
+_HOUR_SECONDS = 3600.0
+
+# Idle-eviction timing wheel: 512 slots of 10s cover the longest idle period (the hourly window)
+_WHEEL_TICK_SECONDS = 10.0
+_WHEEL_SLOTS = 512
+
+_BLOCKED_BURST = 1
+_BLOCKED_HOURLY = 2
+
+# KEYS[1]: client state hash. ARGV: capacity, refill per second, hourly limit.
+# Mirrors ClientState.consume on Redis server time; returns 0 (pass), 1 (burst) or 2 (hourly).
+_TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local hourly_limit = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last', 'hour_count', 'hour_start')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+local hour_count = tonumber(state[3]) or 0
+local hour_start = tonumber(state[4]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local verdict = 0
+if tokens < 1 then
+    verdict = 1
+else
+    tokens = tokens - 1
+    if hour_count > 0 and now - hour_start >= 3600 then
+        hour_count = 1
+        hour_start = now
+    else
+        if hour_count == 0 then
+            hour_start = now
+        end
+        if hour_count >= hourly_limit then
+            verdict = 2
+        else
+            hour_count = hour_count + 1
+        end
+    end
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'last', now, 'hour_count', hour_count, 'hour_start', hour_start)
+local ttl = math.max(hour_start + 3600 - now, (capacity - tokens) / rate)
+redis.call('EXPIRE', KEYS[1], math.max(1, math.ceil(ttl)))
+return verdict
+"""
+
 
 class TokenBucket:
+    __slots__ = ("capacity", "tokens", "refill_rate", "refill_period", "last_refill", "lock")
+
     def __init__(self, capacity: int, refill_rate: float, refill_period: float = 1.0):
         self.capacity = capacity
         self.tokens = float(capacity)
@@ -31,48 +87,146 @@ class TokenBucket:
             return False
 
 
+class ClientState:
+    # Burst bucket and hourly window for one client; guarded by the limiter's lock
+    __slots__ = ("tokens", "last", "hour_count", "hour_start")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.last = now
+        self.hour_count = 0
+        self.hour_start = now
+
+    def consume(self, now: float, capacity: float, rate: float, hourly_limit: int) -> int:
+        self.tokens = min(capacity, self.tokens + (now - self.last) * rate)
+        self.last = now
+        if self.tokens < 1:
+            return _BLOCKED_BURST
+        self.tokens -= 1
+
+        # Same hourly window rules as before: an expired window restarts at this request
+        if self.hour_count and now - self.hour_start >= _HOUR_SECONDS:
+            self.hour_count, self.hour_start = 1, now
+            return 0
+        if not self.hour_count:
+            self.hour_start = now
+        if self.hour_count >= hourly_limit:
+            return _BLOCKED_HOURLY
+        self.hour_count += 1
+        return 0
+
+    def idle_until(self, capacity: float, rate: float) -> float:
+        # After this the state equals a fresh one (bucket full, hourly window over), so dropping it is lossless
+        return max(self.hour_start + _HOUR_SECONDS, self.last + (capacity - self.tokens) / rate)
+
+
 class RateLimiter(Guardrail):
-    def __init__(self, config: GuardrailConfig | None = None):
+    def __init__(self, config: GuardrailConfig | None = None, redis_client=None):
         cfg = config or GuardrailConfig()
-        self.buckets: dict[str, TokenBucket] = defaultdict(
-            lambda: TokenBucket(
-                capacity=cfg.rate_limit_burst,
-                refill_rate=cfg.rate_limit_requests / cfg.rate_limit_window_seconds,
-            )
-        )
-        self.hourly_counts: dict[str, tuple[int, float]] = {}
+        self.capacity = float(cfg.rate_limit_burst)
+        self.refill_rate = cfg.rate_limit_requests / cfg.rate_limit_window_seconds
         self.hourly_limit = cfg.rate_limit_hourly_per_ip
-        self.hourly_lock = threading.Lock()
-        self.cleanup_lock = threading.Lock()
+        self.max_clients = cfg.rate_limit_max_clients
+
+        self.clients: dict[str, ClientState] = {}
+        self._wheel: list[set[str]] = [set() for _ in range(_WHEEL_SLOTS)]
+        self._wheel_tick = math.floor(time.monotonic() / _WHEEL_TICK_SECONDS)
+        self._lock = threading.Lock()
+
+        self.backend = cfg.rate_limit_backend
+        self._redis = redis_client
+        self._redis_script = None
+        self._redis_resolved = redis_client is not None
 
     @property
     def name(self) -> str:
         return "rate_limiter"
 
+    def _schedule(self, client_ip: str, at: float) -> None:
+        tick = max(math.ceil(at / _WHEEL_TICK_SECONDS), self._wheel_tick + 1)
+        self._wheel[tick % _WHEEL_SLOTS].add(client_ip)
+
+    def _advance_wheel(self, now: float) -> None:
+        # Entries are rescheduled lazily: a due slot re-checks its clients and drops only those still idle
+        start, target = self._wheel_tick, math.floor(now / _WHEEL_TICK_SECONDS)
+        if target <= start:
+            return
+        self._wheel_tick = target
+        for tick in range(max(start + 1, target - _WHEEL_SLOTS + 1), target + 1):
+            due, self._wheel[tick % _WHEEL_SLOTS] = self._wheel[tick % _WHEEL_SLOTS], set()
+            for client_ip in due:
+                state = self.clients.get(client_ip)
+                if state is None:
+                    continue
+                idle_at = state.idle_until(self.capacity, self.refill_rate)
+                if idle_at <= now:
+                    del self.clients[client_ip]
+                else:
+                    self._schedule(client_ip, idle_at)
+
+    def _shed(self) -> None:
+        # Over capacity: drop the clients closest to going idle, starting from the next slot
+        for offset in range(1, _WHEEL_SLOTS + 1):
+            slot = self._wheel[(self._wheel_tick + offset) % _WHEEL_SLOTS]
+            while slot and len(self.clients) >= self.max_clients:
+                self.clients.pop(slot.pop(), None)
+            if len(self.clients) < self.max_clients:
+                return
+
+    def _check_local(self, client_ip: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            self._advance_wheel(now)
+            state = self.clients.get(client_ip)
+            if state is None:
+                if len(self.clients) >= self.max_clients:
+                    self._shed()
+                state = self.clients[client_ip] = ClientState(self.capacity, now)
+                verdict = state.consume(now, self.capacity, self.refill_rate, self.hourly_limit)
+                self._schedule(client_ip, state.idle_until(self.capacity, self.refill_rate))
+                return verdict
+            return state.consume(now, self.capacity, self.refill_rate, self.hourly_limit)
+
+    def _redis_check(self, client_ip: str) -> int | None:
+        if not self._redis_resolved:
+            self._redis_resolved = True
+            from infrastructure.cache.redis_cache import get_cache
+
+            cache = get_cache()
+            self._redis = cache._get_client() if cache is not None else None
+            if self._redis is None:
+                logger.warning("Redis rate limiting unavailable; limits apply per process")
+        if self._redis is None:
+            return None
+
+        try:
+            if self._redis_script is None:
+                self._redis_script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+            return int(self._redis_script(
+                keys=[f"ratelimit:{client_ip}"],
+                args=[self.capacity, self.refill_rate, self.hourly_limit],
+            ))
+        except Exception as e:
+            logger.warning("Redis rate limit check failed, using local limits: %s", e)
+            return None
+
     def validate(self, query: str, client_ip: str) -> GuardrailResult:
-        bucket = self.buckets[client_ip]
-        if not bucket.consume():
+        verdict = self._redis_check(client_ip) if self.backend == "redis" else None
+        if verdict is None:
+            verdict = self._check_local(client_ip)
+
+        if verdict == _BLOCKED_BURST:
             return GuardrailResult(
                 passed=False,
                 reason="Too many requests. Please slow down.",
                 status_code=429,
                 metadata={"client_ip": client_ip, "limit_type": "burst"},
             )
-
-        with self.hourly_lock:
-            now = time.monotonic()
-            count, window_start = self.hourly_counts.get(client_ip, (0, now))
-
-            if now - window_start >= 3600:
-                self.hourly_counts[client_ip] = (1, now)
-            else:
-                if count >= self.hourly_limit:
-                    return GuardrailResult(
-                        passed=False,
-                        reason="Hourly request limit exceeded.",
-                        status_code=429,
-                        metadata={"client_ip": client_ip, "limit_type": "hourly"},
-                    )
-                self.hourly_counts[client_ip] = (count + 1, window_start)
-
+        if verdict == _BLOCKED_HOURLY:
+            return GuardrailResult(
+                passed=False,
+                reason="Hourly request limit exceeded.",
+                status_code=429,
+                metadata={"client_ip": client_ip, "limit_type": "hourly"},
+            )
         return GuardrailResult(passed=True)
@@ -0,0 +1,175 @@
+"""
+Compiled scanning primitives shared by the content and pattern guardrails.
+
+- ``PatternSet`` puts a literal prefilter in front of an ordered regex list.
+  Each regex's required literals (at least one must occur in any match) are
+  extracted from its parse tree and merged into one literal alternation; a
+  query with none of them is cleared in a single scan. Otherwise only the
+  regexes whose literals occur are confirmed, in list order, so the reported
+  match is the same as checking every regex one by one.
+- ``scan_text`` collects every character-class statistic the guardrails use
+  (letters, uppercase, specials, zero-width, homoglyphs, combining marks) in
+  one pass, with per-character classification memoized.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+_ALPHA = 1
+_UPPER = 2
+_SPECIAL = 4
+_ZERO_WIDTH = 8
+_HOMOGLYPH = 16
+_COMBINING = 32
+
+# Combining marks counted by the unicode normalization check
+_COMBINING_RANGES = ((0x0300, 0x036F), (0x1AB0, 0x1AFF), (0x1DC0, 0x1DFF), (0x20D0, 0x20FF), (0xFE00, 0xFE0F))
+_MAX_CLASSIFIED_CHARS = 4096
+
+# Non-ASCII characters IGNORECASE matches against ASCII letters; folded before the prefilter
+_CASE_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None))
+
+
+def _best(candidates: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    # Longest shortest-literal is the most selective; ties go to fewer literals
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (min(map(len, c)), -len(c)))
+
+
+def _required_literals(items) -> Optional[FrozenSet[str]]:
+    candidates: List[FrozenSet[str]] = []
+    run: List[str] = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            candidates.append(frozenset(["".join(run)]))
+            run = []
+
+        found = None
+        if op is sre_constants.SUBPATTERN:
+            found = _required_literals(av[-1])
+        elif op is sre_constants.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            if all(branches):
+                found = frozenset().union(*branches)
+        elif op in _REPEATS and av[0] >= 1:
+            found = _required_literals(av[2])
+        if found:
+            candidates.append(found)
+    if run:
+        candidates.append(frozenset(["".join(run)]))
+    return _best(candidates)
+
+
+def required_literals(pattern: re.Pattern) -> Optional[FrozenSet[str]]:
+    """Lowercase literals of which every match contains at least one, or None if unknown."""
+    try:
+        return _required_literals(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None
+
+
+class PatternSet:
+    """Ordered regexes behind a single literal prefilter."""
+
+    def __init__(self, patterns: Iterable[re.Pattern]):
+        self.patterns = list(patterns)
+        self.literals = [required_literals(p) for p in self.patterns]
+        all_literals = sorted(set().union(*(lits for lits in self.literals if lits)), key=len, reverse=True)
+        self._prefilter = re.compile("|".join(map(re.escape, all_literals))) if all_literals else None
+
+    def find(self, text: str) -> Optional[Tuple[int, re.Match]]:
+        """Index and match of the first pattern (in list order) that matches."""
+        folded = text.translate(_CASE_FOLD).lower()
+        hit = self._prefilter is not None and self._prefilter.search(folded) is not None
+        for index, (pattern, literals) in enumerate(zip(self.patterns, self.literals)):
+            if literals is not None and not (hit and any(lit in folded for lit in literals)):
+                continue
+            match = pattern.search(text)
+            if match:
+                return index, match
+        return None
+
+    def search(self, text: str) -> Optional[re.Match]:
+        found = self.find(text)
+        return found[1] if found else None
+
+
+@dataclass(frozen=True)
+class TextStats:
+    length: int
+    letters: int
+    uppercase: int
+    special: int
+    zero_width: int
+    homoglyphs: int
+    combining: int
+
+    @property
+    def uppercase_ratio(self) -> float:
+        return self.uppercase / self.letters if self.letters else 0.0
+
+    @property
+    def special_ratio(self) -> float:
+        return self.special / self.length if self.length else 0.0
+
+
+class CharClassifier(dict):
+    """Character -> class bit mask, computed on first sight and memoized (bounded)."""
+
+    def __init__(self, zero_width: Iterable[str], homoglyphs: Iterable[str]):
+        super().__init__()
+        self.zero_width = frozenset(zero_width)
+        self.homoglyphs = frozenset(homoglyphs)
+
+    def __missing__(self, ch: str) -> int:
+        flags = 0
+        if ch.isalpha():
+            flags |= _ALPHA
+            if ch.isupper():
+                flags |= _UPPER
+        if not ch.isalnum() and not ch.isspace():
+            flags |= _SPECIAL
+        if ch in self.zero_width:
+            flags |= _ZERO_WIDTH
+        if ch in self.homoglyphs:
+            flags |= _HOMOGLYPH
+        code = ord(ch)
+        if any(lo <= code <= hi for lo, hi in _COMBINING_RANGES):
+            flags |= _COMBINING
+        if len(self) < _MAX_CLASSIFIED_CHARS:
+            self[ch] = flags
+        return flags
+
+
+def scan_text(text: str, classifier: CharClassifier) -> TextStats:
+    # One pass over the text; the per-class tallies are then summed over the few distinct masks
+    counts = Counter(map(classifier.__getitem__, text))
+    totals = dict.fromkeys((_ALPHA, _UPPER, _SPECIAL, _ZERO_WIDTH, _HOMOGLYPH, _COMBINING), 0)
+    for mask, count in counts.items():
+        for flag in totals:
+            if mask & flag:
+                totals[flag] += count
+    return TextStats(
+        length=len(text),
+        letters=totals[_ALPHA],
+        uppercase=totals[_UPPER],
+        special=totals[_SPECIAL],
+        zero_width=totals[_ZERO_WIDTH],
+        homoglyphs=totals[_HOMOGLYPH],
+        combining=totals[_COMBINING],
+    )
@@ -11,6 +11,7 @@ from domain.schemas.portfolio import PortfolioQueryParams
 from domain.schemas.alert import AlertQueryParams
 from domain.schemas.forecast import ForecastQueryParams
 from domain.schemas.sector import SectorQueryParams
+from domain.schemas.screening import ScreeningQueryParams
 from pydantic import ValidationError
 
 
@@ -88,6 +89,11 @@ class SectorQueryValidator(TypeValidator):
         return SectorQueryParams
 
 
+class ScreeningQueryValidator(TypeValidator):
+    def _get_schema(self):
+        return ScreeningQueryParams
+
+
 _TYPE_VALIDATORS: Dict[str, TypeValidator] = {
     "price_query": PriceQueryValidator(),
     "ranking_query": RankingQueryValidator(),
@@ -101,6 +107,7 @@ _TYPE_VALIDATORS: Dict[str, TypeValidator] = {
     "alert_query": AlertQueryValidator(),
     "forecast_query": ForecastQueryValidator(),
     "sector_query": SectorQueryValidator(),
+    "screening_query": ScreeningQueryValidator(),
 }
 
 
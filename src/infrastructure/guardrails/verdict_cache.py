@@ -0,0 +1,99 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+from .base import Guardrail, GuardrailResult
+from .scanner import PatternSet
+
+
+@dataclass
+class VerdictCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return (self.hits / total * 100) if total > 0 else 0.0
+
+
+def _canonical(value) -> str:
+    # Deterministic rendering of guardrail settings (sets sorted, patterns by source and flags)
+    if isinstance(value, re.Pattern):
+        return f"re({value.pattern!r},{value.flags})"
+    if isinstance(value, PatternSet):
+        return _canonical(value.patterns)
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(map(_canonical, value))) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(map(_canonical, value)) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k!r}:{_canonical(v)}" for k, v in sorted(value.items())) + "}"
+    return repr(value)
+
+
+def _copy(result: GuardrailResult | None) -> GuardrailResult | None:
+    # Callers may annotate a result; the cached one is never handed out
+    return replace(result, metadata=dict(result.metadata)) if result else None
+
+
+def guardrail_fingerprint(guardrails: list[Guardrail]) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    for index, guardrail in enumerate(guardrails):
+        state = {k: v for k, v in vars(guardrail).items() if not k.startswith("__")}
+        digest.update(f"{index}:{guardrail.name}:{_canonical(state)};".encode())
+    return digest.digest()
+
+
+class VerdictCache:
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.stats = VerdictCacheStats()
+        self._entries: OrderedDict[bytes, tuple[int, GuardrailResult | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(fingerprint: bytes, query: str) -> bytes:
+        # Keyed hash: the same text under different guardrail settings never shares an entry
+        return hashlib.blake2b(query.encode("utf-8", "surrogatepass"), digest_size=16, key=fingerprint).digest()
+
+    def get(self, key: bytes) -> tuple[int, GuardrailResult | None] | None:
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return verdict[0], _copy(verdict[1])
+
+    def put(self, key: bytes, index: int, result: GuardrailResult | None) -> None:
+        with self._lock:
+            self._entries[key] = (index, _copy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "cache_type": "guardrail_verdict",
+                "hits": self.stats.hits,
+                "misses": self.stats.misses,
+                "evictions": self.stats.evictions,
+                "total_requests": self.stats.hits + self.stats.misses,
+                "hit_rate": round(self.stats.hit_rate, 2),
+                "current_size": len(self._entries),
+                "max_size": self.max_entries,
+            }
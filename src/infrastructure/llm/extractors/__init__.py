@@ -20,6 +20,7 @@ from .portfolio_extractor import PortfolioExtractor
 from .alert_extractor import AlertExtractor
 from .forecast_extractor import ForecastExtractor
 from .sector_extractor import SectorExtractor
+from .screening_extractor import ScreeningExtractor
 
 __all__ = [
     "BaseExtractor",
@@ -35,4 +36,5 @@ __all__ = [
     "AlertExtractor",
     "ForecastExtractor",
     "SectorExtractor",
+    "ScreeningExtractor",
 ]
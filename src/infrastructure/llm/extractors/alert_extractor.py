@@ -12,13 +12,25 @@ logger = logging.getLogger(__name__)
 
 class AlertParams(BaseModel):
     tickers: List[str] = Field(
-        ..., description="Stock ticker symbols, e.g. ['VCB']"
+        default_factory=list, description="Stock ticker symbols, e.g. ['VCB']; required to check or watch"
     )
-    threshold: float = Field(
-        ..., description="Price threshold value"
+    threshold: Optional[float] = Field(
+        None, description="Price threshold value; required to check or watch"
     )
     condition: str = Field(
-        "above", description="Condition: above, below"
+        "above", description="Condition: above, below, percent_up, percent_down, cross_above, cross_below"
+    )
+    indicator: Optional[str] = Field(
+        None, description="Moving average for cross conditions: sma, ema"
+    )
+    action: str = Field(
+        "check", description="Action: check (one-shot), watch (keep monitoring), list, cancel"
+    )
+    alert_ids: Optional[List[int]] = Field(
+        None, description="Alert ids to cancel"
+    )
+    status: Optional[str] = Field(
+        None, description="Filter for list: active, triggered, cancelled"
     )
     timeframe: str = Field(
         "1d", description="Timeframe: 1d, 1w, 1h"
@@ -29,9 +41,13 @@ _PROMPT = """
 Bạn là chuyên gia trích xuất tham số cho câu hỏi cảnh báo chứng khoán.
 
 Từ câu hỏi, hãy trích xuất các thông tin sau:
-- tickers: danh sách mã cổ phiếu (mảng string, bắt buộc)
-- threshold: ngưỡng giá (số thực, bắt buộc)
-- condition: điều kiện (above/below, mặc định above)
+- tickers: danh sách mã cổ phiếu (mảng string, bắt buộc khi check/watch; với list là bộ lọc tùy chọn)
+- threshold: ngưỡng giá; với percent_up/percent_down là phần trăm; với cross_above/cross_below là chu kỳ đường MA (số thực, bắt buộc khi check/watch)
+- condition: điều kiện (above/below/percent_up/percent_down/cross_above/cross_below, mặc định above)
+- indicator: đường trung bình cho điều kiện cross (sma/ema, mặc định sma)
+- action: check (kiểm tra ngay), watch (theo dõi liên tục và báo khi chạm ngưỡng), list (xem các cảnh báo đã đặt) hoặc cancel (hủy cảnh báo), mặc định check
+- alert_ids: mã số các cảnh báo cần hủy (mảng số nguyên, bắt buộc khi cancel)
+- status: lọc danh sách theo trạng thái (active/triggered/cancelled), chỉ dùng với list
 - timeframe: khung thời gian (1d/1w/1h, mặc định 1d)
 
 Ví dụ:
@@ -39,8 +55,18 @@ Ví dụ:
   -> {{"tickers": ["VCB"], "threshold": 80000, "condition": "above", "timeframe": "1d"}}
 - "Báo cho tôi nếu HPG xuống dưới 25.000"
   -> {{"tickers": ["HPG"], "threshold": 25000, "condition": "below", "timeframe": "1d"}}
+- "Theo dõi và báo khi FPT tăng 5%"
+  -> {{"tickers": ["FPT"], "threshold": 5, "condition": "percent_up", "timeframe": "1d", "action": "watch"}}
+- "Báo khi VNM cắt lên đường EMA 20"
+  -> {{"tickers": ["VNM"], "threshold": 20, "condition": "cross_above", "indicator": "ema", "timeframe": "1d", "action": "watch"}}
 - "Cảnh báo khối lượng VIC vượt 5 triệu trong 1 giờ"
   -> {{"tickers": ["VIC"], "threshold": 5000000, "condition": "above", "timeframe": "1h"}}
+- "Liệt kê các cảnh báo đang theo dõi của tôi"
+  -> {{"action": "list", "status": "active"}}
+- "Những cảnh báo HPG nào đã kích hoạt?"
+  -> {{"tickers": ["HPG"], "action": "list", "status": "triggered"}}
+- "Hủy cảnh báo số 3 và 5"
+  -> {{"action": "cancel", "alert_ids": [3, 5]}}
 
 Chỉ trả về JSON, không giải thích thêm.
 {format_instructions}
@@ -83,4 +109,8 @@ class AlertExtractor(BaseExtractor):
             "threshold": p.threshold,
             "condition": p.condition,
             "timeframe": p.timeframe,
+            "indicator": p.indicator,
+            "action": p.action,
+            "alert_ids": p.alert_ids,
+            "status": p.status,
         }
@@ -18,7 +18,7 @@ class ForecastParams(BaseModel):
         "1w", description="Forecast timeframe: 1d, 1w, 1M, 3M"
     )
     model: Optional[str] = Field(
-        None, description="Forecast model (optional)"
+        None, description="Forecast model (optional): drift, holt, ar; default averages all three"
     )
 
 
@@ -28,15 +28,15 @@ Bạn là chuyên gia trích xuất tham số cho câu hỏi dự báo cổ phi
 Từ câu hỏi, hãy trích xuất các thông tin sau:
 - tickers: danh sách mã cổ phiếu (mảng string, bắt buộc)
 - timeframe: khung thời gian dự báo (1d/1w/1M/3M, mặc định 1w)
-- model: mô hình dự báo (string, tùy chọn)
+- model: mô hình dự báo (drift/holt/ar, tùy chọn; bỏ trống để lấy trung bình các mô hình)
 
 Ví dụ:
 - "Dự báo giá VCB tuần tới"
   -> {{"tickers": ["VCB"], "timeframe": "1w"}}
 - "Dự đoán xu hướng HPG 3 tháng tới"
   -> {{"tickers": ["HPG"], "timeframe": "3M"}}
-- "Forecast VIC theo mô hình SMA"
-  -> {{"tickers": ["VIC"], "timeframe": "1w", "model": "sma"}}
+- "Forecast VIC theo mô hình Holt"
+  -> {{"tickers": ["VIC"], "timeframe": "1w", "model": "holt"}}
 
 Chỉ trả về JSON, không giải thích thêm.
 {format_instructions}
@@ -30,7 +30,7 @@ Bạn là chuyên gia trích xuất tham số cho câu hỏi chỉ báo kỹ thu
 
 Từ câu hỏi, hãy trích xuất các thông tin sau:
 - tickers: danh sách mã cổ phiếu (mảng string, bắt buộc)
-- indicator_type: loại chỉ báo (sma/rsi/macd/bb/stochastic/adx/atr/obv/cci)
+- indicator_type: loại chỉ báo (sma/ema/rsi/macd/bb/stochastic/adx/atr/obv/cci)
 - indicator_period: chu kỳ chỉ báo (số nguyên, ví dụ: SMA9 -> 9, RSI14 -> 14)
 - days/weeks/months: khoảng thời gian
 
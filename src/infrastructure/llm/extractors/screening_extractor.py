@@ -0,0 +1,106 @@
+import logging
+from typing import Dict, Any, Optional, List
+from pydantic import BaseModel, Field
+from langchain_core.messages import SystemMessage
+from langchain_core.output_parsers import PydanticOutputParser
+
+from . import BaseExtractor
+from infrastructure.llm.llm_provider import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+class ScreeningCondition(BaseModel):
+    field: str = Field(..., description="Ratio: pe, pb, roe, roa, eps, debt_to_equity, current_ratio, dividend_yield, profit_margin, revenue_growth, ...")
+    op: str = Field(..., description="Comparison: >, >=, <, <=, =, !=")
+    value: float = Field(..., description="Threshold; percentages as plain numbers (15% -> 15)")
+
+
+class ScreeningParams(BaseModel):
+    filters: List[ScreeningCondition] = Field(
+        default_factory=list, description="Conditions every result must satisfy"
+    )
+    sector: Optional[str] = Field(None, description="Sector to screen, e.g. banking, real estate")
+    tickers: Optional[List[str]] = Field(None, description="Explicit universe of tickers")
+    sort_by: Optional[str] = Field(None, description="Ratio to sort results by")
+    order: str = Field("desc", description="Sort order: asc, desc")
+    limit: int = Field(20, description="Maximum number of results")
+    period: Optional[str] = Field(None, description="Period: quarter, year")
+    quarter: Optional[int] = Field(None, description="Quarter number 1-4")
+    year: Optional[int] = Field(None, description="Year")
+
+
+_PROMPT = """
+Bạn là chuyên gia trích xuất tham số cho câu hỏi lọc (sàng lọc) cổ phiếu theo chỉ số tài chính.
+
+Từ câu hỏi, hãy trích xuất các thông tin sau:
+- filters: danh sách điều kiện {{"field", "op", "value"}} (field: pe/pb/roe/roa/eps/debt_to_equity/current_ratio/dividend_yield/profit_margin/revenue_growth/...; op: >, >=, <, <=; phần trăm ghi số thường, 15% -> 15)
+- sector: ngành cần lọc (tùy chọn) - banking, real estate, ...
+- tickers: danh sách mã giới hạn phạm vi lọc (tùy chọn)
+- sort_by: chỉ số để sắp xếp (tùy chọn)
+- order: asc hoặc desc (mặc định desc)
+- limit: số kết quả tối đa (mặc định 20)
+- period/quarter/year: kỳ báo cáo (tùy chọn)
+
+Ví dụ:
+- "Các ngân hàng có ROE trên 15% và PE dưới 10"
+  -> {{"filters": [{{"field": "roe", "op": ">", "value": 15}}, {{"field": "pe", "op": "<", "value": 10}}], "sector": "banking"}}
+- "Top 5 cổ phiếu có cổ tức cao nhất với nợ/vốn dưới 1"
+  -> {{"filters": [{{"field": "debt_to_equity", "op": "<", "value": 1}}], "sort_by": "dividend_yield", "order": "desc", "limit": 5}}
+- "Lọc cổ phiếu bất động sản có PB dưới 1 năm 2023"
+  -> {{"filters": [{{"field": "pb", "op": "<", "value": 1}}], "sector": "real estate", "period": "year", "year": 2023}}
+
+Chỉ trả về JSON, không giải thích thêm.
+{format_instructions}
+
+Câu hỏi: {query}
+"""
+
+
+class ScreeningExtractor(BaseExtractor):
+    def __init__(self, llm_provider: Optional[LLMProvider] = None):
+        self._llm_provider = llm_provider or LLMProvider()
+        self._parser = PydanticOutputParser(pydantic_object=ScreeningParams)
+
+    def extract(self, query: str) -> Dict[str, Any]:
+        system_msg = SystemMessage(
+            content=_PROMPT.format(
+                query=query,
+                format_instructions=self._parser.get_format_instructions(),
+            )
+        )
+        try:
+            response = self._llm_provider.invoke_with_fallback([system_msg])
+        except Exception as e:
+            logger.warning("screening extractor LLM call failed: %s", e)
+            return {"query_type": "screening_query", "filters": []}
+
+        try:
+            parsed = self._parser.parse(response.content)
+        except Exception as e:
+            logger.warning("screening extractor parse failed: %s", e)
+            return {"query_type": "screening_query", "filters": []}
+
+        return self._to_dict(parsed)
+
+    @staticmethod
+    def _to_dict(p: ScreeningParams) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "query_type": "screening_query",
+            "filters": [c.model_dump() for c in p.filters],
+            "order": p.order,
+            "limit": p.limit,
+        }
+        if p.sector:
+            result["sector"] = p.sector
+        if p.tickers:
+            result["tickers"] = p.tickers
+        if p.sort_by:
+            result["sort_by"] = p.sort_by
+        if p.period is not None:
+            result["period"] = p.period
+        if p.quarter is not None:
+            result["quarter"] = p.quarter
+        if p.year is not None:
+            result["year"] = p.year
+        return result
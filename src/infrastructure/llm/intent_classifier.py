@@ -5,7 +5,7 @@ from infrastructure.llm.llm_provider import LLMProvider
 
 _INTENT_SYSTEM_PROMPT = (
     "Bạn là bộ phân loại ý định cho câu hỏi chứng khoán tiếng Việt.\n"
-    "Phân loại câu hỏi sau thành 1 trong 12 loại:\n\n"
+    "Phân loại câu hỏi sau thành 1 trong 13 loại:\n\n"
     "- price: dữ liệu giá hoặc khối lượng cơ bản (giá, open, close, volume, "
     "OHLCV, mở cửa, đóng cửa, thông tin giá)\n"
     "- aggregate: yêu cầu tổng hợp số liệu (tổng, sum, trung bình, mean, avg, "
@@ -29,21 +29,26 @@ _INTENT_SYSTEM_PROMPT = (
     "- forecast: dự báo giá cổ phiếu, xu hướng (forecast, dự báo, "
     "xu hướng, predict, prediction)\n"
     "- sector: phân tích theo ngành (sector, ngành, banking, real estate, "
-    "industry, nhóm ngành)\n\n"
+    "industry, nhóm ngành)\n"
+    "- screening: lọc cổ phiếu trên toàn thị trường/ngành theo điều kiện chỉ số "
+    "tài chính (lọc, sàng lọc, screen, ROE > 15%, PE < 10, những mã có)\n\n"
     "Chỉ trả về JSON:\n"
     '{"intent": "price|aggregate|compare|indicator|company|ranking|'
-    'financial_ratio|news_sentiment|portfolio|alert|forecast|sector"}\n\n'
+    'financial_ratio|news_sentiment|portfolio|alert|forecast|sector|screening"}\n\n'
     "Không giải thích gì thêm."
 )
 
 _VALID_INTENTS = (
     "price", "aggregate", "compare", "indicator", "company", "ranking",
-    "financial_ratio", "news_sentiment", "portfolio", "alert", "forecast", "sector"
+    "financial_ratio", "news_sentiment", "portfolio", "alert", "forecast", "sector",
+    "screening"
 )
 
 _INTENT_FALLBACK_KEYWORDS: tuple[tuple[str, tuple[str, ...]], ...] = (
     ("company", ("cổ đông", "ban lãnh đạo", "công ty con", "shareholders",
                  "executives", "subsidiaries", "hội đồng quản trị", "ban điều hành")),
+    # Only phrases that name a screen; "các mã có ..." also opens ranking, indicator and news questions
+    ("screening", ("sàng lọc", "lọc cổ phiếu", "lọc các mã", "lọc mã", "screen")),
     ("ranking", ("xếp hạng", "ranking", "top", "cao nhất", "thấp nhất", "best", "worst",
                  "xếp loại")),
     ("financial_ratio", ("tỷ lệ tài chính", "chỉ số tài chính", "pe", "pb", "roe",
@@ -14,6 +14,7 @@ from .extractors import (
     AlertExtractor,
     ForecastExtractor,
     SectorExtractor,
+    ScreeningExtractor,
     BaseExtractor,
 )
 from infrastructure.llm.llm_provider import LLMProvider
@@ -32,6 +33,7 @@ _INTENT_TO_QUERY_TYPE = {
     "alert": "alert_query",
     "forecast": "forecast_query",
     "sector": "sector_query",
+    "screening": "screening_query",
 }
 
 _INTENT_TO_EXTRACTOR: Dict[str, type[BaseExtractor]] = {
@@ -47,6 +49,7 @@ _INTENT_TO_EXTRACTOR: Dict[str, type[BaseExtractor]] = {
     "alert": AlertExtractor,
     "forecast": ForecastExtractor,
     "sector": SectorExtractor,
+    "screening": ScreeningExtractor,
 }
 
 
@@ -0,0 +1,365 @@
+"""
+Incremental fact deduplication for episodic memory.
+
+Replaces the quadratic self-join DELETE over ``episode_facts`` with a
+locality-sensitive hashing pass over only the facts added since the last run.
+Features:
+- Random-hyperplane LSH (banded signatures) for near-linear candidate search
+- Exact cosine verification of candidates on normalized embeddings
+- Watermark table so each pass only scans newly added facts
+- Trailing re-scan window behind the watermark, so facts whose transaction
+  committed after a later-stamped fact was already scanned are still checked
+- Bounded batches, each committed in its own short transaction
+"""
+
+import json
+import logging
+from typing import Any, Optional, Dict, List, Tuple, TYPE_CHECKING
+from datetime import datetime, timedelta
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from infrastructure.memory.episodic.memory import EpisodicMemory
+
+logger = logging.getLogger(__name__)
+
+_STATE_TABLE = "episodic_dedup_state"
+_STATE_NAME = "episode_facts"
+_EPOCH = datetime(1970, 1, 1)
+
+
+def parse_vector(value: Any) -> Optional[np.ndarray]:
+    """Parse a pgvector value (text form ``[0.1,0.2,...]`` or sequence) to float32."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    try:
+        return np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+
+
+class LSHIndex:
+    """Random-hyperplane LSH with banded signatures for cosine similarity."""
+
+    def __init__(self, dim: int, num_bands: int = 8, rows_per_band: int = 8, seed: int = 13):
+        """
+        Initialize LSH hyperplanes.
+
+        Args:
+            dim: Embedding dimension
+            num_bands: Number of signature bands (more bands -> higher recall)
+            rows_per_band: Hyperplanes per band (more rows -> higher precision)
+            seed: Seed so signatures are stable across runs and processes
+        """
+        self.dim = dim
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((num_bands * rows_per_band, dim)).astype(np.float32)
+        self._weights = (1 << np.arange(rows_per_band, dtype=np.int64))
+
+    def band_keys(self, embeddings: np.ndarray) -> np.ndarray:
+        """Return an (n, num_bands) int64 array of band hash keys."""
+        bits = (embeddings @ self.planes.T) > 0
+        bits = bits.reshape(len(embeddings), self.num_bands, self.rows_per_band)
+        return bits.astype(np.int64) @ self._weights
+
+    def candidate_pairs(self, embeddings: np.ndarray, groups: List[Any]) -> np.ndarray:
+        """
+        Find candidate pairs that share at least one band within the same group.
+
+        Args:
+            embeddings: (n, dim) array of normalized embeddings
+            groups: Group key per row; pairs never cross groups
+
+        Returns:
+            (m, 2) array of row index pairs (i < j), deduplicated
+        """
+        n = len(embeddings)
+        if n < 2:
+            return np.empty((0, 2), dtype=np.int64)
+
+        _, group_ids = np.unique(np.asarray([str(g) for g in groups]), return_inverse=True)
+        keys = self.band_keys(embeddings)
+
+        pairs = []
+        for band in range(self.num_bands):
+            composite = np.stack([group_ids, keys[:, band]], axis=1)
+            _, bucket = np.unique(composite, axis=0, return_inverse=True)
+            order = np.argsort(bucket, kind="stable")
+            sorted_buckets = bucket[order]
+            boundaries = np.flatnonzero(np.diff(sorted_buckets)) + 1
+            for members in np.split(order, boundaries):
+                if len(members) < 2:
+                    continue
+                members = np.sort(members)
+                i, j = np.triu_indices(len(members), k=1)
+                pairs.append(np.stack([members[i], members[j]], axis=1))
+
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(pairs), axis=0)
+
+
+def find_duplicates(
+    embeddings: np.ndarray,
+    groups: List[Any],
+    is_new: np.ndarray,
+    similarity_threshold: float,
+    lsh: LSHIndex
+) -> List[int]:
+    """
+    Select rows to delete as near-duplicates.
+
+    Rows are assumed ordered oldest first. A new row is dropped when it is at
+    least ``similarity_threshold`` cosine-similar to an earlier row that is kept;
+    rows that were already vetted (``is_new`` False) are never dropped.
+
+    Returns:
+        Row indices to delete
+    """
+    pairs = lsh.candidate_pairs(embeddings, groups)
+    if len(pairs) == 0:
+        return []
+
+    sims = np.einsum("ij,ij->i", embeddings[pairs[:, 0]], embeddings[pairs[:, 1]])
+    pairs = pairs[sims >= similarity_threshold]
+    # Only the later row of a pair may be dropped, and only if it is new
+    pairs = pairs[is_new[pairs[:, 1]]]
+    if len(pairs) == 0:
+        return []
+
+    earlier_by_row: Dict[int, List[int]] = {}
+    for i, j in pairs.tolist():
+        earlier_by_row.setdefault(j, []).append(i)
+
+    dropped = set()
+    for j in sorted(earlier_by_row):
+        if any(i not in dropped for i in earlier_by_row[j]):
+            dropped.add(j)
+    return sorted(dropped)
+
+
+class FactDeduplicator:
+    """Watermarked, batched LSH deduplication over ``episode_facts``."""
+
+    def __init__(
+        self,
+        memory: "EpisodicMemory",
+        similarity_threshold: float = 0.95,
+        batch_size: int = 500,
+        num_bands: int = 8,
+        rows_per_band: int = 8,
+        lock_timeout_ms: int = 2000,
+        rescan_window_seconds: float = 600
+    ):
+        """
+        Initialize fact deduplicator.
+
+        Args:
+            memory: Episodic memory providing database connections
+            similarity_threshold: Cosine similarity at which two facts are duplicates
+            batch_size: Maximum number of new facts scanned per transaction
+            num_bands: LSH bands
+            rows_per_band: LSH hyperplanes per band
+            lock_timeout_ms: Per-batch lock timeout so writers are never stalled
+            rescan_window_seconds: How far behind the watermark each pass starts.
+                ``created_at`` is stamped before commit, so a slow writer can
+                commit facts older than the watermark; the window must exceed
+                the longest fact-writing transaction.
+        """
+        self.memory = memory
+        self.similarity_threshold = similarity_threshold
+        self.batch_size = batch_size
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.lock_timeout_ms = lock_timeout_ms
+        self.rescan_window_seconds = rescan_window_seconds
+        self._lsh: Optional[LSHIndex] = None
+        self._init_state_table()
+
+    def _init_state_table(self) -> None:
+        """Create the watermark table if missing."""
+        try:
+            with self.memory.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {_STATE_TABLE} (
+                            name VARCHAR(50) PRIMARY KEY,
+                            last_created_at TIMESTAMP NOT NULL,
+                            last_id VARCHAR(36) NOT NULL,
+                            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                        );
+                    """)
+                    cur.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_episode_facts_created_id ON episode_facts(created_at, id);"
+                    )
+                    conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to initialize dedup state table: {e}")
+
+    def _get_lsh(self, dim: int) -> LSHIndex:
+        if self._lsh is None or self._lsh.dim != dim:
+            self._lsh = LSHIndex(dim, num_bands=self.num_bands, rows_per_band=self.rows_per_band)
+        return self._lsh
+
+    def _load_watermark(self, cur) -> Tuple[datetime, str]:
+        cur.execute(f"SELECT last_created_at, last_id FROM {_STATE_TABLE} WHERE name = %s", [_STATE_NAME])
+        row = cur.fetchone()
+        return (row[0], row[1]) if row else (_EPOCH, "")
+
+    def _save_watermark(self, cur, created_at: datetime, fact_id: str) -> None:
+        # Never moves backwards: re-scanned batches end behind the stored mark
+        cur.execute(f"""
+            INSERT INTO {_STATE_TABLE} (name, last_created_at, last_id, updated_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (name) DO UPDATE
+            SET last_created_at = EXCLUDED.last_created_at,
+                last_id = EXCLUDED.last_id,
+                updated_at = NOW()
+            WHERE ({_STATE_TABLE}.last_created_at, {_STATE_TABLE}.last_id)
+                < (EXCLUDED.last_created_at, EXCLUDED.last_id)
+        """, [_STATE_NAME, created_at, fact_id])
+
+    def _scan_start(self, cur) -> Tuple[datetime, str]:
+        """Position a pass starts from: the watermark minus the re-scan window."""
+        last_created_at, _ = self._load_watermark(cur)
+        return last_created_at - timedelta(seconds=self.rescan_window_seconds), ""
+
+    def _process_batch(
+        self,
+        cur,
+        position: Tuple[datetime, str],
+        similarity_threshold: float
+    ) -> Tuple[int, int, Tuple[datetime, str]]:
+        """
+        Scan one batch past ``position``.
+
+        Rows in the batch are treated as new even when an earlier pass saw
+        them; that is safe because only a row similar to an earlier kept row
+        is dropped.
+
+        Returns:
+            (scanned, deleted, position after the batch)
+        """
+        last_created_at, last_id = position
+
+        cur.execute("""
+            SELECT id, episode_id, fact_type, created_at
+            FROM episode_facts
+            WHERE (created_at, id) > (%s, %s)
+            ORDER BY created_at, id
+            LIMIT %s
+        """, [last_created_at, last_id, self.batch_size])
+        new_rows = cur.fetchall()
+        if not new_rows:
+            return 0, 0, position
+
+        new_ids = [row[0] for row in new_rows]
+        episode_ids = list({row[1] for row in new_rows})
+        fact_types = list({row[2] for row in new_rows})
+        batch_end = new_rows[-1]
+
+        # Already-vetted siblings in the touched episodes are needed as comparison
+        # targets; everything else in the table is left untouched.
+        cur.execute("""
+            SELECT id, episode_id, fact_type, created_at, embedding::text
+            FROM episode_facts
+            WHERE episode_id = ANY(%s)
+            AND fact_type = ANY(%s)
+            AND embedding IS NOT NULL
+            AND (created_at, id) <= (%s, %s)
+            ORDER BY created_at, id
+        """, [episode_ids, fact_types, batch_end[3], batch_end[0]])
+        rows = cur.fetchall()
+
+        deleted = 0
+        vectors = [parse_vector(row[4]) for row in rows]
+        keep = [i for i, v in enumerate(vectors) if v is not None]
+        if len(keep) >= 2:
+            rows = [rows[i] for i in keep]
+            embeddings = np.stack([vectors[i] for i in keep])
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1.0, norms)
+
+            new_id_set = set(new_ids)
+            is_new = np.array([row[0] in new_id_set for row in rows], dtype=bool)
+            groups = [(row[1], row[2]) for row in rows]
+
+            to_delete = find_duplicates(
+                embeddings,
+                groups,
+                is_new,
+                similarity_threshold,
+                self._get_lsh(embeddings.shape[1])
+            )
+            if to_delete:
+                cur.execute("DELETE FROM episode_facts WHERE id = ANY(%s)", [[rows[i][0] for i in to_delete]])
+                deleted = cur.rowcount
+
+        self._save_watermark(cur, batch_end[3], batch_end[0])
+        return len(new_rows), deleted, (batch_end[3], batch_end[0])
+
+    def run(
+        self,
+        max_batches: Optional[int] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Deduplicate facts added since the last pass.
+
+        Each pass starts ``rescan_window_seconds`` behind the watermark and
+        tracks its position in memory, so the re-scanned tail is read once.
+
+        Args:
+            max_batches: Stop after this many batches (None drains the backlog);
+                must cover the re-scan window for the watermark to advance
+            similarity_threshold: Override the configured similarity threshold
+
+        Returns:
+            Dictionary with scanned, deleted and batch counts
+        """
+        threshold = similarity_threshold if similarity_threshold is not None else self.similarity_threshold
+        stats = {"scanned": 0, "deleted": 0, "batches": 0}
+        position: Optional[Tuple[datetime, str]] = None
+
+        while max_batches is None or stats["batches"] < max_batches:
+            try:
+                with self.memory.get_connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}")
+                        if position is None:
+                            position = self._scan_start(cur)
+                        scanned, deleted, position = self._process_batch(cur, position, threshold)
+                        conn.commit()
+            except Exception as e:
+                logger.error(f"Fact deduplication batch failed: {e}")
+                break
+
+            if scanned == 0:
+                break
+            stats["scanned"] += scanned
+            stats["deleted"] += deleted
+            stats["batches"] += 1
+
+        if stats["deleted"] > 0:
+            logger.info(f"Deduplicated {stats['deleted']} similar facts ({stats['scanned']} scanned)")
+        return stats
+
+    def reset(self) -> bool:
+        """Reset the watermark so the next pass rescans every fact."""
+        try:
+            with self.memory.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"DELETE FROM {_STATE_TABLE} WHERE name = %s", [_STATE_NAME])
+                    conn.commit()
+                    return True
+        except Exception as e:
+            logger.error(f"Failed to reset dedup watermark: {e}")
+            return False
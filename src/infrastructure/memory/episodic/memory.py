@@ -6,13 +6,15 @@ Features:
 - Semantic search with pgvector
 - Episode aggregation and fact extraction
 - Temporal weighting and deduplication
-- Migration from short-term memory
+- Bulk migration from short-term memory (batched embeddings, COPY)
 """
 
+import csv
+import io
 import logging
 import json
 import uuid
-from typing import Any, Optional, Dict, List, Union, Tuple
+from typing import Any, Optional, Dict, Iterable, List, Union, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from contextlib import contextmanager
@@ -21,6 +23,8 @@ from psycopg2.extras import RealDictCursor, execute_values
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from infrastructure.memory.episodic.deduplication import FactDeduplicator
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,7 +68,10 @@ class EpisodicMemory:
         embedding_model: str = "all-MiniLM-L6-v2",
         similarity_threshold: float = 0.7,
         max_episodes: int = 10000,
-        cleanup_days: int = 30
+        cleanup_days: int = 30,
+        dedup_similarity_threshold: float = 0.95,
+        dedup_batch_size: int = 500,
+        embedding_batch_size: int = 64
     ):
         """
         Initialize episodic memory.
@@ -79,6 +86,9 @@ class EpisodicMemory:
             similarity_threshold: Threshold for semantic similarity
             max_episodes: Maximum number of episodes to store
             cleanup_days: Days to keep episodes before cleanup
+            dedup_similarity_threshold: Cosine similarity at which facts are duplicates
+            dedup_batch_size: New facts scanned per deduplication transaction
+            embedding_batch_size: Texts per forward pass when batch-embedding
         """
         self.host = host
         self.port = port
@@ -88,6 +98,9 @@ class EpisodicMemory:
         self.similarity_threshold = similarity_threshold
         self.max_episodes = max_episodes
         self.cleanup_days = cleanup_days
+        self.dedup_similarity_threshold = dedup_similarity_threshold
+        self.dedup_batch_size = dedup_batch_size
+        self.embedding_batch_size = embedding_batch_size
         
         # Initialize embedding model
         try:
@@ -109,6 +122,13 @@ class EpisodicMemory:
         # Initialize database schema
         self._init_database()
         
+        # Incremental LSH deduplication over episode_facts
+        self.deduplicator = FactDeduplicator(
+            self,
+            similarity_threshold=dedup_similarity_threshold,
+            batch_size=dedup_batch_size
+        )
+        
         logger.info(f"Initialized EpisodicMemory with {database}@{host}:{port}")
     
     @contextmanager
@@ -240,6 +260,159 @@ class EpisodicMemory:
         
         return facts
     
+    def _generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings for many texts in a single model call."""
+        if not texts:
+            return []
+        if not self.embedding_model:
+            return [None] * len(texts)
+        
+        try:
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=self.embedding_batch_size,
+                normalize_embeddings=True
+            )
+            return [embedding.tolist() for embedding in embeddings]
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+            return [None] * len(texts)
+    
+    @staticmethod
+    def _to_vector_literal(embedding: Optional[List[float]]) -> Optional[str]:
+        """Format an embedding as a pgvector text literal."""
+        if embedding is None:
+            return None
+        return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+    
+    def _prepare_episode(
+        self,
+        interactions: List[Dict[str, Any]],
+        summary: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the episode record and its facts without touching the database."""
+        query_types = [inter.get("context", {}).get("query_type", "unknown") for inter in interactions]
+        most_common_type = max(set(query_types), key=query_types.count)
+        
+        if not summary:
+            summary = f"Episode with {len(interactions)} interactions of type '{most_common_type}'"
+        
+        return {
+            "id": str(uuid.uuid4()),
+            "query_type": most_common_type,
+            "summary": summary,
+            "facts": self._extract_facts(interactions),
+            "confidence": self._calculate_confidence(interactions),
+            "interaction_count": len(interactions)
+        }
+    
+    def _write_episodes(self, cur, episodes: List[Dict[str, Any]]) -> None:
+        """
+        Embed and write a chunk of prepared episodes with their facts.
+        
+        Summaries and facts are embedded in one batched model call; episodes are
+        inserted with execute_values and facts are streamed with COPY.
+        """
+        texts = [episode["summary"] for episode in episodes]
+        for episode in episodes:
+            texts.extend(f"{fact['type']}: {fact['value']}" for fact in episode["facts"])
+        embeddings = self._generate_embeddings(texts)
+        
+        now = datetime.now()
+        episode_records = []
+        fact_buffer = io.StringIO()
+        writer = csv.writer(fact_buffer)
+        offset = len(episodes)
+        
+        for i, episode in enumerate(episodes):
+            episode_records.append((
+                episode["id"],
+                episode["query_type"],
+                episode["summary"],
+                json.dumps(episode["facts"]),
+                episode["confidence"],
+                now,
+                None,
+                0,
+                self._to_vector_literal(embeddings[i])
+            ))
+            
+            for fact in episode["facts"]:
+                writer.writerow([
+                    str(uuid.uuid4()),
+                    episode["id"],
+                    fact["type"],
+                    json.dumps(fact["value"]),
+                    fact["confidence"],
+                    fact["source"],
+                    now.isoformat(),
+                    self._to_vector_literal(embeddings[offset])
+                ])
+                offset += 1
+        
+        execute_values(cur, """
+            INSERT INTO episodes (id, query_type, summary, facts, confidence, created_at, last_accessed, access_count, embedding)
+            VALUES %s
+        """, episode_records, page_size=len(episode_records))
+        
+        if fact_buffer.tell():
+            fact_buffer.seek(0)
+            cur.copy_expert("""
+                COPY episode_facts (id, episode_id, fact_type, fact_value, confidence, source, created_at, embedding)
+                FROM STDIN WITH (FORMAT csv)
+            """, fact_buffer)
+    
+    def bulk_migrate(
+        self,
+        episodes: Iterable[Tuple[List[Dict[str, Any]], Optional[str]]],
+        chunk_size: int = 50
+    ) -> int:
+        """
+        Migrate many episodes from short-term memory in bulk.
+        
+        Episodes are consumed lazily and written in chunks; each chunk is
+        embedded in one model call and committed in a single transaction. A
+        failed chunk stops the migration so callers can retry from there.
+        
+        Args:
+            episodes: Iterable of (interactions, summary) pairs, oldest first
+            chunk_size: Number of episodes written per transaction
+            
+        Returns:
+            Number of interactions migrated
+        """
+        migrated = 0
+        chunk: List[Dict[str, Any]] = []
+        
+        def flush() -> bool:
+            nonlocal migrated
+            try:
+                with self.get_connection() as conn:
+                    with conn.cursor() as cur:
+                        self._write_episodes(cur, chunk)
+                        conn.commit()
+            except Exception as e:
+                logger.error(f"Failed to migrate episode chunk: {e}")
+                return False
+            
+            migrated += sum(episode["interaction_count"] for episode in chunk)
+            chunk.clear()
+            return True
+        
+        for interactions, summary in episodes:
+            if not interactions:
+                continue
+            chunk.append(self._prepare_episode(interactions, summary))
+            if len(chunk) >= chunk_size and not flush():
+                return migrated
+        
+        if chunk:
+            flush()
+        
+        if migrated:
+            logger.info(f"Bulk migrated {migrated} interactions to episodic memory")
+        return migrated
+    
     def migrate_from_short_term(
         self, 
         interactions: List[Dict[str, Any]], 
@@ -258,76 +431,7 @@ class EpisodicMemory:
         if not interactions:
             return False
         
-        try:
-            # Analyze interactions to create episode
-            query_types = [inter.get("context", {}).get("query_type", "unknown") for inter in interactions]
-            most_common_type = max(set(query_types), key=query_types.count)
-            
-            # Generate summary if not provided
-            if not summary:
-                user_queries = [inter["user_query"] for inter in interactions]
-                summary = f"Episode with {len(interactions)} interactions of type '{most_common_type}'"
-            
-            # Extract facts and calculate confidence
-            facts = self._extract_facts(interactions)
-            confidence = self._calculate_confidence(interactions)
-            
-            # Generate embeddings
-            summary_embedding = self._generate_embedding(summary)
-            
-            episode_id = str(uuid.uuid4())
-            
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    # Insert episode
-                    episode_data = (
-                        episode_id,
-                        most_common_type,
-                        summary,
-                        json.dumps(facts),
-                        confidence,
-                        datetime.now(),
-                        None,
-                        0,
-                        summary_embedding
-                    )
-                    
-                    cur.execute("""
-                        INSERT INTO episodes (id, query_type, summary, facts, confidence, created_at, last_accessed, access_count, embedding)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, episode_data)
-                    
-                    # Insert facts
-                    fact_records = []
-                    for fact in facts:
-                        fact_id = str(uuid.uuid4())
-                        fact_embedding = self._generate_embedding(f"{fact['type']}: {fact['value']}")
-                        
-                        fact_record = (
-                            fact_id,
-                            episode_id,
-                            fact["type"],
-                            json.dumps(fact["value"]),
-                            fact["confidence"],
-                            fact["source"],
-                            datetime.now(),
-                            fact_embedding
-                        )
-                        fact_records.append(fact_record)
-                    
-                    if fact_records:
-                        execute_values(cur, """
-                            INSERT INTO episode_facts (id, episode_id, fact_type, fact_value, confidence, source, created_at, embedding)
-                            VALUES %s
-                        """, fact_records)
-                    
-                    conn.commit()
-                    logger.info(f"Migrated {len(interactions)} interactions to episodic memory as episode {episode_id}")
-                    return True
-                    
-        except Exception as e:
-            logger.error(f"Failed to migrate to episodic memory: {e}")
-            return False
+        return self.bulk_migrate([(interactions, summary)]) > 0
     
     def search_episodes(
         self, 
@@ -594,40 +698,31 @@ class EpisodicMemory:
             logger.error(f"Failed to cleanup old episodes: {e}")
             return 0
     
-    def deduplicate_facts(self, similarity_threshold: Optional[float] = None) -> int:
+    def deduplicate_facts(
+        self,
+        similarity_threshold: Optional[float] = None,
+        max_batches: Optional[int] = None
+    ) -> int:
         """
-        Deduplicate similar facts based on embeddings.
+        Deduplicate near-identical facts added since the last pass.
+        
+        Candidates are found with LSH over the fact embeddings and verified by
+        exact cosine similarity; each batch commits on its own so writers are
+        never blocked for the whole table.
         
         Args:
-            similarity_threshold: Threshold for considering facts similar
+            similarity_threshold: Cosine similarity for considering facts duplicates
+            max_batches: Maximum number of batches to process (None drains the backlog)
             
         Returns:
             Number of facts deduplicated
         """
-        threshold = similarity_threshold or self.similarity_threshold
-        
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    # This is a simplified deduplication
-                    # In practice, you might want more sophisticated logic
-                    cur.execute("""
-                        DELETE FROM episode_facts ef1
-                        USING episode_facts ef2
-                        WHERE ef1.id < ef2.id
-                        AND ef1.fact_type = ef2.fact_type
-                        AND ef1.episode_id = ef2.episode_id
-                        AND ef1.embedding <=> ef2.embedding < %s
-                    """, [threshold])
-                    
-                    deleted_count = cur.rowcount
-                    conn.commit()
-                    
-                    if deleted_count > 0:
-                        logger.info(f"Deduplicated {deleted_count} similar facts")
-                    
-                    return deleted_count
-                    
+            stats = self.deduplicator.run(
+                max_batches=max_batches,
+                similarity_threshold=similarity_threshold
+            )
+            return stats["deleted"]
         except Exception as e:
             logger.error(f"Failed to deduplicate facts: {e}")
             return 0
@@ -665,6 +760,7 @@ class EpisodicMemory:
                         "facts": dict(fact_stats) if fact_stats else {},
                         "embedding_model": self.embedding_model.model_card_data.model_name if self.embedding_model else None,
                         "similarity_threshold": self.similarity_threshold,
+                        "dedup_similarity_threshold": self.dedup_similarity_threshold,
                         "max_episodes": self.max_episodes,
                         "cleanup_days": self.cleanup_days
                     }
@@ -37,7 +37,9 @@ class MemoryConfig:
     
     # Migration policies
     auto_migration_enabled: bool = True
-    migration_batch_size: int = 10
+    migration_batch_size: int = 10  # interactions per episode
+    migration_chunk_size: int = 500  # interactions read and written per transaction
+    migration_keep_recent: int = 20  # newest interactions left in short-term memory
     migration_interval_minutes: int = 30
     
     # Cleanup policies
@@ -282,48 +284,72 @@ class MemoryManager:
             # Check short-term memory for migration trigger
             if self.short_term:
                 try:
-                    # Get recent interactions for migration
-                    interactions = self.short_term.get_recent_interactions(
-                        limit=self.config.migration_batch_size
-                    )
+                    backlog = self.short_term.count_messages()
                     
-                    if len(interactions) >= self.config.short_term_migration_threshold:
-                        self._migrate_to_episodic(interactions)
+                    if backlog >= self.config.short_term_migration_threshold:
+                        self._migrate_to_episodic(backlog - self.config.migration_keep_recent)
                         self._last_migration = now
                         
                 except Exception as e:
                     logger.error(f"Failed to check migration trigger: {e}")
     
-    def _migrate_to_episodic(self, interactions: List[Dict[str, Any]]) -> bool:
-        """Migrate interactions from short-term to episodic memory."""
+    def _migrate_to_episodic(self, count: int) -> int:
+        """
+        Stream the oldest short-term interactions into episodic memory.
+        
+        The backlog is read from the tail of the short-term list in chunks; each
+        chunk is grouped into episodes, written in one transaction and only then
+        trimmed from short-term memory, so a failure never loses interactions.
+        
+        Args:
+            count: Number of oldest messages to migrate
+            
+        Returns:
+            Number of interactions migrated
+        """
         if not self.episodic:
             logger.error("Episodic memory not available for migration")
-            return False
+            return 0
+        
+        episode_size = max(1, self.config.migration_batch_size)
+        # Whole episodes per chunk so an episode never spans two transactions
+        chunk_size = max(episode_size, self.config.migration_chunk_size // episode_size * episode_size)
+        remaining = count
+        migrated = 0
         
         try:
-            # Generate summary for the episode
-            summary = self._generate_episode_summary(interactions)
-            
-            # Migrate to episodic memory
-            success = self.episodic.migrate_from_short_term(
-                interactions=interactions,
-                summary=summary
-            )
-            
-            if success:
-                # Clean up migrated interactions from short-term memory
-                # Note: This is a simplified approach - in practice you might want
-                # more sophisticated cleanup logic
-                logger.info(f"Migrated {len(interactions)} interactions to episodic memory")
+            while remaining > 0:
+                interactions, raw = self.short_term.get_oldest_interactions(min(chunk_size, remaining))
+                if not raw:
+                    break
+                
+                episodes = (
+                    (batch, self._generate_episode_summary(batch))
+                    for batch in (
+                        interactions[i:i + episode_size]
+                        for i in range(0, len(interactions), episode_size)
+                    )
+                )
+                written = self.episodic.bulk_migrate(episodes, chunk_size=len(interactions) or 1)
+                if written < len(interactions):
+                    logger.warning("Episodic migration chunk failed; will retry on next trigger")
+                    break
+                
+                if self.short_term.remove_oldest(raw) is None:
+                    break
                 
-                # Trigger deduplication
+                migrated += written
+                remaining -= len(raw)
+            
+            if migrated:
+                logger.info(f"Migrated {migrated} interactions to episodic memory")
                 self.episodic.deduplicate_facts()
             
-            return success
+            return migrated
             
         except Exception as e:
             logger.error(f"Failed to migrate to episodic memory: {e}")
-            return False
+            return migrated
     
     def _generate_episode_summary(self, interactions: List[Dict[str, Any]]) -> str:
         """Generate summary for an episode."""
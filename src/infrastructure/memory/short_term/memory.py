@@ -11,9 +11,9 @@ Features:
 import json
 import logging
 import time
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime
-from redis.exceptions import RedisError
+from redis.exceptions import RedisError, WatchError
 
 from infrastructure.cache.redis_cache import RedisCache, get_cache_with_format
 from infrastructure.cache.serialization import SerializationFormat
@@ -230,6 +230,99 @@ class ShortTermMemory:
             logger.error(f"Failed to get recent interactions: {e}")
             return []
     
+    def count_messages(self) -> int:
+        """Return the number of messages currently held in the message list."""
+        try:
+            client = self._redis._get_client()
+            if not client:
+                return 0
+            return client.llen(self._message_list_key)
+        except RedisError as e:
+            logger.error(f"Failed to count messages: {e}")
+            return 0
+    
+    def get_oldest_interactions(self, limit: int) -> Tuple[List[Dict[str, Any]], List[Any]]:
+        """
+        Get the oldest interactions, oldest first.
+        
+        Args:
+            limit: Maximum number of messages to read from the tail
+            
+        Returns:
+            Tuple of (interactions, raw messages read in list order); pass the raw
+            messages to remove_oldest once they have been migrated
+        """
+        if limit <= 0:
+            return [], []
+        
+        try:
+            client = self._redis._get_client()
+            if not client:
+                return [], []
+            
+            messages_data = client.lrange(self._message_list_key, -limit, -1)
+            
+            interactions = []
+            for msg_data in reversed(messages_data):
+                item = self._deserialize_memory_item(msg_data)
+                if item and item.get("content", {}).get("type") == "interaction":
+                    interactions.append(item["content"])
+            
+            return interactions, list(messages_data)
+            
+        except RedisError as e:
+            logger.error(f"Failed to get oldest interactions: {e}")
+            return [], []
+    
+    @staticmethod
+    def _migrated_tail_length(tail: List[Any], migrated: List[Any]) -> int:
+        # Writers only push to the head and cap-trim drops from the tail, so what is
+        # left of the migrated block is its newest part: migrated[:m] at the tail
+        for m in range(min(len(tail), len(migrated)), 0, -1):
+            if tail[len(tail) - m:] == migrated[:m]:
+                return m
+        return 0
+    
+    def remove_oldest(self, migrated: List[Any]) -> Optional[int]:
+        """
+        Remove exactly the given messages from the tail of the message list.
+        
+        The tail is compared and trimmed in one WATCH/MULTI transaction, retried
+        if a writer touches the list in between; messages pushed or cap-trimmed
+        since the read are never dropped by mistake.
+        
+        Args:
+            migrated: Raw messages returned by get_oldest_interactions
+            
+        Returns:
+            Number of messages removed, or None on failure
+        """
+        if not migrated:
+            return 0
+        
+        try:
+            client = self._redis._get_client()
+            if not client:
+                return None
+            
+            with client.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(self._message_list_key)
+                        tail = pipe.lrange(self._message_list_key, -len(migrated), -1)
+                        count = self._migrated_tail_length(tail, migrated)
+                        pipe.multi()
+                        if count:
+                            pipe.ltrim(self._message_list_key, 0, -(count + 1))
+                        pipe.execute()
+                        return count
+                    except WatchError:
+                        continue
+            
+        except RedisError as e:
+            logger.error(f"Failed to trim short-term memory: {e}")
+            return None
+    
     def get_facts(self, fact_types: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Get facts from short-term memory.
@@ -0,0 +1,49 @@
+"""
+Embedded storage backends for the financial insight agent.
+"""
+
+from .alert_rules import AlertMonitor, AlertRuleIndex, AlertRuleStore, get_alert_monitor, set_alert_monitor_instance
+from .bar_archive import BarArchive, get_bar_archive, set_bar_archive_instance
+from .company_profiles import CompanyProfileStore, get_company_profile_store, set_company_profile_store_instance
+from .portfolio_store import PortfolioStore, get_portfolio_store, set_portfolio_store_instance
+from .market_snapshot import (
+    MarketSnapshot,
+    MarketSnapshotJob,
+    MarketSnapshotStore,
+    get_current_snapshot,
+    get_market_snapshot_store,
+    set_market_snapshot_store_instance,
+)
+from .sector_index import SectorIndex, get_sector_index, normalize_sector_name, set_sector_index_instance
+from .statements import StatementStore, StatementTable, get_statement_store, set_statement_store_instance
+
+__all__ = [
+    'AlertMonitor',
+    'AlertRuleIndex',
+    'AlertRuleStore',
+    'get_alert_monitor',
+    'set_alert_monitor_instance',
+    'BarArchive',
+    'get_bar_archive',
+    'set_bar_archive_instance',
+    'CompanyProfileStore',
+    'get_company_profile_store',
+    'set_company_profile_store_instance',
+    'MarketSnapshot',
+    'MarketSnapshotJob',
+    'MarketSnapshotStore',
+    'get_current_snapshot',
+    'get_market_snapshot_store',
+    'set_market_snapshot_store_instance',
+    'PortfolioStore',
+    'get_portfolio_store',
+    'set_portfolio_store_instance',
+    'SectorIndex',
+    'get_sector_index',
+    'normalize_sector_name',
+    'set_sector_index_instance',
+    'StatementStore',
+    'StatementTable',
+    'get_statement_store',
+    'set_statement_store_instance',
+]
@@ -0,0 +1,598 @@
+"""
+Standing price alerts with a batched evaluation loop.
+
+Registered rules live in SQLite; active ones are mirrored into an in-memory
+index keyed by ticker. Each monitor cycle sweeps the latest closes of every
+watched ticker once, then evaluates all rules against them.
+Features:
+- Conditions: above, below, percent_up, percent_down, cross_above, cross_below
+- Price-level rules kept as per-ticker threshold arrays sorted ascending, so
+  the rules triggered by a price are one ``searchsorted`` slice
+- Percent-move rules become price levels off their reference price
+- Indicator-cross rules share one SMA/EMA series per (ticker, indicator, period)
+- One-shot rules: triggered rules leave the index and are recorded with the price
+- Delivery: every trigger is logged and counted; the owner is shown unseen
+  triggers on their next turn (``take_notifications``)
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.storage.paths import data_path
+from shared.utils.indicators import ema, sma
+
+logger = logging.getLogger(__name__)
+
+ALERT_CONDITIONS = ("above", "below", "percent_up", "percent_down", "cross_above", "cross_below")
+CROSS_CONDITIONS = ("cross_above", "cross_below")
+CROSS_INDICATORS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {"sma": sma, "ema": ema}
+
+DEFAULT_USER = "default"
+
+# Alerts compare against the current price, so only a recent snapshot stands in for a fetch
+_SNAPSHOT_MAX_AGE_HOURS = 0.25
+_MIN_LOOKBACK_DAYS = 10
+
+Trigger = Dict[str, Any]
+
+
+class AlertRuleStore:
+    """SQLite-backed registry of alert rules."""
+
+    def __init__(self, db_path: Optional[str] = None, busy_timeout_ms: int = 5000):
+        """
+        Initialize alert rule store.
+
+        Args:
+            db_path: SQLite database path (defaults to $ALERT_DB_PATH or alert_rules.db in the data directory)
+            busy_timeout_ms: How long writers wait for a competing write lock
+        """
+        self.db_path = db_path or data_path("alert_rules.db", "ALERT_DB_PATH")
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._init_database()
+        logger.info(f"Initialized AlertRuleStore at {self.db_path}")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the write lock up front."""
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _init_database(self) -> None:
+        conditions = ", ".join(f"'{c}'" for c in ALERT_CONDITIONS)
+        self._get_connection().executescript(f"""
+            CREATE TABLE IF NOT EXISTS alert_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                condition TEXT NOT NULL CHECK (condition IN ({conditions})),
+                threshold REAL NOT NULL,
+                indicator TEXT,
+                reference_price REAL,
+                status TEXT NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'triggered', 'cancelled')),
+                created_at TEXT NOT NULL,
+                triggered_at TEXT,
+                triggered_price REAL,
+                notified_at TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_alert_rules_status_ticker
+                ON alert_rules(status, ticker);
+
+            CREATE INDEX IF NOT EXISTS idx_alert_rules_user
+                ON alert_rules(user_id, status);
+        """)
+        # Databases created before trigger delivery lack the column
+        columns = {row["name"] for row in self._get_connection().execute("PRAGMA table_info(alert_rules)")}
+        if "notified_at" not in columns:
+            self._get_connection().execute("ALTER TABLE alert_rules ADD COLUMN notified_at TEXT")
+
+    def add_rule(
+        self,
+        ticker: str,
+        condition: str,
+        threshold: float,
+        user_id: str = DEFAULT_USER,
+        indicator: Optional[str] = None,
+        reference_price: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Register an active rule.
+
+        ``threshold`` is a price for above/below, a percentage for
+        percent_up/percent_down and the indicator period for cross rules.
+
+        Returns:
+            The stored rule
+        """
+        if condition not in ALERT_CONDITIONS:
+            raise ValueError(f"Unsupported alert condition: {condition}")
+        if condition in CROSS_CONDITIONS:
+            indicator = indicator or "sma"
+            if indicator not in CROSS_INDICATORS:
+                raise ValueError(f"Unsupported cross indicator: {indicator}")
+        else:
+            indicator = None
+
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO alert_rules (user_id, ticker, condition, threshold, indicator, reference_price, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, ticker.upper(), condition, float(threshold), indicator, reference_price, now))
+            rule_id = cursor.lastrowid
+        return self.get_rule(rule_id)
+
+    def get_rule(self, rule_id: int) -> Optional[Dict[str, Any]]:
+        row = self._get_connection().execute("SELECT * FROM alert_rules WHERE id = ?", (rule_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_rules(self, user_id: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rules filtered by owner and/or status, oldest first."""
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._get_connection().execute(f"SELECT * FROM alert_rules {where} ORDER BY id", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def active_rules(self) -> List[Dict[str, Any]]:
+        return self.get_rules(status="active")
+
+    def set_reference_prices(self, references: Iterable[Tuple[int, float]]) -> None:
+        references = [(price, rule_id) for rule_id, price in references]
+        if references:
+            with self._transaction() as conn:
+                conn.executemany("UPDATE alert_rules SET reference_price = ? WHERE id = ?", references)
+
+    def mark_triggered(self, triggers: List[Trigger]) -> List[Trigger]:
+        """Record triggers of still-active rules; returns those, skipping rules cancelled meanwhile."""
+        if not triggers:
+            return []
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            return [
+                t for t in triggers
+                if conn.execute(
+                    "UPDATE alert_rules SET status = 'triggered', triggered_at = ?, triggered_price = ? WHERE id = ? AND status = 'active'",
+                    (now, t["price"], t["rule_id"])
+                ).rowcount > 0
+            ]
+
+    def take_notifications(self, user_id: str = DEFAULT_USER) -> List[Dict[str, Any]]:
+        """Triggered rules the owner has not been shown yet, marked as shown."""
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM alert_rules WHERE user_id = ? AND status = 'triggered' AND notified_at IS NULL ORDER BY triggered_at, id",
+                (user_id,)
+            ).fetchall()
+            if rows:
+                conn.executemany("UPDATE alert_rules SET notified_at = ? WHERE id = ?", [(now, row["id"]) for row in rows])
+        return [dict(row) for row in rows]
+
+    def cancel(self, rule_id: int, user_id: Optional[str] = None) -> bool:
+        """Cancel an active rule; returns False when no such active rule exists."""
+        sql = "UPDATE alert_rules SET status = 'cancelled' WHERE id = ? AND status = 'active'"
+        params: List[Any] = [rule_id]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        with self._transaction() as conn:
+            return conn.execute(sql, params).rowcount > 0
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class AlertRuleIndex:
+    """In-memory index of active rules, keyed by ticker and sorted by price level."""
+
+    def __init__(self, rules: Iterable[Dict[str, Any]] = ()):
+        self._rules: Dict[int, Dict[str, Any]] = {}
+        self._by_ticker: Dict[str, set] = defaultdict(set)
+        # ticker -> side -> (levels ascending, rule ids)
+        self._levels: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+        self._dirty: set = set()
+        self._lock = threading.RLock()
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add(self, rule: Dict[str, Any]) -> None:
+        with self._lock:
+            ticker = rule["ticker"].upper()
+            self._rules[rule["id"]] = {**rule, "ticker": ticker}
+            self._by_ticker[ticker].add(rule["id"])
+            self._dirty.add(ticker)
+
+    def remove(self, rule_id: int) -> None:
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return
+            ids = self._by_ticker[rule["ticker"]]
+            ids.discard(rule_id)
+            if not ids:
+                del self._by_ticker[rule["ticker"]]
+            self._dirty.add(rule["ticker"])
+
+    def tickers(self) -> List[str]:
+        with self._lock:
+            return sorted(self._by_ticker)
+
+    def lookback_bars(self, ticker: str) -> int:
+        """Closes needed to evaluate the ticker's rules (two per cross, else one)."""
+        with self._lock:
+            periods = [int(self._rules[i]["threshold"]) for i in self._by_ticker.get(ticker, ())
+                       if self._rules[i]["condition"] in CROSS_CONDITIONS]
+        return max(periods) + 1 if periods else 1
+
+    @staticmethod
+    def _price_level(rule: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+        condition, threshold = rule["condition"], rule["threshold"]
+        if condition in ("above", "below"):
+            return condition, threshold
+        reference = rule.get("reference_price")
+        if reference is None:
+            return None
+        if condition == "percent_up":
+            return "above", reference * (1 + threshold / 100)
+        if condition == "percent_down":
+            return "below", reference * (1 - threshold / 100)
+        return None
+
+    def _rebuild(self, ticker: str) -> None:
+        sides: Dict[str, List[Tuple[float, int]]] = {"above": [], "below": []}
+        for rule_id in self._by_ticker.get(ticker, ()):
+            level = self._price_level(self._rules[rule_id])
+            if level is not None:
+                sides[level[0]].append((level[1], rule_id))
+
+        levels = {}
+        for side, entries in sides.items():
+            entries.sort()
+            levels[side] = (
+                np.array([level for level, _ in entries], dtype=np.float64),
+                np.array([rule_id for _, rule_id in entries], dtype=np.int64),
+            )
+        self._levels[ticker] = levels
+
+    def assign_references(self, prices: Dict[str, float]) -> List[Tuple[int, float]]:
+        """Anchor percent-move rules that have no reference yet at the current price."""
+        assigned = []
+        with self._lock:
+            for rule_id, rule in self._rules.items():
+                price = prices.get(rule["ticker"])
+                if rule["condition"] in ("percent_up", "percent_down") and rule.get("reference_price") is None and price is not None:
+                    rule["reference_price"] = price
+                    self._dirty.add(rule["ticker"])
+                    assigned.append((rule_id, price))
+        return assigned
+
+    def evaluate(self, prices: Dict[str, float], closes: Optional[Dict[str, np.ndarray]] = None) -> List[Trigger]:
+        """
+        Rules triggered by the latest prices.
+
+        Args:
+            prices: Latest close per ticker
+            closes: Recent daily closes per ticker (oldest first), needed by cross rules
+
+        Returns:
+            One trigger per fired rule with rule_id, ticker, condition, threshold, price and level
+        """
+        closes = closes or {}
+        triggers: List[Trigger] = []
+        with self._lock:
+            for ticker in self._dirty:
+                self._rebuild(ticker)
+            self._dirty.clear()
+
+            for ticker, price in prices.items():
+                if price is None or ticker not in self._by_ticker:
+                    continue
+                levels = self._levels.get(ticker, {})
+                fired: List[Tuple[int, float]] = []
+
+                # Sorted levels: every "above" level <= price and every "below" level >= price fired
+                above_levels, above_ids = levels.get("above", (np.empty(0), np.empty(0, np.int64)))
+                cut = np.searchsorted(above_levels, price, side="right")
+                fired.extend(zip(above_ids[:cut].tolist(), above_levels[:cut].tolist()))
+
+                below_levels, below_ids = levels.get("below", (np.empty(0), np.empty(0, np.int64)))
+                cut = np.searchsorted(below_levels, price, side="left")
+                fired.extend(zip(below_ids[cut:].tolist(), below_levels[cut:].tolist()))
+
+                fired.extend(self._evaluate_crosses(ticker, closes.get(ticker)))
+
+                for rule_id, level in fired:
+                    rule = self._rules[rule_id]
+                    triggers.append({
+                        "rule_id": rule_id,
+                        "user_id": rule.get("user_id"),
+                        "ticker": ticker,
+                        "condition": rule["condition"],
+                        "threshold": rule["threshold"],
+                        "price": float(price),
+                        "level": float(level),
+                    })
+        return triggers
+
+    def _evaluate_crosses(self, ticker: str, closes: Optional[np.ndarray]) -> List[Tuple[int, float]]:
+        groups: Dict[Tuple[str, int], List[Dict[str, Any]]] = defaultdict(list)
+        for rule_id in self._by_ticker.get(ticker, ()):
+            rule = self._rules[rule_id]
+            if rule["condition"] in CROSS_CONDITIONS:
+                groups[(rule.get("indicator") or "sma", int(rule["threshold"]))].append(rule)
+        if not groups or closes is None or len(closes) < 2:
+            return []
+
+        closes = np.asarray(closes, dtype=np.float64)
+        fired = []
+        for (indicator, period), rules in groups.items():
+            if len(closes) < period + 1:
+                continue
+            line = CROSS_INDICATORS[indicator](closes, period)
+            prev_side = np.sign(closes[-2] - line[-2])
+            side = np.sign(closes[-1] - line[-1])
+            crossed_up = prev_side < 0 and side >= 0
+            crossed_down = prev_side > 0 and side <= 0
+            for rule in rules:
+                if (rule["condition"] == "cross_above" and crossed_up) or (rule["condition"] == "cross_below" and crossed_down):
+                    fired.append((rule["id"], float(line[-1])))
+        return fired
+
+
+def _fetch_daily_bars(ticker: str, start: str, end: str) -> pd.DataFrame:
+    from infrastructure.api_clients.vn_stock_client import VNStockClient
+    return VNStockClient(ticker=ticker).fetch_trading_data(start=start, end=end, interval="1d")
+
+
+def fetch_latest_closes(
+    tickers: Iterable[str],
+    lookback_bars: Optional[Dict[str, int]] = None,
+    fetch_bars: Optional[Callable[[str, str, str], pd.DataFrame]] = None,
+    max_workers: int = 8
+) -> Dict[str, np.ndarray]:
+    """
+    Recent daily closes for a batch of tickers, each ticker fetched once.
+
+    Tickers needing only the last close are served from a fresh market
+    snapshot when one exists; the rest are fetched concurrently.
+
+    Returns:
+        ticker -> closes (oldest first); tickers without data are omitted
+    """
+    from infrastructure.storage.market_snapshot import get_current_snapshot
+
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    lookback_bars = lookback_bars or {}
+    fetch_bars = fetch_bars or _fetch_daily_bars
+    result: Dict[str, np.ndarray] = {}
+
+    snapshot = get_current_snapshot(_SNAPSHOT_MAX_AGE_HOURS)
+    if snapshot is not None:
+        single = [t for t in tickers if lookback_bars.get(t, 1) <= 1]
+        for ticker, close in snapshot.column("close", single).items():
+            result[ticker] = np.array([close])
+
+    pending = [t for t in tickers if t not in result]
+    if not pending:
+        return result
+
+    today = datetime.now()
+    end = today.strftime("%Y-%m-%d")
+
+    def fetch(ticker: str) -> Optional[np.ndarray]:
+        # ~1.6 calendar days per trading bar
+        days = max(int(lookback_bars.get(ticker, 1) * 1.6) + 10, _MIN_LOOKBACK_DAYS)
+        try:
+            frame = fetch_bars(ticker, (today - timedelta(days=days)).strftime("%Y-%m-%d"), end)
+        except Exception as e:
+            logger.debug(f"Alert price fetch failed for {ticker}: {e}")
+            return None
+        if frame is None or frame.empty:
+            return None
+        return frame["close"].to_numpy(dtype=np.float64)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+        for ticker, closes in zip(pending, pool.map(fetch, pending)):
+            if closes is not None and len(closes):
+                result[ticker] = closes
+    return result
+
+
+def log_trigger(trigger: Trigger) -> None:
+    """Default listener: one log line and one counter increment per fired rule."""
+    from infrastructure.observability.metrics.collector import get_metrics_collector
+
+    logger.info(
+        f"Alert {trigger['rule_id']} for {trigger.get('user_id')} triggered: "
+        f"{trigger['ticker']} {trigger['condition']} {trigger['threshold']} at {trigger['price']}"
+    )
+    metrics = get_metrics_collector()
+    if metrics:
+        metrics.increment_counter("alerts_triggered_total", 1, {"condition": trigger["condition"]})
+
+
+class AlertMonitor:
+    """Keeps the rule index in sync with the store and sweeps prices on a schedule."""
+
+    def __init__(
+        self,
+        store: AlertRuleStore,
+        fetch_bars: Optional[Callable[[str, str, str], pd.DataFrame]] = None,
+        interval_minutes: float = 5,
+        max_workers: int = 8,
+        trading_hours: tuple = ("09:00", "15:00")
+    ):
+        """
+        Initialize alert monitor.
+
+        Args:
+            store: Rule store; active rules are loaded into the index
+            fetch_bars: Callable(ticker, start, end) returning daily bars
+            interval_minutes: Minutes between sweeps during trading hours
+            max_workers: Concurrent price fetches per sweep
+            trading_hours: (open, close) local times bounding sweeps
+        """
+        self.store = store
+        self.fetch_bars = fetch_bars
+        self.interval_minutes = interval_minutes
+        self.max_workers = max_workers
+        self.trading_hours = trading_hours
+        self.index = AlertRuleIndex(store.active_rules())
+        self._listeners: List[Callable[[Trigger], None]] = [log_trigger]
+        # Serializes cancellation against recording a sweep's triggers
+        self._lock = threading.Lock()
+        self._task: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def add_listener(self, listener: Callable[[Trigger], None]) -> None:
+        """Register a callback invoked once per triggered rule."""
+        self._listeners.append(listener)
+
+    def add_rule(self, ticker: str, condition: str, threshold: float, **kwargs) -> Dict[str, Any]:
+        rule = self.store.add_rule(ticker, condition, threshold, **kwargs)
+        self.index.add(rule)
+        return rule
+
+    def cancel_rule(self, rule_id: int, user_id: Optional[str] = None) -> bool:
+        with self._lock:
+            cancelled = self.store.cancel(rule_id, user_id)
+            if cancelled:
+                self.index.remove(rule_id)
+        return cancelled
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and self._task.is_alive()
+
+    def sweep(self) -> List[Trigger]:
+        """Fetch the latest closes for all watched tickers once and evaluate every rule."""
+        tickers = self.index.tickers()
+        if not tickers:
+            return []
+
+        closes = fetch_latest_closes(
+            tickers,
+            {t: self.index.lookback_bars(t) for t in tickers},
+            fetch_bars=self.fetch_bars,
+            max_workers=self.max_workers
+        )
+        prices = {ticker: float(values[-1]) for ticker, values in closes.items()}
+
+        self.store.set_reference_prices(self.index.assign_references(prices))
+        triggers = self.index.evaluate(prices, closes)
+        with self._lock:
+            # Only rules still active in the store fire; a rule cancelled meanwhile (here or by
+            # another process) stays cancelled and silent, and leaves the index either way
+            for trigger in triggers:
+                self.index.remove(trigger["rule_id"])
+            triggers = self.store.mark_triggered(triggers)
+
+        for trigger in triggers:
+            for listener in self._listeners:
+                try:
+                    listener(trigger)
+                except Exception as e:
+                    logger.error(f"Alert listener failed: {e}")
+
+        if triggers:
+            logger.info(f"Alert sweep over {len(tickers)} tickers triggered {len(triggers)} rules")
+        return triggers
+
+    def _in_trading_hours(self, now: datetime) -> bool:
+        open_t, close_t = (datetime.strptime(t, "%H:%M").time() for t in self.trading_hours)
+        return now.weekday() < 5 and open_t <= now.time() <= close_t
+
+    def start_background_job(self) -> None:
+        """Start the sweep thread."""
+        if self._task is None:
+            self._stop_event.clear()
+            self._task = threading.Thread(target=self._background_loop, daemon=True)
+            self._task.start()
+            logger.info("Started alert monitor")
+
+    def stop_background_job(self) -> None:
+        self._stop_event.set()
+        self._task = None
+
+    def _background_loop(self) -> None:
+        while not self._stop_event.wait(self.interval_minutes * 60):
+            if not self._in_trading_hours(datetime.now()):
+                continue
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Alert sweep failed: {e}")
+
+
+# Global alert monitor instance
+_alert_monitor_instance: Optional[AlertMonitor] = None
+_alert_monitor_lock = threading.Lock()
+
+
+def get_alert_monitor() -> Optional[AlertMonitor]:
+    """Get global alert monitor instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.alert_monitor is not None:
+        return deps.alert_monitor
+
+    global _alert_monitor_instance
+    if _alert_monitor_instance is None:
+        with _alert_monitor_lock:
+            if _alert_monitor_instance is None:
+                try:
+                    monitor = AlertMonitor(AlertRuleStore())
+                    # Watch rules registered through the fallback must still be swept
+                    monitor.start_background_job()
+                    _alert_monitor_instance = monitor
+                except Exception as e:
+                    logger.error(f"Failed to create alert monitor instance: {e}")
+                    _alert_monitor_instance = None
+    return _alert_monitor_instance
+
+
+def set_alert_monitor_instance(monitor: AlertMonitor) -> None:
+    """Set global alert monitor instance (for testing)."""
+    global _alert_monitor_instance
+    _alert_monitor_instance = monitor
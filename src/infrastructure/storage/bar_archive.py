@@ -0,0 +1,313 @@
+"""
+Durable local archive of daily OHLCV bars.
+
+Bars are partitioned as ``{root}/{interval}/{TICKER}/{year}`` files and read
+through memory mapping, so range scans slice the mapped columns without
+copying the partition.
+Features:
+- Arrow IPC partitions when pyarrow is installed, NumPy ``.npy`` otherwise
+- Per-ticker coverage ledger so only missing date ranges hit the network;
+  only ranges the vendor returned bars for (or past weekends) count as covered
+- Only completed sessions are persisted; today's bar is always refetched
+- Atomic partition rewrites safe for concurrent readers
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.storage.paths import data_path, replace_atomically
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_INTERVALS = ("1d",)
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+_BAR_DTYPE = np.dtype([("date", "M8[D]")] + [(name, "f8") for name in BAR_COLUMNS])
+
+Columns = Dict[str, np.ndarray]
+DateRange = Tuple[str, str]
+
+
+def _to_day(value: str) -> date:
+    return datetime.strptime(value[:10], "%Y-%m-%d").date()
+
+
+def _only_weekends(start: date, end: date) -> bool:
+    """True when [start, end] holds no weekday (an empty range counts)."""
+    return np.busday_count(start, end + timedelta(days=1)) == 0 if start <= end else True
+
+
+class _NpyPartitionFormat:
+    suffix = ".npy"
+
+    def read(self, path: str) -> Columns:
+        records = np.load(path, mmap_mode="r", allow_pickle=False)
+        return {name: records[name] for name in _BAR_DTYPE.names}
+
+    def write(self, path: str, columns: Columns) -> None:
+        records = np.empty(len(columns["date"]), dtype=_BAR_DTYPE)
+        for name in _BAR_DTYPE.names:
+            records[name] = columns[name]
+        with open(path, "wb") as f:
+            np.save(f, records, allow_pickle=False)
+
+
+class _ArrowPartitionFormat:
+    suffix = ".arrow"
+
+    def __init__(self):
+        import pyarrow as pa
+        self.pa = pa
+
+    def read(self, path: str) -> Columns:
+        pa = self.pa
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        columns = {name: table.column(name).to_numpy() for name in _BAR_DTYPE.names}
+        if columns["date"].dtype == object:
+            columns["date"] = columns["date"].astype("M8[D]")
+        return columns
+
+    def write(self, path: str, columns: Columns) -> None:
+        pa = self.pa
+        table = pa.table({
+            "date": pa.array(columns["date"].astype("M8[D]"), type=pa.date32()),
+            **{name: pa.array(np.asarray(columns[name], dtype=np.float64)) for name in BAR_COLUMNS},
+        })
+        # Uncompressed IPC so reads can map the buffers directly
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def _default_format():
+    try:
+        return _ArrowPartitionFormat()
+    except ImportError:
+        logger.info("pyarrow not available, bar archive using NumPy partitions")
+        return _NpyPartitionFormat()
+
+
+class BarArchive:
+    """Partitioned on-disk bar archive with a coverage ledger per ticker."""
+
+    def __init__(self, root: Optional[str] = None, partition_format=None):
+        """
+        Initialize bar archive.
+
+        Args:
+            root: Archive directory (defaults to $BAR_ARCHIVE_DIR or bar_archive in the data directory)
+            partition_format: Partition reader/writer (defaults to Arrow IPC, else .npy)
+        """
+        self.root = root or data_path("bar_archive", "BAR_ARCHIVE_DIR")
+        self.format = partition_format or _default_format()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Paths and coverage
+    # ------------------------------------------------------------------
+    def _ticker_dir(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, ticker.upper())
+
+    def _partition_path(self, ticker: str, interval: str, year: int) -> str:
+        return os.path.join(self._ticker_dir(ticker, interval), f"{year}{self.format.suffix}")
+
+    def _coverage_path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self._ticker_dir(ticker, interval), "coverage.json")
+
+    def coverage(self, ticker: str, interval: str = "1d") -> List[DateRange]:
+        """Merged, sorted date ranges already archived for a ticker."""
+        path = self._coverage_path(ticker, interval)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, "r") as f:
+                return [tuple(r) for r in json.load(f)]
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Ignoring unreadable bar archive coverage {path}: {e}")
+            return []
+
+    def _save_coverage(self, ticker: str, interval: str, ranges: List[DateRange]) -> None:
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, "w") as f:
+                json.dump([list(r) for r in ranges], f)
+
+        replace_atomically(self._coverage_path(ticker, interval), write)
+
+    @staticmethod
+    def _merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+        merged: List[List[date]] = []
+        for start, end in sorted((_to_day(s), _to_day(e)) for s, e in ranges):
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return [(s.isoformat(), e.isoformat()) for s, e in merged]
+
+    def missing_ranges(self, ticker: str, start: str, end: str, interval: str = "1d") -> List[DateRange]:
+        """Sub-ranges of [start, end] not yet covered by the archive."""
+        gaps = []
+        cursor, stop = _to_day(start), _to_day(end)
+        for covered_start, covered_end in self.coverage(ticker, interval):
+            c_start, c_end = _to_day(covered_start), _to_day(covered_end)
+            if c_end < cursor:
+                continue
+            if c_start > stop:
+                break
+            if c_start > cursor:
+                gaps.append((cursor.isoformat(), (c_start - timedelta(days=1)).isoformat()))
+            cursor = max(cursor, c_end + timedelta(days=1))
+            if cursor > stop:
+                break
+        if cursor <= stop:
+            gaps.append((cursor.isoformat(), stop.isoformat()))
+        return gaps
+
+    # ------------------------------------------------------------------
+    # Read / append
+    # ------------------------------------------------------------------
+    def _read_partition(self, ticker: str, interval: str, year: int) -> Optional[Columns]:
+        path = self._partition_path(ticker, interval, year)
+        if not os.path.exists(path):
+            return None
+        try:
+            return self.format.read(path)
+        except Exception as e:
+            logger.warning(f"Failed to read bar partition {path}: {e}")
+            return None
+
+    def read(self, ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+        """Archived bars in [start, end] as a DataFrame (date, open, high, low, close, volume)."""
+        lo, hi = np.datetime64(start[:10], "D"), np.datetime64(end[:10], "D")
+        pieces = []
+        for year in range(_to_day(start).year, _to_day(end).year + 1):
+            columns = self._read_partition(ticker, interval, year)
+            if columns is None:
+                continue
+            dates = columns["date"]
+            i, j = np.searchsorted(dates, lo, side="left"), np.searchsorted(dates, hi, side="right")
+            if j > i:
+                pieces.append({name: values[i:j] for name, values in columns.items()})
+
+        if not pieces:
+            return pd.DataFrame(columns=["date", *BAR_COLUMNS])
+
+        frame = pd.DataFrame({
+            name: np.concatenate([piece[name] for piece in pieces]) for name in _BAR_DTYPE.names
+        })
+        frame["date"] = pd.to_datetime(frame["date"]).dt.strftime("%Y-%m-%d")
+        frame["volume"] = frame["volume"].astype(np.int64)
+        return frame
+
+    def append(
+        self,
+        ticker: str,
+        bars: pd.DataFrame,
+        start: str,
+        end: str,
+        interval: str = "1d",
+        complete_through: Optional[str] = None
+    ) -> int:
+        """
+        Merge fetched bars into the archive and record the range they cover.
+
+        Bars after ``complete_through`` (default: yesterday) are not persisted and
+        the recorded coverage is clipped to it, so unfinished sessions are refetched.
+        Coverage runs from ``start`` to the last returned bar, extended over
+        trailing weekends; days with no bar before that are holidays or pre-listing.
+        An empty response only covers a range made up of weekends, so a vendor
+        outage or lagging publication is retried on the next fetch.
+
+        Returns:
+            Number of bars written
+        """
+        if interval not in ARCHIVED_INTERVALS:
+            return 0
+        cutoff = complete_through or (date.today() - timedelta(days=1)).isoformat()
+        end = min(end[:10], cutoff)
+        if start[:10] > end:
+            return 0
+
+        frame = bars if bars is not None else pd.DataFrame()
+        if not frame.empty:
+            frame = frame[(frame["date"] >= start[:10]) & (frame["date"] <= end)]
+
+        written = 0
+        with self._lock:
+            try:
+                os.makedirs(self._ticker_dir(ticker, interval), exist_ok=True)
+                if not frame.empty:
+                    dates = frame["date"].to_numpy().astype("M8[D]")
+                    years = dates.astype("M8[Y]").astype(int) + 1970
+                    for year in np.unique(years).tolist():
+                        mask = years == year
+                        new = {"date": dates[mask], **{name: frame[name].to_numpy(dtype=np.float64)[mask] for name in BAR_COLUMNS}}
+                        self._merge_partition(ticker, interval, year, new)
+                        written += int(mask.sum())
+
+                # Coverage is recorded last, so a failed write leaves the range to be refetched
+                covered_end = self._covered_end(start[:10], end, None if frame.empty else frame["date"].max()[:10])
+                if covered_end is not None:
+                    ranges = self.coverage(ticker, interval) + [(start[:10], covered_end)]
+                    self._save_coverage(ticker, interval, self._merge_ranges(ranges))
+            except OSError as e:
+                logger.warning(f"Failed to archive bars for {ticker}: {e}")
+        return written
+
+    @staticmethod
+    def _covered_end(start: str, end: str, last_bar: Optional[str]) -> Optional[str]:
+        """Last day of [start, end] known to be settled, or None when nothing is."""
+        after = _to_day(last_bar) + timedelta(days=1) if last_bar else _to_day(start)
+        if _only_weekends(after, _to_day(end)):
+            return end
+        return last_bar
+
+    def _merge_partition(self, ticker: str, interval: str, year: int, new: Columns) -> None:
+        existing = self._read_partition(ticker, interval, year)
+        if existing is not None:
+            # New bars win on duplicate dates
+            keep = ~np.isin(existing["date"], new["date"])
+            merged = {name: np.concatenate([np.asarray(existing[name])[keep], new[name]]) for name in new}
+        else:
+            merged = new
+        order = np.argsort(merged["date"], kind="stable")
+        merged = {name: values[order] for name, values in merged.items()}
+
+        path = self._partition_path(ticker, interval, year)
+        replace_atomically(path, lambda tmp_path: self.format.write(tmp_path, merged))
+
+
+# Global bar archive instance
+_bar_archive_instance: Optional[BarArchive] = None
+_bar_archive_lock = threading.Lock()
+
+
+def get_bar_archive() -> Optional[BarArchive]:
+    """Get global bar archive instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.bar_archive is not None:
+        return deps.bar_archive
+
+    global _bar_archive_instance
+    if _bar_archive_instance is None:
+        with _bar_archive_lock:
+            if _bar_archive_instance is None:
+                try:
+                    _bar_archive_instance = BarArchive()
+                except Exception as e:
+                    logger.error(f"Failed to create bar archive instance: {e}")
+                    _bar_archive_instance = None
+    return _bar_archive_instance
+
+
+def set_bar_archive_instance(archive: BarArchive) -> None:
+    """Set global bar archive instance (for testing)."""
+    global _bar_archive_instance
+    _bar_archive_instance = archive
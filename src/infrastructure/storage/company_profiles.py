@@ -0,0 +1,275 @@
+"""
+Local store of company profiles, one record per ticker.
+
+The overview and each detail section (shareholders, executives,
+subsidiaries) are downloaded at most once per ticker and TTL, kept as
+plain JSON records with empty values dropped, and projected per request.
+Sections are loaded lazily: a shareholders question does not download
+the officers list, and a later executives question adds it to the same
+record.
+Features:
+- One vendor call per (ticker, section) and TTL, shared by every service
+- Per-ticker locking so concurrent readers wait for one download
+- Records persisted as one JSON file per ticker
+- Changed records written behind to long-term memory on a background worker,
+  which also seeds cold starts
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from infrastructure.storage.paths import data_path, replace_atomically
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SECTIONS = ("overview", "shareholders", "executives", "subsidiaries")
+
+# Section -> vendor Company method
+_SECTION_METHODS = {
+    "overview": "overview",
+    "shareholders": "shareholders",
+    "executives": "officers",
+    "subsidiaries": "subsidiaries",
+}
+
+_SECTOR_FIELDS = ("sector", "industry", "icb_name3", "icb_name2", "icb_name4", "en_icb_name3", "en_icb_name2")
+
+_SECTION_TTL_DAYS = 7
+
+SectionFetcher = Callable[[str, str], Any]
+
+
+def _plain(value: Any) -> Any:
+    # numpy/pandas scalars -> JSON-friendly Python values; None for missing
+    if value is None:
+        return None
+    if hasattr(value, "item") and not isinstance(value, (list, dict, str)):
+        try:
+            value = value.item()
+        except (ValueError, AttributeError):
+            pass
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool, list, dict)):
+        return value
+    return str(value)
+
+
+def compact_records(frame: Any) -> List[Dict[str, Any]]:
+    """Vendor frame as a list of records without empty fields."""
+    if frame is None or getattr(frame, "empty", True):
+        return []
+    records = []
+    for record in frame.to_dict("records"):
+        row = {}
+        for key, value in record.items():
+            value = _plain(value)
+            if value is not None and value != "":
+                row[str(key).strip().lower()] = value
+        if row:
+            records.append(row)
+    return records
+
+
+def fetch_vnstock_section(ticker: str, section: str) -> List[Dict[str, Any]]:
+    """One profile section from the vendor Company API."""
+    from infrastructure.api_clients.vn_stock_client import VNStockClient
+
+    company = VNStockClient(ticker=ticker).company
+    return compact_records(getattr(company, _SECTION_METHODS[section])())
+
+
+class CompanyProfileStore:
+    """Per-ticker company profiles with lazily loaded sections."""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        fetch_section: Optional[SectionFetcher] = None,
+        ttl_days: float = _SECTION_TTL_DAYS
+    ):
+        """
+        Initialize company profile store.
+
+        Args:
+            root: Storage directory (defaults to $COMPANY_PROFILES_DIR or company_profiles in the data directory)
+            fetch_section: (ticker, section) -> records (defaults to vnstock)
+            ttl_days: Age after which a section is downloaded again
+        """
+        self.root = root or data_path("company_profiles", "COMPANY_PROFILES_DIR")
+        self.fetch_section = fetch_section or fetch_vnstock_section
+        self.ttl_seconds = ttl_days * 86400
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        # One worker keeps long-term memory writes off the request path, in order
+        self._memory_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="company-profile-memory")
+        self._memory_pending: set = set()
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker}.json")
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _load(self, ticker: str) -> Dict[str, Any]:
+        # Memory, then disk, then long-term memory; an empty record if none has it
+        record = self._records.get(ticker)
+        if record is not None:
+            return record
+
+        path = self._path(ticker)
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    record = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning(f"Ignoring unreadable company profile {path}: {e}")
+
+        if record is None:
+            memory = _long_term_memory()
+            stored = memory.get_company_profile(ticker) if memory is not None else None
+            if stored is not None and isinstance(stored.profile.get("sections"), dict):
+                record = stored.profile
+
+        record = record or {"ticker": ticker, "sections": {}, "fetched_at": {}}
+        self._records[ticker] = record
+        return record
+
+    def _save(self, record: Dict[str, Any]) -> None:
+        path = self._path(record["ticker"])
+
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, "w") as f:
+                json.dump(record, f, ensure_ascii=False)
+
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            replace_atomically(path, write)
+        except OSError as e:
+            logger.warning(f"Failed to store company profile for {record['ticker']}: {e}")
+
+    def get(self, ticker: str, sections: Iterable[str] = ("overview",), refresh: bool = False) -> Dict[str, Any]:
+        """
+        Requested profile sections, downloading only those missing or expired.
+
+        Args:
+            ticker: Stock symbol
+            sections: Subset of PROFILE_SECTIONS
+            refresh: Force a download of the requested sections
+
+        Returns:
+            {section: data}; the overview is a dict, other sections are lists of records.
+            Sections that could not be loaded are omitted.
+        """
+        ticker = ticker.upper()
+        sections = [s for s in dict.fromkeys(sections) if s in _SECTION_METHODS]
+
+        with self._ticker_lock(ticker):
+            record = self._load(ticker)
+            now = time.time()
+            fetched = changed = False
+            for section in sections:
+                age = now - record["fetched_at"].get(section, -math.inf)
+                if not refresh and section in record["sections"] and age <= self.ttl_seconds:
+                    continue
+                try:
+                    records = self.fetch_section(ticker, section)
+                except Exception as e:
+                    logger.warning(f"Failed to fetch {section} for {ticker}: {e}")
+                    continue
+                data = (records[0] if records else {}) if section == "overview" else records
+                changed = changed or record["sections"].get(section) != data
+                record["sections"][section] = data
+                record["fetched_at"][section] = now
+                fetched = True
+            if fetched:
+                self._save(record)
+            result = {s: record["sections"][s] for s in sections if s in record["sections"]}
+
+        # A refetch that returned the same data only refreshes the local fetch times
+        if changed:
+            self._queue_memory_write(ticker)
+        return result
+
+    def _queue_memory_write(self, ticker: str) -> None:
+        with self._lock:
+            # A queued write reads the record when it runs, so one per ticker is enough
+            if ticker in self._memory_pending:
+                return
+            self._memory_pending.add(ticker)
+        self._memory_writer.submit(self._write_memory, ticker)
+
+    def _write_memory(self, ticker: str) -> None:
+        with self._lock:
+            self._memory_pending.discard(ticker)
+        memory = _long_term_memory()
+        if memory is None:
+            return
+        with self._ticker_lock(ticker):
+            record = json.loads(json.dumps(self._records[ticker]))
+        try:
+            memory.store_company_profile(ticker, record, source="company_profile_store")
+        except Exception as e:
+            logger.warning(f"Failed to store company profile for {ticker} in long-term memory: {e}")
+
+    def flush(self) -> None:
+        """Wait until queued long-term memory writes have run."""
+        self._memory_writer.submit(lambda: None).result()
+
+    def close(self) -> None:
+        """Finish queued long-term memory writes and stop the writer."""
+        self._memory_writer.shutdown(wait=True)
+
+    def overview(self, ticker: str) -> Dict[str, Any]:
+        return self.get(ticker, ("overview",)).get("overview", {})
+
+    def sector(self, ticker: str) -> Optional[str]:
+        """Sector label from the overview, or None."""
+        overview = self.overview(ticker)
+        return next((overview[f] for f in _SECTOR_FIELDS if overview.get(f)), None)
+
+
+def _long_term_memory() -> Optional[Any]:
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    return deps.long_term_memory if deps is not None else None
+
+
+# Global company profile store instance
+_company_profile_store_instance: Optional[CompanyProfileStore] = None
+_company_profile_store_lock = threading.Lock()
+
+
+def get_company_profile_store() -> Optional[CompanyProfileStore]:
+    """Get global company profile store instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.company_profile_store is not None:
+        return deps.company_profile_store
+
+    global _company_profile_store_instance
+    if _company_profile_store_instance is None:
+        with _company_profile_store_lock:
+            if _company_profile_store_instance is None:
+                try:
+                    _company_profile_store_instance = CompanyProfileStore()
+                except Exception as e:
+                    logger.error(f"Failed to create company profile store instance: {e}")
+                    _company_profile_store_instance = None
+    return _company_profile_store_instance
+
+
+def set_company_profile_store_instance(store: CompanyProfileStore) -> None:
+    """Set global company profile store instance (for testing)."""
+    global _company_profile_store_instance
+    _company_profile_store_instance = store
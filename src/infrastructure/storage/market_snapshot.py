@@ -0,0 +1,428 @@
+"""
+Precomputed market snapshot tables.
+
+One compact columnar table per trading day (or intraday label) covering the
+ticker universe: last bar OHLCV, returns over standard horizons, average
+volume and volatility.
+Features:
+- Vectorized build over right-aligned (tickers x bars) matrices
+- Stored as a structured ``.npy`` record array plus a JSON sidecar
+- Memory-mapped reads with an O(1) ticker -> row index
+- Scheduled end-of-day (and optional intraday) rebuild job, fetching under the
+  shared vendor rate budget
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.storage.paths import data_path, replace_atomically
+
+logger = logging.getLogger(__name__)
+
+# Horizon name -> number of trading bars back
+SNAPSHOT_HORIZONS: Dict[str, int] = {"1d": 1, "1w": 5, "1m": 21, "3m": 63, "6m": 126, "1y": 252}
+VOLATILITY_WINDOW = 20
+TRADING_DAYS_PER_YEAR = 252
+
+# Timeframe spellings used by the extractors -> snapshot horizon
+_TIMEFRAME_ALIASES = {"1d": "1d", "1w": "1w", "1m": "1m", "1M": "1m", "3m": "3m", "3M": "3m",
+                      "6m": "6m", "6M": "6m", "1y": "1y", "1Y": "1y"}
+
+_BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+SNAPSHOT_DTYPE = np.dtype(
+    [("ticker", "U12")]
+    + [(name, "f8") for name in _BAR_FIELDS]
+    + [(f"ret_{h}", "f8") for h in SNAPSHOT_HORIZONS]
+    + [(f"avg_volume_{h}", "f8") for h in SNAPSHOT_HORIZONS]
+    + [(f"volatility_{VOLATILITY_WINDOW}", "f8"), ("bars", "i4")]
+)
+
+
+def snapshot_horizon(timeframe: str) -> Optional[str]:
+    """Map a query timeframe ("1w", "1M", ...) to a snapshot horizon, if one exists."""
+    return _TIMEFRAME_ALIASES.get(timeframe)
+
+
+def build_snapshot_table(bars: Dict[str, pd.DataFrame]) -> np.ndarray:
+    """
+    Build a snapshot record array from per-ticker daily bars.
+
+    Args:
+        bars: {ticker: DataFrame with open/high/low/close/volume, oldest first}
+
+    Returns:
+        Structured array with SNAPSHOT_DTYPE, one row per ticker with data
+    """
+    frames = [(ticker, frame) for ticker, frame in bars.items() if frame is not None and not frame.empty]
+    table = np.zeros(len(frames), dtype=SNAPSHOT_DTYPE)
+    if not frames:
+        return table
+
+    width = max(SNAPSHOT_HORIZONS.values()) + 1
+    n = len(frames)
+    closes = np.full((n, width), np.nan)
+    volumes = np.full((n, width), np.nan)
+
+    for i, (ticker, frame) in enumerate(frames):
+        tail = frame.tail(width)
+        k = len(tail)
+        closes[i, width - k:] = tail["close"].to_numpy(dtype=np.float64)
+        volumes[i, width - k:] = tail["volume"].to_numpy(dtype=np.float64) if "volume" in tail else np.nan
+        table["ticker"][i] = ticker
+        table["bars"][i] = len(frame)
+        last = tail.iloc[-1]
+        for name in _BAR_FIELDS:
+            table[name][i] = float(last[name]) if name in tail else np.nan
+
+    last_close = closes[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name, h in SNAPSHOT_HORIZONS.items():
+            table[f"ret_{name}"] = last_close / closes[:, -1 - h] - 1.0
+            window = volumes[:, -1 - h:]
+            counts = np.sum(~np.isnan(window), axis=1)
+            table[f"avg_volume_{name}"] = np.where(counts > 0, np.nansum(window, axis=1) / np.maximum(counts, 1), np.nan)
+
+        recent = closes[:, -1 - VOLATILITY_WINDOW:]
+        returns = recent[:, 1:] / recent[:, :-1] - 1.0
+        valid = np.sum(~np.isnan(returns), axis=1)
+        means = np.nansum(returns, axis=1) / np.maximum(valid, 1)
+        deviations = np.where(np.isnan(returns), 0.0, returns - means[:, None])
+        std = np.sqrt(np.sum(deviations * deviations, axis=1) / np.maximum(valid, 1))
+        table[f"volatility_{VOLATILITY_WINDOW}"] = np.where(valid >= 2, std * np.sqrt(TRADING_DAYS_PER_YEAR) * 100, np.nan)
+
+    return table
+
+
+class MarketSnapshot:
+    """A loaded (typically memory-mapped) snapshot table."""
+
+    def __init__(self, label: str, table: np.ndarray, built_at: float):
+        self.label = label
+        self.table = table
+        self.built_at = built_at
+        self._rows = {str(ticker): i for i, ticker in enumerate(table["ticker"])}
+
+    @property
+    def as_of(self) -> str:
+        return self.label[:10]
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def tickers(self) -> List[str]:
+        return list(self._rows)
+
+    def get(self, ticker: str, column: str) -> Optional[float]:
+        """Single value for a ticker, or None if missing/NaN."""
+        i = self._rows.get(ticker)
+        if i is None:
+            return None
+        value = float(self.table[column][i])
+        return None if np.isnan(value) else value
+
+    def row(self, ticker: str) -> Optional[Dict[str, Any]]:
+        i = self._rows.get(ticker)
+        if i is None:
+            return None
+        record = self.table[i]
+        return {name: (str(record[name]) if name == "ticker" else record[name].item()) for name in SNAPSHOT_DTYPE.names}
+
+    def column(self, name: str, tickers: List[str]) -> Dict[str, float]:
+        """Vectorized gather of one column for the given tickers (missing/NaN skipped)."""
+        present = [t for t in tickers if t in self._rows]
+        if not present:
+            return {}
+        values = self.table[name][np.fromiter((self._rows[t] for t in present), dtype=np.intp, count=len(present))]
+        return {t: float(v) for t, v in zip(present, values.tolist()) if not np.isnan(v)}
+
+    def is_fresh(self, max_age_hours: float) -> bool:
+        return time.time() - self.built_at <= max_age_hours * 3600
+
+
+class MarketSnapshotStore:
+    """Directory of snapshot tables, one ``.npy`` + ``.json`` pair per label."""
+
+    _LABEL_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(T\d{4})?$")
+
+    def __init__(self, root: Optional[str] = None, max_snapshots: int = 10):
+        """
+        Initialize snapshot store.
+
+        Args:
+            root: Directory for snapshot files (defaults to $MARKET_SNAPSHOT_DIR or market_snapshots in the data directory)
+            max_snapshots: Number of most recent snapshots kept on disk
+        """
+        self.root = root or data_path("market_snapshots", "MARKET_SNAPSHOT_DIR")
+        self.max_snapshots = max_snapshots
+        self._loaded: Dict[str, MarketSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, label: str):
+        base = os.path.join(self.root, label)
+        return f"{base}.npy", f"{base}.json"
+
+    def labels(self) -> List[str]:
+        """Snapshot labels oldest first; an end-of-day label sorts after that day's intraday ones."""
+        if not os.path.isdir(self.root):
+            return []
+        labels = {name[:-4] for name in os.listdir(self.root) if name.endswith(".npy")}
+        return sorted((label for label in labels if self._LABEL_RE.match(label)),
+                      key=lambda label: label if "T" in label else f"{label}T2400")
+
+    def write(self, label: str, table: np.ndarray) -> MarketSnapshot:
+        """Persist a snapshot table atomically and prune old snapshots."""
+        if not self._LABEL_RE.match(label):
+            raise ValueError(f"Invalid snapshot label: {label}")
+        os.makedirs(self.root, exist_ok=True)
+        npy_path, meta_path = self._paths(label)
+        built_at = time.time()
+
+        def write_table(tmp_path: str) -> None:
+            with open(tmp_path, "wb") as f:
+                np.save(f, table, allow_pickle=False)
+
+        def write_meta(tmp_path: str) -> None:
+            with open(tmp_path, "w") as f:
+                json.dump({"label": label, "built_at": built_at, "rows": int(len(table)),
+                           "horizons": SNAPSHOT_HORIZONS}, f)
+
+        replace_atomically(npy_path, write_table)
+        replace_atomically(meta_path, write_meta)
+
+        with self._lock:
+            self._loaded.pop(label, None)
+        self._prune()
+        logger.info(f"Wrote market snapshot {label} with {len(table)} tickers")
+        return self.load(label)
+
+    def load(self, label: str) -> Optional[MarketSnapshot]:
+        """Load a snapshot memory-mapped; results are kept per label."""
+        with self._lock:
+            if label in self._loaded:
+                return self._loaded[label]
+
+        npy_path, meta_path = self._paths(label)
+        if not os.path.exists(npy_path):
+            return None
+        try:
+            table = np.load(npy_path, mmap_mode="r", allow_pickle=False)
+            built_at = os.path.getmtime(npy_path)
+            if os.path.exists(meta_path):
+                with open(meta_path, "r") as f:
+                    built_at = json.load(f).get("built_at", built_at)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load market snapshot {label}: {e}")
+            return None
+
+        snapshot = MarketSnapshot(label, table, built_at)
+        with self._lock:
+            self._loaded[label] = snapshot
+        return snapshot
+
+    def latest(self, on_or_before: Optional[str] = None) -> Optional[MarketSnapshot]:
+        """Most recent snapshot, optionally not later than a date (YYYY-MM-DD)."""
+        for label in reversed(self.labels()):
+            if on_or_before is None or label[:10] <= on_or_before:
+                return self.load(label)
+        return None
+
+    def _prune(self) -> None:
+        for label in self.labels()[:-self.max_snapshots]:
+            with self._lock:
+                self._loaded.pop(label, None)
+            for path in self._paths(label):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def _fetch_daily_bars(ticker: str, start: str, end: str) -> pd.DataFrame:
+    from infrastructure.api_clients.vn_stock_client import VNStockClient
+    return VNStockClient(ticker=ticker).fetch_trading_data(start=start, end=end, interval="1d")
+
+
+def _acquire_vendor_slot() -> bool:
+    from infrastructure.api_clients.vendor_limit import acquire_vendor_slot
+    return acquire_vendor_slot()
+
+
+class MarketSnapshotJob:
+    """Builds snapshots for the ticker universe on a schedule."""
+
+    def __init__(
+        self,
+        store: MarketSnapshotStore,
+        universe: Optional[Callable[[], List[str]]] = None,
+        fetch_bars: Optional[Callable[[str, str, str], pd.DataFrame]] = None,
+        max_workers: int = 4,
+        close_time: str = "15:15",
+        intraday_interval_minutes: Optional[int] = None,
+        trading_hours: tuple = ("09:00", "15:00"),
+        rate_limit: Optional[Callable[[], bool]] = None,
+        startup_delay_seconds: float = 600
+    ):
+        """
+        Initialize snapshot job.
+
+        Args:
+            store: Destination snapshot store
+            universe: Callable returning tickers to snapshot (defaults to the sector index)
+            fetch_bars: Callable(ticker, start, end) returning daily bars
+            max_workers: Concurrent bar fetches
+            close_time: Local time (HH:MM) after which the end-of-day snapshot is built
+            intraday_interval_minutes: Also build intraday snapshots at this interval during trading hours
+            trading_hours: (open, close) local times bounding intraday snapshots
+            rate_limit: Blocks until a vendor request may be made (defaults to the shared vendor budget)
+            startup_delay_seconds: Wait before the catch-up build of a missing snapshot
+        """
+        self.store = store
+        self.universe = universe or self._default_universe
+        self.fetch_bars = fetch_bars or _fetch_daily_bars
+        self.max_workers = max_workers
+        self.close_time = close_time
+        self.intraday_interval_minutes = intraday_interval_minutes
+        self.trading_hours = trading_hours
+        self.rate_limit = rate_limit or _acquire_vendor_slot
+        self.startup_delay_seconds = startup_delay_seconds
+        self._task: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _default_universe() -> List[str]:
+        from infrastructure.storage.sector_index import get_sector_index
+        index = get_sector_index()
+        return index.tickers() if index else []
+
+    def run(self, as_of: Optional[datetime] = None, label: Optional[str] = None) -> Optional[MarketSnapshot]:
+        """Fetch bars for the universe and write one snapshot."""
+        as_of = as_of or datetime.now()
+        tickers = self.universe()
+        if not tickers:
+            logger.warning("Market snapshot skipped: empty ticker universe")
+            return None
+
+        # ~1.6 calendar days per trading bar covers the longest horizon
+        start = (as_of - timedelta(days=int(max(SNAPSHOT_HORIZONS.values()) * 1.6) + 10)).strftime("%Y-%m-%d")
+        end = as_of.strftime("%Y-%m-%d")
+
+        def fetch(ticker: str) -> Optional[pd.DataFrame]:
+            # A stopped job drains the remaining tickers without fetching
+            if self._stop_event.is_set() or not self.rate_limit():
+                return None
+            try:
+                return self.fetch_bars(ticker, start, end)
+            except Exception as e:
+                logger.debug(f"Snapshot fetch failed for {ticker}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            bars = dict(zip(tickers, pool.map(fetch, tickers)))
+
+        table = build_snapshot_table(bars)
+        if len(table) == 0:
+            logger.warning("Market snapshot skipped: no bars fetched")
+            return None
+
+        last_dates = [frame["date"].iloc[-1] for frame in bars.values()
+                      if frame is not None and not frame.empty and "date" in frame]
+        label = label or (max(last_dates) if last_dates else end)
+        return self.store.write(label, table)
+
+    def _next_run(self, now: datetime) -> datetime:
+        close = datetime.combine(now.date(), datetime.strptime(self.close_time, "%H:%M").time())
+        candidates = [close if now < close else close + timedelta(days=1)]
+        if self.intraday_interval_minutes:
+            open_t, close_t = (datetime.strptime(t, "%H:%M").time() for t in self.trading_hours)
+            step = timedelta(minutes=self.intraday_interval_minutes)
+            nxt = now + step
+            if open_t <= nxt.time() <= close_t:
+                candidates.append(nxt)
+        return min(candidates)
+
+    def start_background_job(self) -> None:
+        """Start the scheduling thread."""
+        if self._task is None:
+            self._stop_event.clear()
+            self._task = threading.Thread(target=self._background_loop, daemon=True)
+            self._task.start()
+            logger.info("Started market snapshot job")
+
+    def stop_background_job(self) -> None:
+        self._stop_event.set()
+        self._task = None
+
+    def _background_loop(self) -> None:
+        # Catch up on a missing snapshot once startup has settled, not during it
+        if self._stop_event.wait(self.startup_delay_seconds):
+            return
+        latest = self.store.latest()
+        if latest is None or not latest.is_fresh(24):
+            self._safe_run(datetime.now())
+
+        while not self._stop_event.is_set():
+            now = datetime.now()
+            run_at = self._next_run(now)
+            if self._stop_event.wait(max((run_at - now).total_seconds(), 1)):
+                break
+            intraday = run_at.strftime("%H:%M") != self.close_time
+            self._safe_run(run_at, label=run_at.strftime("%Y-%m-%dT%H%M") if intraday else None)
+
+    def _safe_run(self, as_of: datetime, label: Optional[str] = None) -> None:
+        try:
+            self.run(as_of, label)
+        except Exception as e:
+            logger.error(f"Market snapshot job failed: {e}")
+
+
+# Global market snapshot store instance
+_market_snapshot_store_instance: Optional[MarketSnapshotStore] = None
+_market_snapshot_store_lock = threading.Lock()
+
+
+def get_market_snapshot_store() -> Optional[MarketSnapshotStore]:
+    """Get global market snapshot store instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.market_snapshot_store is not None:
+        return deps.market_snapshot_store
+
+    global _market_snapshot_store_instance
+    if _market_snapshot_store_instance is None:
+        with _market_snapshot_store_lock:
+            if _market_snapshot_store_instance is None:
+                try:
+                    _market_snapshot_store_instance = MarketSnapshotStore()
+                except Exception as e:
+                    logger.error(f"Failed to create market snapshot store instance: {e}")
+                    _market_snapshot_store_instance = None
+    return _market_snapshot_store_instance
+
+
+def set_market_snapshot_store_instance(store: MarketSnapshotStore) -> None:
+    """Set global market snapshot store instance (for testing)."""
+    global _market_snapshot_store_instance
+    _market_snapshot_store_instance = store
+
+
+def get_current_snapshot(max_age_hours: float = 24, on_or_before: Optional[str] = None) -> Optional[MarketSnapshot]:
+    """Latest snapshot if one exists and was built within ``max_age_hours``."""
+    store = get_market_snapshot_store()
+    if store is None:
+        return None
+    snapshot = store.latest(on_or_before)
+    return snapshot if snapshot is not None and snapshot.is_fresh(max_age_hours) else None
@@ -0,0 +1,55 @@
+"""
+Filesystem locations of the local stores.
+
+Every store keeps its files under one data directory, $DATA_DIR, which
+defaults to ``data`` at the project root, so locations do not depend on
+the process working directory. A store's own path variable (e.g.
+$PORTFOLIO_DB_PATH) still takes precedence.
+
+Stores replace files through ``replace_atomically`` so readers never see a
+partial write and concurrent writers never share a temp file.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+def data_dir() -> str:
+    """Root directory for local store files."""
+    return os.getenv("DATA_DIR") or str(_PROJECT_ROOT / "data")
+
+
+def data_path(name: str, env_var: Optional[str] = None) -> str:
+    """
+    Location of a store file or directory.
+
+    Args:
+        name: File or directory name under the data directory
+        env_var: Store-specific override variable, checked first
+
+    Returns:
+        Absolute path (or the override as given)
+    """
+    override = os.getenv(env_var) if env_var else None
+    return override or os.path.join(data_dir(), name)
+
+
+def replace_atomically(path: str, write: Callable[[str], None]) -> None:
+    """Write through a uniquely named temp file in the same directory, then rename over path."""
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp_path = tmp.name
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,364 @@
+"""
+Embedded portfolio storage using SQLite in WAL mode.
+
+Replaces the whole-file JSON rewrite with per-user tables.
+Features:
+- Per-user holdings and transactions tables
+- Average-cost basis and realized P&L maintained incrementally on each trade
+- O(holdings) performance summaries without replaying transaction history
+- WAL journaling with per-thread connections for concurrent readers
+- One-time import of the legacy ``user_portfolio.json`` file
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from infrastructure.storage.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER = "default"
+
+
+class PortfolioStore:
+    """SQLite-backed portfolio store with incrementally maintained cost basis."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        legacy_json_path: Optional[str] = "user_portfolio.json",
+        busy_timeout_ms: int = 5000
+    ):
+        """
+        Initialize portfolio store.
+
+        Args:
+            db_path: SQLite database path (defaults to $PORTFOLIO_DB_PATH or user_portfolio.db in the data directory)
+            legacy_json_path: JSON portfolio imported into the default user on first open
+            busy_timeout_ms: How long writers wait for a competing write lock
+        """
+        self.db_path = db_path or data_path("user_portfolio.db", "PORTFOLIO_DB_PATH")
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        self._init_database()
+        if legacy_json_path:
+            self._import_legacy_json(legacy_json_path)
+
+        logger.info(f"Initialized PortfolioStore at {self.db_path}")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the write lock up front."""
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _init_database(self) -> None:
+        """Create tables and indexes if missing."""
+        conn = self._get_connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS holdings (
+                user_id TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                cost_basis REAL NOT NULL DEFAULT 0,
+                realized_pnl REAL NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, ticker)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                type TEXT NOT NULL CHECK (type IN ('buy', 'sell', 'adjust')),
+                quantity INTEGER NOT NULL,
+                price REAL,
+                realized_pnl REAL NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_transactions_user_created
+                ON transactions(user_id, created_at);
+
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def _import_legacy_json(self, path: str) -> None:
+        """
+        Import the legacy JSON portfolio once, replaying its transactions.
+
+        The trades, holdings adjustments and the imported flag commit in one
+        transaction, so a failed import leaves nothing behind and is retried whole.
+        """
+        if not os.path.exists(path):
+            return
+
+        conn = self._get_connection()
+        if conn.execute("SELECT 1 FROM store_meta WHERE key = 'legacy_json_imported'").fetchone():
+            return
+
+        try:
+            with open(path, "r") as f:
+                legacy = json.load(f) or {}
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Skipping legacy portfolio import from {path}: {e}")
+            return
+
+        try:
+            with self._transaction() as conn:
+                # Another process may have imported while this one read the file
+                if conn.execute("SELECT 1 FROM store_meta WHERE key = 'legacy_json_imported'").fetchone():
+                    return
+
+                for tx in legacy.get("transactions", []):
+                    self._apply_trade(
+                        conn, tx["ticker"], tx["type"], int(tx["quantity"]), float(tx["price"]),
+                        DEFAULT_USER, tx.get("date") or datetime.now().isoformat()
+                    )
+
+                # Holdings merged without a trade (no price) carry no cost basis
+                current = self.get_holdings(DEFAULT_USER)
+                for ticker, quantity in (legacy.get("holdings") or {}).items():
+                    delta = int(quantity) - current.get(ticker, 0)
+                    if delta:
+                        self._apply_adjustment(conn, ticker, delta, DEFAULT_USER, datetime.now().isoformat())
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('legacy_json_imported', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            logger.info(f"Imported legacy portfolio from {path}")
+        except Exception as e:
+            logger.error(f"Failed to import legacy portfolio from {path}: {e}")
+
+    def _load_position(self, conn: sqlite3.Connection, user_id: str, ticker: str) -> Dict[str, float]:
+        row = conn.execute(
+            "SELECT quantity, cost_basis, realized_pnl FROM holdings WHERE user_id = ? AND ticker = ?",
+            (user_id, ticker)
+        ).fetchone()
+        if row is None:
+            return {"quantity": 0, "cost_basis": 0.0, "realized_pnl": 0.0}
+        return dict(row)
+
+    def _save_position(self, conn: sqlite3.Connection, user_id: str, ticker: str, position: Dict[str, float], now: str) -> None:
+        conn.execute("""
+            INSERT INTO holdings (user_id, ticker, quantity, cost_basis, realized_pnl, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, ticker) DO UPDATE SET
+                quantity = excluded.quantity,
+                cost_basis = excluded.cost_basis,
+                realized_pnl = excluded.realized_pnl,
+                updated_at = excluded.updated_at
+        """, (user_id, ticker, position["quantity"], position["cost_basis"], position["realized_pnl"], now))
+
+    def record_trade(
+        self,
+        ticker: str,
+        trade_type: str,
+        quantity: int,
+        price: float,
+        user_id: str = DEFAULT_USER,
+        created_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Record a buy or sell and update the position's average cost and realized P&L.
+
+        Sells are capped at the quantity held.
+
+        Args:
+            ticker: Stock ticker
+            trade_type: "buy" or "sell"
+            quantity: Number of shares
+            price: Trade price
+            user_id: Portfolio owner
+            created_at: ISO timestamp (defaults to now)
+
+        Returns:
+            Updated position with quantity, cost_basis and realized_pnl
+        """
+        if trade_type not in ("buy", "sell"):
+            raise ValueError(f"Unsupported trade type: {trade_type}")
+        if quantity <= 0:
+            raise ValueError("Trade quantity must be positive")
+
+        now = created_at or datetime.now().isoformat()
+        with self._transaction() as conn:
+            return self._apply_trade(conn, ticker, trade_type, quantity, price, user_id, now)
+
+    def _apply_trade(
+        self,
+        conn: sqlite3.Connection,
+        ticker: str,
+        trade_type: str,
+        quantity: int,
+        price: float,
+        user_id: str,
+        now: str
+    ) -> Dict[str, Any]:
+        position = self._load_position(conn, user_id, ticker)
+        realized = 0.0
+
+        if trade_type == "buy":
+            position["quantity"] += quantity
+            position["cost_basis"] += quantity * price
+        else:
+            quantity = min(quantity, position["quantity"])
+            if quantity > 0:
+                avg_cost = position["cost_basis"] / position["quantity"]
+                realized = quantity * (price - avg_cost)
+                position["quantity"] -= quantity
+                position["cost_basis"] -= quantity * avg_cost
+                position["realized_pnl"] += realized
+                if position["quantity"] == 0:
+                    position["cost_basis"] = 0.0
+
+        if quantity > 0:
+            conn.execute("""
+                INSERT INTO transactions (user_id, ticker, type, quantity, price, realized_pnl, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, ticker, trade_type, quantity, price, realized, now))
+            self._save_position(conn, user_id, ticker, position, now)
+
+        return position
+
+    def adjust_quantity(self, ticker: str, delta: int, user_id: str = DEFAULT_USER) -> Dict[str, Any]:
+        """
+        Change a holding's quantity without a priced trade.
+
+        Used for holdings declared directly (e.g. "I hold 100 VNM"); the cost
+        basis is scaled down on reductions and left unchanged on additions.
+        """
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            return self._apply_adjustment(conn, ticker, delta, user_id, now)
+
+    def _apply_adjustment(self, conn: sqlite3.Connection, ticker: str, delta: int, user_id: str, now: str) -> Dict[str, Any]:
+        position = self._load_position(conn, user_id, ticker)
+        old_quantity = position["quantity"]
+        new_quantity = max(0, old_quantity + delta)
+        if new_quantity < old_quantity and old_quantity > 0:
+            position["cost_basis"] *= new_quantity / old_quantity
+        position["quantity"] = new_quantity
+
+        conn.execute("""
+            INSERT INTO transactions (user_id, ticker, type, quantity, price, realized_pnl, created_at)
+            VALUES (?, ?, 'adjust', ?, NULL, 0, ?)
+        """, (user_id, ticker, new_quantity - old_quantity, now))
+        self._save_position(conn, user_id, ticker, position, now)
+
+        return position
+
+    def get_holdings(self, user_id: str = DEFAULT_USER) -> Dict[str, int]:
+        """Get open positions as {ticker: quantity}."""
+        rows = self._get_connection().execute(
+            "SELECT ticker, quantity FROM holdings WHERE user_id = ? AND quantity > 0 ORDER BY ticker",
+            (user_id,)
+        ).fetchall()
+        return {row["ticker"]: row["quantity"] for row in rows}
+
+    def get_positions(self, user_id: str = DEFAULT_USER) -> List[Dict[str, Any]]:
+        """Get every position row, including closed ones that carry realized P&L."""
+        rows = self._get_connection().execute(
+            "SELECT ticker, quantity, cost_basis, realized_pnl, updated_at FROM holdings WHERE user_id = ? ORDER BY ticker",
+            (user_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_summary(self, user_id: str = DEFAULT_USER) -> Dict[str, float]:
+        """Aggregate cost basis and realized P&L over the user's positions."""
+        row = self._get_connection().execute("""
+            SELECT COALESCE(SUM(cost_basis), 0) AS cost_basis,
+                   COALESCE(SUM(realized_pnl), 0) AS realized_pnl,
+                   COALESCE(SUM(CASE WHEN quantity > 0 THEN 1 ELSE 0 END), 0) AS open_positions
+            FROM holdings WHERE user_id = ?
+        """, (user_id,)).fetchone()
+        return dict(row)
+
+    def get_transactions(self, user_id: str = DEFAULT_USER, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the user's transactions, newest last."""
+        sql = "SELECT ticker, type, quantity, price, realized_pnl, created_at AS date FROM transactions WHERE user_id = ? ORDER BY id"
+        params: List[Any] = [user_id]
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql} DESC LIMIT ?) ORDER BY date"
+            params.append(limit)
+        return [dict(row) for row in self._get_connection().execute(sql, params).fetchall()]
+
+    def clear(self, user_id: str = DEFAULT_USER) -> None:
+        """Delete all holdings and transactions for a user."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM holdings WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM transactions WHERE user_id = ?", (user_id,))
+
+    def close(self) -> None:
+        """Close every connection opened by this store, from any thread."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads that used the store reconnect lazily; their stale handles are replaced
+        self._local = threading.local()
+
+
+# Global portfolio store instance
+_portfolio_store_instance: Optional[PortfolioStore] = None
+_portfolio_store_lock = threading.Lock()
+
+
+def get_portfolio_store() -> Optional[PortfolioStore]:
+    """Get global portfolio store instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.portfolio_store is not None:
+        return deps.portfolio_store
+
+    global _portfolio_store_instance
+    if _portfolio_store_instance is None:
+        with _portfolio_store_lock:
+            if _portfolio_store_instance is None:
+                try:
+                    _portfolio_store_instance = PortfolioStore()
+                except Exception as e:
+                    logger.error(f"Failed to create portfolio store instance: {e}")
+                    _portfolio_store_instance = None
+    return _portfolio_store_instance
+
+
+def set_portfolio_store_instance(store: PortfolioStore) -> None:
+    """Set global portfolio store instance (for testing)."""
+    global _portfolio_store_instance
+    _portfolio_store_instance = store
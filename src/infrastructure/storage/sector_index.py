@@ -0,0 +1,318 @@
+"""
+Sector universe index: sector -> tickers and ticker -> sector.
+
+Replaces per-query downloads and substring scans of the company overview.
+Features:
+- Built once from the vendor listing, persisted as a JSON snapshot
+- Periodic refresh in a background thread
+- Accent-insensitive sector names with English/Vietnamese aliases
+- O(1) lookups for sector members and a ticker's sector
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from infrastructure.storage.paths import data_path, replace_atomically
+
+logger = logging.getLogger(__name__)
+
+# Canonical sector key -> aliases (matched after normalize_sector_name)
+SECTOR_ALIASES: Dict[str, List[str]] = {
+    "banking": ["banking", "banks", "bank", "ngân hàng"],
+    "real_estate": ["real estate", "bất động sản", "bds", "địa ốc"],
+    "securities": ["securities", "financial services", "dịch vụ tài chính", "chứng khoán"],
+    "insurance": ["insurance", "bảo hiểm"],
+    "basic_resources": ["basic resources", "steel", "tài nguyên cơ bản", "thép"],
+    "construction": ["construction & materials", "construction", "xây dựng và vật liệu", "xây dựng", "vật liệu xây dựng"],
+    "oil_gas": ["oil & gas", "oil and gas", "dầu khí"],
+    "utilities": ["utilities", "điện, nước & xăng dầu khí đốt", "tiện ích"],
+    "chemicals": ["chemicals", "hóa chất"],
+    "food_beverage": ["food & beverage", "food and beverage", "thực phẩm và đồ uống", "thực phẩm"],
+    "retail": ["retail", "bán lẻ"],
+    "technology": ["technology", "information technology", "công nghệ thông tin", "công nghệ"],
+    "telecommunications": ["telecommunications", "viễn thông"],
+    "healthcare": ["health care", "healthcare", "y tế", "dược phẩm"],
+    "industrial_goods": ["industrial goods & services", "hàng & dịch vụ công nghiệp"],
+    "personal_goods": ["personal & household goods", "hàng cá nhân & gia dụng"],
+    "automobiles": ["automobiles & parts", "ô tô và phụ tùng"],
+    "travel_leisure": ["travel & leisure", "du lịch và giải trí", "du lịch"],
+    "media": ["media", "truyền thông"],
+}
+
+_TICKER_COLUMNS = ("ticker", "symbol", "company_code")
+# Every present label column is indexed; the first present one names the ticker's sector
+_SECTOR_COLUMNS = ("sector", "industry", "icb_name2", "en_icb_name2", "icb_name3", "en_icb_name3", "icb_name4", "en_icb_name4")
+
+
+def normalize_sector_name(name: str) -> str:
+    """Lowercase, strip Vietnamese diacritics and collapse punctuation/whitespace."""
+    text = unicodedata.normalize("NFD", str(name).lower().replace("đ", "d"))
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    text = text.replace("&", " and ")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+_ALIAS_TO_CANONICAL: Dict[str, str] = {
+    normalize_sector_name(alias): canonical
+    for canonical, aliases in SECTOR_ALIASES.items()
+    for alias in aliases + [canonical.replace("_", " ")]
+}
+
+
+def _canonical_for(label: str) -> Optional[str]:
+    """Map a vendor sector label to a canonical key (exact alias, else longest contained alias)."""
+    normalized = normalize_sector_name(label)
+    if normalized in _ALIAS_TO_CANONICAL:
+        return _ALIAS_TO_CANONICAL[normalized]
+    padded = f" {normalized} "
+    matches = [alias for alias in _ALIAS_TO_CANONICAL if f" {alias} " in padded]
+    return _ALIAS_TO_CANONICAL[max(matches, key=len)] if matches else None
+
+
+def _load_listing_rows() -> List[Dict[str, Any]]:
+    """Load (ticker, sector labels) rows from the vendor industry listing."""
+    try:
+        from vnstock import Listing
+        frame = Listing().symbols_by_industries()
+    except Exception as e:
+        logger.warning(f"Industry listing unavailable, falling back to company overview: {e}")
+        from infrastructure.api_clients.vn_stock_client import VNStockClient
+        frame = VNStockClient(ticker="VNINDEX").company.overview()
+
+    if frame is None or frame.empty:
+        return []
+    return frame.to_dict("records")
+
+
+class SectorIndex:
+    """In-memory sector/ticker index with a persisted snapshot."""
+
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        refresh_interval_hours: float = 24,
+        retry_interval_minutes: float = 15,
+        loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None
+    ):
+        """
+        Initialize sector index.
+
+        Args:
+            snapshot_path: JSON snapshot path (defaults to $SECTOR_INDEX_PATH or sector_index.json in the data directory)
+            refresh_interval_hours: Age after which the index is rebuilt
+            retry_interval_minutes: Wait between failed build attempts
+            loader: Callable returning listing rows (defaults to the vendor industry listing)
+        """
+        self.snapshot_path = snapshot_path or data_path("sector_index.json", "SECTOR_INDEX_PATH")
+        self.refresh_interval_hours = refresh_interval_hours
+        self.retry_interval_minutes = retry_interval_minutes
+        self.loader = loader or _load_listing_rows
+
+        self._lock = threading.Lock()
+        self._sector_tickers: Dict[str, List[str]] = {}
+        self._ticker_sector: Dict[str, str] = {}
+        self._built_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._refresh_task: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self._load_snapshot()
+
+    # ------------------------------------------------------------------
+    # Build / persistence
+    # ------------------------------------------------------------------
+    @staticmethod
+    def build_maps(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Build the sector -> tickers and ticker -> sector maps from listing rows."""
+        sector_tickers: Dict[str, Set[str]] = {}
+        ticker_sector: Dict[str, str] = {}
+
+        for row in rows:
+            ticker = next((row[col] for col in _TICKER_COLUMNS if row.get(col)), None)
+            if not ticker:
+                continue
+            ticker = str(ticker).upper()
+            labels = [str(row[col]) for col in _SECTOR_COLUMNS if isinstance(row.get(col), str) and row[col].strip()]
+            if not labels:
+                continue
+
+            ticker_sector.setdefault(ticker, labels[0])
+            for label in labels:
+                keys = {normalize_sector_name(label), _canonical_for(label)}
+                for key in keys:
+                    if key:
+                        sector_tickers.setdefault(key, set()).add(ticker)
+
+        return {
+            "sector_tickers": {key: sorted(tickers) for key, tickers in sector_tickers.items()},
+            "ticker_sector": ticker_sector,
+        }
+
+    def _load_snapshot(self) -> None:
+        if not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            with self._lock:
+                self._sector_tickers = snapshot["sector_tickers"]
+                self._ticker_sector = snapshot["ticker_sector"]
+                self._built_at = snapshot["built_at"]
+            logger.info(f"Loaded sector index snapshot with {len(self._ticker_sector)} tickers")
+        except (json.JSONDecodeError, IOError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable sector index snapshot {self.snapshot_path}: {e}")
+
+    def _save_snapshot(self, maps: Dict[str, Any], built_at: float) -> None:
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({**maps, "built_at": built_at}, f, ensure_ascii=False)
+
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            replace_atomically(self.snapshot_path, write)
+        except IOError as e:
+            logger.warning(f"Failed to persist sector index snapshot: {e}")
+
+    def refresh(self) -> bool:
+        """Rebuild the index from the loader and persist it. Returns True on success."""
+        self._last_attempt = time.time()
+        try:
+            maps = self.build_maps(self.loader())
+        except Exception as e:
+            logger.error(f"Failed to build sector index: {e}")
+            return False
+
+        if not maps["ticker_sector"]:
+            logger.warning("Sector listing returned no rows; keeping previous index")
+            return False
+
+        built_at = time.time()
+        with self._lock:
+            self._sector_tickers = maps["sector_tickers"]
+            self._ticker_sector = maps["ticker_sector"]
+            self._built_at = built_at
+        self._save_snapshot(maps, built_at)
+        logger.info(f"Built sector index: {len(maps['ticker_sector'])} tickers, {len(maps['sector_tickers'])} sector keys")
+        return True
+
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        return time.time() - self._built_at > self.refresh_interval_hours * 3600
+
+    def _ensure_built(self) -> None:
+        """Build synchronously only when no index exists yet (rate-limited on failure)."""
+        if self._built_at is not None:
+            return
+        if self._last_attempt is not None and time.time() - self._last_attempt < self.retry_interval_minutes * 60:
+            return
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def resolve_sector(self, name: str) -> Optional[str]:
+        """Resolve a user-supplied sector name to an index key."""
+        normalized = normalize_sector_name(name)
+        if not normalized:
+            return None
+        canonical = _ALIAS_TO_CANONICAL.get(normalized)
+        if canonical and canonical in self._sector_tickers:
+            return canonical
+        if normalized in self._sector_tickers:
+            return normalized
+        canonical = _canonical_for(name)
+        return canonical if canonical in self._sector_tickers else None
+
+    def tickers_for_sector(self, name: str) -> List[str]:
+        """Tickers in a sector; accepts English or Vietnamese names, with or without accents."""
+        self._ensure_built()
+        key = self.resolve_sector(name)
+        return list(self._sector_tickers.get(key, [])) if key else []
+
+    def sector_for_ticker(self, ticker: str) -> Optional[str]:
+        """Vendor sector label for a ticker, or None if unknown."""
+        self._ensure_built()
+        return self._ticker_sector.get(ticker.upper())
+
+    def tickers(self) -> List[str]:
+        """Every ticker in the universe."""
+        self._ensure_built()
+        return sorted(self._ticker_sector)
+
+    def sectors(self) -> List[str]:
+        self._ensure_built()
+        return sorted(self._sector_tickers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tickers": len(self._ticker_sector),
+            "sector_keys": len(self._sector_tickers),
+            "built_at": datetime.fromtimestamp(self._built_at).isoformat() if self._built_at else None,
+            "stale": self.is_stale(),
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduled refresh
+    # ------------------------------------------------------------------
+    def start_background_refresh(self) -> None:
+        """Start the periodic refresh thread."""
+        if self._refresh_task is None:
+            self._stop_event.clear()
+            self._refresh_task = threading.Thread(target=self._background_refresh_loop, daemon=True)
+            self._refresh_task.start()
+            logger.info("Started sector index refresh task")
+
+    def stop_background_refresh(self) -> None:
+        self._stop_event.set()
+        self._refresh_task = None
+
+    def _background_refresh_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                if self.is_stale():
+                    ok = self.refresh()
+                    wait = self.refresh_interval_hours * 3600 if ok else self.retry_interval_minutes * 60
+                else:
+                    wait = self._built_at + self.refresh_interval_hours * 3600 - time.time()
+            except Exception as e:
+                logger.error(f"Error in sector index refresh loop: {e}")
+                wait = self.retry_interval_minutes * 60
+            self._stop_event.wait(max(wait, 1))
+
+
+# Global sector index instance
+_sector_index_instance: Optional[SectorIndex] = None
+_sector_index_lock = threading.Lock()
+
+
+def get_sector_index() -> Optional[SectorIndex]:
+    """Get global sector index instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.sector_index is not None:
+        return deps.sector_index
+
+    global _sector_index_instance
+    if _sector_index_instance is None:
+        with _sector_index_lock:
+            if _sector_index_instance is None:
+                try:
+                    _sector_index_instance = SectorIndex()
+                except Exception as e:
+                    logger.error(f"Failed to create sector index instance: {e}")
+                    _sector_index_instance = None
+    return _sector_index_instance
+
+
+def set_sector_index_instance(index: SectorIndex) -> None:
+    """Set global sector index instance (for testing)."""
+    global _sector_index_instance
+    _sector_index_instance = index
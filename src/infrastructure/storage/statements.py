@@ -0,0 +1,347 @@
+"""
+Local store of financial statements, fetched once per reporting period.
+
+Each ticker's income statement, balance sheet and cash flow are reduced to
+a compact table of canonical line items (revenue, net_profit, equity, ...)
+over every reported period and kept as one JSON file per ticker and period
+type. A table is refetched only once the next period's filing is due, so
+ratio queries of any kind reuse the same download.
+Features:
+- Canonical line items mapped from vnstock's statement item ids/labels
+- Period labels ("2024", "2024-Q1") with period-end dates
+- Refetch when a new period should have been published (with a retry delay)
+- In-process memo over the on-disk tables
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.storage.paths import data_path, replace_atomically
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_PERIODS = ("quarter", "year")
+
+# Canonical line item -> normalized vnstock item ids / English labels, in order of preference
+LINE_ITEM_ALIASES: Dict[str, tuple] = {
+    "revenue": ("net_revenue", "net_sales", "revenue", "sales"),
+    "gross_profit": ("gross_profit",),
+    "operating_profit": ("operating_profit", "operating_profit_loss", "net_operating_profit",
+                         "profit_from_business_activities"),
+    "net_profit": ("attributable_to_parent_company", "net_profit_attributable_to_the_parent",
+                   "attribute_to_parent_company", "net_profit_after_tax", "profit_after_tax",
+                   "net_profit_for_the_year", "net_profit"),
+    "total_assets": ("total_assets",),
+    "total_liabilities": ("total_liabilities", "liabilities"),
+    "equity": ("owners_equity", "owner_s_equity", "total_owners_equity", "total_equity", "equity"),
+    "current_assets": ("current_assets", "short_term_assets"),
+    "current_liabilities": ("current_liabilities", "short_term_liabilities"),
+    "cash_and_equivalents": ("cash_and_cash_equivalents", "cash_and_equivalents"),
+    "short_term_investments": ("short_term_investments", "short_term_financial_investments",
+                               "short_term_financial_investment"),
+    "dividends_paid": ("dividends_paid", "dividends_paid_profits_distributed_to_owners",
+                       "dividends_profits_paid_to_owners"),
+    "shares_outstanding": ("outstanding_shares", "shares_outstanding", "number_of_shares"),
+}
+
+LINE_ITEMS = tuple(LINE_ITEM_ALIASES)
+
+# Days after period end by which statements are normally published
+_FILING_LAG_DAYS = {"quarter": 45, "year": 90}
+# A filing that is due but not yet out is retried at most this often
+_RETRY_HOURS = 24
+
+_ENUMERATION = re.compile(r"^\s*(?:[ivxlc]+|\d+(?:\.\d+)*|[a-z])[\.\)]\s+", re.I)
+_YEAR = re.compile(r"(?<!\d)(19|20)\d{2}(?!\d)")
+_QUARTER = re.compile(r"Q\s*([1-4])", re.I)
+
+StatementFetcher = Callable[[str, str], List[pd.DataFrame]]
+
+
+def _normalize(label: Any) -> str:
+    if not isinstance(label, str):
+        return ""
+    label = _ENUMERATION.sub("", label)
+    label = re.sub(r"\(.*?\)", "", label)
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+
+
+def period_end(label: Any) -> Optional[date]:
+    """End date of a period label such as "2024", "2024-Q1" or "Q1/2024"."""
+    year = _YEAR.search(str(label))
+    if year is None:
+        return None
+    quarter = _QUARTER.search(str(label))
+    if quarter is None:
+        return date(int(year.group(0)), 12, 31)
+    return _quarter_end(int(year.group(0)), int(quarter.group(1)))
+
+
+def period_label(label: Any) -> Optional[str]:
+    """Canonical spelling of a period label: "2024" or "2024-Q1"."""
+    year = _YEAR.search(str(label))
+    if year is None:
+        return None
+    quarter = _QUARTER.search(str(label))
+    return f"{year.group(0)}-Q{quarter.group(1)}" if quarter else year.group(0)
+
+
+def _quarter_end(year: int, quarter: int) -> date:
+    next_start = date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)
+    return next_start - timedelta(days=1)
+
+
+def _long_rows(frame: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    # {period label: {normalized item: value}} from either vnstock layout
+    rows: Dict[str, Dict[str, float]] = {}
+    if "item_id" in frame.columns:
+        period_cols = {c: period_label(c) for c in frame.columns if c not in ("item", "item_en", "item_id")}
+        period_cols = {c: label for c, label in period_cols.items() if label}
+        for _, record in frame.iterrows():
+            keys = {_normalize(record.get("item_id")), _normalize(record.get("item_en"))} - {""}
+            for col, label in period_cols.items():
+                value = pd.to_numeric(record[col], errors="coerce")
+                if pd.notna(value):
+                    for key in keys:
+                        rows.setdefault(label, {}).setdefault(key, float(value))
+        return rows
+
+    # Periods as rows (older layout): year/quarter columns, items as columns
+    year_col = next((c for c in ("yearReport", "year") if c in frame.columns), None)
+    quarter_col = next((c for c in ("lengthReport", "quarter") if c in frame.columns), None)
+    for _, record in frame.iterrows():
+        if year_col is None:
+            break
+        quarter = int(record[quarter_col]) if quarter_col and pd.notna(record[quarter_col]) else 5
+        label = f"{int(record[year_col])}-Q{quarter}" if quarter <= 4 else f"{int(record[year_col])}"
+        row = rows.setdefault(label, {})
+        for col, value in record.items():
+            value = pd.to_numeric(value, errors="coerce")
+            if pd.notna(value):
+                row.setdefault(_normalize(col), float(value))
+    return rows
+
+
+def statements_to_items(frames: List[pd.DataFrame]) -> Dict[str, Dict[str, float]]:
+    """Canonical line items per period label, merged across statement frames."""
+    merged: Dict[str, Dict[str, float]] = {}
+    for frame in frames:
+        if frame is None or frame.empty:
+            continue
+        for label, row in _long_rows(frame).items():
+            target = merged.setdefault(label, {})
+            for item, aliases in LINE_ITEM_ALIASES.items():
+                if item in target:
+                    continue
+                value = next((row[alias] for alias in aliases if alias in row), None)
+                if value is not None:
+                    target[item] = value
+    return {label: items for label, items in merged.items() if items}
+
+
+def fetch_vnstock_statements(ticker: str, period: str) -> List[pd.DataFrame]:
+    """Income statement, balance sheet, cash flow and ratio frames from vnstock."""
+    from vnstock import Finance
+    from infrastructure.api_clients.vendor_limit import acquire_vendor_slot
+
+    finance = Finance(source="VCI", symbol=ticker, period=period)
+    frames = []
+    for report in ("income_statement", "balance_sheet", "cash_flow", "ratio"):
+        # Each report is its own vendor request under the shared budget
+        acquire_vendor_slot()
+        try:
+            frames.append(getattr(finance, report)(period=period, lang="en"))
+        except Exception as e:
+            logger.warning(f"Failed to fetch {report} for {ticker}: {e}")
+    return frames
+
+
+class StatementTable:
+    """Canonical line items over the reported periods of one ticker (oldest first)."""
+
+    def __init__(self, ticker: str, period: str, periods: List[str], items: Dict[str, np.ndarray], fetched_at: float):
+        self.ticker = ticker
+        self.period = period
+        self.periods = periods
+        self.items = items
+        self.fetched_at = fetched_at
+        self.end_dates = np.array([period_end(p) for p in periods], dtype="M8[D]")
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    @classmethod
+    def from_period_items(cls, ticker: str, period: str, per_period: Dict[str, Dict[str, float]],
+                          fetched_at: Optional[float] = None) -> "StatementTable":
+        # Quarterly tables keep quarters only, annual tables whole years only
+        labels = [label for label in per_period if ("Q" in label.upper()) == (period == "quarter")]
+        labels.sort(key=period_end)
+        items = {
+            item: np.array([per_period[label].get(item, np.nan) for label in labels], dtype=np.float64)
+            for item in LINE_ITEMS
+        }
+        return cls(ticker, period, labels, items, fetched_at if fetched_at is not None else time.time())
+
+    def next_filing_due(self) -> date:
+        """Date by which the period after the latest one should have been published."""
+        if not self.periods:
+            return date.min
+        last_end = period_end(self.periods[-1])
+        if self.period == "quarter":
+            quarter = last_end.month // 3
+            next_end = _quarter_end(last_end.year + 1, 1) if quarter == 4 else _quarter_end(last_end.year, quarter + 1)
+        else:
+            next_end = date(last_end.year + 1, 12, 31)
+        return next_end + timedelta(days=_FILING_LAG_DAYS[self.period])
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "ticker": self.ticker,
+            "period": self.period,
+            "periods": self.periods,
+            "fetched_at": self.fetched_at,
+            "items": {item: [None if np.isnan(v) else float(v) for v in values] for item, values in self.items.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "StatementTable":
+        items = {item: np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+                 for item, values in data["items"].items()}
+        return cls(data["ticker"], data["period"], list(data["periods"]), items, data["fetched_at"])
+
+
+class StatementStore:
+    """Per-ticker statement tables on disk, refetched once per reporting period."""
+
+    def __init__(self, root: Optional[str] = None, fetch_statements: Optional[StatementFetcher] = None):
+        """
+        Initialize statement store.
+
+        Args:
+            root: Storage directory (defaults to $STATEMENTS_DIR or financial_statements in the data directory)
+            fetch_statements: (ticker, period) -> statement frames (defaults to vnstock)
+        """
+        self.root = root or data_path("financial_statements", "STATEMENTS_DIR")
+        self.fetch_statements = fetch_statements or fetch_vnstock_statements
+        self._tables: Dict[tuple, StatementTable] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str, period: str) -> str:
+        return os.path.join(self.root, period, f"{ticker.upper()}.json")
+
+    def load(self, ticker: str, period: str = "quarter") -> Optional[StatementTable]:
+        """Stored table without fetching, or None."""
+        key = (ticker.upper(), period)
+        with self._lock:
+            if key in self._tables:
+                return self._tables[key]
+
+        path = self._path(ticker, period)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                table = StatementTable.from_json(json.load(f))
+        except (json.JSONDecodeError, KeyError, IOError) as e:
+            logger.warning(f"Ignoring unreadable statement table {path}: {e}")
+            return None
+        with self._lock:
+            self._tables[key] = table
+        return table
+
+    def save(self, table: StatementTable) -> None:
+        path = self._path(table.ticker, table.period)
+
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, "w") as f:
+                json.dump(table.to_json(), f)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            replace_atomically(path, write)
+        except OSError as e:
+            logger.warning(f"Failed to store statements for {table.ticker}: {e}")
+        with self._lock:
+            self._tables[(table.ticker.upper(), table.period)] = table
+
+    @staticmethod
+    def needs_refresh(table: Optional[StatementTable], now: Optional[float] = None) -> bool:
+        if table is None or not len(table):
+            return True
+        now = now if now is not None else time.time()
+        due = date.fromtimestamp(now) >= table.next_filing_due()
+        return due and now - table.fetched_at >= _RETRY_HOURS * 3600
+
+    def get(self, ticker: str, period: str = "quarter", refresh: bool = False) -> Optional[StatementTable]:
+        """
+        Statement table for a ticker, fetching only when a new period is due.
+
+        Args:
+            ticker: Stock symbol
+            period: "quarter" or "year"
+            refresh: Force a refetch
+
+        Returns:
+            StatementTable, or None if nothing is stored and the fetch failed
+        """
+        if period not in STATEMENT_PERIODS:
+            raise ValueError(f"Unsupported statement period: {period}")
+        ticker = ticker.upper()
+        table = self.load(ticker, period)
+        if not refresh and not self.needs_refresh(table):
+            return table
+
+        try:
+            per_period = statements_to_items(self.fetch_statements(ticker, period))
+        except Exception as e:
+            logger.warning(f"Statement fetch failed for {ticker}: {e}")
+            per_period = {}
+
+        fetched = StatementTable.from_period_items(ticker, period, per_period)
+        if not len(fetched):
+            if table is not None:
+                # Keep serving what we have; try again after the retry delay
+                table.fetched_at = time.time()
+                self.save(table)
+            return table
+        self.save(fetched)
+        return fetched
+
+
+# Global statement store instance
+_statement_store_instance: Optional[StatementStore] = None
+_statement_store_lock = threading.Lock()
+
+
+def get_statement_store() -> Optional[StatementStore]:
+    """Get global statement store instance — prefer Dependencies container."""
+    from infrastructure.dependencies import get_deps
+    deps = get_deps()
+    if deps is not None and deps.statement_store is not None:
+        return deps.statement_store
+
+    global _statement_store_instance
+    if _statement_store_instance is None:
+        with _statement_store_lock:
+            if _statement_store_instance is None:
+                try:
+                    _statement_store_instance = StatementStore()
+                except Exception as e:
+                    logger.error(f"Failed to create statement store instance: {e}")
+                    _statement_store_instance = None
+    return _statement_store_instance
+
+
+def set_statement_store_instance(store: StatementStore) -> None:
+    """Set global statement store instance (for testing)."""
+    global _statement_store_instance
+    _statement_store_instance = store
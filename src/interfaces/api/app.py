@@ -12,9 +12,12 @@ from infrastructure.observability import get_logger
 from infrastructure.observability.logging.logger import request_id_var
 from infrastructure.observability.metrics.collector import get_metrics_collector
 from application.agents.agent import StockAgent
+from application.agents.tool_output import get_tool_payload
 from infrastructure.guardrails.pipeline import GuardrailPipeline
 
 _MAX_QUERY_LENGTH = 1000
+# Caller identity set by the authenticating proxy in front of the API; scopes portfolios and alerts
+_USER_HEADER = "X-User-Id"
 
 agent: Optional[StockAgent] = None
 _request_logger = get_logger("api")
@@ -125,7 +128,7 @@ app.add_middleware(
 
 @app.middleware("http")
 async def trace_middleware(request: Request, call_next):
-    request_id = _request_logger.start_request()
+    request_id = _request_logger.start_request(user_id=request.headers.get(_USER_HEADER))
     request.state.request_id = request_id
     start_time = time.time()
     try:
@@ -290,6 +293,18 @@ async def ask_stock_agent_stream(body: QueryRequest, request: Request):
         return StreamingResponse(error_stream(), media_type="text/event-stream")
 
 
+@app.get(
+    "/tool-payloads/{ref}",
+    summary="Lấy dữ liệu đầy đủ của tool",
+    description="Trả về kết quả đầy đủ của một tool output đã được rút gọn (theo `full_ref`).",
+)
+async def tool_payload(ref: str):
+    payload = get_tool_payload(ref)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Tool payload not found or expired")
+    return payload
+
+
 @app.get(
     "/health",
     response_model=HealthResponse,
@@ -1,9 +1,11 @@
+import os
 import sys
 import json
 import uuid
+from typing import Optional
 from application.agents.agent import StockAgent
 from infrastructure.observability import init_observability, get_logger
-from infrastructure.observability.logging.logger import request_id_var
+from infrastructure.observability.logging.logger import request_id_var, user_id_var
 
 
 BANNER = r"""
@@ -35,9 +37,11 @@ Ví dụ câu hỏi:
 
 
 class ConsoleApp:
-    def __init__(self, raw_output: bool = False):
+    def __init__(self, raw_output: bool = False, user_id: Optional[str] = None):
         self.agent = StockAgent()
         self.raw_output = raw_output
+        # Owner of the portfolio and alerts this session reads and writes
+        self.user_id = user_id
 
     def toggle_raw(self):
         self.raw_output = not self.raw_output
@@ -91,6 +95,7 @@ class ConsoleApp:
                 # Normal question → agent xử lý
                 request_id = str(uuid.uuid4())
                 request_id_var.set(request_id)
+                user_id_var.set(self.user_id)
                 cli_logger = get_logger("cli")
                 cli_logger.info("Processing CLI query", extra={"query": query, "request_id": request_id})
                 response = self.agent.run(query, request_id=request_id)
@@ -113,7 +118,7 @@ class ConsoleApp:
 
 def main():
     init_observability()
-    app = ConsoleApp()
+    app = ConsoleApp(user_id=os.getenv("AGENT_USER_ID"))
     app.run()
 
 
@@ -0,0 +1,137 @@
+"""
+Columnar aggregation over aligned (tickers x dates) matrices.
+
+Price payloads are turned into one float64 matrix per requested field, with
+NaN where a ticker has no bar for a date. Every supported aggregate is then
+computed for all tickers in a single vectorized pass.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+ROW_AGGREGATES = ("count", "sum", "mean", "median", "std", "min", "max", "first", "latest")
+
+
+@dataclass
+class FieldMatrix:
+    tickers: List[str]
+    dates: List[str]
+    values: np.ndarray
+    mask: np.ndarray
+
+    @property
+    def dense(self) -> bool:
+        return bool(self.mask.all())
+
+    def row_values(self, i: int) -> List[float]:
+        return self.values[i][self.mask[i]].tolist()
+
+    def index(self, ticker: str) -> int:
+        return self.tickers.index(ticker)
+
+
+def build_field_matrix(all_data: Dict[str, Any], field: str) -> FieldMatrix:
+    # Payloads with an "error" key, no rows or no values for the field are skipped
+    rows = []
+    for ticker, data in all_data.items():
+        if not isinstance(data, dict) or "error" in data:
+            continue
+        items = [item for item in data.get("data") or [] if field in item]
+        if items:
+            rows.append((ticker, items))
+
+    if not rows:
+        empty = np.empty((0, 0), dtype=np.float64)
+        return FieldMatrix([], [], empty, empty.astype(bool))
+
+    tickers = [ticker for ticker, _ in rows]
+    keyed = all("date" in item for _, items in rows for item in items)
+
+    if keyed:
+        first_dates = [item["date"] for item in rows[0][1]]
+        if all(len(items) == len(first_dates) and [item["date"] for item in items] == first_dates for _, items in rows):
+            # Fast path: every ticker shares the same calendar
+            dates = first_dates
+            values = np.array([[item[field] for item in items] for _, items in rows], dtype=np.float64)
+            return FieldMatrix(tickers, dates, values, np.ones(values.shape, dtype=bool))
+        dates = sorted({item["date"] for _, items in rows for item in items})
+    else:
+        # No dates to align on: right-align so the latest bars share a column
+        width = max(len(items) for _, items in rows)
+        dates = [str(i) for i in range(width)]
+
+    position = {date: j for j, date in enumerate(dates)}
+    values = np.full((len(rows), len(dates)), np.nan)
+    mask = np.zeros(values.shape, dtype=bool)
+    for i, (_, items) in enumerate(rows):
+        if keyed:
+            cols = np.fromiter((position[item["date"]] for item in items), dtype=np.intp, count=len(items))
+        else:
+            cols = np.arange(len(dates) - len(items), len(dates))
+        values[i, cols] = [item[field] for item in items]
+        mask[i, cols] = True
+
+    return FieldMatrix(tickers, dates, values, mask)
+
+
+def aggregate_rows(matrix: FieldMatrix) -> Dict[str, np.ndarray]:
+    values, mask = matrix.values, matrix.mask
+    n_rows, n_cols = values.shape
+    if n_rows == 0:
+        return {name: np.empty(0) for name in ROW_AGGREGATES}
+
+    counts = mask.sum(axis=1)
+    first_idx = mask.argmax(axis=1)
+    last_idx = n_cols - 1 - mask[:, ::-1].argmax(axis=1)
+    rows = np.arange(n_rows)
+
+    if matrix.dense:
+        sums = values.sum(axis=1)
+        means = sums / counts
+        deviations = values - means[:, None]
+        stds = np.sqrt((deviations * deviations).sum(axis=1) / counts)
+        mins = values.min(axis=1)
+        maxs = values.max(axis=1)
+        medians = np.median(values, axis=1)
+    else:
+        filled = np.where(mask, values, 0.0)
+        sums = filled.sum(axis=1)
+        means = sums / counts
+        deviations = np.where(mask, values - means[:, None], 0.0)
+        stds = np.sqrt((deviations * deviations).sum(axis=1) / counts)
+        mins = np.where(mask, values, np.inf).min(axis=1)
+        maxs = np.where(mask, values, -np.inf).max(axis=1)
+        medians = np.nanmedian(values, axis=1)
+
+    return {
+        "count": counts,
+        "sum": sums,
+        "mean": means,
+        "median": medians,
+        "std": stds,
+        "min": mins,
+        "max": maxs,
+        "first": values[rows, first_idx],
+        "latest": values[rows, last_idx],
+    }
+
+
+def pooled_statistics(matrix: FieldMatrix) -> Dict[str, float]:
+    flat = matrix.values[matrix.mask]
+    if flat.size == 0:
+        return {}
+
+    total = float(flat.sum())
+    mean = total / flat.size
+    deviations = flat - mean
+    return {
+        "count": int(flat.size),
+        "sum": total,
+        "mean": mean,
+        "median": float(np.median(flat)),
+        "std": float(np.sqrt(deviations @ deviations / flat.size)),
+        "min": float(flat.min()),
+        "max": float(flat.max()),
+    }
@@ -0,0 +1,150 @@
+"""
+NumPy analytics kernels for price series.
+
+All kernels take float64 arrays (or anything ``np.asarray`` accepts) and
+return float64 arrays or Python floats. Rolling kernels pad the first
+``window - 1`` positions with NaN so outputs stay aligned with inputs.
+"""
+
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+TRADING_DAYS_PER_YEAR = 252
+
+ArrayLike = Union[np.ndarray, Sequence[float]]
+
+
+def to_array(values: ArrayLike) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def field_array(records: List[Dict[str, Any]], field: str = "close") -> np.ndarray:
+    return np.fromiter((r[field] for r in records), dtype=np.float64, count=len(records))
+
+
+def simple_returns(prices: ArrayLike) -> np.ndarray:
+    # Periods whose previous price is zero are dropped rather than yielding inf
+    p = to_array(prices)
+    if p.size < 2:
+        return np.empty(0, dtype=np.float64)
+    prev, curr = p[:-1], p[1:]
+    mask = prev != 0
+    return (curr[mask] - prev[mask]) / prev[mask]
+
+
+def log_returns(prices: ArrayLike) -> np.ndarray:
+    p = to_array(prices)
+    if p.size < 2:
+        return np.empty(0, dtype=np.float64)
+    prev, curr = p[:-1], p[1:]
+    mask = (prev > 0) & (curr > 0)
+    return np.log(curr[mask] / prev[mask])
+
+
+def _std(v: np.ndarray, ddof: int) -> float:
+    # Two-pass dot-product form; np.std carries noticeable overhead on short arrays
+    d = v - v.sum() / v.size
+    return float(np.sqrt(d @ d / (v.size - ddof)))
+
+
+def std_dev(values: ArrayLike, ddof: int = 0) -> float:
+    v = to_array(values)
+    if v.size < 2:
+        return 0.0
+    return _std(v, ddof)
+
+
+def annualized_volatility(
+    returns: ArrayLike,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR,
+    ddof: int = 0
+) -> float:
+    r = to_array(returns)
+    if r.size <= ddof:
+        return 0.0
+    return _std(r, ddof) * float(np.sqrt(periods_per_year))
+
+
+def rolling_mean(values: ArrayLike, window: int) -> np.ndarray:
+    v = to_array(values)
+    out = np.full(v.shape, np.nan)
+    if window <= 0 or v.size < window:
+        return out
+    out[window - 1:] = sliding_window_view(v, window).mean(axis=-1)
+    return out
+
+
+def rolling_std(values: ArrayLike, window: int, ddof: int = 0) -> np.ndarray:
+    v = to_array(values)
+    out = np.full(v.shape, np.nan)
+    if window <= ddof or v.size < window:
+        return out
+    out[window - 1:] = sliding_window_view(v, window).std(axis=-1, ddof=ddof)
+    return out
+
+
+def expanding_mean(values: ArrayLike) -> np.ndarray:
+    v = to_array(values)
+    return np.cumsum(v) / np.arange(1, v.size + 1)
+
+
+def expanding_std(values: ArrayLike, ddof: int = 0) -> np.ndarray:
+    v = to_array(values)
+    if v.size == 0:
+        return v.copy()
+    # Shift by the first value so the running sums of squares stay well conditioned
+    shifted = v - v[0]
+    counts = np.arange(1, v.size + 1, dtype=np.float64)
+    sums = np.cumsum(shifted)
+    sq_sums = np.cumsum(shifted * shifted)
+    denom = counts - ddof
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (sq_sums - sums * sums / counts) / denom
+    var = np.where(denom > 0, np.maximum(var, 0.0), np.nan)
+    return np.sqrt(var)
+
+
+def drawdown(prices: ArrayLike) -> np.ndarray:
+    p = to_array(prices)
+    if p.size == 0:
+        return p.copy()
+    peaks = np.maximum.accumulate(p)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dd = np.where(peaks > 0, p / peaks - 1.0, 0.0)
+    return dd
+
+
+def max_drawdown(prices: ArrayLike) -> float:
+    dd = drawdown(prices)
+    if dd.size == 0:
+        return 0.0
+    return float(dd.min())
+
+
+def correlation(a: ArrayLike, b: ArrayLike) -> float:
+    x, y = to_array(a), to_array(b)
+    n = min(x.size, y.size)
+    if n < 2:
+        return 0.0
+    x, y = x[-n:], y[-n:]
+    xd, yd = x - x.mean(), y - y.mean()
+    denom = np.sqrt((xd * xd).sum() * (yd * yd).sum())
+    if denom == 0:
+        return 0.0
+    return float((xd * yd).sum() / denom)
+
+
+def correlation_matrix(series: ArrayLike) -> np.ndarray:
+    # One row per series; constant rows get zero correlation instead of NaN
+    m = np.atleast_2d(to_array(series))
+    centered = m - m.mean(axis=1, keepdims=True)
+    norms = np.sqrt((centered * centered).sum(axis=1))
+    safe = np.where(norms == 0, 1.0, norms)
+    corr = (centered @ centered.T) / np.outer(safe, safe)
+    zero = norms == 0
+    corr[zero, :] = 0.0
+    corr[:, zero] = 0.0
+    np.fill_diagonal(corr, np.where(zero, 0.0, 1.0))
+    return corr
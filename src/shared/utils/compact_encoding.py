@@ -0,0 +1,148 @@
+"""
+Compact, LLM-oriented encoding of service payloads.
+
+Lists of records are turned into columnar arrays. Date-indexed series
+(the per-day dicts returned by price, indicator and aggregate services)
+also get a summary header: row count, date range and
+first/last/min/max/mean/change per numeric column; series longer than
+the point budget are downsampled to evenly spaced rows plus each numeric
+column's extremes, so the LLM still sees the shape, the turning points
+and exact summary figures. Other record lists (rankings, screens,
+holdings) keep every row. Floats below 10^digits (prices, ratios) are
+rounded to a fixed number of significant digits; larger ones such as
+volume or market cap keep their integer part. The JSON is emitted
+without indentation.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_POINT_BUDGET = 60
+DEFAULT_SIGNIFICANT_DIGITS = 6
+
+_DATE_COLUMNS = ("date", "time", "datetime", "timestamp")
+
+
+def _round(value: Any, digits: int) -> Any:
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        if abs(value) < 10 ** digits:
+            value = float(f"{value:.{digits}g}")
+        else:
+            # Quantities (volume, market cap, statement items) are never rounded to significant digits
+            value = round(value, 2)
+        return int(value) if value.is_integer() and abs(value) < 1e15 else value
+    return value
+
+
+def _is_records(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) >= 2
+        and all(isinstance(v, dict) for v in value)
+        and all(not isinstance(x, (dict, list)) for v in value for x in v.values())
+    )
+
+
+def _is_series(records: List[Dict[str, Any]]) -> bool:
+    return any(all(record.get(name) is not None for record in records) for name in _DATE_COLUMNS)
+
+
+def _numeric(column: List[Any]) -> bool:
+    return any(isinstance(v, (int, float)) and not isinstance(v, bool) for v in column) and all(
+        v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in column
+    )
+
+
+def sample_indices(columns: Dict[str, List[Any]], n: int, budget: int) -> np.ndarray:
+    """Rows kept for a series of ``n`` rows: evenly spaced plus each numeric column's min and max."""
+    if n <= budget:
+        return np.arange(n)
+    numeric = [np.array([np.nan if v is None else v for v in col], dtype=np.float64)
+               for col in columns.values() if _numeric(col)]
+    extremes = [i for values in numeric if np.isfinite(values).any()
+                for i in (int(np.nanargmin(values)), int(np.nanargmax(values)))]
+    even = np.linspace(0, n - 1, max(budget - len(extremes), 2)).round().astype(np.intp)
+    return np.unique(np.concatenate([even, np.array(extremes, dtype=np.intp)]))
+
+
+def _summary(columns: Dict[str, List[Any]], digits: int) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {}
+    for name, column in columns.items():
+        if name in _DATE_COLUMNS:
+            present = [v for v in column if v is not None]
+            if present:
+                summary[name] = {"from": present[0], "to": present[-1]}
+            continue
+        if not _numeric(column):
+            continue
+        values = np.array([np.nan if v is None else v for v in column], dtype=np.float64)
+        finite = values[np.isfinite(values)]
+        if not len(finite):
+            continue
+        stats = {
+            "first": finite[0], "last": finite[-1],
+            "min": finite.min(), "max": finite.max(), "mean": finite.mean(),
+        }
+        if finite[0]:
+            stats["change_pct"] = (finite[-1] - finite[0]) / abs(finite[0]) * 100
+        summary[name] = {k: _round(float(v), digits) for k, v in stats.items()}
+    return summary
+
+
+def compact_records(records: List[Dict[str, Any]], point_budget: int = DEFAULT_POINT_BUDGET,
+                    digits: int = DEFAULT_SIGNIFICANT_DIGITS) -> Tuple[Dict[str, Any], bool]:
+    """
+    Columnar form of a list of flat records.
+
+    Only date-indexed series get a summary and are downsampled.
+
+    Returns:
+        (compact dict, whether rows were dropped by downsampling)
+    """
+    names = list(dict.fromkeys(k for record in records for k in record))
+    columns = {name: [record.get(name) for record in records] for name in names}
+    n = len(records)
+
+    if not _is_series(records):
+        return {"rows": n, "columns": {name: [_round(v, digits) for v in column]
+                                       for name, column in columns.items()}}, False
+
+    keep = sample_indices(columns, n, point_budget)
+    sampled = len(keep) < n
+    out: Dict[str, Any] = {"rows": n, "summary": _summary(columns, digits)}
+    if sampled:
+        out["sampled_rows"] = len(keep)
+    out["columns"] = {name: [_round(column[i], digits) for i in keep] for name, column in columns.items()}
+    return out, sampled
+
+
+def compact_payload(obj: Any, point_budget: int = DEFAULT_POINT_BUDGET,
+                    digits: int = DEFAULT_SIGNIFICANT_DIGITS) -> Tuple[Any, bool]:
+    """Recursively compact a payload; returns (compact payload, whether anything was downsampled)."""
+    if _is_records(obj):
+        return compact_records(obj, point_budget, digits)
+    if isinstance(obj, dict):
+        out, sampled = {}, False
+        for key, value in obj.items():
+            out[key], dropped = compact_payload(value, point_budget, digits)
+            sampled = sampled or dropped
+        return out, sampled
+    if isinstance(obj, list):
+        out, sampled = [], False
+        for value in obj:
+            item, dropped = compact_payload(value, point_budget, digits)
+            out.append(item)
+            sampled = sampled or dropped
+        return out, sampled
+    if isinstance(obj, (np.floating, np.integer)):
+        obj = obj.item()
+    return _round(obj, digits), False
+
+
+def dumps_compact(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -0,0 +1,151 @@
+"""
+Vectorized financial ratios over every reporting period of a statement table.
+
+Inputs are canonical line items as float arrays aligned on periods (oldest
+first, NaN where an item is missing) plus the closing price at each period
+end. Every supported ratio is computed for all periods in one pass; a period
+whose inputs are missing or zero yields NaN rather than an error.
+
+Flow items (revenue, profits, dividends) are annualized for quarterly
+tables by summing the trailing four quarters, so P/E, ROE and turnover stay
+comparable between quarterly and annual tables. Margins use the period's
+own flows.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FLOW_ITEMS = ("revenue", "gross_profit", "operating_profit", "net_profit", "dividends_paid")
+
+# vnstock (VCI) daily bars quote prices in thousand VND while statements report VND;
+# quoted closes are multiplied by this before they are paired with statement items
+VND_PER_QUOTED_PRICE = 1000
+
+# Ratio -> line items it is derived from (besides price)
+RATIO_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "pe_ratio": ("net_profit", "shares_outstanding"),
+    "pb_ratio": ("equity", "shares_outstanding"),
+    "eps": ("net_profit", "shares_outstanding"),
+    "book_value_per_share": ("equity", "shares_outstanding"),
+    "roe": ("net_profit", "equity"),
+    "roa": ("net_profit", "total_assets"),
+    "gross_margin": ("gross_profit", "revenue"),
+    "operating_margin": ("operating_profit", "revenue"),
+    "profit_margin": ("net_profit", "revenue"),
+    "current_ratio": ("current_assets", "current_liabilities"),
+    "quick_ratio": ("cash_and_equivalents", "short_term_investments", "current_liabilities"),
+    "debt_to_equity": ("total_liabilities", "equity"),
+    "asset_turnover": ("revenue", "total_assets"),
+    "dividend_yield": ("dividends_paid", "shares_outstanding"),
+    "revenue_growth": ("revenue",),
+    "eps_growth": ("net_profit", "shares_outstanding"),
+}
+
+SUPPORTED_RATIOS = tuple(RATIO_INPUTS)
+
+# Ratios quoted against the share price at period end
+PRICE_RATIOS = frozenset({"pe_ratio", "pb_ratio", "dividend_yield"})
+
+# Spellings used by the extractor and older callers -> ratio name
+RATIO_ALIASES = {
+    "pe": "pe_ratio",
+    "p/e": "pe_ratio",
+    "pb": "pb_ratio",
+    "p/b": "pb_ratio",
+    "bvps": "book_value_per_share",
+    "net_margin": "profit_margin",
+    "ebit_margin": "operating_margin",
+    "de": "debt_to_equity",
+    "d/e": "debt_to_equity",
+}
+
+PERIODS_PER_YEAR = {"quarter": 4, "year": 1}
+
+
+def resolve_ratio(name: Optional[str]) -> Optional[str]:
+    """Canonical ratio name for a requested field, or None for "all ratios"/unknown."""
+    if not name:
+        return None
+    key = name.strip().lower()
+    key = RATIO_ALIASES.get(key, key)
+    return key if key in RATIO_INPUTS else None
+
+
+def _div(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = num / den
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def trailing_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the last ``window`` periods at each period (NaN until a full window exists, or where one is missing)."""
+    if window <= 1:
+        return values.astype(np.float64, copy=True)
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        # Summed per window so a missing period only blanks the windows containing it
+        out[window - 1:] = sliding_window_view(np.asarray(values, dtype=np.float64), window).sum(axis=-1)
+    return out
+
+
+def _growth(values: np.ndarray, lag: int) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if len(values) > lag:
+        out[lag:] = (_div(values[lag:], np.abs(values[:-lag])) - np.sign(values[:-lag])) * 100
+    return out
+
+
+def compute_ratio_table(items: Dict[str, np.ndarray], prices: np.ndarray, periods_per_year: int = 4) -> Dict[str, np.ndarray]:
+    """
+    Compute every supported ratio for all periods.
+
+    Args:
+        items: {line item: float array over periods}; missing items may be omitted
+        prices: Close in VND at each period end (NaN where unknown); see VND_PER_QUOTED_PRICE
+        periods_per_year: 4 for quarterly tables, 1 for annual
+
+    Returns:
+        {ratio name: float array over periods}
+    """
+    n = len(prices)
+    prices = np.asarray(prices, dtype=np.float64)
+
+    def item(name: str) -> np.ndarray:
+        values = items.get(name)
+        return np.asarray(values, dtype=np.float64) if values is not None else np.full(n, np.nan)
+
+    def annual(name: str) -> np.ndarray:
+        return trailing_sum(item(name), periods_per_year)
+
+    shares = item("shares_outstanding")
+    equity = item("equity")
+    revenue = item("revenue")
+    net_profit_annual = annual("net_profit")
+
+    eps = _div(net_profit_annual, shares)
+    bvps = _div(equity, shares)
+
+    return {
+        "pe_ratio": _div(prices, eps),
+        "pb_ratio": _div(prices, bvps),
+        "eps": eps,
+        "book_value_per_share": bvps,
+        "roe": _div(net_profit_annual, equity) * 100,
+        "roa": _div(net_profit_annual, item("total_assets")) * 100,
+        "gross_margin": _div(item("gross_profit"), revenue) * 100,
+        "operating_margin": _div(item("operating_profit"), revenue) * 100,
+        "profit_margin": _div(item("net_profit"), revenue) * 100,
+        "current_ratio": _div(item("current_assets"), item("current_liabilities")),
+        "quick_ratio": _div(
+            np.nan_to_num(item("cash_and_equivalents")) + np.nan_to_num(item("short_term_investments")),
+            item("current_liabilities"),
+        ),
+        "debt_to_equity": _div(item("total_liabilities"), equity),
+        "asset_turnover": _div(annual("revenue"), item("total_assets")),
+        "dividend_yield": _div(np.abs(annual("dividends_paid")), shares * prices) * 100,
+        "revenue_growth": _growth(revenue, periods_per_year),
+        "eps_growth": _growth(eps, periods_per_year),
+    }
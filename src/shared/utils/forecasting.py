@@ -0,0 +1,227 @@
+"""
+Vectorized price-forecast models with incrementally updatable state.
+
+``ForecastModels`` holds fitted state for many tickers, one row each, and
+advances every row one bar at a time with array operations, so fitting 300
+tickers costs one pass over the bars rather than 300. Input matrices are
+shaped (tickers, bars), oldest first, with leading NaNs where a ticker has
+fewer bars.
+
+Models (all on log prices):
+- drift: exponentially weighted mean log return, EWMA (RiskMetrics) variance
+- holt: Holt linear-trend smoothing; (alpha, beta) picked per ticker from a
+  small grid by one-step-ahead squared error
+- ar: AR(p) on log returns from running least-squares sums, so new bars
+  update the fit in O(p^2) without revisiting history
+
+State round-trips through ``to_rows``/``from_rows`` for per-ticker caching.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+FORECAST_MODELS = ("drift", "holt", "ar")
+
+EWMA_LAMBDA = 0.94
+DRIFT_HALFLIFE_BARS = 60
+HOLT_ALPHAS = (0.1, 0.3, 0.5, 0.8)
+HOLT_BETAS = (0.01, 0.05, 0.1, 0.3)
+AR_ORDER = 3
+AR_RIDGE = 1e-8
+TAIL_BARS = 20
+Z_95 = 1.96
+
+_DRIFT_DECAY = 0.5 ** (1.0 / DRIFT_HALFLIFE_BARS)
+
+_ROW_FIELDS = (
+    "last_price", "bars", "bars_since_fit", "ret_mean", "ewma_var",
+    "level", "trend", "holt_alpha", "holt_beta",
+    "ar_count", "ar_xtx", "ar_xty", "ar_lags", "tail",
+)
+
+
+def _holt_grid_fit(log_prices: np.ndarray) -> Dict[str, np.ndarray]:
+    n, t_len = log_prices.shape
+    alphas, betas = np.meshgrid(np.array(HOLT_ALPHAS), np.array(HOLT_BETAS), indexing="ij")
+    alphas, betas = alphas.ravel(), betas.ravel()
+
+    level = np.full((n, alphas.size), np.nan)
+    trend = np.zeros((n, alphas.size))
+    sse = np.zeros((n, alphas.size))
+    for t in range(t_len):
+        x = log_prices[:, t][:, None]
+        valid = ~np.isnan(x)
+        started = ~np.isnan(level)
+        pred = level + trend
+        step = valid & started
+        sse = np.where(step, sse + (x - pred) ** 2, sse)
+        new_level = alphas * x + (1 - alphas) * pred
+        trend = np.where(step, betas * (new_level - level) + (1 - betas) * trend, trend)
+        level = np.where(step, new_level, np.where(valid & ~started, x, level))
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n)
+    return {
+        "level": level[rows, best],
+        "trend": trend[rows, best],
+        "holt_alpha": alphas[best],
+        "holt_beta": betas[best],
+    }
+
+
+class ForecastModels:
+    """Fitted drift/EWMA, Holt and AR state for a batch of tickers, one row per ticker."""
+
+    def __init__(self, n: int, ar_order: int = AR_ORDER):
+        self.ar_order = ar_order
+        k = ar_order + 1
+        self.last_price = np.full(n, np.nan)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self.bars_since_fit = np.zeros(n, dtype=np.int64)
+        self.ret_mean = np.zeros(n)
+        self.ewma_var = np.zeros(n)
+        self.level = np.full(n, np.nan)
+        self.trend = np.zeros(n)
+        self.holt_alpha = np.full(n, HOLT_ALPHAS[1])
+        self.holt_beta = np.full(n, HOLT_BETAS[1])
+        self.ar_count = np.zeros(n, dtype=np.int64)
+        self.ar_xtx = np.zeros((n, k, k))
+        self.ar_xty = np.zeros((n, k))
+        self.ar_lags = np.zeros((n, ar_order))
+        self.tail = np.full((n, TAIL_BARS), np.nan)
+
+    def __len__(self) -> int:
+        return self.last_price.shape[0]
+
+    @classmethod
+    def fit(cls, closes: Any, ar_order: int = AR_ORDER) -> "ForecastModels":
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        models = cls(closes.shape[0], ar_order)
+        if closes.shape[1]:
+            models._advance(closes, holt=False)
+            for name, values in _holt_grid_fit(np.log(closes)).items():
+                setattr(models, name, values)
+        models.bars_since_fit[:] = 0
+        return models
+
+    def update(self, closes: Any) -> "ForecastModels":
+        # New bars only; NaN cells (shorter rows) leave that ticker untouched
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        if closes.shape[1]:
+            self._advance(closes, holt=True)
+        return self
+
+    def _advance(self, closes: np.ndarray, holt: bool) -> None:
+        p = self.ar_order
+        for t in range(closes.shape[1]):
+            price = closes[:, t]
+            valid = ~np.isnan(price) & (price > 0)
+            if not valid.any():
+                continue
+            x = np.log(np.where(valid, price, 1.0))
+            first = valid & np.isnan(self.last_price)
+            step = valid & ~first
+
+            r = np.where(step, x - np.log(np.where(step, self.last_price, 1.0)), 0.0)
+            seeded = step & (self.bars == 1)
+            self.ret_mean = np.where(seeded, r, np.where(step, _DRIFT_DECAY * self.ret_mean + (1 - _DRIFT_DECAY) * r, self.ret_mean))
+            self.ewma_var = np.where(seeded, r * r, np.where(step, EWMA_LAMBDA * self.ewma_var + (1 - EWMA_LAMBDA) * r * r, self.ewma_var))
+
+            if holt:
+                a, b = self.holt_alpha, self.holt_beta
+                pred = self.level + self.trend
+                new_level = a * x + (1 - a) * pred
+                self.trend = np.where(step, b * (new_level - self.level) + (1 - b) * self.trend, self.trend)
+                self.level = np.where(step, new_level, np.where(first, x, self.level))
+
+            # AR sums take a row once p lagged returns exist
+            learn = step & (self.ar_count >= p)
+            if learn.any():
+                z = np.concatenate((np.ones((len(self), 1)), self.ar_lags[:, ::-1]), axis=1) * learn[:, None]
+                self.ar_xtx += z[:, :, None] * z[:, None, :]
+                self.ar_xty += z * r[:, None]
+            self.ar_lags = np.where(step[:, None], np.concatenate((self.ar_lags[:, 1:], r[:, None]), axis=1), self.ar_lags)
+            self.ar_count += step
+
+            self.tail = np.where(valid[:, None], np.concatenate((self.tail[:, 1:], price[:, None]), axis=1), self.tail)
+            self.last_price = np.where(valid, price, self.last_price)
+            self.bars += valid
+            self.bars_since_fit += valid
+
+    def ar_coefficients(self) -> np.ndarray:
+        k = self.ar_order + 1
+        ridge = AR_RIDGE * np.eye(k) * np.maximum(1.0, np.trace(self.ar_xtx, axis1=1, axis2=2))[:, None, None]
+        coef = np.linalg.solve(self.ar_xtx + ridge, self.ar_xty[:, :, None])[:, :, 0]
+        # Too few equations for a meaningful fit
+        coef[self.ar_count < 4 * k] = np.nan
+        return coef
+
+    def forecast(self, horizon: int) -> Dict[str, np.ndarray]:
+        """Per-model projected prices ``horizon`` bars ahead plus shared volatility bounds."""
+        horizon = max(int(horizon), 1)
+        last = self.last_price
+
+        drift = last * np.exp(self.ret_mean * horizon)
+        holt = np.exp(self.level + horizon * self.trend)
+
+        coef = self.ar_coefficients()
+        lags = self.ar_lags.copy()
+        cumulative = np.zeros(len(self))
+        for _ in range(horizon):
+            r_hat = coef[:, 0] + np.einsum("ij,ij->i", coef[:, 1:], lags[:, ::-1])
+            cumulative += r_hat
+            lags = np.concatenate((lags[:, 1:], r_hat[:, None]), axis=1)
+        ar = last * np.exp(cumulative)
+
+        sigma = np.sqrt(self.ewma_var)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sma = np.nanmean(self.tail, axis=1)
+            trend_5 = last / self.tail[:, -5] - 1
+
+        return {
+            "last_price": last,
+            "drift": drift,
+            "holt": holt,
+            "ar": ar,
+            "volatility": sigma,
+            "band": np.exp(Z_95 * sigma * np.sqrt(horizon)),
+            "sma_20": sma,
+            "trend_5": trend_5,
+        }
+
+    def take(self, rows: Sequence[int]) -> "ForecastModels":
+        rows = np.asarray(rows, dtype=np.intp)
+        out = ForecastModels(len(rows), self.ar_order)
+        for name in _ROW_FIELDS:
+            setattr(out, name, getattr(self, name)[rows].copy())
+        return out
+
+    def to_rows(self, last_dates: Optional[Sequence[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        rows = []
+        for i in range(len(self)):
+            row = {name: getattr(self, name)[i].tolist() for name in _ROW_FIELDS}
+            row["ar_order"] = self.ar_order
+            row["last_date"] = last_dates[i] if last_dates is not None else None
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]]) -> "ForecastModels":
+        ar_order = rows[0]["ar_order"] if rows else AR_ORDER
+        models = cls(len(rows), ar_order)
+        for name in _ROW_FIELDS:
+            current = getattr(models, name)
+            if rows:
+                setattr(models, name, np.array([row[name] for row in rows], dtype=current.dtype).reshape(current.shape))
+        return models
+
+
+def right_aligned(series: Sequence[Sequence[float]], width: Optional[int] = None) -> np.ndarray:
+    width = width if width is not None else max((len(s) for s in series), default=0)
+    out = np.full((len(series), width), np.nan)
+    for i, values in enumerate(series):
+        values = np.asarray(values, dtype=np.float64)[-width:] if width else np.empty(0)
+        if len(values):
+            out[i, width - len(values):] = values
+    return out
@@ -0,0 +1,328 @@
+"""
+Vectorized technical-indicator engine.
+
+Inputs are float64 arrays shaped (n,) for one ticker or (tickers, n) for many;
+time runs along the last axis and leading NaNs mark bars a ticker does not
+have. ``IndicatorEngine.evaluate`` computes a whole indicator spec in one pass
+and memoizes shared intermediates (EMAs, SMAs, price deltas, true range), so
+e.g. MACD(12,26) and EMA12 reuse the same smoothing.
+
+Conventions follow the pandas code this replaces: SMA/rolling std use
+min_periods=window, EMA uses ``ewm(span, adjust=True)``, RSI uses simple
+rolling averages of gains and losses.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_INDICATOR_PARAMS: Dict[str, List[Any]] = {
+    "sma": [20],
+    "ema": [20],
+    "rsi": [14],
+    "macd": [(12, 26, 9)],
+    "bb": [(20, 2.0)],
+    "atr": [14],
+    "adx": [14],
+    "cci": [20],
+    "stochastic": [(14, 3)],
+    "obv": [None],
+}
+
+SUPPORTED_INDICATORS = tuple(DEFAULT_INDICATOR_PARAMS)
+
+
+def _as_list(value: Any) -> List[Any]:
+    # A bare tuple is one parameter set, e.g. (12, 26) for MACD
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _pairs(values: List[Any], defaults: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+    # Accept [(12, 26)], [[12, 26, 9]] or the flat [12, 26] / [12, 26, 9] the preprocessor emits;
+    # a flat list longer than one full parameter set is read as pairs
+    if values and all(isinstance(v, (int, float)) for v in values):
+        if len(values) <= len(defaults):
+            values = [tuple(values)]
+        else:
+            values = [tuple(values[i:i + 2]) for i in range(0, len(values), 2)]
+    out = []
+    for v in values:
+        v = tuple(v) if isinstance(v, (list, tuple)) else (v,)
+        out.append(v + defaults[len(v):])
+    return out
+
+
+def indicator_result_name(name: str, params: Any) -> str:
+    """Result key carrying every parameter, e.g. ``sma_20``, ``macd_12_26_9``, ``bb_20_2.5``."""
+    if params is None:
+        return name
+    values = params if isinstance(params, (list, tuple)) else (params,)
+    return "_".join([name] + [f"{float(v):g}" for v in values])
+
+
+def normalize_indicator_spec(
+    requested_field: Optional[str],
+    indicator_params: Optional[Dict[str, Any]] = None
+) -> Dict[str, List[Any]]:
+    params = indicator_params or {}
+    names = [name for name in params if name in DEFAULT_INDICATOR_PARAMS]
+    if requested_field in DEFAULT_INDICATOR_PARAMS and requested_field not in names:
+        names.insert(0, requested_field)
+
+    spec = {}
+    for name in names:
+        values = _as_list(params.get(name)) or list(DEFAULT_INDICATOR_PARAMS[name])
+        if name == "macd":
+            spec[name] = _pairs(values, DEFAULT_INDICATOR_PARAMS["macd"][0])
+        elif name == "bb":
+            spec[name] = _pairs(values, DEFAULT_INDICATOR_PARAMS["bb"][0])
+        elif name == "stochastic":
+            spec[name] = _pairs(values, DEFAULT_INDICATOR_PARAMS["stochastic"][0])
+        elif name == "obv":
+            spec[name] = [None]
+        else:
+            spec[name] = [int(v) for v in values]
+    return spec
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    # NaN unless all `window` values are present (pandas min_periods=window)
+    out = np.full(x.shape, np.nan)
+    n = x.shape[-1]
+    if window <= 0 or n < window:
+        return out
+    valid = ~np.isnan(x)
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    csum = np.pad(np.cumsum(np.where(valid, x, 0.0), axis=-1), pad)
+    ccount = np.pad(np.cumsum(valid, axis=-1), pad)
+    sums = csum[..., window:] - csum[..., :-window]
+    counts = ccount[..., window:] - ccount[..., :-window]
+    out[..., window - 1:] = np.where(counts == window, sums, np.nan)
+    return out
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if window <= ddof or x.shape[-1] < window:
+        return out
+    out[..., window - 1:] = sliding_window_view(x, window, axis=-1).std(axis=-1, ddof=ddof)
+    return out
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window > 0:
+        out[..., window - 1:] = sliding_window_view(x, window, axis=-1).min(axis=-1)
+    return out
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window > 0:
+        out[..., window - 1:] = sliding_window_view(x, window, axis=-1).max(axis=-1)
+    return out
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    # pandas ewm(span, adjust=True, ignore_na=False); one step per bar, vectorized across tickers
+    decay = 1.0 - 2.0 / (span + 1.0)
+    out = np.empty(x.shape)
+    num = np.zeros(x.shape[:-1])
+    den = np.zeros(x.shape[:-1])
+    started = np.zeros(x.shape[:-1], dtype=bool)
+    for t in range(x.shape[-1]):
+        xt = x[..., t]
+        valid = ~np.isnan(xt)
+        started |= valid
+        num = np.where(started, decay * num, 0.0) + np.where(valid, xt, 0.0)
+        den = np.where(started, decay * den, 0.0) + valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[..., t] = np.where(den > 0, num / den, np.nan)
+    return out
+
+
+def diff(x: np.ndarray) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[..., 1:] = x[..., 1:] - x[..., :-1]
+    return out
+
+
+def shift(x: np.ndarray) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+class IndicatorEngine:
+    """Evaluates indicator specs over one OHLCV array set with shared intermediates."""
+
+    def __init__(
+        self,
+        close: Any,
+        high: Any = None,
+        low: Any = None,
+        volume: Any = None
+    ):
+        self.close = np.asarray(close, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64) if high is not None else self.close
+        self.low = np.asarray(low, dtype=np.float64) if low is not None else self.close
+        self.volume = np.asarray(volume, dtype=np.float64) if volume is not None else None
+        self._memo: Dict[Tuple[Any, ...], np.ndarray] = {}
+
+    def _cached(self, key: Tuple[Any, ...], fn) -> np.ndarray:
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    # Shared intermediates
+
+    def sma(self, period: int) -> np.ndarray:
+        return self._cached(("sma", period), lambda: sma(self.close, period))
+
+    def ema(self, span: int) -> np.ndarray:
+        return self._cached(("ema", span), lambda: ema(self.close, span))
+
+    def delta(self) -> np.ndarray:
+        return self._cached(("delta",), lambda: diff(self.close))
+
+    def prev_close(self) -> np.ndarray:
+        return self._cached(("prev_close",), lambda: shift(self.close))
+
+    def true_range(self) -> np.ndarray:
+        def compute():
+            prev = self.prev_close()
+            hl = self.high - self.low
+            with np.errstate(invalid="ignore"):
+                tr = np.fmax(hl, np.fmax(np.abs(self.high - prev), np.abs(self.low - prev)))
+            return np.where(np.isnan(self.close), np.nan, tr)
+        return self._cached(("tr",), compute)
+
+    def typical_price(self) -> np.ndarray:
+        return self._cached(("tp",), lambda: (self.high + self.low + self.close) / 3.0)
+
+    # Indicators
+
+    def rsi(self, period: int) -> np.ndarray:
+        def compute():
+            delta = self.delta()
+            present = ~np.isnan(self.close)
+            # pandas delta.where(delta > 0, 0) turns the first NaN delta into 0
+            gains = np.where(present, np.where(delta > 0, delta, 0.0), np.nan)
+            losses = np.where(present, np.where(delta < 0, -delta, 0.0), np.nan)
+            avg_gain = sma(gains, period)
+            avg_loss = sma(losses, period)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return self._cached(("rsi", period), compute)
+
+    def macd(self, fast: int, slow: int, signal: int = 9) -> Dict[str, np.ndarray]:
+        line = self._cached(("macd", fast, slow), lambda: self.ema(fast) - self.ema(slow))
+        signal_line = self._cached(("macd_signal", fast, slow, signal), lambda: ema(line, signal))
+        return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+    def bollinger(self, period: int, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+        middle = self.sma(period)
+        std = self._cached(("std", period), lambda: rolling_std(self.close, period))
+        return {"upper": middle + num_std * std, "middle": middle, "lower": middle - num_std * std}
+
+    def atr(self, period: int) -> np.ndarray:
+        return self._cached(("atr", period), lambda: sma(self.true_range(), period))
+
+    def obv(self) -> np.ndarray:
+        def compute():
+            if self.volume is None:
+                return np.full(self.close.shape, np.nan)
+            direction = np.sign(np.nan_to_num(self.delta()))
+            flows = np.where(np.isnan(self.close), 0.0, direction * np.nan_to_num(self.volume))
+            return np.where(np.isnan(self.close), np.nan, np.cumsum(flows, axis=-1))
+        return self._cached(("obv",), compute)
+
+    def adx(self, period: int) -> Dict[str, np.ndarray]:
+        def compute():
+            up = diff(self.high)
+            down = -diff(self.low)
+            with np.errstate(invalid="ignore"):
+                plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+                minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+            missing = np.isnan(up)
+            plus_dm[missing] = np.nan
+            minus_dm[missing] = np.nan
+            tr = np.where(missing, np.nan, self.true_range())
+            tr_sum = rolling_sum(tr, period)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                plus_di = 100.0 * rolling_sum(plus_dm, period) / tr_sum
+                minus_di = 100.0 * rolling_sum(minus_dm, period) / tr_sum
+                dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+            return plus_di, minus_di, sma(dx, period)
+        plus_di, minus_di, adx = self._cached(("adx", period), lambda: np.stack(compute()))
+        return {"adx": adx, "plus_di": plus_di, "minus_di": minus_di}
+
+    def cci(self, period: int) -> np.ndarray:
+        def compute():
+            tp = self.typical_price()
+            mean = sma(tp, period)
+            out = np.full(tp.shape, np.nan)
+            if tp.shape[-1] >= period:
+                windows = sliding_window_view(tp, period, axis=-1)
+                mad = np.abs(windows - mean[..., period - 1:, None]).mean(axis=-1)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[..., period - 1:] = (tp[..., period - 1:] - mean[..., period - 1:]) / (0.015 * mad)
+            return out
+        return self._cached(("cci", period), compute)
+
+    def stochastic(self, k_period: int, d_period: int = 3) -> Dict[str, np.ndarray]:
+        def compute():
+            lowest = rolling_min(self.low, k_period)
+            highest = rolling_max(self.high, k_period)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return 100.0 * (self.close - lowest) / (highest - lowest)
+        k = self._cached(("stoch_k", k_period), compute)
+        d = self._cached(("stoch_d", k_period, d_period), lambda: sma(k, d_period))
+        return {"k": k, "d": d}
+
+    def evaluate(self, spec: Dict[str, Iterable[Any]]) -> Dict[str, Any]:
+        """
+        Evaluate a normalized spec (see ``normalize_indicator_spec``).
+
+        Returns:
+            Mapping of result name (e.g. ``sma_20``, ``macd_12_26_9``, see
+            ``indicator_result_name``) to an array or a dict of arrays for
+            multi-line indicators
+        """
+        results: Dict[str, Any] = {}
+        for name, params in spec.items():
+            for p in params:
+                key = indicator_result_name(name, p)
+                if name == "sma":
+                    results[key] = self.sma(p)
+                elif name == "ema":
+                    results[key] = self.ema(p)
+                elif name == "rsi":
+                    results[key] = self.rsi(p)
+                elif name == "macd":
+                    fast, slow, signal = p
+                    results[key] = self.macd(fast, slow, signal)
+                elif name == "bb":
+                    period, num_std = p
+                    results[key] = self.bollinger(int(period), float(num_std))
+                elif name == "atr":
+                    results[key] = self.atr(p)
+                elif name == "adx":
+                    results[key] = self.adx(p)
+                elif name == "cci":
+                    results[key] = self.cci(p)
+                elif name == "stochastic":
+                    k_period, d_period = p
+                    results[key] = self.stochastic(int(k_period), int(d_period))
+                elif name == "obv":
+                    results[key] = self.obv()
+        return results
@@ -0,0 +1,85 @@
+"""
+Vectorized OHLCV resampling between bar intervals.
+
+A base series at the finest requested interval is bucketed by timestamp
+(floor to N minutes, hour, day, ISO week or month) and reduced with
+``reduceat``: first open, max high, min low, last close, summed volume.
+Intervals follow ``domain.entities.interval.Interval``.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Finest to coarsest; mirrors domain.entities.interval.Interval
+INTERVAL_ORDER = ("1m", "5m", "15m", "30m", "1H", "1d", "1W", "1M")
+
+_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1H": 60}
+_ALIASES = {"1h": "1H", "60m": "1H", "1D": "1d", "d": "1d", "1w": "1W", "w": "1W", "1mo": "1M"}
+
+Bars = Dict[str, np.ndarray]
+
+
+def normalize_interval(interval: str) -> str:
+    value = _ALIASES.get(interval, interval)
+    if value not in INTERVAL_ORDER:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return value
+
+
+def is_intraday(interval: str) -> bool:
+    return normalize_interval(interval) in _MINUTES
+
+
+def finest_interval(intervals: Iterable[str]) -> str:
+    return min((normalize_interval(i) for i in intervals), key=INTERVAL_ORDER.index)
+
+
+def can_resample(base: str, target: str) -> bool:
+    base, target = normalize_interval(base), normalize_interval(target)
+    if INTERVAL_ORDER.index(target) < INTERVAL_ORDER.index(base):
+        return False
+    if base in _MINUTES and target in _MINUTES:
+        return _MINUTES[target] % _MINUTES[base] == 0
+    return True
+
+
+def bucket_keys(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    interval = normalize_interval(interval)
+    ts = timestamps.astype("M8[m]")
+    if interval in _MINUTES:
+        step = _MINUTES[interval]
+        return (ts.astype(np.int64) // step * step).astype("M8[m]")
+    if interval == "1d":
+        return ts.astype("M8[D]")
+    if interval == "1W":
+        # The epoch is a Thursday; shift so buckets start on Monday
+        days = ts.astype("M8[D]").astype(np.int64)
+        return ((days + 3) // 7 * 7 - 3).astype("M8[D]")
+    return ts.astype("M8[M]").astype("M8[D]")
+
+
+def resample_ohlcv(bars: Bars, interval: str) -> Bars:
+    # ``bars`` holds equal-length arrays: date (datetime64, ascending), open, high, low, close, volume
+    dates = bars["date"]
+    if len(dates) == 0:
+        return {name: values[:0] for name, values in bars.items()}
+
+    keys = bucket_keys(dates, interval)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+
+    return {
+        "date": keys[starts],
+        "open": np.asarray(bars["open"], dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(np.asarray(bars["high"], dtype=np.float64), starts),
+        "low": np.minimum.reduceat(np.asarray(bars["low"], dtype=np.float64), starts),
+        "close": np.asarray(bars["close"], dtype=np.float64)[ends],
+        "volume": np.add.reduceat(np.asarray(bars["volume"], dtype=np.float64), starts),
+    }
+
+
+def format_bar_dates(dates: np.ndarray, interval: Optional[str] = None) -> np.ndarray:
+    if interval is not None and is_intraday(interval):
+        return np.char.replace(np.datetime_as_string(dates.astype("M8[s]")), "T", " ")
+    return np.datetime_as_string(dates.astype("M8[D]"))
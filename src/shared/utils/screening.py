@@ -0,0 +1,200 @@
+"""
+Vectorized fundamentals screening over a (ticker x ratio x period) matrix.
+
+Each ticker contributes its ratio table (every supported ratio over its
+reported periods); the matrix aligns all tickers on the union of period
+labels so a screen is a handful of array comparisons over the whole
+universe instead of one ratio query per ticker.
+
+Screen conditions are (ratio, operator, value) triples, given either as
+dicts ({"field": "roe", "op": ">", "value": 15}) or as an expression such
+as "roe > 15 and pe < 10". Comparisons against a missing value are false.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from shared.utils.financial_ratios import SUPPORTED_RATIOS, resolve_ratio
+
+_OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "=": np.equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+_CONDITION = re.compile(r"([a-z_/]+)\s*(>=|<=|==|!=|>|<|=)\s*(-?\d+(?:\.\d+)?)\s*%?", re.I)
+_CONJUNCTION = re.compile(r"\s*(?:\band\b|\bvà\b|&&?|,|;)\s*", re.I)
+
+
+class ScreenCondition(NamedTuple):
+    ratio: str
+    op: str
+    value: float
+
+
+def parse_conditions(filters: Union[str, Iterable[Any], None]) -> List[ScreenCondition]:
+    """
+    Normalize screen filters into conditions.
+
+    Args:
+        filters: Expression string, or an iterable of dicts/triples
+
+    Returns:
+        List of ScreenCondition
+
+    Raises:
+        ValueError: On an unknown ratio, operator or malformed expression
+    """
+    if not filters:
+        return []
+    if isinstance(filters, str):
+        parts = [p for p in _CONJUNCTION.split(filters.strip()) if p]
+        triples = []
+        for part in parts:
+            match = _CONDITION.fullmatch(part.strip())
+            if match is None:
+                raise ValueError(f"Cannot parse screen condition: {part!r}")
+            triples.append(match.groups())
+    else:
+        triples = [
+            (f.get("field") or f.get("ratio"), f.get("op"), f.get("value")) if isinstance(f, dict) else tuple(f)
+            for f in filters
+        ]
+
+    conditions = []
+    for name, op, value in triples:
+        ratio = resolve_ratio(name)
+        if ratio is None:
+            raise ValueError(f"Unknown ratio: {name}")
+        if op not in _OPS:
+            raise ValueError(f"Unknown operator: {op}")
+        conditions.append(ScreenCondition(ratio, op, float(value)))
+    return conditions
+
+
+def _last_finite(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Index of the last finite entry along the last axis, and whether one exists
+    finite = np.isfinite(values)
+    last = values.shape[-1] - 1 - np.argmax(finite[..., ::-1], axis=-1)
+    return last, finite.any(axis=-1)
+
+
+class FundamentalsMatrix:
+    """Ratio tables of many tickers aligned as one (ticker x ratio x period) array."""
+
+    def __init__(self, ratios: Sequence[str] = SUPPORTED_RATIOS):
+        self.ratios = tuple(ratios)
+        self.ratio_index = {name: i for i, name in enumerate(self.ratios)}
+        self._rows: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._built: Optional[Tuple[List[str], Dict[str, int], List[str], np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._rows
+
+    def update(self, ticker: str, periods: List[str], ratios: Dict[str, List[Optional[float]]],
+               loaded_at: Optional[float] = None) -> None:
+        """Replace a ticker's row; ``ratios`` maps ratio name to values over ``periods``."""
+        row = np.full((len(self.ratios), len(periods)), np.nan)
+        for name, values in ratios.items():
+            if name in self.ratio_index:
+                row[self.ratio_index[name]] = np.array(values, dtype=np.float64)
+        with self._lock:
+            self._rows[ticker] = (list(periods), row)
+            self._loaded_at[ticker] = loaded_at if loaded_at is not None else time.time()
+            self._built = None
+
+    def stale(self, tickers: Iterable[str], max_age_seconds: float, now: Optional[float] = None) -> List[str]:
+        """Tickers that are missing or were loaded more than ``max_age_seconds`` ago."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            return [t for t in tickers if now - self._loaded_at.get(t, -np.inf) > max_age_seconds]
+
+    def _build(self) -> Tuple[List[str], Dict[str, int], List[str], np.ndarray]:
+        with self._lock:
+            if self._built is not None:
+                return self._built
+            tickers = list(self._rows)
+            # "2024" and "2024-Q1" style labels sort chronologically as strings
+            periods = sorted({p for labels, _ in self._rows.values() for p in labels})
+            column = {p: i for i, p in enumerate(periods)}
+            values = np.full((len(tickers), len(self.ratios), len(periods)), np.nan)
+            for i, ticker in enumerate(tickers):
+                labels, row = self._rows[ticker]
+                if labels:
+                    values[i][:, [column[p] for p in labels]] = row
+            self._built = (tickers, {t: i for i, t in enumerate(tickers)}, periods, values)
+            return self._built
+
+    def snapshot(self, tickers: Optional[Iterable[str]] = None, period: Optional[str] = None,
+                 ratios: Optional[Sequence[str]] = None) -> Tuple[List[str], List[Optional[str]], np.ndarray]:
+        """
+        One value per (ticker, ratio), all of a ticker's values taken from a single period.
+
+        Args:
+            tickers: Universe to include (default: every loaded ticker)
+            period: Period label prefix ("2024" or "2024-Q1") restricting the candidate periods
+            ratios: Ratios that must all be reported in the chosen period; each ticker takes
+                its latest such period (default: its latest period reporting any ratio)
+
+        Returns:
+            (tickers, period label per ticker, values of shape (tickers, ratios))
+        """
+        all_tickers, row_of, periods, values = self._build()
+        rows = np.array([row_of[t] for t in tickers if t in row_of] if tickers is not None
+                        else range(len(all_tickers)), dtype=np.intp)
+        names = [all_tickers[r] for r in rows]
+        if not len(rows) or not periods:
+            return names, [None] * len(names), np.full((len(rows), len(self.ratios)), np.nan)
+
+        cube = values[rows]
+        if period:
+            columns = [i for i, p in enumerate(periods) if p.startswith(str(period))]
+            if not columns:
+                return names, [None] * len(names), np.full((len(rows), len(self.ratios)), np.nan)
+            cube = cube[:, :, columns]
+            labels = [periods[i] for i in columns]
+        else:
+            labels = periods
+
+        if ratios:
+            usable = np.isfinite(cube[:, [self.ratio_index[r] for r in ratios], :]).all(axis=1)
+        else:
+            usable = np.isfinite(cube).any(axis=1)
+        last, present = _last_finite(np.where(usable, 0.0, np.nan))
+        out = np.take_along_axis(cube, last[:, None, None], axis=-1)[..., 0]
+        out[~present] = np.nan
+
+        period_of = [labels[i] if ok else None for i, ok in zip(last, present)]
+        return names, period_of, out
+
+    def screen(self, values: np.ndarray, conditions: Sequence[ScreenCondition], sort_by: Optional[str] = None,
+               descending: bool = True, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Row indices of ``values`` (from ``snapshot``) matching every condition, sorted.
+
+        Rows with a missing sort value go last.
+        """
+        mask = np.ones(len(values), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for cond in conditions:
+                mask &= _OPS[cond.op](values[:, self.ratio_index[cond.ratio]], cond.value)
+        matches = np.flatnonzero(mask)
+
+        if sort_by is not None and len(matches):
+            key = values[matches, self.ratio_index[sort_by]]
+            key = np.where(np.isfinite(key), -key if descending else key, np.inf)
+            matches = matches[np.argsort(key, kind="stable")]
+        return matches[:limit] if limit else matches
@@ -0,0 +1,400 @@
+"""
+Incremental indicator state, updated in O(1) per new bar.
+
+Each state object keeps exactly what it needs to produce the next value
+(running window mean and variance, EMA numerators, monotonic deques for
+rolling extremes)
+and round-trips through ``to_dict``/``from_dict`` so it can be persisted per
+(ticker, indicator, params). Values match ``shared.utils.indicators`` on the
+same bar sequence.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Type
+
+
+class IndicatorState(ABC):
+    kind = ""
+
+    def __init__(self):
+        self.last_date: Optional[str] = None
+
+    @property
+    @abstractmethod
+    def params(self) -> Tuple[Any, ...]:
+        ...
+
+    @abstractmethod
+    def _step(self, close: float, high: float, low: float, volume: float) -> None:
+        ...
+
+    @abstractmethod
+    def value(self) -> Any:
+        ...
+
+    def update(self, bar: Dict[str, Any]) -> bool:
+        # Bars at or before the last seen date are ignored, so replaying a window is safe
+        date = bar.get("date")
+        if date is not None and self.last_date is not None and date <= self.last_date:
+            return False
+        close = float(bar["close"])
+        self._step(
+            close,
+            float(bar.get("high", close)),
+            float(bar.get("low", close)),
+            float(bar.get("volume", 0.0))
+        )
+        if date is not None:
+            self.last_date = date
+        return True
+
+    def update_many(self, bars: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for bar in bars if self.update(bar))
+
+    @abstractmethod
+    def _state(self) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def _restore(self, state: Dict[str, Any]) -> None:
+        ...
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "params": list(self.params), "last_date": self.last_date, "state": self._state()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorState":
+        state_cls = _STATE_TYPES[data["kind"]]
+        obj = state_cls(*data["params"])
+        obj.last_date = data.get("last_date")
+        obj._restore(data["state"])
+        return obj
+
+
+class RollingWindow:
+    """
+    Fixed-size window with a running mean and sum of squared deviations.
+
+    Updates use Welford's recurrence (with the sliding-window replace step), which
+    avoids the cancellation of sum-of-squares variance on price-sized values. The
+    running figures are recomputed exactly from the window every ``size`` pushes so
+    rounding error cannot accumulate over a long stream.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Deque[float] = deque(maxlen=size)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_recompute = 0
+
+    def push(self, x: float) -> None:
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.values.append(x)
+            mean = self._mean + (x - old) / self.size
+            self._m2 += (x - old) * (x - mean + old - self._mean)
+            self._mean = mean
+        else:
+            self.values.append(x)
+            delta = x - self._mean
+            self._mean += delta / len(self.values)
+            self._m2 += delta * (x - self._mean)
+
+        self._since_recompute += 1
+        if self._since_recompute >= self.size:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        n = len(self.values)
+        self._mean = math.fsum(self.values) / n if n else 0.0
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in self.values)
+        self._since_recompute = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def mean(self) -> Optional[float]:
+        return self._mean if self.full else None
+
+    def std(self, ddof: int = 1) -> Optional[float]:
+        if not self.full or self.size <= ddof:
+            return None
+        return (max(self._m2, 0.0) / (self.size - ddof)) ** 0.5
+
+    def to_list(self) -> List[float]:
+        return list(self.values)
+
+    @classmethod
+    def from_list(cls, size: int, values: List[float]) -> "RollingWindow":
+        window = cls(size)
+        window.values.extend(values)
+        window._recompute()
+        return window
+
+
+class MonotonicWindow:
+    """Sliding-window min or max via a monotonic deque of (index, value)."""
+
+    def __init__(self, size: int, mode: str = "min"):
+        self.size = size
+        self.mode = mode
+        self.items: Deque[Tuple[int, float]] = deque()
+        self.index = -1
+
+    def push(self, x: float) -> None:
+        self.index += 1
+        if self.mode == "min":
+            while self.items and self.items[-1][1] >= x:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] <= x:
+                self.items.pop()
+        self.items.append((self.index, x))
+        while self.items[0][0] <= self.index - self.size:
+            self.items.popleft()
+
+    def value(self) -> Optional[float]:
+        return self.items[0][1] if self.index + 1 >= self.size else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index": self.index, "items": [list(item) for item in self.items]}
+
+    @classmethod
+    def from_dict(cls, size: int, mode: str, data: Dict[str, Any]) -> "MonotonicWindow":
+        window = cls(size, mode)
+        window.index = data["index"]
+        window.items = deque((int(i), float(v)) for i, v in data["items"])
+        return window
+
+
+class EMA:
+    """pandas ``ewm(span, adjust=True)`` as a running numerator/denominator."""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.num = 0.0
+        self.den = 0.0
+
+    def push(self, x: float) -> float:
+        self.num = self.decay * self.num + x
+        self.den = self.decay * self.den + 1.0
+        return self.num / self.den
+
+    def value(self) -> Optional[float]:
+        return self.num / self.den if self.den > 0 else None
+
+
+class SMAState(IndicatorState):
+    kind = "sma"
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self.window = RollingWindow(self.period)
+
+    @property
+    def params(self):
+        return (self.period,)
+
+    def _step(self, close, _high, _low, _volume):
+        self.window.push(close)
+
+    def value(self):
+        return self.window.mean()
+
+    def _state(self):
+        return {"window": self.window.to_list()}
+
+    def _restore(self, state):
+        self.window = RollingWindow.from_list(self.period, state["window"])
+
+
+class EMAState(IndicatorState):
+    kind = "ema"
+
+    def __init__(self, span: int):
+        super().__init__()
+        self.span = int(span)
+        self.ema = EMA(self.span)
+
+    @property
+    def params(self):
+        return (self.span,)
+
+    def _step(self, close, _high, _low, _volume):
+        self.ema.push(close)
+
+    def value(self):
+        return self.ema.value()
+
+    def _state(self):
+        return {"num": self.ema.num, "den": self.ema.den}
+
+    def _restore(self, state):
+        self.ema.num, self.ema.den = state["num"], state["den"]
+
+
+class RSIState(IndicatorState):
+    """RSI over simple rolling averages of gains and losses (the service's convention)."""
+
+    kind = "rsi"
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self.prev_close: Optional[float] = None
+        self.gains = RollingWindow(self.period)
+        self.losses = RollingWindow(self.period)
+
+    @property
+    def params(self):
+        return (self.period,)
+
+    def _step(self, close, _high, _low, _volume):
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.gains.push(max(delta, 0.0))
+        self.losses.push(max(-delta, 0.0))
+        self.prev_close = close
+
+    def value(self):
+        if not self.gains.full:
+            return None
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        if avg_loss == 0:
+            return None if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def _state(self):
+        return {"prev_close": self.prev_close, "gains": self.gains.to_list(), "losses": self.losses.to_list()}
+
+    def _restore(self, state):
+        self.prev_close = state["prev_close"]
+        self.gains = RollingWindow.from_list(self.period, state["gains"])
+        self.losses = RollingWindow.from_list(self.period, state["losses"])
+
+
+class MACDState(IndicatorState):
+    kind = "macd"
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast, self.slow, self.signal = int(fast), int(slow), int(signal)
+        self.fast_ema = EMA(self.fast)
+        self.slow_ema = EMA(self.slow)
+        self.signal_ema = EMA(self.signal)
+
+    @property
+    def params(self):
+        return (self.fast, self.slow, self.signal)
+
+    def _step(self, close, _high, _low, _volume):
+        line = self.fast_ema.push(close) - self.slow_ema.push(close)
+        self.signal_ema.push(line)
+
+    def value(self):
+        if self.fast_ema.den == 0:
+            return None
+        line = self.fast_ema.value() - self.slow_ema.value()
+        signal = self.signal_ema.value()
+        return {"macd": line, "signal": signal, "histogram": line - signal}
+
+    def _state(self):
+        return {name: [ema.num, ema.den] for name, ema in
+                (("fast", self.fast_ema), ("slow", self.slow_ema), ("signal", self.signal_ema))}
+
+    def _restore(self, state):
+        for name, ema in (("fast", self.fast_ema), ("slow", self.slow_ema), ("signal", self.signal_ema)):
+            ema.num, ema.den = state[name]
+
+
+class BollingerState(IndicatorState):
+    kind = "bb"
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        super().__init__()
+        self.period = int(period)
+        self.num_std = float(num_std)
+        self.window = RollingWindow(self.period)
+
+    @property
+    def params(self):
+        return (self.period, self.num_std)
+
+    def _step(self, close, _high, _low, _volume):
+        self.window.push(close)
+
+    def value(self):
+        middle, std = self.window.mean(), self.window.std(ddof=1)
+        if middle is None or std is None:
+            return None
+        return {"upper": middle + self.num_std * std, "middle": middle, "lower": middle - self.num_std * std}
+
+    def _state(self):
+        return {"window": self.window.to_list()}
+
+    def _restore(self, state):
+        self.window = RollingWindow.from_list(self.period, state["window"])
+
+
+class StochasticState(IndicatorState):
+    kind = "stochastic"
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        super().__init__()
+        self.k_period, self.d_period = int(k_period), int(d_period)
+        self.lows = MonotonicWindow(self.k_period, "min")
+        self.highs = MonotonicWindow(self.k_period, "max")
+        self.k_values = RollingWindow(self.d_period)
+        self.k: Optional[float] = None
+
+    @property
+    def params(self):
+        return (self.k_period, self.d_period)
+
+    def _step(self, close, high, low, _volume):
+        self.lows.push(low)
+        self.highs.push(high)
+        lowest, highest = self.lows.value(), self.highs.value()
+        if lowest is None or highest == lowest:
+            # A flat window yields NaN %K in the batch engine, which also blanks %D
+            self.k = None
+            self.k_values = RollingWindow(self.d_period)
+            return
+        self.k = 100.0 * (close - lowest) / (highest - lowest)
+        self.k_values.push(self.k)
+
+    def value(self):
+        if self.k is None:
+            return None
+        return {"k": self.k, "d": self.k_values.mean()}
+
+    def _state(self):
+        return {
+            "lows": self.lows.to_dict(),
+            "highs": self.highs.to_dict(),
+            "k_values": self.k_values.to_list(),
+            "k": self.k,
+        }
+
+    def _restore(self, state):
+        self.lows = MonotonicWindow.from_dict(self.k_period, "min", state["lows"])
+        self.highs = MonotonicWindow.from_dict(self.k_period, "max", state["highs"])
+        self.k_values = RollingWindow.from_list(self.d_period, state["k_values"])
+        self.k = state["k"]
+
+
+_STATE_TYPES: Dict[str, Type[IndicatorState]] = {
+    cls.kind: cls for cls in (SMAState, EMAState, RSIState, MACDState, BollingerState, StochasticState)
+}
+
+STREAMING_INDICATORS = tuple(_STATE_TYPES)
+
+
+def make_indicator_state(kind: str, params: Any) -> IndicatorState:
+    args = params if isinstance(params, (list, tuple)) else (params,)
+    return _STATE_TYPES[kind](*args)
@@ -0,0 +1,64 @@
+"""
+Microbenchmarks: NumPy analytics kernels vs. the previous pure-Python loops.
+
+Run with:
+    PYTHONPATH=src python src/tests/benchmarks/bench_analytics.py
+"""
+
+import timeit
+
+import numpy as np
+
+from shared.utils.calculations import calculate_std_dev, calculate_volatility
+
+
+def legacy_volatility(price_data):
+    if len(price_data) < 2:
+        return 0.0
+    returns = []
+    for i in range(1, len(price_data)):
+        prev_price = price_data[i-1]["close"]
+        curr_price = price_data[i]["close"]
+        if prev_price != 0:
+            returns.append((curr_price - prev_price) / prev_price)
+    if not returns:
+        return 0.0
+    mean_return = sum(returns) / len(returns)
+    variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
+    return (variance ** 0.5) * (252 ** 0.5) * 100
+
+
+def legacy_std_dev(values):
+    if len(values) < 2:
+        return 0.0
+    mean = sum(values) / len(values)
+    variance = sum((x - mean) ** 2 for x in values) / len(values)
+    return variance ** 0.5
+
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<10} {seconds * 1e6:10.1f} us")
+    return seconds
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n in (20, 250, 2_500, 25_000):
+        prices = (100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))).tolist()
+        records = [{"close": p} for p in prices]
+        number = max(10, 200_000 // n)
+
+        print(f"calculate_volatility n={n}")
+        old = bench("legacy", lambda records=records: legacy_volatility(records), number)
+        new = bench("numpy", lambda records=records: calculate_volatility(records), number)
+        print(f"  speedup    {old / new:10.1f}x")
+
+        print(f"calculate_std_dev n={n}")
+        old = bench("legacy", lambda prices=prices: legacy_std_dev(prices), number)
+        new = bench("numpy", lambda prices=prices: calculate_std_dev(prices), number)
+        print(f"  speedup    {old / new:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Microbenchmark: per-ticker forecast latency, looping tickers vs. one batch fit.
+
+Compares the previous per-ticker statistics (Python lists), fitting the new
+models one ticker at a time, fitting all tickers as one batch, and the
+incremental update of cached state by one new bar.
+
+Run with:
+    PYTHONPATH=src python src/tests/benchmarks/bench_forecast.py
+"""
+
+import timeit
+from statistics import mean, stdev
+
+import numpy as np
+
+from shared.utils.forecasting import ForecastModels
+
+HISTORY_BARS = 500
+HORIZON = 5
+
+
+def legacy_forecast(close_prices):
+    sma_20 = mean(close_prices[-20:])
+    recent_trend = (close_prices[-1] - close_prices[-5]) / close_prices[-5]
+    volatility = stdev(close_prices[-20:])
+    projected_price = close_prices[-1] * (1 + recent_trend)
+    return projected_price, projected_price - volatility * 1.96, projected_price + volatility * 1.96, sma_20
+
+
+def bench(label, fn, tickers, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print(f"  {label:<14} {seconds / tickers * 1e3:10.3f} ms/ticker")
+    return seconds
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for tickers in (1, 30, 300):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (tickers, HISTORY_BARS)), axis=1))
+        lists = closes.tolist()
+        new_bar = closes[:, -1:] * 1.01
+        state = ForecastModels.fit(closes)
+        rows = state.to_rows()
+        number = max(1, 30 // tickers)
+
+        print(f"tickers={tickers} bars={HISTORY_BARS}")
+        bench("legacy", lambda lists=lists: [legacy_forecast(c) for c in lists], tickers, number)
+        looped = bench("fit per ticker", lambda closes=closes: [ForecastModels.fit(c).forecast(HORIZON) for c in closes], tickers, number)
+        batched = bench("fit batch", lambda closes=closes: ForecastModels.fit(closes).forecast(HORIZON), tickers, number)
+        bench("update 1 bar", lambda rows=rows, new_bar=new_bar: ForecastModels.from_rows(rows).update(new_bar).forecast(HORIZON), tickers, number)
+        print(f"  batch speedup  {looped / batched:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
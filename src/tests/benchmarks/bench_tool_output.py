@@ -0,0 +1,118 @@
+"""
+Benchmark: compact tool output encoding vs. the previous indented JSON.
+
+Payloads mirror what the services return: daily OHLCV records for several
+tickers over a year, and SMA/RSI/MACD/Bollinger series for one ticker.
+Reports characters, tokens and encode time for each form, plus the
+prompt-processing time those tokens imply at an assumed prefill rate
+(the LLM cannot be called offline; set PREFILL_TOKENS_PER_S to match the
+deployed provider).
+
+Tokens are counted with tiktoken's cl100k_base when its vocabulary is
+available locally, otherwise estimated with a word/number/punctuation
+split, which tracks BPE counts on JSON closely enough for comparison.
+
+Run with:
+    PYTHONPATH=src python src/tests/benchmarks/bench_tool_output.py
+"""
+
+import json
+import os
+import re
+import timeit
+
+import numpy as np
+
+from application.agents.tool_output import encode_tool_output
+
+TICKERS = ["VCB", "BID", "CTG", "TCB", "MBB", "HPG", "FPT", "VNM"]
+DAYS = 250
+PREFILL_TOKENS_PER_S = float(os.getenv("PREFILL_TOKENS_PER_S", "2000"))
+
+_PIECES = re.compile(r"\d{1,3}|[^\W\d_]+|\s+|[^\w\s]")
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return (lambda text: len(encoding.encode(text))), "tiktoken cl100k_base"
+    except Exception:
+        return (lambda text: len(_PIECES.findall(text))), "regex estimate (tiktoken vocabulary unavailable)"
+
+
+def _dates(n):
+    return [str(d) for d in np.datetime64("2024-01-01") + np.arange(n)]
+
+
+def ohlcv_payload(rng):
+    dates = _dates(DAYS)
+    payload = {}
+    for ticker in TICKERS:
+        close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.015, DAYS)))
+        payload[ticker] = [
+            {
+                "date": d,
+                "open": round(c * (1 + rng.normal(0, 0.005)), 2),
+                "high": round(c * 1.01, 2),
+                "low": round(c * 0.99, 2),
+                "close": round(c, 2),
+                "volume": int(rng.integers(100_000, 5_000_000)),
+            }
+            for d, c in zip(dates, close)
+        ]
+    return payload
+
+
+def indicator_payload(rng):
+    dates = _dates(DAYS)
+    series = lambda scale: (scale * (1 + np.cumsum(rng.normal(0, 0.01, DAYS)))).tolist()
+    records = lambda key, values: [{"date": d, key: v} for d, v in zip(dates, values)]
+    return {
+        "FPT": {
+            "sma_20": records("sma", series(100000)),
+            "rsi_14": records("rsi", series(50)),
+            "macd_12_26_9": {
+                "macd_line": records("macd", series(300)),
+                "signal_line": records("signal", series(250)),
+                "histogram": records("histogram", series(50)),
+            },
+            "bb_20_2": {
+                "upper_band": records("upper_band", series(105000)),
+                "middle_band": records("middle_band", series(100000)),
+                "lower_band": records("lower_band", series(95000)),
+            },
+        }
+    }
+
+
+def pretty(obj):
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def main():
+    count_tokens, method = _token_counter()
+    rng = np.random.default_rng(7)
+    cases = {
+        f"price {len(TICKERS)} tickers x {DAYS}d OHLCV": ohlcv_payload(rng),
+        f"indicators 1 ticker x {DAYS}d (SMA/RSI/MACD/BB)": indicator_payload(rng),
+    }
+
+    print(f"Token counting: {method}; prefill assumed at {PREFILL_TOKENS_PER_S:.0f} tokens/s\n")
+    for name, payload in cases.items():
+        print(name)
+        for label, encode in (("pretty json", pretty), ("compact", encode_tool_output)):
+            text = encode(payload)
+            runs = 20
+            encode_ms = timeit.timeit(lambda encode=encode, payload=payload: encode(payload), number=runs) / runs * 1000
+            tokens = count_tokens(text)
+            prefill_ms = tokens / PREFILL_TOKENS_PER_S * 1000
+            print(
+                f"  {label:<12} {len(text):>9,} chars {tokens:>8,} tokens "
+                f"encode {encode_ms:7.2f} ms  encode+prefill {encode_ms + prefill_ms:9.1f} ms"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
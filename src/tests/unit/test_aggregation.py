@@ -0,0 +1,86 @@
+"""
+Unit tests for the columnar aggregation engine and the services built on it.
+"""
+
+import statistics
+
+import numpy as np
+
+from application.services.financial.aggregate_service import perform_aggregation
+from application.services.financial.ranking_service import perform_ranking
+from application.services.market.compare_service import perform_comparison
+from shared.utils.aggregation import aggregate_rows, build_field_matrix, pooled_statistics
+
+
+def _payload(ticker, closes, dates=None):
+    dates = dates or [f"2026-01-{i + 1:02d}" for i in range(len(closes))]
+    return {
+        "ticker": ticker,
+        "data": [{"date": d, "close": c, "volume": 100 * (i + 1)} for i, (d, c) in enumerate(zip(dates, closes))]
+    }
+
+
+def _all_data():
+    return {
+        "VNM": _payload("VNM", [10.0, 12.0, 11.0, 15.0]),
+        "HPG": _payload("HPG", [20.0, 18.0, 19.0]),
+        "FPT": _payload("FPT", [5.0, 7.0], dates=["2026-01-02", "2026-01-04"]),
+        "BAD": {"error": "No data available"},
+    }
+
+
+def test_matrix_alignment_and_row_aggregates():
+    matrix = build_field_matrix(_all_data(), "close")
+    assert matrix.tickers == ["VNM", "HPG", "FPT"]
+    assert matrix.dates == ["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"]
+    assert not matrix.dense
+
+    rows = aggregate_rows(matrix)
+    for i, ticker in enumerate(matrix.tickers):
+        values = [item["close"] for item in _all_data()[ticker]["data"]]
+        assert rows["count"][i] == len(values)
+        assert np.isclose(rows["mean"][i], statistics.fmean(values))
+        assert np.isclose(rows["median"][i], statistics.median(values))
+        assert np.isclose(rows["std"][i], statistics.pstdev(values))
+        assert rows["min"][i] == min(values) and rows["max"][i] == max(values)
+        assert rows["first"][i] == values[0] and rows["latest"][i] == values[-1]
+
+
+def test_dense_fast_path():
+    data = {t: _payload(t, list(np.arange(5.0) + k)) for k, t in enumerate(["A", "B", "C"])}
+    matrix = build_field_matrix(data, "close")
+    assert matrix.dense
+    np.testing.assert_allclose(aggregate_rows(matrix)["latest"], [4.0, 5.0, 6.0])
+    assert pooled_statistics(matrix)["count"] == 15
+
+
+def test_perform_aggregation():
+    result = perform_aggregation(_all_data(), "close", "median")
+    pooled = [10.0, 12.0, 11.0, 15.0, 20.0, 18.0, 19.0, 5.0, 7.0]
+    assert result["result"]["value"] == statistics.median(pooled)
+    stats = result["overall_statistics"]
+    assert np.isclose(stats["std_dev"], statistics.pstdev(pooled))
+    assert stats["total_data_points"] == len(pooled)
+    assert result["ticker_breakdown"]["FPT"]["values"] == [5.0, 7.0]
+    assert result["valid_tickers"] == ["VNM", "HPG", "FPT"]
+    assert "error" in perform_aggregation({"BAD": {"error": "x"}}, "close", "mean")
+
+
+def test_perform_ranking():
+    result = perform_ranking(_all_data(), "close", "latest")
+    assert [r["ticker"] for r in result["ranking_list"]] == ["HPG", "VNM", "FPT"]
+    assert "data_points" not in result["ranking_list"][0]
+
+    result = perform_ranking(_all_data(), "close", "min")
+    assert [r["ticker"] for r in result["ranking_list"]] == ["FPT", "VNM", "HPG"]
+    assert result["ranking_list"][0]["data_points"] == 2
+    assert result["statistics"]["range"] == 13.0
+
+
+def test_perform_comparison():
+    data = _all_data()
+    result = perform_comparison({"VNM": data["VNM"], "BAD": data["BAD"]}, {"HPG": data["HPG"]}, "close")
+    assert result["main_tickers_stats"]["BAD"] == {"error": "No data available"}
+    assert result["main_tickers_stats"]["VNM"]["latest"] == 15.0
+    assert result["compare_overall"]["mean"] == 19.0
+    assert np.isclose(result["percentage_difference"]["mean"]["percentage"], (12.0 - 19.0) / 19.0 * 100)
@@ -0,0 +1,202 @@
+"""
+Unit tests for standing alert rules and the batched alert sweep.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.market import alert_service
+from infrastructure.observability.logging.logger import user_id_var
+from infrastructure.storage.alert_rules import (
+    AlertMonitor,
+    AlertRuleIndex,
+    AlertRuleStore,
+    get_alert_monitor,
+    set_alert_monitor_instance,
+)
+
+
+def _frame(closes):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-01-01", periods=len(closes)).strftime("%Y-%m-%d"),
+        "open": closes, "high": closes, "low": closes, "close": closes,
+        "volume": np.full(len(closes), 100),
+    })
+
+
+@pytest.fixture(autouse=True)
+def no_snapshot(monkeypatch):
+    monkeypatch.setattr("infrastructure.storage.market_snapshot.get_current_snapshot", lambda *a, **k: None)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AlertRuleStore(db_path=str(tmp_path / "alerts.db"))
+    yield store
+    store.close()
+
+
+def test_index_triggers_sorted_price_levels():
+    rules = [
+        {"id": 1, "ticker": "VCB", "condition": "above", "threshold": 90.0},
+        {"id": 2, "ticker": "VCB", "condition": "above", "threshold": 95.0},
+        {"id": 3, "ticker": "VCB", "condition": "above", "threshold": 100.0},
+        {"id": 4, "ticker": "VCB", "condition": "below", "threshold": 80.0},
+        {"id": 5, "ticker": "VCB", "condition": "below", "threshold": 96.0},
+        {"id": 6, "ticker": "HPG", "condition": "below", "threshold": 30.0},
+    ]
+    index = AlertRuleIndex(rules)
+    fired = index.evaluate({"VCB": 95.0, "HPG": 31.0})
+    assert sorted(t["rule_id"] for t in fired) == [1, 2, 5]
+
+    index.remove(2)
+    assert sorted(t["rule_id"] for t in index.evaluate({"VCB": 95.0})) == [1, 5]
+
+
+def test_percent_rules_anchor_reference_then_fire():
+    index = AlertRuleIndex([
+        {"id": 1, "ticker": "FPT", "condition": "percent_up", "threshold": 5.0},
+        {"id": 2, "ticker": "FPT", "condition": "percent_down", "threshold": 10.0},
+    ])
+    assert index.evaluate({"FPT": 100.0}) == []
+    assert index.assign_references({"FPT": 100.0}) == [(1, 100.0), (2, 100.0)]
+    assert index.evaluate({"FPT": 104.0}) == []
+    assert [t["rule_id"] for t in index.evaluate({"FPT": 105.0})] == [1]
+    assert [t["rule_id"] for t in index.evaluate({"FPT": 89.0})] == [2]
+
+
+def test_cross_rules_use_moving_average():
+    closes = np.array([10.0, 10.0, 10.0, 9.0, 12.0])
+    index = AlertRuleIndex([
+        {"id": 1, "ticker": "VNM", "condition": "cross_above", "threshold": 3, "indicator": "sma"},
+        {"id": 2, "ticker": "VNM", "condition": "cross_below", "threshold": 3, "indicator": "sma"},
+    ])
+    assert index.lookback_bars("VNM") == 4
+    fired = index.evaluate({"VNM": 12.0}, {"VNM": closes})
+    assert [t["rule_id"] for t in fired] == [1]
+    assert fired[0]["level"] == pytest.approx(31.0 / 3)
+
+
+def test_monitor_sweeps_each_ticker_once(store):
+    fetched = []
+
+    def fetch_bars(ticker, start, end):
+        fetched.append(ticker)
+        return _frame({"VCB": [90.0, 101.0], "HPG": [25.0, 26.0]}[ticker])
+
+    monitor = AlertMonitor(store, fetch_bars=fetch_bars)
+    for threshold in (95.0, 100.0, 105.0):
+        monitor.add_rule("VCB", "above", threshold)
+    monitor.add_rule("hpg", "below", 20.0)
+    received = []
+    monitor.add_listener(received.append)
+
+    triggers = monitor.sweep()
+    assert sorted(fetched) == ["HPG", "VCB"]
+    assert sorted(t["threshold"] for t in triggers) == [95.0, 100.0]
+    assert len(received) == 2
+
+    # Triggered rules are one-shot and persisted
+    assert sorted(t["threshold"] for t in monitor.sweep()) == []
+    statuses = {r["threshold"]: r["status"] for r in store.get_rules()}
+    assert statuses == {95.0: "triggered", 100.0: "triggered", 105.0: "active", 20.0: "active"}
+
+    # A fresh monitor reloads only active rules
+    assert len(AlertMonitor(store, fetch_bars=fetch_bars).index) == 2
+
+
+def test_handler_watch_list_and_cancel(store):
+    monitor = AlertMonitor(store, fetch_bars=lambda t, s, e: _frame([1.0]))
+    set_alert_monitor_instance(monitor)
+    token = user_id_var.set("u1")
+    try:
+        registered = alert_service.handle_alert_query({
+            "tickers": ["VCB", "BID"], "threshold": 5, "condition": "percent_up", "action": "watch"
+        })
+        assert registered["summary"] == {"total": 2, "watched_tickers": 2}
+        assert {r["user_id"] for r in store.get_rules()} == {"u1"}
+
+        rule_id = registered["registered"][0]["id"]
+        # An owner named in the parsed query is ignored
+        spoofed = alert_service.handle_alert_query({"action": "cancel", "alert_ids": [rule_id], "user_id": "u2"})
+        assert spoofed["cancelled"] == [rule_id]
+
+        user_id_var.set("u2")
+        assert alert_service.handle_alert_query({"action": "list", "user_id": "u1"})["rules"] == []
+        user_id_var.set("u1")
+        listing = alert_service.handle_alert_query({"action": "list"})
+        assert listing["summary"]["active"] == 1
+        assert monitor.index.tickers() == ["BID"]
+    finally:
+        user_id_var.reset(token)
+        set_alert_monitor_instance(None)
+
+
+def test_triggered_watch_alerts_reach_their_owner_once(store):
+    monitor = AlertMonitor(store, fetch_bars=lambda t, s, e: _frame([90.0, 101.0]))
+    monitor.add_rule("VCB", "above", 100.0, user_id="u1")
+    monitor.add_rule("VCB", "above", 95.0, user_id="u2")
+    assert len(monitor.sweep()) == 2
+
+    set_alert_monitor_instance(monitor)
+    token = user_id_var.set("u1")
+    try:
+        notices = alert_service.take_alert_notices()
+        assert notices.count("\n") == 0 and "VCB above 100" in notices and "101" in notices
+        assert alert_service.take_alert_notices() == ""
+    finally:
+        user_id_var.reset(token)
+        set_alert_monitor_instance(None)
+    assert [r["threshold"] for r in store.take_notifications("u2")] == [95.0]
+
+
+def test_one_shot_check_uses_batched_closes(monkeypatch):
+    calls = []
+
+    def fake_closes(tickers, lookback_bars=None, **kwargs):
+        calls.append(list(tickers))
+        return {"VCB": np.array([100.0, 104.0]), "HPG": np.array([25.0, 25.5])}
+
+    monkeypatch.setattr(alert_service, "fetch_latest_closes", fake_closes)
+    result = alert_service.handle_alert_query({"tickers": ["VCB", "HPG", "XYZ"], "threshold": 4, "condition": "percent_up"})
+
+    assert calls == [["VCB", "HPG", "XYZ"]]
+    assert [a.get("triggered") for a in result["alerts"]] == [True, False, None]
+    assert result["alerts"][2]["error"] == "No price data available"
+
+
+def test_rule_cancelled_during_a_sweep_does_not_fire(store):
+    monitor = AlertMonitor(store, fetch_bars=lambda t, s, e: _frame([90.0, 101.0]))
+    kept = monitor.add_rule("VCB", "above", 95.0)
+    cancelled = monitor.add_rule("VCB", "above", 100.0)
+    received = []
+    monitor.add_listener(received.append)
+
+    evaluate = monitor.index.evaluate
+
+    def evaluate_then_cancel(prices, closes=None):
+        triggers = evaluate(prices, closes)
+        # Another thread cancels after evaluation, before the triggers are recorded
+        store.cancel(cancelled["id"])
+        return triggers
+
+    monitor.index.evaluate = evaluate_then_cancel
+    assert [t["rule_id"] for t in monitor.sweep()] == [kept["id"]]
+    assert [t["rule_id"] for t in received] == [kept["id"]]
+    assert store.get_rule(cancelled["id"])["status"] == "cancelled"
+    assert len(monitor.index) == 0
+
+
+def test_fallback_monitor_runs_its_sweep_job(monkeypatch, tmp_path):
+    monkeypatch.setenv("ALERT_DB_PATH", str(tmp_path / "alerts.db"))
+    monkeypatch.setattr("infrastructure.dependencies.get_deps", lambda: None)
+    set_alert_monitor_instance(None)
+    monitor = get_alert_monitor()
+    try:
+        assert monitor.running
+    finally:
+        monitor.stop_background_job()
+        monitor.store.close()
+        set_alert_monitor_instance(None)
@@ -0,0 +1,103 @@
+"""
+Numerical-equivalence tests for the NumPy analytics kernels.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from shared.utils import analytics
+from shared.utils.calculations import calculate_std_dev, calculate_volatility
+
+
+def _legacy_volatility(price_data):
+    if len(price_data) < 2:
+        return 0.0
+    returns = []
+    for i in range(1, len(price_data)):
+        prev_price = price_data[i-1]["close"]
+        curr_price = price_data[i]["close"]
+        if prev_price != 0:
+            returns.append((curr_price - prev_price) / prev_price)
+    if not returns:
+        return 0.0
+    mean_return = sum(returns) / len(returns)
+    variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
+    return (variance ** 0.5) * (252 ** 0.5) * 100
+
+
+def _legacy_std_dev(values):
+    if len(values) < 2:
+        return 0.0
+    mean = sum(values) / len(values)
+    variance = sum((x - mean) ** 2 for x in values) / len(values)
+    return variance ** 0.5
+
+
+def _prices(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def test_volatility_matches_legacy():
+    cases = [
+        [{"close": p} for p in _prices()],
+        [{"close": 10.0}, {"close": 0.0}, {"close": 12.0}, {"close": 11.5}],
+        [{"close": 5.0}],
+        [{"close": 0.0}, {"close": 0.0}],
+        [],
+    ]
+    for data in cases:
+        assert math.isclose(calculate_volatility(data), _legacy_volatility(data), rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_std_dev_matches_legacy():
+    cases = [list(_prices(50)), [1.0], [], [3.0, 3.0, 3.0], [1e9 + 1, 1e9 + 2, 1e9 + 3]]
+    for values in cases:
+        assert math.isclose(calculate_std_dev(values), _legacy_std_dev(values), rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_returns():
+    prices = _prices(100)
+    expected = pd.Series(prices).pct_change().dropna().to_numpy()
+    np.testing.assert_allclose(analytics.simple_returns(prices), expected, rtol=1e-12)
+    np.testing.assert_allclose(analytics.log_returns(prices), np.log1p(expected), rtol=1e-9)
+    assert analytics.simple_returns([1.0]).size == 0
+
+
+def test_rolling_and_expanding_match_pandas():
+    series = pd.Series(_prices(120))
+    for window in (1, 5, 20):
+        np.testing.assert_allclose(
+            analytics.rolling_mean(series, window), series.rolling(window).mean(), rtol=1e-10, equal_nan=True
+        )
+        np.testing.assert_allclose(
+            analytics.rolling_std(series, window, ddof=1 if window > 1 else 0),
+            series.rolling(window).std(ddof=1 if window > 1 else 0),
+            rtol=1e-8, atol=1e-12, equal_nan=True
+        )
+    np.testing.assert_allclose(analytics.expanding_mean(series), series.expanding().mean(), rtol=1e-10)
+    np.testing.assert_allclose(
+        analytics.expanding_std(series, ddof=1), series.expanding().std(ddof=1), rtol=1e-7, equal_nan=True
+    )
+    assert np.isnan(analytics.rolling_mean([1.0, 2.0], 5)).all()
+
+
+def test_drawdown():
+    prices = [100.0, 120.0, 90.0, 130.0, 65.0, 70.0]
+    np.testing.assert_allclose(analytics.drawdown(prices), [0.0, 0.0, -0.25, 0.0, -0.5, 70 / 130 - 1])
+    assert math.isclose(analytics.max_drawdown(prices), -0.5)
+    assert analytics.max_drawdown([]) == 0.0
+
+
+def test_correlation():
+    rng = np.random.default_rng(3)
+    data = rng.normal(size=(4, 60))
+    np.testing.assert_allclose(analytics.correlation_matrix(data), np.corrcoef(data), atol=1e-12)
+    assert math.isclose(analytics.correlation(data[0], data[1]), np.corrcoef(data[0], data[1])[0, 1], abs_tol=1e-12)
+
+    with_constant = np.vstack([data[:2], np.ones(60)])
+    corr = analytics.correlation_matrix(with_constant)
+    assert corr[2, 2] == 0.0 and corr[0, 2] == 0.0
+    assert analytics.correlation([1.0, 1.0, 1.0], [1.0, 2.0, 3.0]) == 0.0
@@ -0,0 +1,117 @@
+"""
+Unit tests for the local OHLCV bar archive.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from infrastructure.api_clients.vn_stock_client import VNStockClient
+from infrastructure.storage import bar_archive
+from infrastructure.storage.bar_archive import BarArchive, _NpyPartitionFormat, set_bar_archive_instance
+
+
+def _bars(start, end):
+    dates = pd.bdate_range(start, end)
+    closes = np.arange(len(dates), dtype=float) + 100
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "open": closes - 1,
+        "high": closes + 1,
+        "low": closes - 2,
+        "close": closes,
+        "volume": np.arange(len(dates)) * 10,
+    })
+
+
+def _formats():
+    formats = [_NpyPartitionFormat()]
+    try:
+        formats.append(bar_archive._ArrowPartitionFormat())
+    except ImportError:
+        pass
+    return formats
+
+
+@pytest.fixture(params=_formats(), ids=lambda f: f.suffix)
+def archive(request, tmp_path):
+    return BarArchive(root=str(tmp_path / "archive"), partition_format=request.param)
+
+
+def test_append_and_read_across_year_partitions(archive):
+    bars = _bars("2023-12-20", "2024-01-10")
+    assert archive.append("VCB", bars, "2023-12-20", "2024-01-10", complete_through="2024-12-31") == len(bars)
+
+    frame = archive.read("VCB", "2023-12-28", "2024-01-03")
+    expected = bars[(bars["date"] >= "2023-12-28") & (bars["date"] <= "2024-01-03")].reset_index(drop=True)
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+    assert frame["volume"].dtype == np.int64
+
+
+def test_coverage_gaps_and_merge(archive):
+    archive.append("VCB", _bars("2024-01-01", "2024-01-31"), "2024-01-01", "2024-01-31", complete_through="2024-12-31")
+    archive.append("VCB", _bars("2024-03-01", "2024-03-31"), "2024-03-01", "2024-03-31", complete_through="2024-12-31")
+
+    assert archive.missing_ranges("VCB", "2024-01-10", "2024-01-20") == []
+    assert archive.missing_ranges("VCB", "2023-12-25", "2024-04-05") == [
+        ("2023-12-25", "2023-12-31"), ("2024-02-01", "2024-02-29"), ("2024-04-01", "2024-04-05")
+    ]
+
+    archive.append("VCB", _bars("2024-02-01", "2024-02-29"), "2024-02-01", "2024-02-29", complete_through="2024-12-31")
+    assert archive.coverage("VCB") == [("2024-01-01", "2024-03-31")]
+
+
+def test_unfinished_sessions_not_persisted(archive):
+    archive.append("VCB", _bars("2024-01-01", "2024-01-10"), "2024-01-01", "2024-01-10", complete_through="2024-01-08")
+    assert archive.read("VCB", "2024-01-01", "2024-01-10")["date"].iloc[-1] == "2024-01-08"
+    assert archive.missing_ranges("VCB", "2024-01-01", "2024-01-10") == [("2024-01-09", "2024-01-10")]
+
+
+class _FakeQuote:
+    def __init__(self):
+        self.calls = []
+
+    def history(self, start, end, interval):
+        self.calls.append((start, end))
+        frame = _bars(start, end).rename(columns={"date": "time"})
+        return frame
+
+
+def test_client_fetches_only_missing_ranges(tmp_path):
+    archive = BarArchive(root=str(tmp_path / "archive"), partition_format=_NpyPartitionFormat())
+    set_bar_archive_instance(archive)
+    try:
+        client = VNStockClient.__new__(VNStockClient)
+        client.ticker, client.quote, client.use_archive = "VCB", _FakeQuote(), True
+
+        first = client.fetch_trading_data(start="2024-01-01", end="2024-02-29", interval="1d")
+        second = client.fetch_trading_data(start="2024-01-15", end="2024-03-15", interval="1d")
+
+        assert client.quote.calls == [("2024-01-01", "2024-02-29"), ("2024-03-01", "2024-03-15")]
+        assert first["date"].iloc[0] == "2024-01-01" and first["date"].iloc[-1] == "2024-02-29"
+        assert second["date"].iloc[0] == "2024-01-15" and second["date"].iloc[-1] == "2024-03-15"
+        assert second["date"].is_unique
+    finally:
+        set_bar_archive_instance(None)
+
+
+def test_empty_or_short_responses_are_not_covered(archive):
+    # Vendor outage: nothing returned for a range with weekdays
+    assert archive.append("VCB", pd.DataFrame(), "2024-01-01", "2024-01-31", complete_through="2024-12-31") == 0
+    assert archive.coverage("VCB") == []
+
+    # Only a weekend asked for: settled without data
+    archive.append("VCB", pd.DataFrame(), "2024-01-06", "2024-01-07", complete_through="2024-12-31")
+    assert archive.coverage("VCB") == [("2024-01-06", "2024-01-07")]
+
+    # Bars stop on Wednesday: Thursday onward is refetched, the leading gap is not
+    archive.append("VCB", _bars("2024-01-10", "2024-01-17"), "2024-01-08", "2024-01-19", complete_through="2024-12-31")
+    assert archive.missing_ranges("VCB", "2024-01-06", "2024-01-19") == [("2024-01-18", "2024-01-19")]
+
+
+def test_writes_leave_no_temp_files(archive, tmp_path):
+    archive.append("VCB", _bars("2024-01-01", "2024-01-31"), "2024-01-01", "2024-01-31", complete_through="2024-12-31")
+    archive.append("VCB", _bars("2024-01-15", "2024-02-15"), "2024-01-15", "2024-02-15", complete_through="2024-12-31")
+
+    files = sorted(p.name for p in (tmp_path / "archive" / "1d" / "VCB").iterdir())
+    assert files == ["2024" + archive.format.suffix, "coverage.json"]
@@ -0,0 +1,110 @@
+"""
+Unit tests for compact tool output encoding.
+"""
+
+import json
+
+from application.agents import tool_output
+from application.agents.tool_output import ToolPayloadStore, encode_tool_output, get_tool_payload
+from shared.utils.compact_encoding import compact_payload, sample_indices
+
+
+def _bars(n, start=100.0):
+    return [
+        {"date": f"2024-01-{i % 28 + 1:02d}", "close": start + i * 0.5, "volume": 1000 + i}
+        for i in range(n)
+    ]
+
+
+def test_records_become_columns_with_summary():
+    compact, sampled = compact_payload({"VCB": _bars(3)})
+
+    assert not sampled
+    assert compact["VCB"] == {
+        "rows": 3,
+        "summary": {
+            "date": {"from": "2024-01-01", "to": "2024-01-03"},
+            "close": {"first": 100, "last": 101, "min": 100, "max": 101, "mean": 100.5, "change_pct": 1},
+            "volume": {"first": 1000, "last": 1002, "min": 1000, "max": 1002, "mean": 1001, "change_pct": 0.2},
+        },
+        "columns": {
+            "date": ["2024-01-01", "2024-01-02", "2024-01-03"],
+            "close": [100, 100.5, 101],
+            "volume": [1000, 1001, 1002],
+        },
+    }
+
+
+def test_downsampling_keeps_extremes_and_full_summary():
+    bars = _bars(500)
+    bars[137]["close"] = 999.0
+    bars[401]["close"] = 1.0
+    compact, sampled = compact_payload({"VCB": bars}, point_budget=40)
+
+    series = compact["VCB"]
+    assert sampled
+    assert series["rows"] == 500
+    assert series["sampled_rows"] == len(series["columns"]["close"]) <= 40
+    assert {999, 1} <= set(series["columns"]["close"])
+    assert series["columns"]["date"][0] == bars[0]["date"]
+    assert series["columns"]["close"][-1] == bars[-1]["close"]
+    assert series["summary"]["close"]["max"] == 999
+
+
+def test_sample_indices_within_budget():
+    columns = {"close": [float(i) for i in range(10)]}
+    assert list(sample_indices(columns, 10, 20)) == list(range(10))
+    assert len(sample_indices(columns, 10, 4)) <= 4
+
+
+def test_non_record_values_are_rounded_not_reshaped():
+    compact, _ = compact_payload({"pe": 12.3456789123, "items": ["a", "b"], "one": [{"x": 1.0}], "nan": float("nan")})
+    assert compact == {"pe": 12.3457, "items": ["a", "b"], "one": [{"x": 1}], "nan": None}
+
+
+def test_only_date_indexed_series_are_sampled():
+    ranking = [{"ticker": f"T{i:03d}", "roe": 30.0 - i * 0.1} for i in range(100)]
+    compact, sampled = compact_payload({"ranking": ranking}, point_budget=20)
+
+    assert not sampled
+    assert compact["ranking"]["rows"] == 100
+    assert "summary" not in compact["ranking"]
+    assert len(compact["ranking"]["columns"]["ticker"]) == 100
+
+
+def test_quantities_keep_their_integer_part():
+    compact, _ = compact_payload({
+        "volume": 12345678.0, "market_cap": 512345678901234.0, "close": 92.123456789, "pe": 18.4999999,
+    })
+    assert compact == {"volume": 12345678, "market_cap": 512345678901234, "close": 92.1235, "pe": 18.5}
+
+
+def test_encode_tool_output(monkeypatch):
+    encoded = encode_tool_output({"VCB": _bars(200)}, point_budget=20)
+    assert "\n" not in encoded
+    decoded = json.loads(encoded)
+    assert decoded["VCB"]["rows"] == 200
+    assert decoded["VCB"]["sampled_rows"] <= 20
+
+    monkeypatch.setenv("TOOL_OUTPUT_FORMAT", "pretty")
+    assert encode_tool_output({"error": "x"}) == '{\n  "error": "x"\n}'
+
+
+def test_encode_tool_output_keeps_full_payload(monkeypatch):
+    monkeypatch.setattr(tool_output, "_payload_store", ToolPayloadStore(max_entries=2))
+    payload = {"VCB": _bars(200)}
+    decoded = json.loads(encode_tool_output(payload, point_budget=20))
+    assert get_tool_payload(decoded["full_ref"]) is payload
+
+    assert "full_ref" not in json.loads(encode_tool_output({"VCB": _bars(5)}, point_budget=20))
+
+
+def test_payload_store_is_bounded_and_expires(monkeypatch):
+    store = ToolPayloadStore(max_entries=2, ttl_seconds=60)
+    refs = [store.put(i) for i in range(3)]
+    assert store.get(refs[0]) is None
+    assert [store.get(ref) for ref in refs[1:]] == [1, 2]
+
+    now = tool_output.time.monotonic()
+    monkeypatch.setattr(tool_output.time, "monotonic", lambda: now + 61)
+    assert store.get(refs[2]) is None
@@ -0,0 +1,133 @@
+"""
+Unit tests for the shared company profile store.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from application.services.company import company_service
+from infrastructure.storage import company_profiles
+from infrastructure.storage.company_profiles import CompanyProfileStore, compact_records
+
+_SECTIONS = {
+    "overview": [{"symbol": "VCB", "company_name": "Vietcombank", "icb_name3": "Ngân hàng"}],
+    "shareholders": [{"share_holder": "SBV", "share_own_percent": 0.748}],
+    "executives": [{"officer_name": "Nguyen Van A", "officer_position": "CEO"}],
+    "subsidiaries": [],
+}
+
+
+class _Fetcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, ticker, section):
+        self.calls.append((ticker, section))
+        return [dict(r) for r in _SECTIONS[section]]
+
+
+class _LongTermMemory:
+    def __init__(self, stored=None):
+        self.stored = stored or {}
+
+    def store_company_profile(self, ticker, profile, source="agent", confidence=0.8):
+        self.stored[ticker] = profile
+        return True
+
+    def get_company_profile(self, ticker):
+        if ticker not in self.stored:
+            return None
+        return type("Profile", (), {"profile": self.stored[ticker]})()
+
+
+def _store(tmp_path, monkeypatch, memory=None):
+    monkeypatch.setattr(company_profiles, "_long_term_memory", lambda: memory)
+    fetcher = _Fetcher()
+    return CompanyProfileStore(root=str(tmp_path), fetch_section=fetcher), fetcher
+
+
+def test_compact_records_drops_missing_values():
+    frame = pd.DataFrame({"Name": ["A", "B"], "pct": [np.float64(0.5), np.nan], "note": ["", None]})
+    assert compact_records(frame) == [{"name": "A", "pct": 0.5}, {"name": "B"}]
+    assert isinstance(compact_records(frame)[0]["pct"], float)
+    assert compact_records(pd.DataFrame()) == []
+
+
+def test_sections_are_fetched_lazily_once(tmp_path, monkeypatch):
+    store, fetcher = _store(tmp_path, monkeypatch)
+
+    assert store.get("vcb", ["shareholders"])["shareholders"][0]["share_holder"] == "SBV"
+    store.get("VCB", ["shareholders"])
+    store.get("VCB", ["executives", "shareholders"])
+    assert store.sector("VCB") == "Ngân hàng"
+
+    assert fetcher.calls == [("VCB", "shareholders"), ("VCB", "executives"), ("VCB", "overview")]
+
+
+def test_profile_persists_and_expires(tmp_path, monkeypatch):
+    store, fetcher = _store(tmp_path, monkeypatch)
+    store.get("VCB", ["overview", "shareholders"])
+
+    reloaded, refetcher = _store(tmp_path, monkeypatch)
+    assert reloaded.overview("VCB")["company_name"] == "Vietcombank"
+    assert refetcher.calls == []
+
+    reloaded.ttl_seconds = -1
+    reloaded.get("VCB", ["shareholders"])
+    assert refetcher.calls == [("VCB", "shareholders")]
+
+
+def test_long_term_memory_shares_the_record(tmp_path, monkeypatch):
+    memory = _LongTermMemory()
+    store, _ = _store(tmp_path / "a", monkeypatch, memory)
+    store.get("VCB", ["overview", "executives"])
+    store.flush()
+    assert set(memory.stored["VCB"]["sections"]) == {"overview", "executives"}
+
+    # A fresh store with no local files starts from the long-term memory record
+    cold, fetcher = _store(tmp_path / "b", monkeypatch, memory)
+    assert cold.get("VCB", ["executives"])["executives"][0]["officer_position"] == "CEO"
+    assert fetcher.calls == []
+
+
+def test_company_query_projects_sections(tmp_path, monkeypatch):
+    store, fetcher = _store(tmp_path, monkeypatch)
+    monkeypatch.setattr(company_service, "get_company_profile_store", lambda: store)
+
+    result = company_service.handle_company_query({"tickers": ["VCB"], "requested_field": "shareholders"})
+    assert result["VCB"]["total_shareholders"] == 1
+
+    # An empty section falls back to basic info from the overview
+    result = company_service.handle_company_query({"tickers": ["VCB"], "requested_field": "subsidiaries"})
+    assert result["VCB"]["company_info"] == {"company_name": "Vietcombank"}
+
+    company_service.handle_company_query({"tickers": ["VCB"], "requested_field": "shareholders"})
+    assert fetcher.calls == [("VCB", "shareholders"), ("VCB", "subsidiaries"), ("VCB", "overview")]
+
+
+def test_memory_writes_are_off_the_request_path_and_only_on_change(tmp_path, monkeypatch):
+    release = threading.Event()
+    writes = []
+
+    class _SlowMemory(_LongTermMemory):
+        def store_company_profile(self, ticker, profile, source="agent", confidence=0.8):
+            release.wait(5)
+            writes.append(sorted(profile["sections"]))
+            return super().store_company_profile(ticker, profile, source, confidence)
+
+    store, fetcher = _store(tmp_path, monkeypatch, _SlowMemory())
+    # Returns while the long-term memory write is still blocked
+    assert store.get("VCB", ["overview"])["overview"]["company_name"] == "Vietcombank"
+    assert writes == []
+    release.set()
+    store.flush()
+    assert writes == [["overview"]]
+
+    # An expired section refetched unchanged is not written again
+    store.ttl_seconds = -1
+    store.get("VCB", ["overview"])
+    store.flush()
+    assert len(fetcher.calls) == 2 and writes == [["overview"]]
+    store.close()
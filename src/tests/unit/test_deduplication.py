@@ -0,0 +1,129 @@
+"""
+Unit tests for LSH fact deduplication.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from infrastructure.memory.episodic.deduplication import FactDeduplicator, LSHIndex, find_duplicates
+
+_T0 = datetime(2026, 1, 1, 9, 0)
+
+
+def _unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _near(base, n, seed=3, noise=1e-3):
+    rng = np.random.default_rng(seed)
+    return _unit(base + rng.normal(0, noise, (n, len(base))))
+
+
+def test_candidate_pairs_stay_within_groups():
+    base = np.random.default_rng(0).standard_normal(32)
+    embeddings = _near(base, 4)
+    lsh = LSHIndex(32)
+
+    pairs = lsh.candidate_pairs(embeddings, ["a", "a", "b", "b"])
+    assert pairs.tolist() == [[0, 1], [2, 3]]
+    assert lsh.candidate_pairs(embeddings[:1], ["a"]).shape == (0, 2)
+
+
+def test_new_near_duplicates_are_dropped():
+    rng = np.random.default_rng(1)
+    base, other = rng.standard_normal(32), rng.standard_normal(32)
+    embeddings = np.vstack([_near(base, 2), _unit([other])])
+    is_new = np.array([False, True, True])
+
+    assert find_duplicates(embeddings, ["g"] * 3, is_new, 0.95, LSHIndex(32)) == [1]
+    # Vetted rows are never dropped, even when similar to an earlier row
+    assert find_duplicates(embeddings, ["g"] * 3, np.zeros(3, dtype=bool), 0.95, LSHIndex(32)) == []
+
+
+def test_chain_keeps_first_of_each_cluster():
+    base = np.random.default_rng(2).standard_normal(32)
+    embeddings = _near(base, 3)
+    # Rows 1 and 2 are both dropped against the kept row 0
+    assert find_duplicates(embeddings, ["g"] * 3, np.ones(3, dtype=bool), 0.95, LSHIndex(32)) == [1, 2]
+
+
+class _Cursor:
+    """Answers the deduplicator's queries from an in-memory fact list."""
+
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = 0
+        self._result = []
+
+    def execute(self, sql, params=None):
+        facts = sorted(self.db.facts, key=lambda f: (f[3], f[0]))
+        if "SELECT last_created_at" in sql:
+            self._result = [self.db.watermark] if self.db.watermark else []
+        elif "INSERT INTO episodic_dedup_state" in sql:
+            self.db.watermark = max(self.db.watermark or (params[1], params[2]), (params[1], params[2]))
+        elif "embedding::text" in sql:
+            episodes, types, end = params[0], params[1], (params[2], params[3])
+            self._result = [
+                (f[0], f[1], f[2], f[3], "[" + ",".join(map(str, f[4])) + "]")
+                for f in facts if f[1] in episodes and f[2] in types and (f[3], f[0]) <= end
+            ]
+        elif "SELECT id, episode_id" in sql:
+            start, limit = (params[0], params[1]), params[2]
+            self._result = [f[:4] for f in facts if (f[3], f[0]) > start][:limit]
+        elif "DELETE FROM episode_facts" in sql:
+            before = len(self.db.facts)
+            self.db.facts = [f for f in self.db.facts if f[0] not in params[0]]
+            self.rowcount = before - len(self.db.facts)
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Memory:
+    def __init__(self):
+        self.facts = []
+        self.watermark = None
+
+    @contextmanager
+    def get_connection(self):
+        memory = self
+
+        class _Conn:
+            def cursor(self):
+                return _Cursor(memory)
+
+            def commit(self):
+                pass
+
+        yield _Conn()
+
+
+def test_late_committed_fact_inside_window_is_deduplicated():
+    rng = np.random.default_rng(4)
+    base = rng.standard_normal(16)
+    near = _near(base, 2)
+    memory = _Memory()
+    dedup = FactDeduplicator(memory, batch_size=2, rescan_window_seconds=600)
+
+    memory.facts = [("f1", "e1", "price", _T0, near[0].tolist()),
+                    ("f2", "e2", "price", _T0 + timedelta(minutes=1), rng.standard_normal(16).tolist())]
+    assert dedup.run()["deleted"] == 0
+    assert memory.watermark == (_T0 + timedelta(minutes=1), "f2")
+
+    # Stamped before the watermark but committed after the previous pass
+    memory.facts.append(("f0", "e1", "price", _T0 - timedelta(seconds=30), near[1].tolist()))
+    assert dedup.run()["deleted"] == 1
+    assert [f[0] for f in memory.facts] == ["f2", "f0"]
+    assert memory.watermark == (_T0 + timedelta(minutes=1), "f2")
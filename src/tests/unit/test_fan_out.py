@@ -0,0 +1,113 @@
+"""
+Unit tests for multi-question fan-out.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from langchain.tools import tool
+from langchain_core.messages import AIMessage
+
+from application.agents import agent as agent_module
+from application.agents import fan_out as fan_out_module
+from application.agents.fan_out import QueryFanOut, synthesis_input
+from application.agents.hybrid_splitter import HybridQuerySplitter
+from application.agents.parallel_tools import ParallelToolExecutor
+
+
+@tool("handle_price_query", description="Price.")
+def price_tool(query: Optional[Dict[str, Any]] = None) -> str:
+    time.sleep(0.3)
+    return f'{{"{query["tickers"][0]}":"price"}}'
+
+
+@tool("handle_indicator_query", description="Indicator.")
+def indicator_tool(query: Optional[Dict[str, Any]] = None) -> str:
+    time.sleep(0.3)
+    return f'{{"{query["tickers"][0]}":"rsi"}}'
+
+
+_TOOLS = {"price_query": price_tool, "indicator_query": indicator_tool}
+
+
+class _Parser:
+    def parse(self, question):
+        query_type = "indicator_query" if "RSI" in question else "price_query"
+        return {"query_type": query_type, "tickers": [question.split()[-1]]}
+
+
+class _Provider:
+    def __init__(self):
+        self.synthesis = []
+        self.tool_calling = 0
+        provider = self
+
+        class _ToolCallingLLM:
+            def invoke(self, messages, **kwargs):
+                provider.tool_calling += 1
+                return AIMessage(content="single answer")
+
+        self._tool_llm = _ToolCallingLLM()
+
+    def get_tool_calling_llm(self, tools):
+        return self._tool_llm
+
+    def with_structured_output(self, **kwargs):
+        return None
+
+    def invoke_with_fallback(self, messages, model_kwargs=None):
+        self.synthesis.append(messages[-1].content)
+        return AIMessage(content="merged answer")
+
+
+def test_rule_split_on_ticker_and_field():
+    splitter = HybridQuerySplitter.__new__(HybridQuerySplitter)
+    assert splitter._rule_split("giá VCB và RSI của HPG") == ["giá VCB", "RSI của HPG"]
+    assert splitter._rule_split("giá NT2, RSI của PC1") == ["giá NT2", "RSI của PC1"]
+    assert splitter._rule_split("So sánh giá VCB và BID") == []
+    assert splitter._rule_split("Tính SMA9 và SMA20 của VIC") == []
+    # Indicator and ratio names are not tickers
+    assert splitter._rule_split("RSI và MACD của HPG") == []
+    assert splitter._rule_split("EPS và ROE của FPT") == []
+    # A comparison stays one question even when each side has a field
+    assert splitter._rule_split("So sánh giá VCB và giá BID") == []
+
+
+def test_may_be_compound():
+    assert HybridQuerySplitter.may_be_compound("giá VCB, RSI HPG")
+    assert HybridQuerySplitter.may_be_compound("giá VCB rồi xem tin tức")
+    assert not HybridQuerySplitter.may_be_compound("Giá VCB hôm nay?")
+    assert not HybridQuerySplitter.may_be_compound("giá VCB, HPG, FPT")
+    assert not HybridQuerySplitter.may_be_compound("giá VCB và HPG")
+    assert not HybridQuerySplitter.may_be_compound("So sánh giá VCB và giá BID")
+
+
+def test_pipelines_run_concurrently(monkeypatch):
+    monkeypatch.setattr(fan_out_module, "TOOL_REGISTRY", _TOOLS)
+    fan_out = QueryFanOut(_Parser(), ParallelToolExecutor(list(_TOOLS.values())))
+
+    start = time.monotonic()
+    answers = fan_out.run(["giá VCB", "RSI của HPG"])
+    assert time.monotonic() - start < 0.55
+
+    assert [a["result"] for a in answers] == ['{"VCB":"price"}', '{"HPG":"rsi"}']
+    text = synthesis_input("giá VCB và RSI của HPG", answers)
+    assert "[2] RSI của HPG" in text and 'Kết quả: {"HPG":"rsi"}' in text
+
+
+def test_agent_fans_out_compound_questions(monkeypatch):
+    provider = _Provider()
+    monkeypatch.setattr(agent_module, "LLMProvider", lambda: provider)
+    monkeypatch.setattr(agent_module, "TwoPhaseParser", lambda llm_provider=None: _Parser())
+    monkeypatch.setattr(fan_out_module, "TOOL_REGISTRY", _TOOLS)
+
+    agent = agent_module.StockAgent(fan_out=True)
+    agent.tool_node = agent.fan_out.executor = ParallelToolExecutor(list(_TOOLS.values()))
+
+    assert agent.run("giá VCB và RSI của HPG") == "merged answer"
+    assert provider.tool_calling == 0 and len(provider.synthesis) == 1
+    assert [q["query_type"] for q in agent._last_parsed_query["sub_queries"]] == ["price_query", "indicator_query"]
+
+    # Single questions take the regular parser -> agent loop
+    assert agent.run("Giá VCB hôm nay?") == "single answer"
+    assert provider.tool_calling == 1 and len(provider.synthesis) == 1
@@ -0,0 +1,188 @@
+"""
+Unit tests for the statement store and the vectorized ratio table.
+"""
+
+import os
+import threading
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.financial import financial_ratio_service
+from infrastructure.storage.statements import StatementStore, StatementTable, period_end, period_label
+from shared.utils.financial_ratios import compute_ratio_table, resolve_ratio, trailing_sum
+
+QUARTERS = ["2023-Q1", "2023-Q2", "2023-Q3", "2023-Q4", "2024-Q1"]
+
+
+def _frames(ticker, period):
+    # vnstock 4 layout: items as rows, periods as columns
+    columns = {"item": ["a", "b", "c", "d", "e"], "item_en": [
+        "Net revenue", "Attributable to parent company", "Total assets", "Owners' equity", "Outstanding shares",
+    ], "item_id": ["net_revenue", "attributable_to_parent_company", "total_assets", "owners_equity", "outstanding_shares"]}
+    for i, label in enumerate(QUARTERS):
+        columns[label] = [100.0 + 10 * i, 10.0 + i, 1000.0, 400.0, 10.0]
+    return [pd.DataFrame(columns)]
+
+
+class _Fetcher:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, ticker, period):
+        self.calls += 1
+        return _frames(ticker, period)
+
+
+class _Cache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl_hours=None):
+        self.data[key] = value
+        return True
+
+
+def test_period_labels():
+    assert period_label("Q1/2024") == "2024-Q1"
+    assert period_label("2024-Q4") == "2024-Q4"
+    assert period_label("2023") == "2023"
+    assert period_label("item_en") is None
+    assert period_end("2024-Q1") == date(2024, 3, 31)
+    assert period_end("2024") == date(2024, 12, 31)
+
+
+def test_ratio_table_uses_trailing_twelve_months():
+    items = {
+        "net_profit": np.array([10.0, 11.0, 12.0, 13.0, 14.0]),
+        "revenue": np.array([100.0, 110.0, 120.0, 130.0, 140.0]),
+        "equity": np.full(5, 400.0),
+        "shares_outstanding": np.full(5, 10.0),
+    }
+    prices = np.array([np.nan, 50.0, 50.0, 92.0, 100.0])
+    ratios = compute_ratio_table(items, prices, periods_per_year=4)
+
+    assert np.isnan(ratios["eps"][:3]).all()
+    assert ratios["eps"][3] == pytest.approx(4.6)
+    assert ratios["pe_ratio"][3] == pytest.approx(20.0)
+    assert ratios["roe"][4] == pytest.approx(50 / 400 * 100)
+    assert ratios["profit_margin"][0] == pytest.approx(10.0)
+    assert ratios["revenue_growth"][4] == pytest.approx(40.0)
+    assert np.isnan(ratios["current_ratio"]).all()
+    np.testing.assert_allclose(trailing_sum(np.arange(5.0), 2)[1:], [1.0, 3.0, 5.0, 7.0])
+
+
+def test_missing_quarter_only_blanks_its_windows():
+    values = np.array([1.0, 1.0, np.nan, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+    sums = trailing_sum(values, 4)
+    assert np.isnan(sums[:6]).all()
+    np.testing.assert_allclose(sums[6:], [4.0, 4.0, 4.0, 4.0])
+
+    items = {"net_profit": values * 10, "shares_outstanding": np.full(10, 10.0)}
+    eps = compute_ratio_table(items, np.full(10, 50.0), periods_per_year=4)["eps"]
+    assert eps[-1] == pytest.approx(4.0)
+
+
+def test_resolve_ratio_aliases():
+    assert resolve_ratio("PE") == "pe_ratio"
+    assert resolve_ratio("net_margin") == "profit_margin"
+    assert resolve_ratio("financial_ratio") is None
+
+
+def test_store_fetches_once_and_persists(tmp_path):
+    fetcher = _Fetcher()
+    store = StatementStore(root=str(tmp_path), fetch_statements=fetcher)
+
+    table = store.get("vcb")
+    assert table.periods == QUARTERS
+    assert table.items["revenue"][-1] == 140.0
+    store.get("VCB")
+    assert fetcher.calls == 1
+
+    reloaded = StatementStore(root=str(tmp_path), fetch_statements=fetcher).load("VCB")
+    assert reloaded.periods == QUARTERS
+    np.testing.assert_array_equal(reloaded.items["net_profit"], table.items["net_profit"])
+
+
+def test_concurrent_saves_do_not_share_a_temp_file(tmp_path):
+    store = StatementStore(root=str(tmp_path), fetch_statements=_Fetcher())
+    table = store.get("VCB")
+    threads = [threading.Thread(target=store.save, args=(table,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert os.listdir(tmp_path / "quarter") == ["VCB.json"]
+    assert StatementStore(root=str(tmp_path)).load("VCB").periods == QUARTERS
+
+
+def test_refresh_only_when_next_filing_is_due():
+    table = StatementTable.from_period_items("VCB", "quarter", {"2024-Q1": {"revenue": 1.0}}, fetched_at=0.0)
+    assert table.next_filing_due() == date(2024, 8, 14)
+
+    before_due = time.mktime(date(2024, 8, 1).timetuple())
+    after_due = time.mktime(date(2024, 8, 20).timetuple())
+    assert not StatementStore.needs_refresh(table, before_due)
+    assert StatementStore.needs_refresh(table, after_due)
+
+    table.fetched_at = after_due - 3600
+    assert not StatementStore.needs_refresh(table, after_due)
+
+
+def test_one_statement_fetch_serves_every_ratio(tmp_path, monkeypatch):
+    fetcher = _Fetcher()
+    monkeypatch.setattr(financial_ratio_service, "get_statement_store",
+                        lambda: StatementStore(root=str(tmp_path), fetch_statements=fetcher))
+    monkeypatch.setattr(financial_ratio_service, "_cache", lambda: cache)
+    cache = _Cache()
+    bar_calls = []
+
+    def get_bars(ticker, start, end, interval="1d"):
+        bar_calls.append((ticker, start))
+        dates = pd.date_range("2022-12-01", "2024-04-30", freq="D")
+        return pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": np.full(len(dates), 92.0)})
+
+    monkeypatch.setattr(financial_ratio_service, "get_bars", get_bars)
+    client = type("Client", (), {"ticker": "VCB"})()
+
+    pe = financial_ratio_service.get_financial_ratios(client, "pe", {})
+    roe = financial_ratio_service.get_financial_ratios(client, "roe", {})
+    history = financial_ratio_service.get_financial_ratios(client, "revenue_growth", {"year": 2024})
+
+    assert fetcher.calls == 1 and len(bar_calls) == 1
+    assert set(pe) == {"pe_ratio"}
+    assert pe["pe_ratio"]["period"] == "2024-Q1"
+    assert pe["pe_ratio"]["value"] == pytest.approx(92.0 * 1000 / (50.0 / 10.0))
+    assert "interpretation" in pe["pe_ratio"]
+    assert roe["roe"]["value"] == pytest.approx(12.5)
+    assert history["revenue_growth"]["value"] == pytest.approx(40.0)
+
+
+def test_quoted_prices_are_scaled_to_statement_units(monkeypatch):
+    # VCI quotes VCB around 92.5 (thousand VND); statements report VND
+    quarters = {f"2024-Q{q}": {
+        "net_profit": 6.25e12, "equity": 1.85e14, "shares_outstanding": 5e9, "dividends_paid": -1.25e12,
+    } for q in range(1, 5)}
+    table = StatementTable.from_period_items("VCB", "quarter", quarters, fetched_at=time.time())
+    monkeypatch.setattr(financial_ratio_service, "get_statement_store",
+                        lambda: type("Store", (), {"get": lambda self, ticker, period: table})())
+    monkeypatch.setattr(financial_ratio_service, "_cache", lambda: None)
+
+    def get_bars(ticker, start, end, interval="1d"):
+        dates = pd.date_range("2023-12-01", "2025-01-31", freq="D")
+        return pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": np.full(len(dates), 92.5)})
+
+    monkeypatch.setattr(financial_ratio_service, "get_bars", get_bars)
+    ratios = financial_ratio_service.get_ratio_table("VCB", "quarter")["ratios"]
+
+    assert ratios["eps"][-1] == pytest.approx(5000.0)
+    assert ratios["pe_ratio"][-1] == pytest.approx(18.5)
+    assert ratios["pb_ratio"][-1] == pytest.approx(92500 / 37000)
+    assert ratios["dividend_yield"][-1] == pytest.approx(5e12 / (5e9 * 92500) * 100)
@@ -0,0 +1,135 @@
+"""
+Unit tests for the vectorized forecast models and forecast service.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.market import forecast_service
+from shared.utils.forecasting import EWMA_LAMBDA, ForecastModels, right_aligned
+
+
+def _closes(n_tickers, n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (n_tickers, n_bars)), axis=1))
+
+
+def test_incremental_update_matches_full_fit():
+    closes = _closes(4, 300)
+    closes[1, :120] = np.nan
+
+    full = ForecastModels.fit(closes)
+    partial = ForecastModels.fit(closes[:, :260]).update(closes[:, 260:])
+
+    for name in ("ret_mean", "ewma_var", "ar_xtx", "ar_xty", "ar_lags", "tail", "last_price", "bars"):
+        np.testing.assert_allclose(getattr(partial, name), getattr(full, name), equal_nan=True)
+    assert partial.bars_since_fit.tolist() == [40] * 4
+
+
+def test_batch_fit_matches_single_ticker_fits():
+    closes = right_aligned([_closes(1, 250, seed=1)[0], _closes(1, 90, seed=2)[0]])
+    batch = ForecastModels.fit(closes).forecast(5)
+    for row in range(2):
+        single = ForecastModels.fit(closes[row][~np.isnan(closes[row])]).forecast(5)
+        for name in ("drift", "holt", "ar", "volatility"):
+            assert batch[name][row] == pytest.approx(single[name][0])
+
+
+def test_ewma_variance_and_holt_trend():
+    closes = _closes(1, 100)[0]
+    returns = np.diff(np.log(closes))
+    variance = returns[0] ** 2
+    for r in returns[1:]:
+        variance = EWMA_LAMBDA * variance + (1 - EWMA_LAMBDA) * r * r
+    assert ForecastModels.fit(closes).ewma_var[0] == pytest.approx(variance)
+
+    trending = 100 * np.exp(0.01 * np.arange(60))
+    projected = ForecastModels.fit(trending).forecast(10)
+    assert projected["holt"][0] == pytest.approx(trending[-1] * np.exp(0.1), rel=1e-3)
+    assert projected["drift"][0] == pytest.approx(trending[-1] * np.exp(0.1), rel=1e-6)
+
+
+def test_state_roundtrip():
+    models = ForecastModels.fit(_closes(3, 120))
+    restored = ForecastModels.from_rows(models.to_rows(["2024-05-31"] * 3))
+    for name, value in models.forecast(5).items():
+        np.testing.assert_allclose(restored.forecast(5)[name], value)
+
+
+class _DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl_hours=None):
+        self.data[key] = value
+
+
+def test_service_reuses_cached_state(monkeypatch):
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=200)
+    frames = {
+        ticker: pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": closes})
+        for ticker, closes in zip(("VCB", "FPT"), _closes(2, 200))
+    }
+    frames["NEW"] = frames["VCB"].head(10)
+    requests = []
+
+    def fake_bars(ticker, start, end, interval="1d"):
+        requests.append((ticker, start))
+        frame = frames[ticker]
+        return frame[(frame["date"] >= start) & (frame["date"] <= end)]
+
+    cache = _DictCache()
+    monkeypatch.setattr(forecast_service, "get_bars", fake_bars)
+    monkeypatch.setattr(forecast_service, "_cache", lambda: cache)
+
+    first = forecast_service.handle_forecast_query({"tickers": ["VCB", "FPT", "NEW"], "timeframe": "1w"})
+    assert first["forecasts"]["NEW"] == {"error": "Insufficient historical data for forecast"}
+    vcb = first["forecasts"]["VCB"]
+    assert vcb["data_points"] == 200 and set(vcb["model_projections"]) == {"drift", "holt", "ar"}
+    assert vcb["confidence_bounds"]["lower"] < vcb["projected_price"] < vcb["confidence_bounds"]["upper"]
+
+    # Another model misses the result cache but only fetches bars after the cached state
+    requests.clear()
+    second = forecast_service.handle_forecast_query({"tickers": ["VCB"], "timeframe": "1w", "model": "ar"})
+    assert requests == [("VCB", dates[-1].strftime("%Y-%m-%d"))]
+    assert second["model"] == "ar"
+    assert second["forecasts"]["VCB"]["projected_price"] == vcb["model_projections"]["ar"]
+
+
+def test_partial_session_bar_never_enters_the_state(monkeypatch):
+    today = pd.Timestamp.today().normalize()
+    dates = pd.bdate_range(end=today - pd.Timedelta(days=1), periods=100).append(pd.DatetimeIndex([today]))
+    closes = _closes(1, len(dates))[0]
+    frame = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": closes})
+    yesterday, today_label = dates[-2].strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+
+    def fake_bars(ticker, start, end, interval="1d"):
+        return frame[(frame["date"] >= start) & (frame["date"] <= end)]
+
+    cache = _DictCache()
+    monkeypatch.setattr(forecast_service, "get_bars", fake_bars)
+    monkeypatch.setattr(forecast_service, "_cache", lambda: cache)
+
+    # During the session today's bar is partial: the state stops at yesterday
+    monkeypatch.setattr(forecast_service, "_last_completed_session", lambda now: yesterday)
+    forecast_service.handle_forecast_query({"tickers": ["VCB"], "timeframe": "1w"})
+    state = cache.get(forecast_service._state_key("VCB"))
+    assert state["last_date"] == yesterday and state["bars"] == 100
+
+    # After the close the final bar is folded in incrementally
+    frame.loc[frame.index[-1], "close"] *= 1.01
+    monkeypatch.setattr(forecast_service, "_last_completed_session", lambda now: today_label)
+    forecast_service.handle_forecast_query({"tickers": ["VCB"], "timeframe": "1w", "model": "ar"})
+    state = cache.get(forecast_service._state_key("VCB"))
+    assert state["last_date"] == today_label and state["bars"] == 101
+
+
+def test_last_completed_session():
+    assert forecast_service._last_completed_session(datetime(2024, 5, 7, 10, 30)) == "2024-05-06"
+    assert forecast_service._last_completed_session(datetime(2024, 5, 7, 15, 5)) == "2024-05-07"
@@ -0,0 +1,63 @@
+"""
+Unit tests for the compiled guardrail scanner and the guardrails built on it.
+"""
+
+import re
+
+import pytest
+
+from infrastructure.guardrails.content_filter import HOMOGLYPHS, ZERO_WIDTH_CHARS, ContentFilter
+from infrastructure.guardrails.query_validator import PatternGuard
+from infrastructure.guardrails.scanner import CharClassifier, PatternSet, required_literals, scan_text
+from tests.benchmarks.bench_guardrails import CORPUS, legacy_content_filter, legacy_pattern_guard
+
+
+def _verdict(result):
+    return None if result.passed else result.metadata.get("type")
+
+
+def test_required_literals_sequence_and_branch():
+    assert required_literals(re.compile(r"(\bDROP\b.*\bTABLE\b|\bDROP\s+DATABASE\b)", re.I)) == {"table", "database"}
+    assert required_literals(re.compile(r"__import__|__builtins__", re.I)) == {"import__", "builtins__"}
+    assert required_literals(re.compile(r"file://", re.I)) == {"file://"}
+
+
+def test_required_literals_unknown_for_optional_or_class_only():
+    assert required_literals(re.compile(r"[`$][({]")) is None
+    assert required_literals(re.compile(r"(?:abc)?\d+")) is None
+
+
+def test_pattern_set_reports_first_pattern_in_order():
+    patterns = [re.compile(r"union\s+select", re.I), re.compile(r"select", re.I), re.compile(r"\d{3}")]
+    patterns_set = PatternSet(patterns)
+
+    assert patterns_set.find("UNION SELECT 1")[0] == 0
+    assert patterns_set.find("select 1")[0] == 1
+    # No literal required: always confirmed
+    assert patterns_set.find("giá 123")[0] == 2
+    assert patterns_set.find("giá VCB") is None
+
+
+@pytest.mark.parametrize("text", ["ſelect", "Kill", "İmport"])
+def test_pattern_set_follows_ignorecase_folding(text):
+    patterns = [re.compile(r"select", re.I), re.compile(r"kill", re.I), re.compile(r"import", re.I)]
+    assert PatternSet(patterns).search(text) is not None
+
+
+def test_scan_text_counts_in_one_pass():
+    classifier = CharClassifier(ZERO_WIDTH_CHARS, HOMOGLYPHS)
+    stats = scan_text("AB c\u200b!\u0430e\u0301", classifier)
+
+    assert stats.length == 9
+    assert stats.letters == 5
+    assert stats.uppercase == 2
+    assert stats.zero_width == 1
+    assert stats.homoglyphs == 1
+    assert stats.combining == 1
+    assert stats.uppercase_ratio == pytest.approx(0.4)
+
+
+@pytest.mark.parametrize("query", CORPUS)
+def test_verdicts_match_per_pattern_checks(query):
+    assert _verdict(ContentFilter().validate(query, "")) == legacy_content_filter(query)
+    assert _verdict(PatternGuard().validate(query, "")) == legacy_pattern_guard(query)
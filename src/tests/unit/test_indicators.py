@@ -0,0 +1,116 @@
+"""
+Equivalence tests for the vectorized indicator engine against pandas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from application.services.market.indicator_service import format_indicator_results
+from shared.utils.indicators import IndicatorEngine, normalize_indicator_spec
+
+
+def _ohlcv(n=120, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    volume = rng.integers(1_000, 10_000, n).astype(float)
+    return close, high, low, volume
+
+
+def _close(a, b):
+    np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_close_based_indicators_match_pandas():
+    close, high, low, volume = _ohlcv()
+    s = pd.Series(close)
+    engine = IndicatorEngine(close, high, low, volume)
+
+    _close(engine.sma(20), s.rolling(20).mean())
+    _close(engine.ema(12), s.ewm(span=12).mean())
+
+    delta = s.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    _close(engine.rsi(14), 100 - 100 / (1 + gain / loss))
+
+    macd_line = s.ewm(span=12).mean() - s.ewm(span=26).mean()
+    macd = engine.macd(12, 26, 9)
+    _close(macd["macd"], macd_line)
+    _close(macd["signal"], macd_line.ewm(span=9).mean())
+
+    bb = engine.bollinger(20, 2.0)
+    _close(bb["upper"], s.rolling(20).mean() + 2 * s.rolling(20).std())
+
+
+def test_range_indicators_match_pandas():
+    close, high, low, volume = _ohlcv()
+    h, l, c = pd.Series(high), pd.Series(low), pd.Series(close)
+    engine = IndicatorEngine(close, high, low, volume)
+
+    k = 100 * (c - l.rolling(14).min()) / (h.rolling(14).max() - l.rolling(14).min())
+    stoch = engine.stochastic(14, 3)
+    _close(stoch["k"], k)
+    _close(stoch["d"], k.rolling(3).mean())
+
+    prev = c.shift()
+    tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1)
+    _close(engine.atr(14), tr.rolling(14).mean())
+
+    tp = (h + l + c) / 3
+    mad = tp.rolling(20).apply(lambda w: np.abs(w - w.mean()).mean(), raw=True)
+    _close(engine.cci(20), (tp - tp.rolling(20).mean()) / (0.015 * mad))
+
+    obv = (np.sign(c.diff().fillna(0)) * volume).cumsum()
+    _close(engine.obv(), obv)
+
+    adx = engine.adx(14)["adx"]
+    assert np.isnan(adx[:27]).all() and not np.isnan(adx[27:]).any()
+    assert ((adx[27:] >= 0) & (adx[27:] <= 100)).all()
+
+
+def test_multi_ticker_matches_single():
+    series = [_ohlcv(seed=s) for s in (1, 2, 3)]
+    stacked = IndicatorEngine(*[np.stack(col) for col in zip(*series)])
+    spec = normalize_indicator_spec("macd", {"sma": [5, 20], "rsi": [14], "bb": [20], "macd": [12, 26]})
+    combined = stacked.evaluate(spec)
+    for row, ohlcv in enumerate(series):
+        single = IndicatorEngine(*ohlcv).evaluate(spec)
+        _close(combined["sma_20"][row], single["sma_20"])
+        _close(combined["rsi_14"][row], single["rsi_14"])
+        _close(combined["macd_12_26_9"]["histogram"][row], single["macd_12_26_9"]["histogram"])
+
+
+def test_result_names_carry_every_parameter():
+    engine = IndicatorEngine(_ohlcv()[0])
+    out = engine.evaluate({"bb": [(20, 2), (20, 2.5)], "macd": [(12, 26, 9), (12, 26, 5)]})
+    assert set(out) == {"bb_20_2", "bb_20_2.5", "macd_12_26_9", "macd_12_26_5"}
+    assert not np.allclose(out["bb_20_2"]["upper"][19:], out["bb_20_2.5"]["upper"][19:])
+
+
+def test_ragged_leading_nans():
+    close = _ohlcv()[0]
+    padded = np.concatenate([np.full(10, np.nan), close[10:]])
+    engine = IndicatorEngine(np.stack([close, padded]))
+    _close(engine.ema(12)[1, 10:], pd.Series(close[10:]).ewm(span=12).mean())
+    _close(engine.sma(5)[1, 10:], pd.Series(close[10:]).rolling(5).mean())
+
+
+def test_normalize_spec_and_formatting():
+    spec = normalize_indicator_spec("sma", {"macd": [12, 26], "rsi": [14], "unknown": [3]})
+    assert spec == {"sma": [20], "macd": [(12, 26, 9)], "rsi": [14]}
+    assert normalize_indicator_spec("bb", {})["bb"] == [(20, 2.0)]
+    # A flat list is one full parameter set when it fits, pairs otherwise
+    assert normalize_indicator_spec("macd", {"macd": [12, 26, 9]})["macd"] == [(12, 26, 9)]
+    assert normalize_indicator_spec("macd", {"macd": [12, 26, 5, 35]})["macd"] == [(12, 26, 9), (5, 35, 9)]
+
+    dates = [f"2026-01-{i:02d}" for i in range(1, 6)]
+    engine = IndicatorEngine([1.0, 2.0, 3.0, 4.0, 5.0])
+    out = format_indicator_results(dates, engine.evaluate({"sma": [3], "macd": [(12, 26, 9)]}))
+    assert out["sma_3"] == [
+        {"date": "2026-01-03", "sma": 2.0},
+        {"date": "2026-01-04", "sma": 3.0},
+        {"date": "2026-01-05", "sma": 4.0},
+    ]
+    assert out["macd_12_26_9"] == {"error": "Insufficient data for MACD calculation"}
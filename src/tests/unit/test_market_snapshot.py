@@ -0,0 +1,161 @@
+"""
+Unit tests for precomputed market snapshot tables.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.financial import ranking_service
+from application.services.market import sector_service
+from infrastructure.storage import market_snapshot
+from infrastructure.storage.market_snapshot import (
+    MarketSnapshotJob,
+    MarketSnapshotStore,
+    build_snapshot_table,
+    set_market_snapshot_store_instance,
+)
+from shared.utils.calculations import calculate_volatility
+
+
+def _frame(closes, volumes=None, start="2024-01-01"):
+    dates = pd.bdate_range(start, periods=len(closes)).strftime("%Y-%m-%d")
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "date": dates,
+        "open": closes - 1,
+        "high": closes + 1,
+        "low": closes - 2,
+        "close": closes,
+        "volume": volumes if volumes is not None else np.full(len(closes), 1000.0),
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MarketSnapshotStore(root=str(tmp_path / "snapshots"))
+    set_market_snapshot_store_instance(store)
+    yield store
+    set_market_snapshot_store_instance(None)
+
+
+def test_build_matches_per_ticker_calculations():
+    rng = np.random.default_rng(1)
+    long_closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, 300))
+    bars = {"AAA": _frame(long_closes, np.arange(300, dtype=float)), "BBB": _frame([10.0, 11.0, 12.1])}
+    table = build_snapshot_table(bars)
+    a, b = table[0], table[1]
+
+    assert str(a["ticker"]) == "AAA" and a["bars"] == 300
+    assert a["close"] == pytest.approx(long_closes[-1])
+    assert a["ret_1w"] == pytest.approx(long_closes[-1] / long_closes[-6] - 1)
+    assert a["ret_1y"] == pytest.approx(long_closes[-1] / long_closes[-253] - 1)
+    assert a["avg_volume_1m"] == pytest.approx(np.arange(300)[-22:].mean())
+    price_data = [{"close": c} for c in long_closes[-21:]]
+    assert a["volatility_20"] == pytest.approx(calculate_volatility(price_data))
+
+    assert b["ret_1d"] == pytest.approx(0.1)
+    assert np.isnan(b["ret_1w"])
+    assert b["avg_volume_1w"] == pytest.approx(1000.0)
+
+
+def test_store_roundtrip_is_memory_mapped(store):
+    store.write("2024-01-02", build_snapshot_table({"VCB": _frame([90.0, 91.0])}))
+    store.write("2024-01-03T1030", build_snapshot_table({"VCB": _frame([91.0, 92.0])}))
+    store.write("2024-01-03", build_snapshot_table({"VCB": _frame([91.0, 93.0])}))
+
+    assert store.labels() == ["2024-01-02", "2024-01-03T1030", "2024-01-03"]
+    fresh_store = MarketSnapshotStore(root=store.root)
+    snapshot = fresh_store.latest()
+    assert isinstance(snapshot.table, np.memmap)
+    assert snapshot.get("VCB", "close") == 93.0
+    assert snapshot.get("FPT", "close") is None
+    assert fresh_store.latest(on_or_before="2024-01-02").get("VCB", "close") == 91.0
+
+
+def test_store_prunes_old_snapshots(tmp_path):
+    store = MarketSnapshotStore(root=str(tmp_path), max_snapshots=2)
+    for day in ("2024-01-02", "2024-01-03", "2024-01-04"):
+        store.write(day, build_snapshot_table({"VCB": _frame([1.0, 2.0])}))
+    assert store.labels() == ["2024-01-03", "2024-01-04"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2024-01-03.json", "2024-01-03.npy", "2024-01-04.json", "2024-01-04.npy"
+    ]
+
+
+def test_job_labels_snapshot_by_last_bar(store):
+    frames = {"VCB": _frame([90.0, 91.0, 92.0]), "HPG": _frame([20.0, 21.0])}
+    job = MarketSnapshotJob(store, universe=lambda: list(frames), fetch_bars=lambda t, s, e: frames[t])
+    snapshot = job.run()
+    assert snapshot.label == "2024-01-03"
+    assert sorted(snapshot.tickers()) == ["HPG", "VCB"]
+
+
+def test_ranking_latest_served_from_snapshot(store, monkeypatch):
+    store.write("2024-01-03", build_snapshot_table({
+        "VCB": _frame([90.0, 91.0, 92.0]), "BID": _frame([40.0, 95.0]), "HPG": _frame([25.0, 26.0])
+    }))
+    monkeypatch.setattr(ranking_service, "get_price_data", lambda *a, **k: pytest.fail("vendor fetch"))
+
+    result = ranking_service.handle_ranking_query({
+        "tickers": ["VCB", "BID", "HPG"], "requested_field": "close", "aggregate": "latest",
+        "start": "2024-01-01", "end": "2024-01-31"
+    })
+    assert [r["ticker"] for r in result["ranking"]["ranking_list"]] == ["BID", "VCB", "HPG"]
+    assert "data_points" not in result["ranking"]["ranking_list"][0]
+
+
+def test_sector_uses_snapshot_and_scans_only_missing(store, monkeypatch):
+    store.write("2024-01-03", build_snapshot_table({"VCB": _frame([100.0, 105.0]), "BID": _frame([50.0, 49.0])}))
+    scanned = []
+
+    def fake_fetch(ticker, start, end, deadline):
+        scanned.append((ticker, end))
+        return np.array([10.0, 12.0]), np.array([5.0, 5.0])
+
+    monkeypatch.setattr(sector_service, "_cache", lambda: None)
+    monkeypatch.setattr(sector_service, "_get_tickers_in_sector", lambda s: ["VCB", "BID", "CTG"])
+    monkeypatch.setattr(sector_service, "_fetch_member_bars", fake_fetch)
+
+    result = sector_service.handle_sector_query({"sector": "banking", "timeframe": "1d"})
+    # The live member is measured over the same bars as the snapshot, ending on its date
+    assert scanned == [("CTG", "2024-01-03")]
+    assert result["as_of"] == "2024-01-03"
+    assert [(r["ticker"], r["performance_pct"], r["source"]) for r in result["ranked_tickers"]] == [
+        ("CTG", 20.0, "live"), ("VCB", 5.0, "snapshot"), ("BID", -2.0, "snapshot")
+    ]
+
+
+def test_stale_snapshot_ignored(store, monkeypatch):
+    store.write("2024-01-03", build_snapshot_table({"VCB": _frame([1.0, 2.0])}))
+    monkeypatch.setattr(market_snapshot.MarketSnapshot, "is_fresh", lambda self, hours: False)
+    assert market_snapshot.get_current_snapshot() is None
+
+
+def test_job_fetches_under_the_rate_limit(store):
+    frames = {"VCB": _frame([90.0, 91.0]), "HPG": _frame([20.0, 21.0]), "FPT": _frame([100.0, 101.0])}
+    slots = []
+
+    def rate_limit():
+        slots.append(1)
+        return len(slots) <= 2
+
+    job = MarketSnapshotJob(store, universe=lambda: list(frames), fetch_bars=lambda t, s, e: frames[t],
+                            max_workers=1, rate_limit=rate_limit)
+    snapshot = job.run()
+    assert len(slots) == 3
+    assert sorted(snapshot.tickers()) == ["HPG", "VCB"]
+
+
+def test_job_start_does_not_build_eagerly(store):
+    fetched = []
+    job = MarketSnapshotJob(store, universe=lambda: ["VCB"], fetch_bars=lambda t, s, e: fetched.append(t),
+                            rate_limit=lambda: True, startup_delay_seconds=60)
+    job.start_background_job()
+    try:
+        time.sleep(0.1)
+        assert fetched == []
+    finally:
+        job.stop_background_job()
@@ -0,0 +1,103 @@
+"""
+Unit tests for the parallel tool executor node.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from langchain.tools import tool
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+
+from application.agents.parallel_tools import ParallelToolExecutor
+from infrastructure.observability.logging.logger import request_id_var
+
+
+@tool("slow_tool", description="Sleeps for query['seconds'] and echoes the request id.")
+def slow_tool(query: Optional[Dict[str, Any]] = None) -> str:
+    time.sleep(query["seconds"])
+    return f"{query['label']}:{request_id_var.get()}"
+
+
+@tool("config_tool", description="Echoes the run tags it was invoked with.")
+def config_tool(query: Optional[Dict[str, Any]] = None, config: RunnableConfig = None) -> str:
+    return ",".join(config.get("tags") or [])
+
+
+@tool("broken_tool", description="Always fails.")
+def broken_tool(query: Optional[Dict[str, Any]] = None) -> str:
+    raise RuntimeError("boom")
+
+
+def _call(call_id, name, **query):
+    return {"id": call_id, "name": name, "args": {"query": query}, "type": "tool_call"}
+
+
+def test_calls_run_concurrently_in_order():
+    executor = ParallelToolExecutor([slow_tool])
+    calls = [_call(f"c{i}", "slow_tool", seconds=0.3 - i * 0.1, label=f"r{i}") for i in range(3)]
+
+    token = request_id_var.set("req-9")
+    try:
+        start = time.monotonic()
+        out = executor({"messages": [AIMessage(content="", tool_calls=calls)]})["messages"]
+        elapsed = time.monotonic() - start
+    finally:
+        request_id_var.reset(token)
+
+    assert elapsed < 0.5
+    assert [m.tool_call_id for m in out] == ["c0", "c1", "c2"]
+    assert [m.content for m in out] == ["r0:req-9", "r1:req-9", "r2:req-9"]
+
+
+def test_timeouts_and_errors_become_tool_errors():
+    executor = ParallelToolExecutor([slow_tool, broken_tool], timeouts={"slow_tool": 0.2})
+    calls = [
+        _call("a", "slow_tool", seconds=1.0, label="late"),
+        _call("b", "broken_tool"),
+        _call("c", "missing_tool"),
+    ]
+
+    start = time.monotonic()
+    out = executor.run(calls)
+    assert time.monotonic() - start < 0.6
+
+    assert "timed out within 0.2s" in out[0].content
+    assert out[1].content.startswith("TOOL_ERR#") and "boom" in out[1].content
+    assert "Unknown tool missing_tool" in out[2].content
+
+
+def test_no_tool_calls():
+    assert ParallelToolExecutor([slow_tool])({"messages": [AIMessage(content="done")]}) == {"messages": []}
+
+
+def test_deadline_starts_when_the_call_starts():
+    executor = ParallelToolExecutor([slow_tool], timeouts={"slow_tool": 0.45}, max_workers=1)
+    calls = [_call(f"c{i}", "slow_tool", seconds=0.3, label=f"r{i}") for i in range(2)]
+
+    # The second call waits 0.3s for the worker but still gets its full 0.45s
+    token = request_id_var.set("req-1")
+    try:
+        out = executor.run(calls)
+    finally:
+        request_id_var.reset(token)
+    assert [m.content for m in out] == ["r0:req-1", "r1:req-1"]
+
+
+def test_call_queued_past_its_timeout_is_not_started():
+    executor = ParallelToolExecutor([slow_tool], timeouts={"slow_tool": 0.2}, max_workers=1)
+    calls = [_call("a", "slow_tool", seconds=0.6, label="hung"), _call("b", "slow_tool", seconds=0.0, label="next")]
+
+    start = time.monotonic()
+    out = executor.run(calls)
+    assert time.monotonic() - start < 0.5
+    assert "timed out within 0.2s" in out[0].content
+    assert "did not start within 0.2s" in out[1].content
+
+
+def test_config_reaches_the_tool():
+    executor = ParallelToolExecutor([config_tool])
+    message = AIMessage(content="", tool_calls=[_call("a", "config_tool")])
+
+    out = executor({"messages": [message]}, {"tags": ["trace-me"]})["messages"]
+    assert out[0].content == "trace-me"
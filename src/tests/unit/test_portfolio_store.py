@@ -0,0 +1,123 @@
+"""
+Unit tests for the SQLite portfolio store.
+"""
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from infrastructure.storage.portfolio_store import PortfolioStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PortfolioStore(db_path=str(tmp_path / "portfolio.db"), legacy_json_path=None)
+    yield store
+    store.close()
+
+
+def test_average_cost_and_realized_pnl(store):
+    store.record_trade("VCB", "buy", 100, 80.0)
+    store.record_trade("VCB", "buy", 100, 100.0)
+    position = store.record_trade("VCB", "sell", 50, 110.0)
+
+    assert position["quantity"] == 150
+    assert position["cost_basis"] == pytest.approx(150 * 90.0)
+    assert position["realized_pnl"] == pytest.approx(50 * 20.0)
+
+    summary = store.get_summary()
+    assert summary["cost_basis"] == pytest.approx(13500.0)
+    assert summary["realized_pnl"] == pytest.approx(1000.0)
+    assert summary["open_positions"] == 1
+
+
+def test_sell_is_capped_and_closed_positions_keep_pnl(store):
+    store.record_trade("HPG", "buy", 10, 20.0)
+    store.record_trade("HPG", "sell", 25, 30.0)
+
+    assert store.get_holdings() == {}
+    assert store.get_summary() == {"cost_basis": 0, "realized_pnl": pytest.approx(100.0), "open_positions": 0}
+    assert [tx["quantity"] for tx in store.get_transactions()] == [10, 10]
+
+
+def test_users_are_isolated(store):
+    store.record_trade("FPT", "buy", 5, 100.0, user_id="alice")
+    store.adjust_quantity("VNM", 20, user_id="bob")
+
+    assert store.get_holdings("alice") == {"FPT": 5}
+    assert store.get_holdings("bob") == {"VNM": 20}
+    assert store.get_summary("bob")["cost_basis"] == 0
+
+    store.clear("alice")
+    assert store.get_holdings("alice") == {}
+    assert store.get_holdings("bob") == {"VNM": 20}
+
+
+def test_invalid_trade_rejected(store):
+    with pytest.raises(ValueError):
+        store.record_trade("VCB", "short", 10, 1.0)
+    with pytest.raises(ValueError):
+        store.record_trade("VCB", "buy", 0, 1.0)
+
+
+def test_legacy_json_imported_once(tmp_path):
+    legacy = tmp_path / "user_portfolio.json"
+    legacy.write_text(json.dumps({
+        "holdings": {"VCB": 150, "BID": 30},
+        "transactions": [
+            {"ticker": "VCB", "quantity": 200, "price": 90.0, "date": "2024-01-02T00:00:00", "type": "buy"},
+            {"ticker": "VCB", "quantity": 50, "price": 100.0, "date": "2024-02-01T00:00:00", "type": "sell"},
+        ]
+    }))
+    db_path = str(tmp_path / "portfolio.db")
+
+    store = PortfolioStore(db_path=db_path, legacy_json_path=str(legacy))
+    assert store.get_holdings() == {"BID": 30, "VCB": 150}
+    assert store.get_summary()["realized_pnl"] == pytest.approx(500.0)
+    store.close()
+
+    reopened = PortfolioStore(db_path=db_path, legacy_json_path=str(legacy))
+    assert reopened.get_holdings() == {"BID": 30, "VCB": 150}
+    assert len(reopened.get_transactions()) == 3
+    reopened.close()
+
+
+def test_failed_legacy_import_leaves_nothing_behind(tmp_path):
+    legacy = tmp_path / "user_portfolio.json"
+    trades = [
+        {"ticker": "VCB", "quantity": 100, "price": 90.0, "date": "2024-01-02T00:00:00", "type": "buy"},
+        {"ticker": "HPG", "quantity": 10, "date": "2024-01-03T00:00:00", "type": "buy"},
+    ]
+    legacy.write_text(json.dumps({"holdings": {}, "transactions": trades}))
+    db_path = str(tmp_path / "portfolio.db")
+
+    # The second trade has no price, so the whole import rolls back
+    store = PortfolioStore(db_path=db_path, legacy_json_path=str(legacy))
+    assert store.get_transactions() == []
+    store.close()
+
+    trades[1]["price"] = 25.0
+    legacy.write_text(json.dumps({"holdings": {}, "transactions": trades}))
+    retried = PortfolioStore(db_path=db_path, legacy_json_path=str(legacy))
+    assert retried.get_holdings() == {"HPG": 10, "VCB": 100}
+    assert len(retried.get_transactions()) == 2
+    retried.close()
+
+
+def test_close_releases_every_thread_connection(store):
+    worker = threading.Thread(target=store.record_trade, args=("VCB", "buy", 10, 90.0))
+    worker.start()
+    worker.join()
+    store.get_holdings()
+
+    connections = list(store._connections)
+    assert len(connections) == 2
+
+    store.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # The store reconnects on next use
+    assert store.get_holdings() == {"VCB": 10}
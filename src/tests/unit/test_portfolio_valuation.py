@@ -0,0 +1,82 @@
+"""
+Unit tests for the single-pass portfolio valuation.
+"""
+
+import pytest
+
+from application.services.portfolio import portfolio_service
+from application.services.portfolio.portfolio_service import (
+    PortfolioManager,
+    get_portfolio_allocation,
+    get_portfolio_performance,
+    get_portfolio_value,
+    value_portfolio,
+)
+from infrastructure.observability.logging.logger import user_id_var
+from infrastructure.storage.portfolio_store import PortfolioStore
+
+_MARKET = {
+    "VCB": {"price": 90.0, "sector": "Banking"},
+    "BID": {"price": 45.0, "sector": "Banking"},
+    "HPG": {"price": 25.0, "sector": "Steel"},
+    "XYZ": {"price_error": "No data"},
+}
+
+
+def _fake_resolve(calls):
+    def resolve(tickers, include_sectors=True):
+        calls.append(list(tickers))
+        return {t: dict(_MARKET[t]) for t in tickers}
+    return resolve
+
+
+def test_single_resolve_shared_by_value_and_allocation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(portfolio_service, "resolve_market_data", _fake_resolve(calls))
+
+    valuation = value_portfolio({"VCB": 100, "BID": 200, "HPG": 400, "XYZ": 10, "FPT": 0})
+    assert calls == [["VCB", "BID", "HPG", "XYZ"]]
+    assert valuation.unpriced == ["XYZ"]
+
+    value = get_portfolio_value({}, valuation)
+    assert value["portfolio_value"] == 9000 + 9000 + 10000
+    assert value["holdings"]["HPG"] == {"quantity": 400, "current_price": 25.0, "value": 10000.0}
+    assert value["unpriced_tickers"] == ["XYZ"]
+
+    allocation = get_portfolio_allocation({}, valuation)
+    assert allocation["allocation"]["Banking"]["value"] == 18000
+    assert round(allocation["allocation"]["Steel"]["percentage"], 6) == round(10000 / 28000 * 100, 6)
+    assert allocation["diversification_score"] == 50
+    assert len(calls) == 1
+
+
+def test_performance_leaves_unpriced_cost_out_of_unrealized_pnl(monkeypatch, tmp_path):
+    monkeypatch.setattr(portfolio_service, "resolve_market_data", _fake_resolve([]))
+    store = PortfolioStore(db_path=str(tmp_path / "portfolio.db"), legacy_json_path=None)
+    monkeypatch.setattr(portfolio_service, "get_portfolio_store", lambda: store)
+    manager = PortfolioManager()
+    manager.add_holding("VCB", 100, 80.0)
+    manager.add_holding("XYZ", 10, 500.0)
+
+    performance = get_portfolio_performance({}, value_portfolio(manager.get_holdings(), include_sectors=False))
+    store.close()
+
+    assert performance["total_invested"] == pytest.approx(13000.0)
+    assert performance["unrealized_pnl"] == pytest.approx(9000.0 - 8000.0)
+    assert performance["return_rate"] == pytest.approx(1000.0 / 8000.0 * 100)
+    assert performance["unpriced_tickers"] == ["XYZ"]
+
+
+def test_portfolio_owner_comes_from_the_request_context(monkeypatch, tmp_path):
+    monkeypatch.setattr(portfolio_service, "resolve_market_data", _fake_resolve([]))
+    store = PortfolioStore(db_path=str(tmp_path / "portfolio.db"), legacy_json_path=None)
+    monkeypatch.setattr(portfolio_service, "get_portfolio_store", lambda: store)
+    token = user_id_var.set("alice")
+    try:
+        portfolio_service.handle_portfolio_query({"portfolio": {"VCB": 100}, "user_id": "bob"})
+    finally:
+        user_id_var.reset(token)
+    holdings = {user: store.get_holdings(user) for user in ("alice", "bob")}
+    store.close()
+
+    assert holdings == {"alice": {"VCB": 100}, "bob": {}}
@@ -0,0 +1,106 @@
+"""
+Unit tests for the memory-bounded guardrail rate limiter.
+"""
+
+import pytest
+
+from infrastructure.guardrails import rate_limiter
+from infrastructure.guardrails.config import GuardrailConfig
+from infrastructure.guardrails.rate_limiter import RateLimiter
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def _config(**overrides):
+    cfg = GuardrailConfig()
+    cfg.rate_limit_backend = "memory"
+    for name, value in overrides.items():
+        setattr(cfg, name, value)
+    return cfg
+
+
+def test_burst_then_refill(clock):
+    limiter = RateLimiter(_config())
+
+    results = [limiter.validate("q", "1.1.1.1") for _ in range(6)]
+    assert [r.passed for r in results] == [True] * 5 + [False]
+    assert results[-1].metadata["limit_type"] == "burst"
+
+    clock.now += 3.0  # 20 requests / 60s refills one token every 3s
+    assert limiter.validate("q", "1.1.1.1").passed
+
+
+def test_hourly_limit_and_window_reset(clock):
+    limiter = RateLimiter(_config(rate_limit_hourly_per_ip=3))
+
+    passed = []
+    for _ in range(4):
+        passed.append(limiter.validate("q", "2.2.2.2").passed)
+        clock.now += 10
+    assert passed == [True, True, True, False]
+    assert limiter.validate("q", "2.2.2.2").metadata["limit_type"] == "hourly"
+
+    clock.now += 3600
+    assert limiter.validate("q", "2.2.2.2").passed
+
+
+def test_idle_clients_are_evicted(clock):
+    limiter = RateLimiter(_config())
+    for i in range(50):
+        limiter.validate("q", f"10.0.0.{i}")
+    assert len(limiter.clients) == 50
+
+    clock.now += 1800
+    limiter.validate("q", "10.0.1.1")
+    assert len(limiter.clients) == 51
+
+    clock.now += 1800 + rate_limiter._WHEEL_TICK_SECONDS
+    limiter.validate("q", "10.0.1.2")
+    assert set(limiter.clients) == {"10.0.1.1", "10.0.1.2"}
+
+
+def test_active_clients_are_rescheduled_not_dropped(clock):
+    limiter = RateLimiter(_config())
+    limiter.validate("q", "3.3.3.3")
+    clock.now += 3594
+    for _ in range(3):
+        limiter.validate("q", "3.3.3.3")
+
+    # The hourly window has ended when the wheel slot fires, but the bucket is still refilling
+    clock.now += 6
+    limiter.validate("q", "3.3.3.3")
+    assert limiter.clients["3.3.3.3"].tokens == pytest.approx(3.0)
+
+
+def test_client_count_is_bounded(clock):
+    limiter = RateLimiter(_config(rate_limit_max_clients=100))
+    for i in range(1000):
+        limiter.validate("q", f"192.168.{i // 256}.{i % 256}")
+        clock.now += 0.5
+
+    assert len(limiter.clients) <= 100
+    assert sum(map(len, limiter._wheel)) == len(limiter.clients)
+
+
+def test_redis_failure_falls_back_to_local_limits(clock):
+    class _BrokenRedis:
+        def register_script(self, script):
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter(_config(rate_limit_backend="redis"), redis_client=_BrokenRedis())
+
+    results = [limiter.validate("q", "4.4.4.4") for _ in range(6)]
+    assert [r.passed for r in results] == [True] * 5 + [False]
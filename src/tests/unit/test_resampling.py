@@ -0,0 +1,99 @@
+"""
+Unit tests for OHLCV interval resampling and multi-interval bar fetches.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.market import bar_service
+from shared.utils.resampling import (
+    bucket_keys,
+    can_resample,
+    finest_interval,
+    normalize_interval,
+    resample_ohlcv,
+)
+
+
+def _bars(dates, closes):
+    closes = np.asarray(closes, dtype=float)
+    return {
+        "date": np.asarray(dates, dtype="M8[m]"),
+        "open": closes - 0.5,
+        "high": closes + 1,
+        "low": closes - 1,
+        "close": closes,
+        "volume": np.full(len(closes), 10.0),
+    }
+
+
+def test_normalize_and_order():
+    assert normalize_interval("1h") == "1H"
+    assert normalize_interval("1w") == "1W"
+    assert finest_interval(["1d", "5m", "1H"]) == "5m"
+    assert can_resample("5m", "15m") and can_resample("1d", "1M")
+    assert not can_resample("1H", "5m")
+    with pytest.raises(ValueError):
+        normalize_interval("7m")
+
+
+def test_five_minute_to_hourly():
+    dates = pd.date_range("2024-01-02 09:15", periods=12, freq="5min")
+    bars = resample_ohlcv(_bars(dates, np.arange(12) + 100), "1H")
+
+    assert bars["date"].astype("M8[m]").tolist() == list(pd.to_datetime(["2024-01-02 09:00", "2024-01-02 10:00"]))
+    assert bars["open"].tolist() == [99.5, 108.5]
+    assert bars["high"].tolist() == [109.0, 112.0]
+    assert bars["low"].tolist() == [99.0, 108.0]
+    assert bars["close"].tolist() == [108.0, 111.0]
+    assert bars["volume"].tolist() == [90.0, 30.0]
+
+
+def test_daily_to_weekly_and_monthly():
+    dates = pd.bdate_range("2024-01-24", "2024-02-06")
+    weekly = resample_ohlcv(_bars(dates, np.arange(len(dates))), "1W")
+    assert np.datetime_as_string(weekly["date"]).tolist() == ["2024-01-22", "2024-01-29", "2024-02-05"]
+    assert weekly["volume"].tolist() == [30.0, 50.0, 20.0]
+
+    monthly = resample_ohlcv(_bars(dates, np.arange(len(dates))), "1M")
+    assert np.datetime_as_string(monthly["date"]).tolist() == ["2024-01-01", "2024-02-01"]
+    assert monthly["close"].tolist() == [5.0, 9.0]
+
+
+def test_week_buckets_start_on_monday():
+    keys = bucket_keys(np.array(["2024-03-03", "2024-03-04", "2024-03-10"], dtype="M8[D]"), "1W")
+    assert np.datetime_as_string(keys).tolist() == ["2024-02-26", "2024-03-04", "2024-03-04"]
+
+
+class _FakeClient:
+    calls = []
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def fetch_trading_data(self, start, end, interval):
+        self.calls.append(interval)
+        dates = pd.date_range("2024-01-02 09:00", periods=24, freq="5min")
+        closes = np.arange(24, dtype=float) + 50
+        return pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+            "open": closes, "high": closes + 1, "low": closes - 1, "close": closes,
+            "volume": np.full(24, 100),
+        })
+
+
+def test_multi_interval_bars_share_one_fetch(monkeypatch):
+    _FakeClient.calls = []
+    monkeypatch.setattr(bar_service, "VNStockClient", _FakeClient)
+    monkeypatch.setattr(bar_service, "_cache", lambda: None)
+
+    bars = bar_service.get_multi_interval_bars("VCB", "2024-01-02", "2024-01-02", ["5m", "1h", "1d"])
+
+    assert _FakeClient.calls == ["5m"]
+    assert len(bars["5m"]) == 24
+    assert bars["1H"]["date"].tolist() == ["2024-01-02 09:00:00", "2024-01-02 10:00:00"]
+    assert bars["1H"]["close"].tolist() == [61.0, 73.0]
+    daily = bars["1d"].iloc[0]
+    assert daily["date"] == "2024-01-02" and daily["volume"] == 2400
+    assert (daily["open"], daily["high"], daily["low"], daily["close"]) == (50.0, 74.0, 49.0, 73.0)
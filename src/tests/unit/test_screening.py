@@ -0,0 +1,150 @@
+"""
+Unit tests for the fundamentals screening matrix and service.
+"""
+
+import sys
+import time
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.financial import financial_ratio_service, screening_service
+from infrastructure.api_clients import vendor_limit
+from infrastructure.llm.intent_classifier import IntentClassifier
+from infrastructure.storage import statements
+from application.services.financial.screening_service import handle_screening_query
+from shared.utils.screening import FundamentalsMatrix, ScreenCondition, parse_conditions
+
+_TABLES = {
+    "VCB": {"periods": ["2023-Q4", "2024-Q1"], "ratios": {"roe": [20.0, 21.0], "pe_ratio": [14.0, 15.0]}},
+    "BID": {"periods": ["2023-Q4", "2024-Q1"], "ratios": {"roe": [18.0, 19.0], "pe_ratio": [9.0, 9.5]}},
+    "CTG": {"periods": ["2023-Q4"], "ratios": {"roe": [17.0], "pe_ratio": [7.0]}},
+    "STB": {"periods": ["2023-Q4", "2024-Q1"], "ratios": {"roe": [12.0, None], "pe_ratio": [6.0, 5.0]}},
+}
+
+
+def _matrix():
+    matrix = FundamentalsMatrix()
+    for ticker, table in _TABLES.items():
+        matrix.update(ticker, table["periods"], table["ratios"])
+    return matrix
+
+
+def test_parse_conditions_from_expression_and_dicts():
+    assert parse_conditions("ROE > 15% and P/E <= 10") == [
+        ScreenCondition("roe", ">", 15.0),
+        ScreenCondition("pe_ratio", "<=", 10.0),
+    ]
+    assert parse_conditions([{"field": "net_margin", "op": ">", "value": 5}]) == [
+        ScreenCondition("profit_margin", ">", 5.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_conditions("roe >> 15")
+    with pytest.raises(ValueError):
+        parse_conditions([{"field": "beta", "op": ">", "value": 1}])
+
+
+def test_snapshot_takes_one_period_per_ticker():
+    matrix = _matrix()
+    roe, pe = matrix.ratio_index["roe"], matrix.ratio_index["pe_ratio"]
+
+    tickers, periods, values = matrix.snapshot()
+    assert tickers == ["VCB", "BID", "CTG", "STB"]
+    assert periods == ["2024-Q1", "2024-Q1", "2023-Q4", "2024-Q1"]
+    np.testing.assert_allclose(values[:, roe], [21.0, 19.0, 17.0, np.nan])
+
+    # STB has no 2024-Q1 ROE: both ratios come from 2023-Q4 rather than a mix of quarters
+    _, periods, values = matrix.snapshot(ratios=["roe", "pe_ratio"])
+    assert periods == ["2024-Q1", "2024-Q1", "2023-Q4", "2023-Q4"]
+    np.testing.assert_allclose(values[3, [roe, pe]], [12.0, 6.0])
+
+    _, periods, values = _matrix().snapshot(["CTG", "VCB", "XXX"], period="2024")
+    assert periods == [None, "2024-Q1"]
+    assert np.isnan(values[0]).all()
+
+
+def test_screen_filters_and_sorts_vectorized():
+    matrix = _matrix()
+    tickers, _, values = matrix.snapshot()
+    conditions = parse_conditions("roe > 15 and pe < 10")
+
+    matches = matrix.screen(values, conditions, sort_by="roe")
+    assert [tickers[i] for i in matches] == ["BID", "CTG"]
+
+    ascending = matrix.screen(values, [], sort_by="pe_ratio", descending=False, limit=2)
+    assert [tickers[i] for i in ascending] == ["STB", "CTG"]
+
+
+def test_screening_query_loads_universe_once(monkeypatch):
+    loads = []
+
+    def get_ratio_table(ticker, period="quarter"):
+        loads.append(ticker)
+        return _TABLES.get(ticker)
+
+    monkeypatch.setattr(screening_service, "_matrices", {"quarter": FundamentalsMatrix(), "year": FundamentalsMatrix()})
+    monkeypatch.setattr(screening_service, "get_ratio_table", get_ratio_table)
+    monkeypatch.setattr(screening_service, "_universe", lambda parsed: list(_TABLES) + ["ZZZ"])
+
+    parsed = {"filters": [{"field": "roe", "op": ">", "value": 15}, {"field": "pe", "op": "<", "value": 10}]}
+    result = handle_screening_query(parsed)
+
+    assert [r["ticker"] for r in result["results"]] == ["BID", "CTG"]
+    assert result["results"][0] == {"ticker": "BID", "period": "2024-Q1", "roe": 19.0, "pe_ratio": 9.5}
+    assert result["total_screened"] == 5
+    assert "partial" not in result
+
+    handle_screening_query({"expression": "pe < 8", "sort_by": "pe", "order": "asc"})
+    assert sorted(loads) == sorted(list(_TABLES) + ["ZZZ"])
+
+
+def test_screening_query_rejects_unknown_ratio():
+    assert "error" in handle_screening_query({"expression": "beta > 1"})
+    assert "error" in handle_screening_query({})
+
+
+def test_universe_load_reports_pending_tickers(monkeypatch):
+    matrix = FundamentalsMatrix()
+    monkeypatch.setattr(screening_service, "_matrices", {"quarter": matrix})
+
+    def get_ratio_table(ticker, period="quarter"):
+        if ticker in ("BID", "STB"):
+            time.sleep(0.5)
+        return _TABLES.get(ticker)
+
+    monkeypatch.setattr(screening_service, "get_ratio_table", get_ratio_table)
+    pending = screening_service.load_universe(list(_TABLES), time_budget=0.2, max_workers=4)
+    assert sorted(pending) == ["BID", "STB"]
+    assert sorted(matrix.stale(_TABLES, 3600)) == ["BID", "STB"]
+
+
+def test_each_vendor_request_takes_a_slot(monkeypatch):
+    slots = []
+    monkeypatch.setattr(financial_ratio_service, "acquire_vendor_slot", lambda: slots.append("bars"))
+    monkeypatch.setattr(financial_ratio_service, "get_bars", lambda *a: pd.DataFrame())
+    financial_ratio_service._period_end_prices("VCB", np.array(["2024-03-31"], dtype="M8[D]"))
+    assert slots == ["bars"]
+
+    class _Finance:
+        def __init__(self, **kwargs):
+            pass
+
+        def __getattr__(self, report):
+            return lambda **kwargs: pd.DataFrame({"report": [report]})
+
+    monkeypatch.setitem(sys.modules, "vnstock", types.SimpleNamespace(Finance=_Finance))
+    monkeypatch.setattr(vendor_limit, "acquire_vendor_slot", lambda deadline=None: slots.append("statement"))
+    assert len(statements.fetch_vnstock_statements("VCB", "quarter")) == 4
+    assert slots == ["bars"] + ["statement"] * 4
+
+
+def test_keyword_fallback_only_routes_explicit_screens():
+    classify = IntentClassifier.__new__(IntentClassifier)._fallback_classify
+    assert classify("Sàng lọc cổ phiếu ngân hàng có ROE > 15%") == "screening"
+    assert classify("Lọc cổ phiếu có PE < 10") == "screening"
+    assert classify("Cổ phiếu nào có giá cao nhất hôm nay?") == "ranking"
+    assert classify("Tìm cổ phiếu có khối lượng lớn nhất") == "aggregate"
+    assert classify("Các mã có RSI trên 70") == "indicator"
+    assert classify("Những mã có tin tức tích cực") == "news_sentiment"
@@ -0,0 +1,78 @@
+"""
+Unit tests for the sector universe index.
+"""
+
+import os
+
+from infrastructure.storage.sector_index import SectorIndex, normalize_sector_name
+
+_ROWS = [
+    {"symbol": "VCB", "icb_name2": "Ngân hàng", "en_icb_name2": "Banks"},
+    {"symbol": "BID", "icb_name2": "Ngân hàng", "en_icb_name2": "Banks"},
+    {"symbol": "VHM", "icb_name2": "Bất động sản", "en_icb_name2": "Real Estate"},
+    {"symbol": "SSI", "icb_name2": "Dịch vụ tài chính", "en_icb_name2": "Financial Services"},
+    {"symbol": "HPG", "icb_name2": "Tài nguyên Cơ bản", "en_icb_name2": "Basic Resources"},
+    {"symbol": "XYZ"},
+]
+
+
+def _index(tmp_path, rows=_ROWS, calls=None):
+    def loader():
+        if calls is not None:
+            calls.append(1)
+        return rows
+    return SectorIndex(snapshot_path=str(tmp_path / "sectors.json"), loader=loader)
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize_sector_name("  Ngân  Hàng ") == "ngan hang"
+    assert normalize_sector_name("Bất động sản") == "bat dong san"
+    assert normalize_sector_name("Oil & Gas") == "oil and gas"
+
+
+def test_aliases_resolve_to_same_members(tmp_path):
+    index = _index(tmp_path)
+    for name in ("banking", "Ngân hàng", "ngan hang", "Banks", "BANK"):
+        assert index.tickers_for_sector(name) == ["BID", "VCB"]
+    assert index.tickers_for_sector("bất động sản") == ["VHM"]
+    assert index.tickers_for_sector("real estate") == ["VHM"]
+    assert index.tickers_for_sector("chứng khoán") == ["SSI"]
+    assert index.tickers_for_sector("steel") == ["HPG"]
+    assert index.tickers_for_sector("aviation") == []
+
+
+def test_ticker_to_sector(tmp_path):
+    index = _index(tmp_path)
+    assert index.sector_for_ticker("vcb") == "Ngân hàng"
+    assert index.sector_for_ticker("XYZ") is None
+
+
+def test_built_once_and_reloaded_from_snapshot(tmp_path):
+    calls = []
+    index = _index(tmp_path, calls=calls)
+    index.tickers_for_sector("banking")
+    index.sector_for_ticker("VHM")
+    assert len(calls) == 1
+    assert not index.is_stale()
+    assert [p.name for p in tmp_path.iterdir()] == ["sectors.json"]
+
+    reloaded = _index(tmp_path, rows=[], calls=calls)
+    assert reloaded.tickers_for_sector("banking") == ["BID", "VCB"]
+    assert len(calls) == 1
+
+
+def test_failed_refresh_keeps_previous_index(tmp_path):
+    index = _index(tmp_path)
+    index.refresh()
+
+    index.loader = lambda: []
+    assert index.refresh() is False
+    assert index.tickers_for_sector("banking") == ["BID", "VCB"]
+
+
+def test_default_snapshot_lives_in_the_data_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.delenv("SECTOR_INDEX_PATH", raising=False)
+    index = SectorIndex(loader=lambda: _ROWS)
+    assert index.refresh()
+    assert os.path.exists(tmp_path / "sector_index.json")
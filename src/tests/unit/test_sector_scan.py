@@ -0,0 +1,71 @@
+"""
+Unit tests for the concurrent sector scan.
+"""
+
+import time
+
+import numpy as np
+
+from application.services.market import sector_service
+from application.services.market.sector_service import compute_sector_metrics, handle_sector_query, scan_sector
+
+_BARS = {
+    "VCB": ([100.0, 102.0, 110.0], [1000, 2000, 3000]),
+    "BID": ([50.0, 45.0], [500, 700]),
+    "CTG": ([30.0, 33.0, 36.0, 30.0], [100, 100, 100, 100]),
+    "MBB": ([20.0], [10]),
+}
+
+
+def _fake_fetch(delays=None):
+    def fetch(ticker, start, end, deadline):
+        if delays and ticker in delays:
+            time.sleep(delays[ticker])
+        closes, volumes = _BARS[ticker]
+        return np.array(closes), np.array(volumes, dtype=float)
+    return fetch
+
+
+def _patch(monkeypatch, delays=None):
+    monkeypatch.setattr(sector_service, "_cache", lambda: None)
+    monkeypatch.setattr(sector_service, "_fetch_member_bars", _fake_fetch(delays))
+    monkeypatch.setattr(sector_service, "_get_tickers_in_sector", lambda sector: list(_BARS))
+
+
+def test_compute_sector_metrics_matches_per_ticker():
+    bars = {t: (np.array(c), np.array(v, dtype=float)) for t, (c, v) in _BARS.items()}
+    metrics = compute_sector_metrics(bars)
+
+    assert metrics["tickers"].tolist() == ["VCB", "BID", "CTG"]
+    np.testing.assert_allclose(metrics["performance_pct"], [10.0, -10.0, 0.0])
+    np.testing.assert_allclose(metrics["avg_volume"], [2000.0, 600.0, 100.0])
+
+    last_two = compute_sector_metrics(bars, last_n=2)
+    np.testing.assert_allclose(last_two["performance_pct"], [110 / 102 * 100 - 100, -10.0, 30 / 36 * 100 - 100])
+
+
+def test_snapshot_horizons_scan_the_snapshot_bar_window():
+    assert sector_service._scan_window("1d", "2024-01-31")[1:] == ("2024-01-31", 2)
+    assert sector_service._scan_window("1M", "2024-01-31")[2] == 22
+    assert sector_service._scan_window("2w")[2] is None
+
+
+def test_sector_query_ranks_all_members(monkeypatch):
+    _patch(monkeypatch)
+    result = handle_sector_query({"sector": "banking", "metric": "performance", "timeframe": "1w"})
+
+    assert [r["ticker"] for r in result["ranked_tickers"]] == ["VCB", "CTG", "BID"]
+    assert result["total_tickers"] == 3
+    assert "partial" not in result
+
+    by_volume = handle_sector_query({"sector": "banking", "metric": "volume"})
+    assert [r["ticker"] for r in by_volume["ranked_tickers"]] == ["VCB", "BID", "CTG"]
+
+
+def test_scan_returns_partial_results_within_budget(monkeypatch):
+    _patch(monkeypatch, delays={"CTG": 1.0})
+    started = time.monotonic()
+    seen = dict(scan_sector(list(_BARS), "2024-01-01", "2024-01-08", time_budget=0.3))
+
+    assert time.monotonic() - started < 0.9
+    assert set(seen) == {"VCB", "BID", "MBB"}
@@ -0,0 +1,199 @@
+"""
+Unit tests for short-term memory tail migration.
+"""
+
+import json
+
+import pytest
+from redis.exceptions import WatchError
+
+from infrastructure.memory.memory_manager import MemoryConfig, MemoryManager
+from infrastructure.memory.short_term.memory import ShortTermMemory
+
+
+def _slice(values, start, stop):
+    n = len(values)
+    start = max(start + n if start < 0 else start, 0)
+    stop = stop + n if stop < 0 else stop
+    return values[start:stop + 1]
+
+
+class _FakeRedis:
+    """List commands plus WATCH/MULTI/EXEC over an in-memory dict."""
+
+    def __init__(self):
+        self.lists = {}
+        self.versions = {}
+        self.on_watched_read = None
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+        self._touch(key)
+        return len(self.lists[key])
+
+    def ltrim(self, key, start, stop):
+        self.lists[key] = _slice(self.lists.get(key, []), start, stop)
+        self._touch(key)
+        return True
+
+    def lrange(self, key, start, stop):
+        return list(_slice(self.lists.get(key, []), start, stop))
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def expire(self, key, seconds):
+        return True
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.watched = {}
+        self.queued = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        self.watched = {key: self.client.versions.get(key, 0)}
+        self.queued = None
+
+    def lrange(self, key, start, stop):
+        values = self.client.lrange(key, start, stop)
+        if self.client.on_watched_read:
+            hook, self.client.on_watched_read = self.client.on_watched_read, None
+            hook()
+        return values
+
+    def multi(self):
+        self.queued = []
+
+    def ltrim(self, key, start, stop):
+        self.queued.append((key, start, stop))
+
+    def execute(self):
+        if any(self.client.versions.get(k, 0) != v for k, v in self.watched.items()):
+            raise WatchError("watched key changed")
+        for args in self.queued:
+            self.client.ltrim(*args)
+        self.watched, self.queued = {}, None
+
+
+class _Cache:
+    def __init__(self, client):
+        self.client = client
+
+    def _get_client(self):
+        return self.client
+
+    def _serialize(self, value):
+        return json.dumps(value)
+
+    def _deserialize(self, data):
+        return json.loads(data)
+
+
+@pytest.fixture
+def memory():
+    memory = ShortTermMemory.__new__(ShortTermMemory)
+    memory._redis = _Cache(_FakeRedis())
+    memory._message_list_key = "memory:short_term:messages"
+    memory.ttl_hours = 2
+    memory.max_messages = 100
+    memory.migration_threshold = 1000
+    return memory
+
+
+def _add(memory, *queries):
+    for q in queries:
+        memory.add_interaction(q, f"answer {q}")
+
+
+def _queries(memory):
+    return [json.loads(m)["content"]["user_query"] for m in memory._redis.client.lists[memory._message_list_key]]
+
+
+def test_oldest_interactions_are_removed_after_migration(memory):
+    _add(memory, "q1", "q2", "q3", "q4")
+
+    interactions, raw = memory.get_oldest_interactions(3)
+    assert [i["user_query"] for i in interactions] == ["q1", "q2", "q3"]
+
+    assert memory.remove_oldest(raw) == 3
+    assert _queries(memory) == ["q4"]
+
+
+def test_push_between_read_and_trim_is_kept(memory):
+    memory.max_messages = 5
+    _add(memory, "q1", "q2", "q3", "q4", "q5")
+    _, raw = memory.get_oldest_interactions(3)
+
+    # A concurrent writer pushes and cap-trims the tail while the chunk is migrating
+    _add(memory, "q6", "q7")
+
+    assert memory.remove_oldest(raw) == 1
+    assert _queries(memory) == ["q7", "q6", "q5", "q4"]
+
+
+def test_write_inside_the_transaction_is_retried(memory):
+    memory.max_messages = 4
+    _add(memory, "q1", "q2", "q3", "q4")
+    _, raw = memory.get_oldest_interactions(2)
+
+    memory._redis.client.on_watched_read = lambda: _add(memory, "q5")
+
+    assert memory.remove_oldest(raw) == 1
+    assert _queries(memory) == ["q5", "q4", "q3"]
+
+
+def test_nothing_is_removed_when_the_block_is_gone(memory):
+    _add(memory, "q1", "q2")
+    _, raw = memory.get_oldest_interactions(2)
+    memory._redis.client.lists[memory._message_list_key] = []
+    _add(memory, "q3")
+
+    assert memory.remove_oldest(raw) == 0
+    assert _queries(memory) == ["q3"]
+
+
+class _Episodic:
+    def __init__(self, during_write=None):
+        self.episodes = []
+        self.during_write = during_write
+
+    def bulk_migrate(self, episodes, chunk_size=50):
+        episodes = list(episodes)
+        if self.during_write:
+            self.during_write()
+        self.episodes.extend(episodes)
+        return sum(len(batch) for batch, _ in episodes)
+
+    def deduplicate_facts(self):
+        return 0
+
+
+def test_migration_never_drops_unmigrated_messages(memory):
+    memory.max_messages = 6
+    _add(memory, *(f"q{i}" for i in range(1, 7)))
+
+    manager = MemoryManager.__new__(MemoryManager)
+    manager.config = MemoryConfig(migration_batch_size=2, migration_chunk_size=4)
+    manager.short_term = memory
+    manager.episodic = _Episodic(during_write=lambda: _add(memory, "q7", "q8"))
+
+    manager._migrate_to_episodic(4)
+
+    migrated = [i["user_query"] for batch, _ in manager.episodic.episodes for i in batch]
+    assert migrated == ["q1", "q2", "q3", "q4"]
+    # q1/q2 were cap-trimmed by the writer after being read; q5 and later stay
+    assert _queries(memory) == ["q8", "q7", "q6", "q5"]
@@ -0,0 +1,144 @@
+"""
+Incremental indicator state must match the batch engine bar for bar.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.services.market import indicator_service
+from shared.utils.indicators import IndicatorEngine
+from shared.utils.streaming_indicators import IndicatorState, RollingWindow, make_indicator_state
+
+
+def _bars(n=80, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 30 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    bars = [
+        {"date": f"2026-{1 + i // 28:02d}-{1 + i % 28:02d}", "close": c, "high": h, "low": lo, "volume": 1000.0}
+        for i, (c, h, lo) in enumerate(zip(close, high, low))
+    ]
+    return bars, close, high, low
+
+
+def _check(state, expected, pick=lambda v: v):
+    bars = _bars()[0]
+    for i, bar in enumerate(bars):
+        # Round-trip through the persisted form every bar
+        state = IndicatorState.from_dict(state.to_dict())
+        assert state.update(bar)
+        value = state.value()
+        if np.isnan(expected[i]):
+            assert value is None or pick(value) is None
+        else:
+            assert np.isclose(pick(value), expected[i], rtol=1e-9, atol=1e-9)
+
+
+def test_streaming_matches_batch():
+    _, close, high, low = _bars()
+    engine = IndicatorEngine(close, high, low)
+
+    _check(make_indicator_state("sma", 10), engine.sma(10))
+    _check(make_indicator_state("ema", 12), engine.ema(12))
+    _check(make_indicator_state("rsi", 14), engine.rsi(14))
+    _check(make_indicator_state("macd", (12, 26, 9)), engine.macd(12, 26, 9)["signal"], lambda v: v["signal"])
+    _check(make_indicator_state("bb", (20, 2.0)), engine.bollinger(20, 2.0)["upper"], lambda v: v["upper"])
+    _check(make_indicator_state("stochastic", (14, 3)), engine.stochastic(14, 3)["k"], lambda v: v["k"])
+    _check(make_indicator_state("stochastic", (14, 3)), engine.stochastic(14, 3)["d"], lambda v: v["d"])
+
+
+def test_replayed_bars_are_ignored():
+    bars = _bars()[0]
+    state = make_indicator_state("sma", 5)
+    assert state.update_many(bars[:50]) == 50
+    before = state.value()
+    assert state.update_many(bars[:51]) == 1
+    assert state.last_date == bars[50]["date"]
+    assert state.value() != before
+
+
+def test_indicator_state_is_abstract():
+    with pytest.raises(TypeError):
+        IndicatorState()
+
+
+def test_rolling_window_stays_exact_on_long_streams():
+    rng = np.random.default_rng(1)
+    values = 1e4 + rng.normal(0, 1e-3, 50_000)
+    window = RollingWindow(20)
+    for x in values:
+        window.push(x)
+
+    assert np.isclose(window.mean(), values[-20:].mean(), rtol=1e-12)
+    assert np.isclose(window.std(), values[-20:].std(ddof=1), rtol=1e-9)
+
+
+class _Cache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl_hours=None):
+        self.data[key] = value
+
+
+class _Vendor:
+    """Serves slices of ``frame`` and records each requested range."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.fetches = []
+
+    def __call__(self, ticker, start, end, intervals):
+        self.fetches.append((start, end))
+        frame = self.frame
+        return {intervals[0]: frame[(frame["date"] >= start) & (frame["date"] <= end)].reset_index(drop=True)}
+
+
+@pytest.fixture
+def vendor(monkeypatch):
+    cache = _Cache()
+    vendor = _Vendor(pd.DataFrame(_bars()[0]).iloc[:60])
+    monkeypatch.setattr(indicator_service, "_cache", lambda: cache)
+    monkeypatch.setattr(indicator_service, "get_multi_interval_bars", vendor)
+    return vendor
+
+
+def _latest_sma(window=10):
+    return indicator_service.get_latest_indicator_values("VCB", {"sma": [window]}, "2026-01-01", "2026-12-31")
+
+
+def test_latest_only_fetches_bars_after_the_stored_state(vendor):
+    frame = pd.DataFrame(_bars()[0])
+
+    assert _latest_sma()["sma_10"]["date"] == frame["date"].iloc[59]
+    assert vendor.fetches == [("2026-01-01", "2026-12-31")]
+
+    vendor.frame, vendor.fetches = frame, []
+    latest = _latest_sma()["sma_10"]
+    assert vendor.fetches == [(frame["date"].iloc[59], "2026-12-31")]
+    assert latest["date"] == frame["date"].iloc[-1]
+    assert np.isclose(latest["value"], frame["close"].iloc[-10:].mean())
+
+
+def test_latest_only_rebuilds_across_a_gap(vendor):
+    frame = pd.DataFrame(_bars()[0])
+    _latest_sma()
+
+    # The state's last bar is no longer served, so the new bars cannot be chained onto it
+    vendor.frame, vendor.fetches = frame.drop(index=59), []
+    latest = _latest_sma()["sma_10"]
+    assert vendor.fetches == [(frame["date"].iloc[59], "2026-12-31"), ("2026-01-01", "2026-12-31")]
+    assert np.isclose(latest["value"], vendor.frame["close"].iloc[-10:].mean())
+
+
+def test_latest_keeps_parameter_variants_apart(vendor):
+    latest = indicator_service.get_latest_indicator_values(
+        "VCB", {"bb": [(20, 2.0), (20, 2.5)], "macd": [(12, 26, 9), (12, 26, 5)]}, "2026-01-01", "2026-12-31"
+    )
+    assert set(latest) == {"bb_20_2", "bb_20_2.5", "macd_12_26_9", "macd_12_26_5"}
+    assert latest["bb_20_2"]["value"]["upper"] < latest["bb_20_2.5"]["value"]["upper"]
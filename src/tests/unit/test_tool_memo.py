@@ -0,0 +1,141 @@
+"""
+Unit tests for the tool-result memo.
+"""
+
+import pytest
+
+from application.agents import tool_memo
+from application.agents.tool_memo import ToolMemo, canonical_query, memoized_tool
+from infrastructure.observability.logging.logger import request_id_var
+from shared.utils.time_processor import TimeProcessor
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def memo(monkeypatch):
+    # A fresh memo and no ambient request id, whatever earlier tests left behind
+    memo = ToolMemo()
+    clock = _Clock()
+    monkeypatch.setattr(tool_memo, "_tool_memo", memo)
+    monkeypatch.setattr(tool_memo, "time", clock)
+    memo.clock = clock
+    token = request_id_var.set(None)
+    yield memo
+    request_id_var.reset(token)
+
+
+def _counting_tool(result='{\n  "VCB": 1\n}'):
+    calls = []
+
+    @memoized_tool("price_query", "TOOL_ERR#")
+    def run(query=None):
+        calls.append(query)
+        return result if not callable(result) else result(query)
+
+    return run, calls
+
+
+def test_canonical_query_resolves_relative_time():
+    resolved = TimeProcessor().process_time_params({"days": 7})
+    relative = {"tickers": ["vcb"], "days": 7, "interval": None, "query_type": "price_query"}
+    absolute = {"end": resolved["end_date"], "start": resolved["start_date"], "tickers": ["VCB"]}
+
+    assert canonical_query(relative) == canonical_query(absolute)
+    assert canonical_query({"tickers": ["VCB"], "days": 7}) != canonical_query({"tickers": ["VCB"], "days": 30})
+    assert canonical_query({"tickers": ["VCB", "BID"]}) != canonical_query({"tickers": ["BID", "VCB"]})
+
+
+def test_repeat_calls_return_the_serialized_result(memo):
+    run, calls = _counting_tool()
+
+    first = run({"tickers": ["VCB"], "days": 7})
+    second = run({"tickers": ["vcb"], "days": 7, "interval": None})
+    assert second is first
+    assert len(calls) == 1
+    assert memo.get_stats()["hits"] == 1
+
+    memo.clock.now += 61
+    run({"tickers": ["VCB"], "days": 7})
+    assert len(calls) == 2
+
+
+def test_errors_are_not_memoized(memo):
+    run, calls = _counting_tool('{\n  "error": "timeout"\n}')
+    run({"tickers": ["VCB"]})
+    run({"tickers": ["VCB"]})
+    assert len(calls) == 2
+
+    run, calls = _counting_tool("TOOL_ERR# boom")
+    run({"tickers": ["VCB"]})
+    run({"tickers": ["VCB"]})
+    assert len(calls) == 2
+
+    # A per-ticker failure inside an otherwise good result
+    run, calls = _counting_tool('{"VCB":{"rows":2},"HPG":{"error":"timeout"}}')
+    run({"tickers": ["VCB", "HPG"]})
+    run({"tickers": ["VCB", "HPG"]})
+    assert len(calls) == 2
+
+
+def test_request_scope_outlives_ttl(memo):
+    run, calls = _counting_tool()
+    token = request_id_var.set("req-1")
+    try:
+        with memo.request_scope("req-1"):
+            run({"tickers": ["VCB"]})
+            memo.clock.now += 3600
+            run({"tickers": ["VCB"]})
+            assert len(calls) == 1
+        assert memo.get_stats()["requests"] == 0
+
+        # Once the request has ended the same id gets no stale results
+        run({"tickers": ["VCB"]})
+        assert len(calls) == 2
+    finally:
+        request_id_var.reset(token)
+
+
+def test_untagged_calls_only_use_the_ttl(memo):
+    run, calls = _counting_tool()
+    token = request_id_var.set("unknown")
+    try:
+        run({"tickers": ["VCB"]})
+        memo.clock.now += 61
+        run({"tickers": ["VCB"]})
+        assert len(calls) == 2
+        assert memo.get_stats()["requests"] == 0
+    finally:
+        request_id_var.reset(token)
+
+
+def test_request_layer_is_bounded(memo):
+    memo.max_request_entries = 3
+    run, calls = _counting_tool(lambda q: f'{{"{q["tickers"][0]}":1}}')
+    token = request_id_var.set("req-2")
+    try:
+        with memo.request_scope("req-2"):
+            for ticker in ["A", "B", "C", "D", "E"]:
+                run({"tickers": [ticker]})
+            assert len(memo._requests["req-2"]) == 3
+    finally:
+        request_id_var.reset(token)
+
+
+def test_stateful_tools_are_not_memoized(memo):
+    calls = []
+
+    @memoized_tool("alert_query", "TOOL_ERR#")
+    def run(query=None):
+        calls.append(query)
+        return "{}"
+
+    run({"tickers": ["VCB"], "action": "watch"})
+    run({"tickers": ["VCB"], "action": "watch"})
+    assert len(calls) == 2
@@ -13,6 +13,7 @@ from infrastructure.llm.extractors import (
     AlertExtractor,
     ForecastExtractor,
     SectorExtractor,
+    ScreeningExtractor,
 )
 from infrastructure.llm.extractors.aggregate_extractor import AggregateParams
 from infrastructure.llm.extractors.comparison_extractor import ComparisonParams
@@ -26,7 +27,9 @@ from infrastructure.llm.extractors.portfolio_extractor import PortfolioParams
 from infrastructure.llm.extractors.alert_extractor import AlertParams
 from infrastructure.llm.extractors.forecast_extractor import ForecastParams
 from infrastructure.llm.extractors.sector_extractor import SectorParams
+from infrastructure.llm.extractors.screening_extractor import ScreeningParams
 from infrastructure.llm.extractors import BaseExtractor
+from domain.schemas.alert import AlertQueryParams
 
 
 class TestIntentClassifier:
@@ -100,6 +103,11 @@ class TestIntentClassifier:
         result = classifier._fallback_classify("Hiệu suất ngành ngân hàng thế nào?")
         assert result == "sector"
 
+    def test_classify_fallback_keyword_screening(self):
+        classifier = IntentClassifier()
+        result = classifier._fallback_classify("Lọc cổ phiếu ngân hàng có ROE > 15% và PE < 10")
+        assert result == "screening"
+
     def test_classify_fallback_default_price(self):
         classifier = IntentClassifier()
         result = classifier._fallback_classify("một câu hỏi không xác định abcxyz")
@@ -273,6 +281,15 @@ class TestExtractorParams:
         assert d["condition"] == "below"
         assert d["timeframe"] == "1h"
 
+    def test_alert_list_and_cancel_need_no_rule_fields(self):
+        listing = AlertExtractor._to_dict(AlertParams.model_validate_json('{"action": "list", "status": "triggered"}'))
+        assert listing["action"] == "list" and listing["status"] == "triggered"
+        assert listing["tickers"] == [] and listing["threshold"] is None
+
+        cancel = AlertExtractor._to_dict(AlertParams.model_validate_json('{"action": "cancel", "alert_ids": [3, 5]}'))
+        assert cancel["alert_ids"] == [3, 5]
+        assert AlertQueryParams(**cancel).alert_ids == [3, 5]
+
     def test_forecast_params_defaults(self):
         p = ForecastParams(tickers=["VCB"])
         assert p.timeframe == "1w"
@@ -298,6 +315,21 @@ class TestExtractorParams:
         assert d["metric"] == "volume"
         assert d["timeframe"] == "1d"
 
+    def test_screening_to_dict(self):
+        p = ScreeningParams(
+            filters=[{"field": "roe", "op": ">", "value": 15}],
+            sector="banking",
+            sort_by="pe",
+            limit=5,
+        )
+        d = ScreeningExtractor._to_dict(p)
+        assert d["query_type"] == "screening_query"
+        assert d["filters"] == [{"field": "roe", "op": ">", "value": 15.0}]
+        assert d["sector"] == "banking"
+        assert d["sort_by"] == "pe"
+        assert d["limit"] == 5
+        assert "tickers" not in d
+
 
 class TestTwoPhaseParserRouting:
     def test_intent_to_query_type_all_12(self):
@@ -322,6 +354,7 @@ class TestTwoPhaseParserRouting:
         assert _INTENT_TO_QUERY_TYPE["alert"] == "alert_query"
         assert _INTENT_TO_QUERY_TYPE["forecast"] == "forecast_query"
         assert _INTENT_TO_QUERY_TYPE["sector"] == "sector_query"
+        assert _INTENT_TO_QUERY_TYPE["screening"] == "screening_query"
 
 
 class TestExtractorFallbackDicts: